@@ -7,9 +7,6 @@ from flask import Flask, send_from_directory, render_template, request, jsonify,
 import json
 import uuid
 import time
-import qrcode
-import io
-import base64
 import secrets
 import hashlib
 from datetime import datetime, timedelta
@@ -19,6 +16,8 @@ import boto3
 from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
 
+from qr_rendering_service import qr_renderer, website_qr_pool
+
 # Real CSRF token generation
 def csrf_token():
     return secrets.token_urlsafe(32)
@@ -997,10 +996,11 @@ def qr_login():
 def generate_website_qr():
     """Generate QR code for website authentication"""
     try:
-        # Generate a temporary token for website QR display
-        token_id = str(uuid.uuid4())
+        # Take a pre-generated token whose QR image is already rendered
         created_at = datetime.utcnow()
         expires_at = created_at + timedelta(minutes=10)
+        pooled = website_qr_pool.acquire()
+        token_id = pooled['token_id']
         
         # Store the token for later verification
         qr_tokens[token_id] = {
@@ -1012,16 +1012,8 @@ def generate_website_qr():
             'website_generated': True
         }
         
-        # Create QR code data
-        qr_data = {
-            'token': token_id,
-            'domain': 'ieltsaiprep.com',
-            'type': 'website_auth',
-            'timestamp': int(created_at.timestamp())
-        }
-        
-        # Generate QR code image
-        qr_code_image = generate_qr_code(json.dumps(qr_data))
+        # Inline SVG data URI: works from any worker and inside the mobile app
+        qr_code_image = qr_renderer.svg_data_uri(svg=pooled['svg'])
         
         return jsonify({
             'success': True,
@@ -1216,14 +1208,28 @@ def health_check():
             'timestamp': datetime.utcnow().isoformat()
         }), 500
 
+@app.route('/api/metrics/safety', methods=['GET'])
+def safety_metrics():
+    """Content safety counters summed across threads and worker processes (admin only)"""
+    try:
+        from lambda_security import is_admin_request
+        if not is_admin_request(request.headers):
+            return jsonify({'success': False, 'error': 'Admin authorization required'}), 403
+        
+        from content_safety import get_safety_metrics
+        return jsonify(get_safety_metrics())
+        
+    except Exception as e:
+        print(f"[CLOUDWATCH] Safety metrics failed: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'error': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }), 500
+
 def generate_qr_code(data):
     """Generate QR code image as base64 string"""
-    qr = qrcode.make(data)
-    
-    # Convert to base64
-    buffer = io.BytesIO()
-    qr.save(buffer, format='PNG')
-    img_str = base64.b64encode(buffer.getvalue()).decode()
+    img_str = qr_renderer.render_png_base64(data)
     
     return f"data:image/png;base64,{img_str}"
 
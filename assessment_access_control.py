@@ -11,6 +11,7 @@ from functools import wraps
 
 from payment_sync_service import get_payment_sync_service, PurchaseProductType
 from dynamodb_dal import get_dal
+from request_loader import request_scoped
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +30,7 @@ class AssessmentAccessController:
             'general_writing': PurchaseProductType.GENERAL_WRITING
         }
     
+    @request_scoped
     def check_assessment_access(self, user_email: str, assessment_type: str, 
                                auto_refresh: bool = True) -> Dict[str, Any]:
         """
@@ -134,6 +136,7 @@ class AssessmentAccessController:
                 'details': str(e)
             }
     
+    @request_scoped
     def use_assessment_attempt(self, user_email: str, assessment_type: str) -> Dict[str, Any]:
         """
         Use one assessment attempt for the user
@@ -146,24 +149,36 @@ class AssessmentAccessController:
             Dict with success status and remaining attempts
         """
         try:
-            # First check if user has access
-            access_check = self.check_assessment_access(user_email, assessment_type)
-            if not access_check['has_access']:
+            if assessment_type not in self.assessment_types:
                 return {
                     'success': False,
-                    'error': 'No access to this assessment',
-                    'details': access_check
+                    'error': 'Invalid assessment type',
+                    'valid_types': list(self.assessment_types.keys())
                 }
             
-            # Use the attempt
-            success = self.dal.use_assessment_attempt(user_email, assessment_type)
-            if not success:
-                return {
-                    'success': False,
-                    'error': 'Failed to use assessment attempt'
-                }
+            # Atomic conditional decrement (None when no entitlement had a use left)
+            consumed = self.dal.consume_assessment_attempt(user_email, assessment_type)
+            
+            if consumed is None:
+                # Nothing to consume: the full access check explains why and may refresh
+                # purchases from the stores, after which the consume is retried once
+                access_check = self.check_assessment_access(user_email, assessment_type)
+                if not access_check['has_access']:
+                    return {
+                        'success': False,
+                        'error': 'No access to this assessment',
+                        'details': access_check
+                    }
+                
+                consumed = self.dal.consume_assessment_attempt(user_email, assessment_type)
+                if consumed is None:
+                    return {
+                        'success': False,
+                        'error': 'Failed to use assessment attempt'
+                    }
             
-            # Get updated attempt count
+            # The consume returns the count of the one entitlement it used; report the total across
+            # all of the user's entitlements for this type (the consume invalidated the cached ones)
             new_attempts = self._get_remaining_attempts(user_email, assessment_type)
             
             logger.info(f"Assessment attempt used for {user_email} - {assessment_type}, {new_attempts} remaining")
@@ -182,6 +197,7 @@ class AssessmentAccessController:
                 'error': 'Internal error using attempt'
             }
     
+    @request_scoped
     def get_user_assessment_overview(self, user_email: str) -> Dict[str, Any]:
         """
         Get comprehensive assessment access overview for user
@@ -274,6 +290,7 @@ def require_assessment_access(assessment_type_param: str = 'assessment_type'):
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
+        @request_scoped
         def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             try:
                 # Extract user email and assessment type from event
@@ -6,12 +6,15 @@ This module loads and prepares IELTS assessment context data from provided conte
 import os
 import json
 import logging
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=None)
 def load_writing_context_data():
     """
     Load context data from the IELTS Writing Context File.
+    Built once per process; the returned dict is shared, so treat it as read-only.
     
     Returns:
         dict: Structured IELTS Writing assessment context data
@@ -127,9 +130,11 @@ A well-structured General Training Task 2 essay should have:
         logger.error(f"Error loading writing context data: {str(e)}")
         return context_data
 
+@lru_cache(maxsize=None)
 def load_speaking_context_data():
     """
     Load context data from the IELTS Speaking Context File.
+    Built once per process; the returned dict is shared, so treat it as read-only.
     
     Returns:
         dict: Structured IELTS Speaking assessment context data
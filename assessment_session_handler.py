@@ -11,6 +11,7 @@ from typing import Dict, Any
 from lambda_security import apply_security
 from assessment_access_control import get_assessment_controller
 from question_bank_dal import get_question_bank_dal
+from request_loader import request_scoped
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ logger = logging.getLogger(__name__)
     validate_input=True,
     require_auth=True
 )
+@request_scoped
 def handle_start_assessment_session(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Start new assessment session with question selection
@@ -4,17 +4,28 @@ Provides JWT token generation and verification for mobile API clients
 Integrates with unified User model and AWS Secrets Manager
 """
 import json
+import time
+import hashlib
 import datetime
+import threading
 import jwt
+from collections import OrderedDict
 from functools import wraps
 from flask import current_app, request, jsonify, g
 # Using DynamoDB UserDAL instead of SQLAlchemy models
 # from dynamodb_dal import UserDAL  # Import when needed in specific functions
-from aws_secrets_manager import get_jwt_config
+from aws_secrets_manager import get_jwt_config, JWT_LEGACY_KID
 import logging
 
 logger = logging.getLogger(__name__)
 
+# How long key material is held in memory before re-reading Secrets Manager
+JWT_KEY_REFRESH_SECONDS = 300
+# Minimum gap between forced refreshes triggered by an unknown kid
+JWT_UNKNOWN_KID_REFRESH_SECONDS = 30
+# Maximum number of verified tokens kept in the decoded-claims cache
+JWT_CLAIMS_CACHE_SIZE = 10000
+
 
 def generate_jwt_token(user_id):
     """
@@ -42,7 +53,8 @@ def generate_jwt_token(user_id):
         token = jwt.encode(
             payload, 
             jwt_config['SECRET_KEY'], 
-            jwt_config['ALGORITHM']
+            jwt_config['ALGORITHM'],
+            headers={'kid': jwt_config.get('ACTIVE_KID', JWT_LEGACY_KID)}
         )
         return token
         
@@ -51,6 +63,143 @@ def generate_jwt_token(user_id):
         raise RuntimeError("Token generation failed")
 
 
+class JWTVerifier:
+    """
+    In-memory JWT verifier with key rotation and a decoded-claims LRU
+    
+    Key material is loaded from Secrets Manager once per refresh interval and indexed by kid,
+    so several keys can be accepted during rotation. Successfully verified tokens are cached
+    by SHA-256 hash until their exp, skipping jwt.decode for repeat requests.
+    """
+    
+    def __init__(self, cache_size=JWT_CLAIMS_CACHE_SIZE, refresh_seconds=JWT_KEY_REFRESH_SECONDS):
+        self.cache_size = cache_size
+        self.refresh_seconds = refresh_seconds
+        self._keys = {}
+        self._keys_loaded_at = 0.0
+        self._last_forced_refresh = 0.0
+        self._claims_cache = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _load_keys(self):
+        jwt_config = get_jwt_config()
+        keys = jwt_config.get('KEYS') or {
+            JWT_LEGACY_KID: {'SECRET_KEY': jwt_config['SECRET_KEY'], 'ALGORITHM': jwt_config['ALGORITHM']}
+        }
+        with self._lock:
+            self._keys = keys
+            self._keys_loaded_at = time.monotonic()
+            # Drop cached claims signed by keys that are no longer accepted
+            for token_hash in [h for h, (_, kid, _) in self._claims_cache.items() if kid not in keys]:
+                del self._claims_cache[token_hash]
+    
+    def _get_key(self, kid):
+        # Tokens issued before key rotation carry no kid and were signed with the legacy key
+        kid = kid or JWT_LEGACY_KID
+        now = time.monotonic()
+        if not self._keys or now - self._keys_loaded_at > self.refresh_seconds:
+            self._load_keys()
+        
+        key = self._keys.get(kid)
+        if key is None and now - self._last_forced_refresh > JWT_UNKNOWN_KID_REFRESH_SECONDS:
+            # A new kid may have been rotated in since the last load
+            self._last_forced_refresh = now
+            self._load_keys()
+            key = self._keys.get(kid)
+        return key
+    
+    def _cached_claims(self, token_hash):
+        with self._lock:
+            entry = self._claims_cache.get(token_hash)
+            if entry is None:
+                return None
+            payload, kid, exp = entry
+            if exp <= time.time() or kid not in self._keys:
+                del self._claims_cache[token_hash]
+                return None
+            self._claims_cache.move_to_end(token_hash)
+            return dict(payload)
+    
+    def _cache_claims(self, token_hash, payload, kid):
+        exp = payload.get('exp')
+        if exp is None:
+            return
+        with self._lock:
+            self._claims_cache[token_hash] = (dict(payload), kid, float(exp))
+            self._claims_cache.move_to_end(token_hash)
+            while len(self._claims_cache) > self.cache_size:
+                self._claims_cache.popitem(last=False)
+    
+    def verify(self, token):
+        """
+        Verify a JWT token
+        
+        Args:
+            token: JWT token to verify
+            
+        Returns:
+            dict: Token payload if valid, None otherwise
+        """
+        token_hash = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        payload = self._cached_claims(token_hash)
+        if payload is not None:
+            return payload
+        
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+            key = self._get_key(kid)
+            if key is None:
+                logger.error(f"Unknown JWT key id: {kid}")
+                return None
+            
+            payload = jwt.decode(
+                token, 
+                key['SECRET_KEY'], 
+                algorithms=[key['ALGORITHM']],
+                audience='mobile-app',
+                issuer='ielts-genai-prep'
+            )
+            self._cache_claims(token_hash, payload, kid or JWT_LEGACY_KID)
+            return payload
+        except jwt.ExpiredSignatureError:
+            logger.error("JWT token has expired")
+            return None
+        except jwt.InvalidTokenError:
+            logger.error("Invalid JWT token")
+            return None
+        except Exception as e:
+            logger.error(f"JWT verification failed: {e}")
+            return None
+    
+    def verify_many(self, tokens):
+        """
+        Verify a batch of tokens (e.g. WebSocket fan-out), decoding each distinct token once
+        
+        Args:
+            tokens: Iterable of JWT tokens
+            
+        Returns:
+            list: Payload dict or None for each token, in input order
+        """
+        tokens = list(tokens)
+        results = {}
+        for token in tokens:
+            if token not in results:
+                results[token] = self.verify(token) if token else None
+        return [dict(results[token]) if results[token] else None for token in tokens]
+    
+    def clear(self):
+        """Forget cached claims and key material (forces a Secrets Manager reload)"""
+        with self._lock:
+            self._claims_cache.clear()
+            self._keys = {}
+            self._keys_loaded_at = 0.0
+
+
+# Global verifier shared by every request in the container
+jwt_verifier = JWTVerifier()
+
+
 def verify_jwt_token(token):
     """
     Verify a JWT token using AWS Secrets Manager configuration
@@ -61,26 +210,20 @@ def verify_jwt_token(token):
     Returns:
         dict: Token payload if valid, None otherwise
     """
-    try:
-        jwt_config = get_jwt_config()
+    return jwt_verifier.verify(token)
+
+
+def verify_jwt_tokens(tokens):
+    """
+    Verify several JWT tokens at once
+    
+    Args:
+        tokens: List of JWT tokens
         
-        payload = jwt.decode(
-            token, 
-            jwt_config['SECRET_KEY'], 
-            algorithms=[jwt_config['ALGORITHM']],
-            audience='mobile-app',
-            issuer='ielts-genai-prep'
-        )
-        return payload
-    except jwt.ExpiredSignatureError:
-        logger.error("JWT token has expired")
-        return None
-    except jwt.InvalidTokenError:
-        logger.error("Invalid JWT token")
-        return None
-    except Exception as e:
-        logger.error(f"JWT verification failed: {e}")
-        return None
+    Returns:
+        list: Payload dict or None for each token
+    """
+    return jwt_verifier.verify_many(tokens)
 
 
 def jwt_required(f):
@@ -0,0 +1,376 @@
+"""
+Section Auto-Advance Scheduler
+Hierarchical timer wheel for long-running workers plus a durable due-time index swept by a
+scheduled Lambda, so timed sections expire without clients polling for time remaining
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Timer wheel geometry: 4 levels of 64 one-second slots cover ~194 days
+WHEEL_TICK_SECONDS = 1.0
+WHEEL_SLOTS = 64
+WHEEL_LEVELS = 4
+
+# Due-time index partitioning (DynamoDB): hourly buckets, sharded to spread writes
+AUTO_ADVANCE_BUCKET_SECONDS = 3600
+AUTO_ADVANCE_SHARDS = 4
+# Buckets older than this are not swept (sections are at most 40 minutes long)
+SWEEP_LOOKBACK_SECONDS = 2 * 3600
+
+SWEEP_BATCH_SIZE = 100
+
+AUTO_ADVANCE_GSI = 'auto-advance-index'
+
+
+@dataclass(frozen=True)
+class AutoAdvanceTimer:
+    """A section that auto-advances at due_at (epoch seconds)"""
+    session_id: str
+    user_id: str
+    section_id: str
+    due_at: float
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.session_id, self.section_id
+
+
+FireCallback = Callable[[List[AutoAdvanceTimer]], None]
+
+
+def _epoch(value) -> float:
+    """Epoch seconds from a number or a datetime (naive datetimes are UTC, as stored by the session manager)"""
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+    return float(value)
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel (O(1) schedule/cancel, amortized O(1) per tick)
+
+    Level 0 slots are one tick wide; each higher level is WHEEL_SLOTS times coarser and
+    cascades its timers down when the lower level wraps.
+    """
+
+    def __init__(self, tick_seconds: float = WHEEL_TICK_SECONDS, slots: int = WHEEL_SLOTS,
+                 levels: int = WHEEL_LEVELS, now: Optional[float] = None):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self.levels = levels
+        self._wheels: List[List[List[AutoAdvanceTimer]]] = [[[] for _ in range(slots)] for _ in range(levels)]
+        self._timers: Dict[Tuple[str, str], AutoAdvanceTimer] = {}
+        self._tick = self._to_tick(time.time() if now is None else now)
+        self._lock = threading.Lock()
+
+    def _to_tick(self, ts: float) -> int:
+        return int(ts // self.tick_seconds)
+
+    def _due_tick(self, due_at: float) -> int:
+        # First tick at or after the due time, so timers never fire early
+        return -int(-due_at // self.tick_seconds)
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def _place(self, timer: AutoAdvanceTimer):
+        due_tick = max(self._due_tick(timer.due_at), self._tick + 1)
+        delta = due_tick - self._tick
+        level = 0
+        while level < self.levels - 1 and delta >= self.slots ** (level + 1):
+            level += 1
+        slot = (due_tick // self.slots ** level) % self.slots
+        self._wheels[level][slot].append(timer)
+
+    def schedule(self, timer: AutoAdvanceTimer):
+        """Add or replace the timer for (session_id, section_id)"""
+        with self._lock:
+            self._timers[timer.key] = timer
+            self._place(timer)
+
+    def cancel(self, session_id: str, section_id: str) -> bool:
+        # Slot entries are dropped lazily when their slot comes round
+        with self._lock:
+            return self._timers.pop((session_id, section_id), None) is not None
+
+    def advance(self, now: Optional[float] = None) -> List[AutoAdvanceTimer]:
+        """Move the wheel to now and return the timers that fell due"""
+        target = self._to_tick(time.time() if now is None else now)
+        expired = []
+        with self._lock:
+            while self._tick < target:
+                self._tick += 1
+                # Cascade coarser levels whose slot boundary was just crossed
+                for level in range(1, self.levels):
+                    if self._tick % self.slots ** level:
+                        break
+                    slot = (self._tick // self.slots ** level) % self.slots
+                    bucket, self._wheels[level][slot] = self._wheels[level][slot], []
+                    for timer in bucket:
+                        if self._timers.get(timer.key) is timer:
+                            self._place_or_expire(timer, expired)
+                bucket, self._wheels[0][self._tick % self.slots] = self._wheels[0][self._tick % self.slots], []
+                for timer in bucket:
+                    if self._timers.get(timer.key) is timer:
+                        self._place_or_expire(timer, expired)
+        return expired
+
+    def _place_or_expire(self, timer: AutoAdvanceTimer, expired: List[AutoAdvanceTimer]):
+        if self._due_tick(timer.due_at) <= self._tick:
+            del self._timers[timer.key]
+            expired.append(timer)
+        else:
+            self._place(timer)
+
+
+class DueTimeIndex:
+    """Durable index of pending auto-advance timers"""
+
+    def add(self, timer: AutoAdvanceTimer):
+        raise NotImplementedError
+
+    def remove(self, session_id: str, section_id: str):
+        raise NotImplementedError
+
+    def due(self, now: float, limit: int) -> List[AutoAdvanceTimer]:
+        """Timers due at or before now, oldest first"""
+        raise NotImplementedError
+
+    def claim(self, timer: AutoAdvanceTimer) -> bool:
+        """Atomically remove a due timer; only the caller that claims it may fire it"""
+        raise NotImplementedError
+
+
+class SQLiteDueTimeIndex(DueTimeIndex):
+    """Local stand-in for the DynamoDB index (development and single-host workers)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get('AUTO_ADVANCE_INDEX_PATH', '/tmp/ielts-auto-advance.db')
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS auto_advance ("
+                " session_id TEXT NOT NULL, section_id TEXT NOT NULL, user_id TEXT NOT NULL,"
+                " due_at REAL NOT NULL, PRIMARY KEY (session_id, section_id))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS auto_advance_due ON auto_advance (due_at)")
+
+    def add(self, timer: AutoAdvanceTimer):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO auto_advance (session_id, section_id, user_id, due_at) VALUES (?, ?, ?, ?)",
+                (timer.session_id, timer.section_id, timer.user_id, timer.due_at)
+            )
+
+    def remove(self, session_id: str, section_id: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM auto_advance WHERE session_id = ? AND section_id = ?", (session_id, section_id)
+            )
+
+    def due(self, now: float, limit: int) -> List[AutoAdvanceTimer]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, user_id, section_id, due_at FROM auto_advance"
+                " WHERE due_at <= ? ORDER BY due_at LIMIT ?", (now, limit)
+            ).fetchall()
+        return [AutoAdvanceTimer(*row) for row in rows]
+
+    def claim(self, timer: AutoAdvanceTimer) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM auto_advance WHERE session_id = ? AND section_id = ? AND due_at = ?",
+                (timer.session_id, timer.section_id, timer.due_at)
+            )
+        return cursor.rowcount == 1
+
+
+class DynamoDBDueTimeIndex(DueTimeIndex):
+    """
+    Sparse GSI on the sessions table
+
+    A session carries auto_advance_bucket / auto_advance_at only while a timed section is
+    running, so the index holds exactly the pending timers and is queried by hourly bucket.
+    """
+
+    def __init__(self, table=None):
+        if table is None:
+            from dynamodb_dal import get_dal
+            stage = os.environ.get('STAGE', 'prod')
+            # The SessionsTable that carries the auto-advance-index GSI (template.yaml)
+            table_name = os.environ.get('DYNAMODB_SESSIONS_TABLE', f'ielts-genai-prep-sessions-{stage}')
+            table = get_dal().connection.get_table(table_name)
+        self.table = table
+
+    @staticmethod
+    def bucket(due_at: float, shard: int) -> str:
+        hour = datetime.utcfromtimestamp(due_at - due_at % AUTO_ADVANCE_BUCKET_SECONDS)
+        return f"{hour.strftime('%Y%m%d%H')}#{shard}"
+
+    @staticmethod
+    def _shard(session_id: str) -> int:
+        return sum(session_id.encode('utf-8')) % AUTO_ADVANCE_SHARDS
+
+    def add(self, timer: AutoAdvanceTimer):
+        from decimal import Decimal
+        self.table.update_item(
+            Key={'session_id': timer.session_id},
+            UpdateExpression=(
+                'SET auto_advance_bucket = :bucket, auto_advance_at = :due, '
+                'auto_advance_section = :section, auto_advance_user = :user'
+            ),
+            ExpressionAttributeValues={
+                ':bucket': self.bucket(timer.due_at, self._shard(timer.session_id)),
+                ':due': Decimal(str(timer.due_at)),
+                ':section': timer.section_id,
+                ':user': timer.user_id
+            }
+        )
+
+    def _remove(self, session_id: str, section_id: str, due_at: Optional[float] = None) -> bool:
+        from decimal import Decimal
+        from botocore.exceptions import ClientError
+
+        condition = 'auto_advance_section = :section'
+        values = {':section': section_id}
+        if due_at is not None:
+            condition += ' AND auto_advance_at = :due'
+            values[':due'] = Decimal(str(due_at))
+        try:
+            self.table.update_item(
+                Key={'session_id': session_id},
+                UpdateExpression='REMOVE auto_advance_bucket, auto_advance_at, auto_advance_section, auto_advance_user',
+                ConditionExpression=condition,
+                ExpressionAttributeValues=values
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def remove(self, session_id: str, section_id: str):
+        self._remove(session_id, section_id)
+
+    def due(self, now: float, limit: int) -> List[AutoAdvanceTimer]:
+        from decimal import Decimal
+        from boto3.dynamodb.conditions import Key
+
+        timers = []
+        start = now - SWEEP_LOOKBACK_SECONDS
+        hours = range(int(start // AUTO_ADVANCE_BUCKET_SECONDS), int(now // AUTO_ADVANCE_BUCKET_SECONDS) + 1)
+        for hour in hours:
+            for shard in range(AUTO_ADVANCE_SHARDS):
+                response = self.table.query(
+                    IndexName=AUTO_ADVANCE_GSI,
+                    KeyConditionExpression=(
+                        Key('auto_advance_bucket').eq(self.bucket(hour * AUTO_ADVANCE_BUCKET_SECONDS, shard))
+                        & Key('auto_advance_at').lte(Decimal(str(now)))
+                    ),
+                    Limit=limit
+                )
+                timers.extend(
+                    AutoAdvanceTimer(item['session_id'], item['auto_advance_user'],
+                                     item['auto_advance_section'], float(item['auto_advance_at']))
+                    for item in response.get('Items', [])
+                )
+        timers.sort(key=lambda t: t.due_at)
+        return timers[:limit]
+
+    def claim(self, timer: AutoAdvanceTimer) -> bool:
+        return self._remove(timer.session_id, timer.section_id, timer.due_at)
+
+
+class AutoAdvanceScheduler:
+    """Schedules section auto-advance in the durable index and, in workers, the timer wheel"""
+
+    def __init__(self, index: DueTimeIndex, wheel: Optional[TimerWheel] = None):
+        self.index = index
+        self.wheel = wheel or TimerWheel()
+        self._worker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def worker_running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive() and not self._stop.is_set()
+
+    def schedule(self, session_id: str, user_id: str, section_id: str, due_at) -> AutoAdvanceTimer:
+        timer = AutoAdvanceTimer(session_id, user_id, section_id, _epoch(due_at))
+        self.index.add(timer)
+        # Without a worker nothing advances the wheel; the sweep fires from the index alone
+        if self.worker_running:
+            self.wheel.schedule(timer)
+        return timer
+
+    def cancel(self, session_id: str, section_id: str):
+        self.wheel.cancel(session_id, section_id)
+        self.index.remove(session_id, section_id)
+
+    def _fire(self, timers: List[AutoAdvanceTimer], fire: FireCallback) -> int:
+        # Claiming through the index keeps the wheel and the sweeper from both firing a timer
+        claimed = [timer for timer in timers if self.index.claim(timer)]
+        if claimed:
+            fire(claimed)
+        return len(claimed)
+
+    def sweep(self, fire: FireCallback, now: Optional[float] = None,
+              batch_size: int = SWEEP_BATCH_SIZE) -> Dict[str, int]:
+        """Fire every due timer from the durable index, batch_size at a time"""
+        now = time.time() if now is None else now
+        stats = {'due': 0, 'fired': 0, 'batches': 0}
+        while True:
+            due = self.index.due(now, batch_size)
+            if not due:
+                break
+            fired = self._fire(due, fire)
+            stats['due'] += len(due)
+            stats['fired'] += fired
+            stats['batches'] += 1
+            if len(due) < batch_size or fired == 0:
+                break
+        return stats
+
+    def start_worker(self, fire: FireCallback):
+        """Drive the timer wheel on a daemon thread (long-running workers only)"""
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(self.wheel.tick_seconds):
+                expired = self.wheel.advance()
+                if expired:
+                    try:
+                        self._fire(expired, fire)
+                    except Exception as e:
+                        logger.error(f"Auto-advance worker batch failed: {e}")
+
+        self._worker = threading.Thread(target=run, name='auto-advance-wheel', daemon=True)
+        self._worker.start()
+
+    def stop_worker(self):
+        self._stop.set()
+
+
+# Global scheduler instance
+_scheduler = None
+
+def get_auto_advance_scheduler() -> AutoAdvanceScheduler:
+    """Get the configured scheduler (AUTO_ADVANCE_INDEX = sqlite | dynamodb)"""
+    global _scheduler
+    if _scheduler is None:
+        backend = os.environ.get('AUTO_ADVANCE_INDEX', 'sqlite').lower()
+        index = DynamoDBDueTimeIndex() if backend == 'dynamodb' else SQLiteDueTimeIndex()
+        _scheduler = AutoAdvanceScheduler(index)
+        logger.info(f"Auto-advance due-time index: {backend}")
+    return _scheduler
@@ -7,8 +7,16 @@ import os
 import json
 import time
 import uuid
+import threading
+from bisect import bisect_left, insort
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
+
+from pagination import (
+    DEFAULT_PAGE_SIZE, HISTORY_SUMMARY_FIELDS, clamp_page_size, decode_cursor, encode_cursor, project
+)
+from question_bank_index import get_question_bank_index
+import request_loader
 
 # Make bcrypt optional for AWS Lambda deployment
 try:
@@ -21,15 +29,26 @@ except ImportError:
 class MockDynamoDBTable:
     """Simulates DynamoDB table with TTL support"""
     
-    def __init__(self, table_name: str):
+    # BatchWriteItem accepts at most 25 requests per call
+    BATCH_WRITE_LIMIT = 25
+    
+    def __init__(self, table_name: str, key_attribute: Optional[str] = None,
+                 index_attribute: Optional[str] = None):
         self.table_name = table_name
+        self.key_attribute = key_attribute
+        # Simulated GSI: index_attribute value -> item keys
+        self.index_attribute = index_attribute
         self.items = {}
         self.gsi_indexes = {}
+        # Serializes conditional updates, as DynamoDB does per item
+        self._lock = threading.Lock()
     
     def put_item(self, item: Dict[str, Any]) -> bool:
         """Store item with automatic TTL cleanup"""
         # For users table, use email as key; for others, use their primary key
-        if self.table_name == 'ielts-genai-prep-users':
+        if self.key_attribute:
+            item_key = item.get(self.key_attribute)
+        elif self.table_name == 'ielts-genai-prep-users':
             item_key = item.get('email')
         else:
             item_key = item.get('user_id', item.get('session_id', item.get('email')))
@@ -41,7 +60,11 @@ class MockDynamoDBTable:
         item['_created_at'] = time.time()
         item['_table'] = self.table_name
         
+        if item_key in self.items:
+            self._unindex(item_key, self.items[item_key])
         self.items[item_key] = item
+        self._index(item_key, item)
+        request_loader.invalidate(self.table_name, item_key)
         self._cleanup_expired_items()
         
         print(f"[DYNAMODB] PUT {self.table_name}: {item_key}")
@@ -59,22 +82,93 @@ class MockDynamoDBTable:
             print(f"[DYNAMODB] GET {self.table_name}: {key} -> Not Found")
             return None
     
+    def batch_get(self, keys: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        """Read up to 100 items in one call (BatchGetItem); missing keys are left out"""
+        if len(keys) > request_loader.MAX_BATCH_SIZE:
+            raise ValueError(f"BatchGetItem accepts at most {request_loader.MAX_BATCH_SIZE} keys")
+        self._cleanup_expired_items()
+        found = {key: self.items[key] for key in keys if key in self.items}
+        print(f"[DYNAMODB] BATCH_GET {self.table_name}: {len(found)}/{len(keys)} found")
+        return found
+    
     def delete_item(self, key: str) -> bool:
         """Delete item"""
         if key in self.items:
-            del self.items[key]
+            self._unindex(key, self.items.pop(key))
+            request_loader.invalidate(self.table_name, key)
             print(f"[DYNAMODB] DELETE {self.table_name}: {key}")
             return True
         return False
     
+    def batch_delete(self, keys: List[Any]) -> List[Any]:
+        """Delete up to BATCH_WRITE_LIMIT items in one call; returns the unprocessed keys"""
+        if len(keys) > self.BATCH_WRITE_LIMIT:
+            raise ValueError(f"BatchWriteItem accepts at most {self.BATCH_WRITE_LIMIT} requests")
+        for key in keys:
+            self.delete_item(key)
+        print(f"[DYNAMODB] BATCH_WRITE {self.table_name}: {len(keys)} deletes")
+        return []
+    
+    def batch_put(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Put up to BATCH_WRITE_LIMIT items in one call; returns the items that were not stored"""
+        if len(items) > self.BATCH_WRITE_LIMIT:
+            raise ValueError(f"BatchWriteItem accepts at most {self.BATCH_WRITE_LIMIT} requests")
+        unprocessed = [item for item in items if not self.put_item(item)]
+        print(f"[DYNAMODB] BATCH_WRITE {self.table_name}: {len(items) - len(unprocessed)} puts")
+        return unprocessed
+    
     def update_item(self, key: str, updates: Dict[str, Any]) -> bool:
         """Update existing item"""
         if key in self.items:
+            self._unindex(key, self.items[key])
             self.items[key].update(updates)
+            self._index(key, self.items[key])
+            request_loader.invalidate(self.table_name, key)
             print(f"[DYNAMODB] UPDATE {self.table_name}: {key}")
             return True
         return False
     
+    def update_item_if(self, key: Any, condition: Callable[[Dict[str, Any]], bool],
+                       apply: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Atomic conditional update (UpdateItem with a ConditionExpression, ReturnValues=UPDATED_NEW)
+        
+        condition is evaluated and apply mutates the item under the table lock, so two
+        concurrent callers can never both pass the same condition.
+        
+        Returns:
+            The updated attributes from apply, or None if the item is missing or the condition fails
+        """
+        with self._lock:
+            item = self.items.get(key)
+            if item is None or not condition(item):
+                print(f"[DYNAMODB] CONDITIONAL_CHECK_FAILED {self.table_name}: {key}")
+                return None
+            self._unindex(key, item)
+            updated = apply(item)
+            self._index(key, item)
+            request_loader.invalidate(self.table_name, key)
+        print(f"[DYNAMODB] UPDATE {self.table_name}: {key} (conditional)")
+        return updated
+    
+    def keys_for(self, value: Any) -> List[Any]:
+        """Keys of items whose index_attribute equals value (a GSI keys-only query)"""
+        self._cleanup_expired_items()
+        return list(self.gsi_indexes.get(value, ()))
+    
+    def _index(self, key: Any, item: Dict[str, Any]):
+        value = item.get(self.index_attribute) if self.index_attribute else None
+        if value is not None:
+            self.gsi_indexes.setdefault(value, set()).add(key)
+    
+    def _unindex(self, key: Any, item: Dict[str, Any]):
+        value = item.get(self.index_attribute) if self.index_attribute else None
+        keys = self.gsi_indexes.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.gsi_indexes[value]
+    
     def scan(self, filter_expression: Optional[str] = None) -> list:
         """Scan table with optional filtering"""
         self._cleanup_expired_items()
@@ -93,15 +187,131 @@ class MockDynamoDBTable:
                 expired_keys.append(key)
         
         for key in expired_keys:
-            del self.items[key]
+            self._unindex(key, self.items.pop(key))
+            request_loader.invalidate(self.table_name, key)
             print(f"[DYNAMODB] TTL_EXPIRED {self.table_name}: {key}")
 
+class MockUserTimelineTable(MockDynamoDBTable):
+    """
+    Items keyed by key_attribute, with a per-user index ordered by sort_attribute
+    (simulates a GSI with user_email HASH and sort_attribute RANGE)
+    """
+
+    def __init__(self, table_name: str, key_attribute: str, sort_attribute: str):
+        super().__init__(table_name, key_attribute=key_attribute, index_attribute='user_email')
+        self.sort_attribute = sort_attribute
+        # user_email -> ascending [(sort value, key)]
+        self.user_index = {}
+
+    def put_item(self, item: Dict[str, Any]) -> bool:
+        """Store item and index it under its user"""
+        item.setdefault(self.sort_attribute, datetime.utcnow().isoformat())
+        return super().put_item(item)
+
+    def _index(self, key: Any, item: Dict[str, Any]):
+        user_email = item.get('user_email')
+        if user_email:
+            insort(self.user_index.setdefault(user_email, []), (item[self.sort_attribute], key))
+
+    def _unindex(self, key: Any, item: Dict[str, Any]):
+        entries = self.user_index.get(item.get('user_email'))
+        if not entries:
+            return
+        entry = (item.get(self.sort_attribute), key)
+        position = bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+        if not entries:
+            del self.user_index[item.get('user_email')]
+
+    def query_user_history(self, user_email: str, limit: int,
+                           exclusive_start_key: Optional[Dict[str, Any]] = None,
+                           projection: Optional[tuple] = None) -> Dict[str, Any]:
+        """
+        Newest-first page of a user's items
+
+        Returns:
+            {'Items': [...], 'LastEvaluatedKey': {...} or None} like a DynamoDB Query
+        """
+        self._cleanup_expired_items()
+        entries = self.user_index.get(user_email, [])
+
+        if exclusive_start_key:
+            end = bisect_left(entries, (exclusive_start_key.get(self.sort_attribute, ''),
+                                        exclusive_start_key.get(self.key_attribute, '')))
+        else:
+            end = len(entries)
+
+        items = []
+        position = end
+        while position > 0 and len(items) < limit:
+            position -= 1
+            item = self.items.get(entries[position][1])
+            if item:  # Entries of TTL-expired items are skipped
+                items.append(project(item, projection))
+
+        last_key = None
+        if position > 0 and entries:
+            sort_value, key = entries[position]
+            last_key = {'user_email': user_email, self.sort_attribute: sort_value, self.key_attribute: key}
+
+        print(f"[DYNAMODB] QUERY {self.table_name} user-history-index: {user_email} -> {len(items)} items")
+        return {'Items': items, 'LastEvaluatedKey': last_key}
+
+    def keys_for(self, user_email: str) -> List[str]:
+        """All item keys stored for a user"""
+        self._cleanup_expired_items()
+        return [key for _, key in self.user_index.get(user_email, [])]
+
+class MockAssessmentResultsTable(MockUserTimelineTable):
+    """Assessment results keyed by assessment_id (user-history-index: user_email HASH, timestamp RANGE)"""
+
+    def __init__(self, table_name: str):
+        super().__init__(table_name, key_attribute='assessment_id', sort_attribute='timestamp')
+
+class MockCompletedAssessmentLog(MockUserTimelineTable):
+    """
+    Append-only log of completed assessments, one item per completion (user_email, completed_at)
+
+    Maintains a read model of the questions each user has used per assessment type.
+    """
+
+    def __init__(self, table_name: str):
+        super().__init__(table_name, key_attribute='completion_id', sort_attribute='completed_at')
+        # (user_email, assessment_type) -> {question_id: completions}
+        self.used_questions = {}
+
+    def _index(self, key: Any, item: Dict[str, Any]):
+        super()._index(key, item)
+        question_id = item.get('question_id')
+        if question_id:
+            used = self.used_questions.setdefault((item.get('user_email'), item.get('assessment_type')), {})
+            used[question_id] = used.get(question_id, 0) + 1
+
+    def _unindex(self, key: Any, item: Dict[str, Any]):
+        super()._unindex(key, item)
+        pool = (item.get('user_email'), item.get('assessment_type'))
+        used = self.used_questions.get(pool)
+        question_id = item.get('question_id')
+        if used and question_id in used:
+            used[question_id] -= 1
+            if not used[question_id]:
+                del used[question_id]
+            if not used:
+                del self.used_questions[pool]
+
+    def used_question_ids(self, user_email: str, assessment_type: str) -> set:
+        self._cleanup_expired_items()
+        return set(self.used_questions.get((user_email, assessment_type), ()))
+
 class MockElastiCache:
     """Simulates ElastiCache Redis for session storage"""
     
-    def __init__(self):
+    def __init__(self, on_expire: Optional[Callable[[str, Any], None]] = None):
         self.cache = {}
         self.expirations = {}
+        # Called with (key, value) for each key removed because it expired
+        self.on_expire = on_expire
     
     def set(self, key: str, value: Any, ex: int = 3600) -> bool:
         """Set key with expiration"""
@@ -157,10 +367,11 @@ class MockElastiCache:
                 expired_keys.append(key)
         
         for key in expired_keys:
-            if key in self.cache:
-                del self.cache[key]
+            value = self.cache.pop(key, None)
             del self.expirations[key]
             print(f"[ELASTICACHE] EXPIRED {key}")
+            if self.on_expire:
+                self.on_expire(key, value)
 
 class MockCloudWatch:
     """Simulates CloudWatch logging and metrics"""
@@ -221,18 +432,22 @@ class AWSMockServices:
     def __init__(self):
         # DynamoDB Tables
         self.users_table = MockDynamoDBTable('ielts-genai-prep-users')
-        self.assessment_results_table = MockDynamoDBTable('ielts-genai-prep-assessment-results')
+        self.assessment_results_table = MockAssessmentResultsTable('ielts-genai-prep-assessment-results')
+        self.completed_assessments_table = MockCompletedAssessmentLog('ielts-genai-prep-completed-assessments')
         self.assessment_rubrics_table = MockDynamoDBTable('ielts-genai-prep-assessment-rubrics')
-        self.password_reset_table = MockDynamoDBTable('ielts-genai-prep-password-reset')
+        self.password_reset_table = MockDynamoDBTable('ielts-genai-prep-password-reset', key_attribute='token', index_attribute='user_id')
         self.emails_table = MockDynamoDBTable('ielts-genai-prep-emails')
         
         # GDPR Compliance Tables
-        self.gdpr_consents_table = MockDynamoDBTable('ielts-genai-prep-gdpr-consents')
-        self.gdpr_data_requests_table = MockDynamoDBTable('ielts-genai-prep-gdpr-data-requests')
-        self.gdpr_cookie_preferences_table = MockDynamoDBTable('ielts-genai-prep-cookie-preferences')
+        self.gdpr_consents_table = MockDynamoDBTable('ielts-genai-prep-gdpr-consents', key_attribute='user_email')
+        self.gdpr_data_requests_table = MockDynamoDBTable('ielts-genai-prep-gdpr-data-requests', key_attribute='request_id', index_attribute='user_email')
+        self.gdpr_cookie_preferences_table = MockDynamoDBTable('ielts-genai-prep-cookie-preferences', key_attribute='user_email')
+        self.gdpr_erasure_receipts_table = MockDynamoDBTable('ielts-genai-prep-gdpr-erasure-receipts', key_attribute='receipt_id')
         
         # ElastiCache
-        self.session_cache = MockElastiCache()
+        self.session_cache = MockElastiCache(on_expire=self._forget_session)
+        # user_email -> session ids, so a user's sessions can be revoked without walking the cache
+        self.user_sessions = {}
         
         # CloudWatch
         self.cloudwatch = MockCloudWatch()
@@ -446,7 +661,11 @@ class AWSMockServices:
     
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email address"""
-        return self.users_table.get_item(email)
+        return self._load_user(email)
+    
+    def _load_user(self, user_email: str) -> Optional[Dict[str, Any]]:
+        """User item, read at most once per request scope"""
+        return request_loader.load(self.users_table.table_name, user_email, self.users_table.batch_get)
     
     def store_password_reset_token(self, user_id: str, token: str, expires_at: int) -> bool:
         """Store password reset token in database"""
@@ -519,12 +738,33 @@ class AWSMockServices:
     def create_session(self, session_data: Dict[str, Any]) -> bool:
         """Create session in ElastiCache"""
         session_id = session_data['session_id']
+        user_email = session_data.get('user_email')
+        if user_email:
+            self.user_sessions.setdefault(user_email, set()).add(session_id)
         return self.session_cache.set(session_id, session_data, ex=3600)
     
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session from ElastiCache"""
         return self.session_cache.get(session_id)
     
+    def delete_session(self, session_id: str) -> bool:
+        """Delete session from ElastiCache (logout)"""
+        session_data = self.session_cache.cache.get(session_id)
+        deleted = self.session_cache.delete(session_id)
+        if deleted:
+            self._forget_session(session_id, session_data)
+        return deleted
+    
+    def _forget_session(self, session_id: str, session_data: Any):
+        """Drop a removed session from the user -> sessions index"""
+        user_email = session_data.get('user_email') if isinstance(session_data, dict) else None
+        session_ids = self.user_sessions.get(user_email)
+        if session_ids is None:
+            return
+        session_ids.discard(session_id)
+        if not session_ids:
+            del self.user_sessions[user_email]
+    
     def log_event(self, log_group: str, message: str, level: str = 'INFO'):
         """Log event to CloudWatch"""
         self.cloudwatch.put_log_events(log_group, 'lambda-stream', [{
@@ -551,7 +791,7 @@ class AWSMockServices:
     
     def get_user_assessments(self, user_email: str) -> Dict[str, Dict[str, Any]]:
         """Get user's purchased assessments with attempt counts"""
-        user = self.users_table.get_item(user_email)
+        user = self._load_user(user_email)
         if not user or 'purchases' not in user:
             # Return default assessments for testing
             return {
@@ -575,10 +815,34 @@ class AWSMockServices:
         
         return assessment_data
     
-    def get_assessment_history(self, user_email: str) -> list:
-        """Get assessment history for a user from DynamoDB"""
-        results = self.assessment_results_table.scan(f"user_email = '{user_email}'")
-        
+    def query_assessment_history(self, user_email: str, limit: Optional[int] = None,
+                                 cursor: Optional[str] = None,
+                                 projection: Optional[tuple] = None) -> Dict[str, Any]:
+        """
+        Page through a user's assessment results, newest first
+
+        Args:
+            user_email: Owner of the results
+            limit: Page size (clamped to 1..MAX_PAGE_SIZE)
+            cursor: next_cursor from the previous page
+            projection: Attributes to return, e.g. HISTORY_SUMMARY_FIELDS (all when None)
+
+        Returns:
+            {'items': [...], 'next_cursor': str or None}
+        """
+        page = self.assessment_results_table.query_user_history(
+            user_email,
+            clamp_page_size(limit),
+            exclusive_start_key=decode_cursor(cursor),
+            projection=projection
+        )
+        return {'items': page['Items'], 'next_cursor': encode_cursor(page['LastEvaluatedKey'])}
+
+    def get_assessment_history(self, user_email: str, limit: Optional[int] = None,
+                               projection: Optional[tuple] = HISTORY_SUMMARY_FIELDS) -> list:
+        """Get the most recent assessment results for a user (newest first)"""
+        results = self.query_assessment_history(user_email, limit=limit, projection=projection)['items']
+
         if not results:
             # Return mock assessment history for testing
             return [
@@ -604,7 +868,7 @@ class AWSMockServices:
     
     def get_user_profile(self, user_email: str) -> Dict[str, Any]:
         """Get user profile information"""
-        user = self.users_table.get_item(user_email)
+        user = self._load_user(user_email)
         if not user:
             # Return basic profile for testing
             return {
@@ -638,43 +902,22 @@ class AWSMockServices:
     
     def delete_user_completely(self, user_email: str) -> bool:
         """Delete all user data across all tables (GDPR compliance)"""
+        receipt = self.erase_user_data(user_email)
+        return receipt['status'] == 'completed'
+    
+    def erase_user_data(self, user_email: str, request_id: Optional[str] = None) -> Dict[str, Any]:
+        """Erase all user data with batched, parallel deletes and return the erasure receipt"""
+        from gdpr_erasure import get_erasure_engine
+        
         try:
-            # Delete from users table
-            self.users_table.delete_item(user_email)
-            
-            # Delete from assessment results table
-            user_assessments = self.assessment_results_table.scan(f"user_email = '{user_email}'")
-            for assessment in user_assessments:
-                assessment_id = assessment.get('assessment_id')
-                if assessment_id:
-                    self.assessment_results_table.delete_item(assessment_id)
-            
-            # Delete from auth tokens table
-            tokens = self.auth_tokens_table.scan(f"user_email = '{user_email}'")
-            for token in tokens:
-                token_id = token.get('token_id')
-                if token_id:
-                    self.auth_tokens_table.delete_item(token_id)
-            
-            # Delete from GDPR tables
-            self.gdpr_consent_table.delete_item(user_email)
-            self.gdpr_requests_table.delete_item(user_email)
-            
-            # Clear from session cache
-            sessions_to_delete = []
-            for session_id, session_data in self.session_cache.items():
-                if session_data.get('user_email') == user_email:
-                    sessions_to_delete.append(session_id)
-            
-            for session_id in sessions_to_delete:
-                del self.session_cache[session_id]
-            
-            print(f"[GDPR_DELETION] All data deleted for user: {user_email}")
-            return True
-            
+            receipt = get_erasure_engine(self).erase_user(user_email, request_id)
         except Exception as e:
             print(f"[ERROR] Failed to delete user data: {str(e)}")
-            return False
+            return {'status': 'failed', 'error': str(e)}
+        
+        print(f"[GDPR_DELETION] {receipt['items_erased']} items erased, receipt {receipt['receipt_id']}")
+        self.log_event('GDPR_Deletion', f"Erasure {receipt['receipt_id']} {receipt['status']}")
+        return receipt
     
     def add_user_purchase(self, user_id: str, purchase_data: Dict[str, Any]) -> bool:
         """Add purchase to user record with 4 assessment attempts"""
@@ -715,29 +958,41 @@ class AWSMockServices:
 
     def use_assessment_attempt(self, user_email: str, assessment_type: str) -> bool:
         """Decrement assessment counter when user completes an assessment"""
-        user = self.users_table.get_item(user_email)
-        if not user or 'purchases' not in user:
-            return False
+        return self.consume_assessment_attempt(user_email, assessment_type) is not None
+
+    def consume_assessment_attempt(self, user_email: str, assessment_type: str) -> Optional[int]:
+        """
+        Take one attempt with a single conditional update of the user item
+        
+        Returns:
+            Assessments remaining on the purchase, or None if none were left
+        """
+        def purchase_with_attempts(user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            for purchase in user.get('purchases', []):
+                if purchase.get('assessment_type') == assessment_type and purchase.get('assessments_remaining', 0) > 0:
+                    return purchase
+            return None
         
-        # Find the purchase for this assessment type
-        for purchase in user['purchases']:
-            if purchase.get('assessment_type') == assessment_type:
-                if purchase.get('assessments_remaining', 0) > 0:
-                    purchase['assessments_remaining'] -= 1
-                    purchase['assessments_used'] = purchase.get('assessments_used', 0) + 1
-                    purchase['last_used'] = datetime.utcnow().isoformat()
-                    
-                    # Update user record
-                    self.users_table.put_item(user)
-                    
-                    self.log_event('AssessmentUsage', f'Assessment used: {user_email} - {assessment_type}, {purchase["assessments_remaining"]} remaining')
-                    return True
+        def consume(user: Dict[str, Any]) -> Dict[str, Any]:
+            purchase = purchase_with_attempts(user)
+            purchase['assessments_remaining'] -= 1
+            purchase['assessments_used'] = purchase.get('assessments_used', 0) + 1
+            purchase['last_used'] = datetime.utcnow().isoformat()
+            return {'assessments_remaining': purchase['assessments_remaining'],
+                    'assessments_used': purchase['assessments_used']}
+        
+        updated = self.users_table.update_item_if(
+            user_email, lambda user: purchase_with_attempts(user) is not None, consume
+        )
+        if updated is None:
+            return None
         
-        return False
+        self.log_event('AssessmentUsage', f'Assessment used: {user_email} - {assessment_type}, {updated["assessments_remaining"]} remaining')
+        return updated['assessments_remaining']
 
     def get_user_assessment_counts(self, user_email: str) -> Dict[str, Dict[str, int]]:
         """Get remaining and used assessment counts for user"""
-        user = self.users_table.get_item(user_email)
+        user = self._load_user(user_email)
         if not user or 'purchases' not in user:
             return {}
         
@@ -763,558 +1018,55 @@ class AWSMockServices:
 
     def get_unique_assessment_question(self, user_email: str, assessment_type: str) -> Optional[Dict[str, Any]]:
         """Get a unique assessment question that user hasn't seen before"""
-        user = self.users_table.get_item(user_email)
+        user = self._load_user(user_email)
         if not user:
             return None
         
-        # Get user's completed assessments to avoid repetition
-        completed_assessments = user.get('completed_assessments', [])
-        used_questions = [a.get('question_id') for a in completed_assessments if a.get('assessment_type') == assessment_type]
-        
-        # Get question bank for this assessment type
-        question_bank = self._get_question_bank(assessment_type)
-        available_questions = [q for q in question_bank if q['question_id'] not in used_questions]
+        # Questions used, from the completed-assessment log's read model
+        used_questions = self.completed_assessments_table.used_question_ids(user_email, assessment_type)
         
-        if not available_questions:
-            # If all questions used, allow reuse after completing all 4 attempts
-            available_questions = question_bank
-        
-        # Return random question from available pool
-        import random
-        return random.choice(available_questions) if available_questions else None
+        # Random unused question; if all questions are used, reuse is allowed after completing all 4 attempts
+        return get_question_bank_index().sample_unused(assessment_type, used_questions)
 
     def _get_question_bank(self, assessment_type: str) -> List[Dict[str, Any]]:
-        """Get comprehensive question bank for assessment type - Full Migration Complete"""
-        question_banks = {
-            'academic_writing': [
-                {
-                    'question_id': 'aw_task2_001',
-                    'task': 'Task 2',
-                    'prompt': 'Some people believe that universities should require every student to take a variety of courses outside their field of study. Others believe that universities should not force students to take any courses other than those that will help prepare them for jobs in their chosen fields. Write a response in which you discuss which view more closely aligns with your own position and explain your reasoning for the position you take.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'aw_task2_002', 
-                    'task': 'Task 2',
-                    'prompt': 'Many governments think that economic progress is their most important goal. Some people, however, think that other types of progress are equally important for a country. Discuss both these views and give your own opinion.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'aw_task2_003',
-                    'task': 'Task 2', 
-                    'prompt': 'In some countries, young people are encouraged to work or travel for a year between finishing high school and starting university studies. Discuss the advantages and disadvantages for young people who decide to do this.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'aw_task2_004',
-                    'task': 'Task 2',
-                    'prompt': 'Some people say that the main environmental problem of our time is the loss of particular species of plants and animals. Others say that there are more important environmental problems. Discuss both these views and give your own opinion.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'aw_task2_005',
-                    'task': 'Task 2',
-                    'prompt': 'In a number of countries, some people think it is necessary to spend large sums of money on constructing new railway lines for very fast trains between cities. Others believe the money should be spent on improving existing public transport. Discuss both these views and give your own opinion.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                # Additional comprehensive questions from Academic Writing database
-                {
-                    'question_id': 'aw_task2_006',
-                    'task': 'Task 2',
-                    'prompt': 'The global economy is evolving quickly, and individuals can no longer rely on the same career path or workplace environment throughout their lives. Discuss the potential reasons for this rapid evolution, and propose strategies to prepare people for their careers in the future.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'aw_task2_007',
-                    'task': 'Task 2',
-                    'prompt': 'Many countries are experiencing a significant increase in the proportion of older people in their populations. Discuss the possible reasons for this demographic shift, and suggest ways in which societies can adapt to this aging population.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'aw_task2_008',
-                    'task': 'Task 2',
-                    'prompt': 'In many parts of the world, the popularity of private vehicles is increasing despite growing concerns about environmental pollution and traffic congestion. Discuss the possible reasons for the continued preference for private vehicles, and suggest ways in which governments could encourage people to use alternative forms of transport.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'aw_task2_009',
-                    'task': 'Task 2',
-                    'prompt': 'The increasing availability and influence of social media have fundamentally changed the way people communicate and form relationships. Discuss the potential benefits and drawbacks of this development, and suggest ways individuals and societies can navigate the impact of social media in the future.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'aw_task2_010',
-                    'task': 'Task 2',
-                    'prompt': 'Many cities around the world are experiencing increasing pressure from tourism, which can have both positive and negative effects on local communities and environments. Discuss the potential benefits and drawbacks of mass tourism in urban areas, and suggest ways in which cities can manage tourism more sustainably in the future.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'aw_task2_011',
-                    'task': 'Task 2',
-                    'prompt': 'The reliance on standardized testing as the primary method for evaluating student performance and determining educational opportunities is a subject of ongoing debate. Discuss the potential advantages and disadvantages of standardized testing in education, and suggest alternative methods that could be used to assess student learning and potential.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'aw_task2_012',
-                    'task': 'Task 2',
-                    'prompt': 'The increasing consumption of fast food and processed meals is a growing trend in many developed nations. Discuss the possible reasons for the popularity of these types of food, and suggest ways in which individuals and governments could encourage healthier eating habits.',
-                    'word_limit': 250,
-                    'time_limit': 40
-                }
-            ],
-            'general_writing': [
-                {
-                    'question_id': 'gw_task1_001',
-                    'task': 'Task 1',
-                    'prompt': 'You recently bought a piece of equipment for your kitchen but it did not work. You phoned the shop but no action was taken. Write a letter to the shop manager. In your letter: describe the problem with the equipment, explain what happened when you phoned the shop, say what you would like the manager to do.',
-                    'word_limit': 150,
-                    'time_limit': 20
-                },
-                {
-                    'question_id': 'gw_task1_002',
-                    'task': 'Task 1', 
-                    'prompt': 'You work for an international company, and would like to spend six months working in its head office in another country. Write a letter to your manager. In your letter: explain why you want to work in the company\'s head office for six months, say how your work could be done while you are away, ask for his/her help in arranging it.',
-                    'word_limit': 150,
-                    'time_limit': 20
-                },
-                {
-                    'question_id': 'gw_task1_003',
-                    'task': 'Task 1',
-                    'prompt': 'A friend has agreed to look after your house and pet while you are on holiday. Write a letter to your friend. In your letter: give contact details for when you are away, give instructions about how to care for your pet, describe other household duties.',
-                    'word_limit': 150,
-                    'time_limit': 20
-                },
-                {
-                    'question_id': 'gw_task1_004',
-                    'task': 'Task 1',
-                    'prompt': 'You have seen an advertisement in an Australian magazine for someone to live with a family for six months and look after their six-year-old child. Write a letter to the parents. In your letter: explain why you would like the job, give details of why you would be a suitable person to employ, say how you would spend your free time while you are in Australia.',
-                    'word_limit': 150,
-                    'time_limit': 20
-                },
-                {
-                    'question_id': 'gw_task1_005',
-                    'task': 'Task 1',
-                    'prompt': 'You are going to another country to study. You would like to do a part-time job while you are studying, so you want to ask a friend who lives there for some help. Write a letter to your friend. In your letter: give details about your study plans, explain why you want to get a part-time job, suggest how your friend could help you find a job.',
-                    'word_limit': 150,
-                    'time_limit': 20
-                },
-                # Additional comprehensive questions from General Writing database - Task 2 Essays
-                {
-                    'question_id': 'gw_task2_006',
-                    'task': 'Task 2',
-                    'prompt': 'Urban areas face increasing traffic problems. Some think building more roads is the answer, while others favor improving public transport. Who do you believe should be the priority: expanding roads or developing public transport?',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'gw_task2_007',
-                    'task': 'Task 2',
-                    'prompt': 'Many companies are now allowing their employees to work from home some or all of the time. This shift has both benefits and drawbacks. Do you think the advantages of remote work outweigh the disadvantages, or vice versa?',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'gw_task2_008',
-                    'task': 'Task 2',
-                    'prompt': 'The use of social media has become widespread among young people. It offers opportunities for connection but also presents potential risks. Do you believe the benefits of social media for young people outweigh the risks, or are the risks more significant?',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                {
-                    'question_id': 'gw_task2_009',
-                    'task': 'Task 2',
-                    'prompt': 'Fast food is a popular choice for many due to its convenience and affordability. However, its impact on health is often debated. Do you think the advantages of fast food outweigh its disadvantages, or are the health concerns more significant?',
-                    'word_limit': 250,
-                    'time_limit': 40
-                },
-                # Additional Task 1 Letters from database files
-                {
-                    'question_id': 'gw_task1_006',
-                    'task': 'Task 1',
-                    'prompt': 'You are currently enrolled in an evening course at a local community center, but you are facing several issues with the classroom environment that make it challenging to focus and learn effectively. Write a letter to the course coordinator at the community center. In your letter: describe the situation, explain your problems and why it is difficult to learn, suggest what kind of classroom environment you would prefer.',
-                    'word_limit': 150,
-                    'time_limit': 20
-                },
-                {
-                    'question_id': 'gw_task1_007',
-                    'task': 'Task 1',
-                    'prompt': 'You have recently joined a local gym to improve your fitness, but you are experiencing several issues with the gym facilities that make it difficult to exercise comfortably. Write a letter to the gym manager. In your letter: describe the situation, explain your problems and why it is difficult to exercise, suggest what kind of improvements or facilities you would prefer.',
-                    'word_limit': 150,
-                    'time_limit': 20
-                }
-            ],
-            'academic_speaking': [
-                {
-                    'question_id': 'as_complete_001',
-                    'assessment_type': 'academic_speaking',
-                    'parts': [
-                        {
-                            'part': 1,
-                            'duration': '4-5 minutes',
-                            'topic': 'Introduction and Interview',
-                            'questions': [
-                                'Tell me about your favorite hobby and why you enjoy it.',
-                                'Tell me about your job. What responsibilities do you have?'
-                            ]
-                        },
-                        {
-                            'part': 2,
-                            'duration': '3-4 minutes',
-                            'topic': 'Individual Long Turn',
-                            'prompt': 'Describe a place you have visited that had a significant impact on you. You should say: where the place is, when you went there, what you did there, and explain why this place had such an impact on you.',
-                            'prep_time': 60,
-                            'talk_time': 120
-                        },
-                        {
-                            'part': 3,
-                            'duration': '4-5 minutes',
-                            'topic': 'Two-way Discussion',
-                            'questions': [
-                                'Do you think travel is an important part of education? Why or why not?',
-                                'What changes do you think will happen in education in the future?'
-                            ]
-                        }
-                    ],
-                    'total_duration': '11-14 minutes'
-                },
-                {
-                    'question_id': 'as_complete_002',
-                    'assessment_type': 'academic_speaking',
-                    'parts': [
-                        {
-                            'part': 1,
-                            'duration': '4-5 minutes',
-                            'topic': 'Introduction and Interview',
-                            'questions': [
-                                'What do you like or dislike about your studies?',
-                                'Would you prefer to work in a large company or a small company? Why?'
-                            ]
-                        },
-                        {
-                            'part': 2,
-                            'duration': '3-4 minutes',
-                            'topic': 'Individual Long Turn',
-                            'prompt': 'Describe a person who has had a significant influence on your life. You should say: who this person is, how you know them, what they do, and explain why they have influenced you so much.',
-                            'prep_time': 60,
-                            'talk_time': 120
-                        },
-                        {
-                            'part': 3,
-                            'duration': '4-5 minutes',
-                            'topic': 'Two-way Discussion',
-                            'questions': [
-                                'Do you think students should be able to choose what they study at school?',
-                                'How important do you think it is for people to continue learning throughout their lives?'
-                            ]
-                        }
-                    ],
-                    'total_duration': '11-14 minutes'
-                },
-                {
-                    'question_id': 'as_complete_003',
-                    'assessment_type': 'academic_speaking',
-                    'parts': [
-                        {
-                            'part': 1,
-                            'duration': '4-5 minutes',
-                            'topic': 'Introduction and Interview',
-                            'questions': [
-                                'Can you describe the place where you live?',
-                                'What kind of accommodation do you live in?'
-                            ]
-                        },
-                        {
-                            'part': 2,
-                            'duration': '3-4 minutes',
-                            'topic': 'Individual Long Turn',
-                            'prompt': 'Describe a teacher who has influenced you. You should say: when you met them, what subject they taught, what was special about them, and explain how they influenced your life.',
-                            'prep_time': 60,
-                            'talk_time': 120
-                        },
-                        {
-                            'part': 3,
-                            'duration': '4-5 minutes',
-                            'topic': 'Two-way Discussion',
-                            'questions': [
-                                'What factors should people consider when choosing a career?',
-                                'Do you think it\'s better to have one job for life or to change jobs regularly?'
-                            ]
-                        }
-                    ],
-                    'total_duration': '11-14 minutes'
-                },
-                {
-                    'question_id': 'as_complete_004',
-                    'assessment_type': 'academic_speaking',
-                    'parts': [
-                        {
-                            'part': 1,
-                            'duration': '4-5 minutes',
-                            'topic': 'Introduction and Interview',
-                            'questions': [
-                                'What changes would you like to make to your home?',
-                                'Describe your hometown. What is it known for?'
-                            ]
-                        },
-                        {
-                            'part': 2,
-                            'duration': '3-4 minutes',
-                            'topic': 'Individual Long Turn',
-                            'prompt': 'Describe a friend who is a good leader. You should say: who the person is, how you know this person, what leadership qualities they have, and explain why you think they are a good leader.',
-                            'prep_time': 60,
-                            'talk_time': 120
-                        },
-                        {
-                            'part': 3,
-                            'duration': '4-5 minutes',
-                            'topic': 'Two-way Discussion',
-                            'questions': [
-                                'How has technology changed the way people work in your country?',
-                                'What environmental problems does your country face today?'
-                            ]
-                        }
-                    ],
-                    'total_duration': '11-14 minutes'
-                },
-                {
-                    'question_id': 'as_complete_005',
-                    'assessment_type': 'academic_speaking',
-                    'parts': [
-                        {
-                            'part': 1,
-                            'duration': '4-5 minutes',
-                            'topic': 'Introduction and Interview',
-                            'questions': [
-                                'Is your hometown a good place for tourists to visit? Why or why not?',
-                                'How has your hometown changed in recent years?'
-                            ]
-                        },
-                        {
-                            'part': 2,
-                            'duration': '3-4 minutes',
-                            'topic': 'Individual Long Turn',
-                            'prompt': 'Describe a public place you like to visit. You should say: where it is, when you usually go there, what you do there, and explain why you like this place.',
-                            'prep_time': 60,
-                            'talk_time': 120
-                        },
-                        {
-                            'part': 3,
-                            'duration': '4-5 minutes',
-                            'topic': 'Two-way Discussion',
-                            'questions': [
-                                'Do you think individuals or governments should be responsible for protecting the environment?',
-                                'How can we encourage more people to use public transportation instead of cars?'
-                            ]
-                        }
-                    ],
-                    'total_duration': '11-14 minutes'
-                }
-            ],
-            'general_speaking': [
-                {
-                    'question_id': 'gs_complete_001',
-                    'assessment_type': 'general_speaking',
-                    'parts': [
-                        {
-                            'part': 1,
-                            'duration': '4-5 minutes',
-                            'topic': 'Introduction and Interview',
-                            'questions': [
-                                'What activities do you enjoy doing in your free time?',
-                                'Do you prefer indoor or outdoor activities? Why?'
-                            ]
-                        },
-                        {
-                            'part': 2,
-                            'duration': '3-4 minutes',
-                            'topic': 'Individual Long Turn',
-                            'prompt': 'Describe a historic building you have visited. You should say: where it is, when you visited it, what the building looks like, and explain why you visited this building.',
-                            'prep_time': 60,
-                            'talk_time': 120
-                        },
-                        {
-                            'part': 3,
-                            'duration': '4-5 minutes',
-                            'topic': 'Two-way Discussion',
-                            'questions': [
-                                'How might technology change the way we live in the future?',
-                                'Do social media platforms bring people together or push them further apart?'
-                            ]
-                        }
-                    ],
-                    'total_duration': '11-14 minutes'
-                },
-                {
-                    'question_id': 'gs_complete_002',
-                    'assessment_type': 'general_speaking',
-                    'parts': [
-                        {
-                            'part': 1,
-                            'duration': '4-5 minutes',
-                            'topic': 'Introduction and Interview',
-                            'questions': [
-                                'How important is it to have hobbies?',
-                                'How often do you use computers or technology in your daily life?'
-                            ]
-                        },
-                        {
-                            'part': 2,
-                            'duration': '3-4 minutes',
-                            'topic': 'Individual Long Turn',
-                            'prompt': 'Describe a place in your country that you would recommend someone visit. You should say: where it is, what people can do there, when is the best time to visit, and explain why you would recommend this place.',
-                            'prep_time': 60,
-                            'talk_time': 120
-                        },
-                        {
-                            'part': 3,
-                            'duration': '4-5 minutes',
-                            'topic': 'Two-way Discussion',
-                            'questions': [
-                                'Should there be more regulation of technology and the internet?',
-                                'How has family life changed in your country in recent decades?'
-                            ]
-                        }
-                    ],
-                    'total_duration': '11-14 minutes'
-                },
-                {
-                    'question_id': 'gs_complete_003',
-                    'assessment_type': 'general_speaking',
-                    'parts': [
-                        {
-                            'part': 1,
-                            'duration': '4-5 minutes',
-                            'topic': 'Introduction and Interview',
-                            'questions': [
-                                'What impact does technology have on your work or studies?',
-                                'Do you think people rely too much on technology nowadays?'
-                            ]
-                        },
-                        {
-                            'part': 2,
-                            'duration': '3-4 minutes',
-                            'topic': 'Individual Long Turn',
-                            'prompt': 'Describe an important object in your life. You should say: what it is, how long you\'ve had it, where you got it from, and explain why it\'s important to you.',
-                            'prep_time': 60,
-                            'talk_time': 120
-                        },
-                        {
-                            'part': 3,
-                            'duration': '4-5 minutes',
-                            'topic': 'Two-way Discussion',
-                            'questions': [
-                                'What role should governments play in healthcare and social services?',
-                                'Is it better to live in a city or in the countryside? Why?'
-                            ]
-                        }
-                    ],
-                    'total_duration': '11-14 minutes'
-                },
-                {
-                    'question_id': 'gs_complete_004',
-                    'assessment_type': 'general_speaking',
-                    'parts': [
-                        {
-                            'part': 1,
-                            'duration': '4-5 minutes',
-                            'topic': 'Introduction and Interview',
-                            'questions': [
-                                'What kind of places do you like to visit on vacation?',
-                                'Do you prefer traveling alone or with other people? Why?'
-                            ]
-                        },
-                        {
-                            'part': 2,
-                            'duration': '3-4 minutes',
-                            'topic': 'Individual Long Turn',
-                            'prompt': 'Describe a piece of technology that you find useful. You should say: what it is, what you use it for, how often you use it, and explain why it is so useful to you.',
-                            'prep_time': 60,
-                            'talk_time': 120
-                        },
-                        {
-                            'part': 3,
-                            'duration': '4-5 minutes',
-                            'topic': 'Two-way Discussion',
-                            'questions': [
-                                'How can countries work together more effectively to solve global problems?',
-                                'What do you think are the biggest challenges facing young people today?'
-                            ]
-                        }
-                    ],
-                    'total_duration': '11-14 minutes'
-                },
-                {
-                    'question_id': 'gs_complete_005',
-                    'assessment_type': 'general_speaking',
-                    'parts': [
-                        {
-                            'part': 1,
-                            'duration': '4-5 minutes',
-                            'topic': 'Introduction and Interview',
-                            'questions': [
-                                'What\'s the most interesting journey you\'ve ever taken?',
-                                'Tell me about your favorite hobby and why you enjoy it.'
-                            ]
-                        },
-                        {
-                            'part': 2,
-                            'duration': '3-4 minutes',
-                            'topic': 'Individual Long Turn',
-                            'prompt': 'Describe a book that has influenced you. You should say: what kind of book it is, what it is about, when you first read it, and explain how it has influenced you.',
-                            'prep_time': 60,
-                            'talk_time': 120
-                        },
-                        {
-                            'part': 3,
-                            'duration': '4-5 minutes',
-                            'topic': 'Two-way Discussion',
-                            'questions': [
-                                'Do you think international tourism is mostly positive or negative for local communities?',
-                                'How might technology change the way we live in the future?'
-                            ]
-                        }
-                    ],
-                    'total_duration': '11-14 minutes'
-                }
-            ]
-        }
-        
-        bank = question_banks.get(assessment_type, [])
-        print(f"[COMPREHENSIVE] Loaded {len(bank)} questions for {assessment_type} - Full Migration Complete")
-        return bank
+        """Get comprehensive question bank for assessment type (loaded once from mock_question_bank.json)"""
+        return get_question_bank_index().questions(assessment_type)
 
     def record_completed_assessment(self, user_email: str, assessment_type: str, question_id: str, result_data: Dict[str, Any]) -> bool:
         """Record completed assessment and use attempt"""
-        user = self.users_table.get_item(user_email)
+        user = self._load_user(user_email)
         if not user:
             return False
         
-        # Add to completed assessments
-        if 'completed_assessments' not in user:
-            user['completed_assessments'] = []
-        
-        completed_assessment = {
+        # One log item per completion; the user item only carries summary counters
+        completed_at = datetime.utcnow().isoformat()
+        if not self.completed_assessments_table.put_item({
+            'completion_id': str(uuid.uuid4()),
+            'user_email': user_email,
             'assessment_type': assessment_type,
             'question_id': question_id,
-            'completed_at': datetime.utcnow().isoformat(),
+            'completed_at': completed_at,
             'result_data': result_data
-        }
-        
-        user['completed_assessments'].append(completed_assessment)
+        }):
+            return False
         
-        # Update user record
-        return self.users_table.put_item(user)
+        completed_counts = dict(user.get('completed_counts', {}))
+        completed_counts[assessment_type] = completed_counts.get(assessment_type, 0) + 1
+        return self.users_table.update_item(user_email, {
+            'completed_assessment_count': user.get('completed_assessment_count', 0) + 1,
+            'completed_counts': completed_counts,
+            'last_completed_at': completed_at
+        })
+    
+    def get_completed_assessments(self, user_email: str, limit: int = DEFAULT_PAGE_SIZE,
+                                  cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Newest-first page of a user's completed-assessment log: {'items', 'next_cursor'}"""
+        page = self.completed_assessments_table.query_user_history(
+            user_email,
+            clamp_page_size(limit),
+            exclusive_start_key=decode_cursor(cursor)
+        )
+        return {'items': page['Items'], 'next_cursor': encode_cursor(page['LastEvaluatedKey'])}
     
     def get_nova_sonic_prompts(self, assessment_type: str) -> Optional[Dict[str, Any]]:
         """Get Nova Sonic system prompts from DynamoDB rubrics"""
@@ -1332,6 +1084,7 @@ class AWSMockServices:
             'dynamodb_tables': {
                 'users': len(self.users_table.items),
                 'assessment_results': len(self.assessment_results_table.items),
+                'completed_assessments': len(self.completed_assessments_table.items),
                 'assessment_rubrics': len(self.assessment_rubrics_table.items),
                 'gdpr_consents': len(self.gdpr_consents_table.items),
                 'gdpr_data_requests': len(self.gdpr_data_requests_table.items),
@@ -1416,56 +1169,14 @@ class AWSMockServices:
         return result
     
     def request_data_export(self, user_email: str, export_format: str = 'json', include_assessments: bool = True) -> str:
-        """Create data export request and return request ID"""
-        request_id = str(uuid.uuid4())
+        """Create data export request and return request ID (the file is built by gdpr_export)"""
+        from gdpr_export import get_gdpr_export_service
         
-        # Get user data
-        user_data = self.users_table.get_item(user_email)
-        if not user_data:
+        request_id = get_gdpr_export_service(self).start_export(user_email, export_format, include_assessments)
+        if not request_id:
             return None
         
-        # Get assessment results
-        assessment_data = []
-        if include_assessments:
-            assessment_data = self.get_user_assessments(user_email)
-        
-        # Get consent history
-        consent_data = self.get_user_consent(user_email)
-        
-        # Prepare export data
-        export_data = {
-            'user_profile': {
-                'email': user_data.get('email'),
-                'created_at': user_data.get('created_at'),
-                'last_login': user_data.get('last_login'),
-                'purchases': user_data.get('purchases', [])
-            },
-            'assessments': assessment_data,
-            'consent_history': consent_data,
-            'export_info': {
-                'request_id': request_id,
-                'format': export_format,
-                'created_at': datetime.utcnow().isoformat(),
-                'data_as_of': datetime.utcnow().isoformat()
-            }
-        }
-        
-        # Store export request
-        request_record = {
-            'request_id': request_id,
-            'user_email': user_email,
-            'request_type': 'data_export',
-            'format': export_format,
-            'include_assessments': include_assessments,
-            'status': 'completed',
-            'created_at': datetime.utcnow().isoformat(),
-            'completed_at': datetime.utcnow().isoformat(),
-            'export_data': export_data
-        }
-        
-        self.gdpr_data_requests_table.put_item(request_record)
         self.log_event('GDPR_Export', f'Data export requested by {user_email} - {request_id}')
-        
         return request_id
     
     def request_data_deletion(self, user_email: str, deletion_type: str = 'complete') -> str:
@@ -1494,8 +1205,8 @@ class AWSMockServices:
     
     def get_user_gdpr_requests(self, user_email: str) -> List[Dict[str, Any]]:
         """Get all GDPR requests for a user"""
-        all_requests = self.gdpr_data_requests_table.scan()
-        return [req for req in all_requests if req.get('user_email') == user_email]
+        requests = (self.gdpr_data_requests_table.get_item(key) for key in self.gdpr_data_requests_table.keys_for(user_email))
+        return [request for request in requests if request]
 
 # Global instance for use across the application
 aws_mock = AWSMockServices()
@@ -211,6 +211,9 @@ def get_secrets_manager() -> SecretsManager:
         secrets_manager = SecretsManager()
     return secrets_manager
 
+# Key ID of JWT_SECRET; also used to verify tokens that carry no kid header
+JWT_LEGACY_KID = 'default'
+
 def get_jwt_config() -> Dict[str, Any]:
     """Get JWT configuration from secrets"""
     secrets = get_secrets_manager()
@@ -219,10 +222,34 @@ def get_jwt_config() -> Dict[str, Any]:
     if not jwt_secrets:
         raise RuntimeError("JWT secrets not available - check AWS Secrets Manager configuration")
     
+    algorithm = jwt_secrets.get('JWT_ALGORITHM', 'HS256')
+    
+    # Rotation: JWT_KEYS lists every accepted key ({kid, secret, algorithm}); JWT_ACTIVE_KID signs new tokens
+    keys = {}
+    for key in jwt_secrets.get('JWT_KEYS', []):
+        keys[key['kid']] = {
+            'SECRET_KEY': key['secret'],
+            'ALGORITHM': key.get('algorithm', algorithm)
+        }
+    
+    active_kid = jwt_secrets.get('JWT_ACTIVE_KID')
+    if 'JWT_SECRET' in jwt_secrets:
+        legacy_key = {'SECRET_KEY': jwt_secrets['JWT_SECRET'], 'ALGORITHM': algorithm}
+        # JWT_SECRET stays registered under the legacy kid so tokens issued without a kid
+        # keep verifying after JWT_ACTIVE_KID moves to a rotated key
+        keys.setdefault(JWT_LEGACY_KID, legacy_key)
+        active_kid = active_kid or JWT_LEGACY_KID
+        keys.setdefault(active_kid, legacy_key)
+    
+    if not keys or active_kid not in keys:
+        raise RuntimeError("JWT signing key not configured - check JWT_SECRET/JWT_ACTIVE_KID")
+    
     return {
-        'SECRET_KEY': jwt_secrets['JWT_SECRET'],
-        'ALGORITHM': jwt_secrets.get('JWT_ALGORITHM', 'HS256'),
-        'ACCESS_TOKEN_EXPIRES_MINUTES': jwt_secrets.get('JWT_ACCESS_TOKEN_EXPIRES_MINUTES', 15)
+        'SECRET_KEY': keys[active_kid]['SECRET_KEY'],
+        'ALGORITHM': keys[active_kid]['ALGORITHM'],
+        'ACCESS_TOKEN_EXPIRES_MINUTES': jwt_secrets.get('JWT_ACCESS_TOKEN_EXPIRES_MINUTES', 15),
+        'ACTIVE_KID': active_kid,
+        'KEYS': keys
     }
 
 def get_qr_encryption_config() -> Dict[str, str]:
@@ -34,21 +34,23 @@ def populate_questions_quickly():
                 {"id": "gs_001", "parts": [{"part": 1, "topic": "Home and Family", "questions": ["Where do you live?", "Who do you live with?", "Describe your home."]}, {"part": 2, "topic": "Describe a family celebration you enjoyed", "prep_time": 60, "talk_time": 120}, {"part": 3, "topic": "Family and Traditions", "questions": ["How important are family traditions?", "How have families changed over time?"]}]},
                 {"id": "gs_002", "parts": [{"part": 1, "topic": "Free Time", "questions": ["What do you do in your free time?", "Do you prefer indoor or outdoor activities?", "How do you relax?"]}, {"part": 2, "topic": "Describe a hobby you enjoy", "prep_time": 60, "talk_time": 120}, {"part": 3, "topic": "Leisure and Recreation", "questions": ["How important is leisure time?", "How do people choose their hobbies?"]}]},
                 {"id": "gs_003", "parts": [{"part": 1, "topic": "Shopping", "questions": ["Do you like shopping?", "Where do you usually shop?", "How often do you go shopping?"]}, {"part": 2, "topic": "Describe a shop you like to visit", "prep_time": 60, "talk_time": 120}, {"part": 3, "topic": "Consumer Culture", "questions": ["How has shopping changed?", "Do people buy too many things nowadays?"]}]},
-                {"id": "gs_004", "parts": [{"part": 1, "topic": "Food", "questions": ["What is your favorite food?", "Do you cook at home?", "What food is popular in your country?"]}, {"part": 2, "topic": "Describe a meal you enjoyed", "prep_time": 60, "talk_time": 120}, {"part": 3, "topic": "Food and Culture", "questions": ["How important is food in your culture?", "How have eating habits changed?"]}]}
+                {"id": "gs_004", "parts": [{"part": 1, "topic": "Food", "questions": ["What is your favorite food?", "Do you cook at home?", "What food is popular in your country?"]}, {"part": 2, "topic": "Describe a meal you enjoyed", "prep_time": 60, "talk_time": 120}, {"part": 3, "topic": "Food and Culture", "questions": ["How important is food in your culture?", "How have eating habits changed?"]}]}]
         }
         
         questions_count = 0
-        for assessment_type, questions in questions_data.items():
-            for question in questions:
-                item = {
-                    'assessment_type': assessment_type,
-                    'question_id': question['id'],
-                    'question_data': question,
-                    'created_at': '2025-07-08T10:50:00Z',
-                    'active': True
-                }
-                table.put_item(Item=item)
-                questions_count += 1
+        # batch_writer groups puts into BatchWriteItem calls and resends unprocessed items
+        with table.batch_writer() as batch:
+            for assessment_type, questions in questions_data.items():
+                for question in questions:
+                    item = {
+                        'assessment_type': assessment_type,
+                        'question_id': question['id'],
+                        'question_data': question,
+                        'created_at': '2025-07-08T10:50:00Z',
+                        'active': True
+                    }
+                    batch.put_item(Item=item)
+                    questions_count += 1
         
         print(f"✅ Populated {questions_count} questions in DynamoDB")
         return True
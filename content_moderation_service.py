@@ -10,7 +10,10 @@ import logging
 import base64
 import json
 import os
-from typing import Dict, Tuple, List, Optional, Union
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple, List, Optional, Union
 from enum import Enum
 from datetime import datetime
 
@@ -30,6 +33,7 @@ class ContentModerationService:
     def __init__(self):
         self.profanity_patterns = self._load_profanity_patterns()
         self.inappropriate_patterns = self._load_inappropriate_patterns()
+        self.severe_patterns = self._load_severe_patterns()
         self.redirection_responses = self._load_redirection_responses()
         
     def _load_profanity_patterns(self) -> List[str]:
@@ -105,16 +109,18 @@ class ContentModerationService:
         # Content is clean
         return ModerationSeverity.CLEAN, None, text
     
-    def _has_severe_violations(self, text: str) -> bool:
-        """Check for content that requires immediate assessment termination"""
-        severe_patterns = [
+    def _load_severe_patterns(self) -> List[str]:
+        """Load patterns for content that requires immediate assessment termination"""
+        return [
             r'\b(threat|kill|murder|bomb|weapon|gun)\b',
             r'\b(extreme|graphic|violent)\s+(content|description)\b',
             r'\b(personal|private|confidential)\s+(information|data)\b',
             r'\b(racist|sexist|discriminatory)\b',
         ]
-        
-        for pattern in severe_patterns:
+    
+    def _has_severe_violations(self, text: str) -> bool:
+        """Check for content that requires immediate assessment termination"""
+        for pattern in self.severe_patterns:
             if re.search(pattern, text, re.IGNORECASE):
                 logging.warning(f"Severe violation detected: {pattern}")
                 return True
@@ -430,6 +436,187 @@ def moderate_speaking_content(user_text: str, user_id: str = "anonymous") -> Tup
     
     return continue_assessment, processed_text, examiner_response
 
+# Severity ordering used to decide when a streaming session crosses a threshold
+_SEVERITY_RANK = {
+    ModerationSeverity.CLEAN: 0,
+    ModerationSeverity.MILD: 1,
+    ModerationSeverity.MODERATE: 2,
+    ModerationSeverity.SEVERE: 3,
+}
+
+class StreamingContentModerator:
+    """
+    Incremental moderator for partial transcripts of a single speaking session.
+    Only the newly committed text plus a short overlap window is scanned per delta,
+    so the growing transcript is never re-scanned on each partial.
+    """
+    
+    # Characters of already-scanned text kept for patterns spanning chunk boundaries
+    OVERLAP_CHARS = 64
+    # Same rule as _has_severe_violations: more than 2 hits of a profanity pattern
+    PROFANITY_REPEAT_LIMIT = 2
+    
+    def __init__(self, session_id: str, user_id: str = "anonymous",
+                 threshold: ModerationSeverity = ModerationSeverity.MILD,
+                 service: Optional[ContentModerationService] = None):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.threshold = threshold
+        self.service = service or content_moderator
+        self.severe_regexes = [re.compile(p, re.IGNORECASE) for p in self.service.severe_patterns]
+        self.inappropriate_regexes = [re.compile(p, re.IGNORECASE) for p in self.service.inappropriate_patterns]
+        self.profanity_regexes = [re.compile(p, re.IGNORECASE) for p in self.service.profanity_patterns]
+        self.profanity_counts = [0] * len(self.profanity_regexes)
+        self.current_severity = ModerationSeverity.CLEAN
+        self.chars_consumed = 0
+        self._tail = ""
+        self._pending = ""
+        self._closed = False
+    
+    def feed(self, delta: str, is_final: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Consume a partial transcript delta
+        
+        Args:
+            delta: Text appended to the transcript since the previous call
+            is_final: True when the utterance is complete (flushes the trailing word)
+            
+        Returns:
+            Moderation event dict when the session escalates past the threshold, else None
+        """
+        if self._closed:
+            return None
+        
+        buffer = self._tail + self._pending + (delta or "").lower()
+        self.chars_consumed += len(delta or "")
+        
+        if is_final:
+            commit_end = len(buffer)
+        else:
+            # Hold back the last (possibly incomplete) word so "kill" is not flagged before "killer" arrives
+            commit_end = max(buffer.rfind(" "), buffer.rfind("\n")) + 1
+        
+        committed = buffer[:commit_end]
+        self._pending = buffer[commit_end:]
+        new_from = len(self._tail)
+        
+        event = None
+        if len(committed) > new_from:
+            event = self._scan(committed, new_from)
+            self._tail = committed[-self.OVERLAP_CHARS:]
+        
+        if is_final:
+            self._tail = ""
+            self._pending = ""
+        
+        return event
+    
+    def finalize(self) -> Optional[Dict[str, Any]]:
+        """Flush any held-back text at the end of an utterance"""
+        return self.feed("", is_final=True)
+    
+    def _new_matches(self, regex, text: str, new_from: int) -> int:
+        """Count matches that end inside the newly committed region"""
+        return sum(1 for match in regex.finditer(text) if match.end() > new_from)
+    
+    def _scan(self, text: str, new_from: int) -> Optional[Dict[str, Any]]:
+        """Scan committed text and escalate session severity if needed"""
+        severity = ModerationSeverity.CLEAN
+        category = None
+        
+        for regex in self.severe_regexes:
+            if self._new_matches(regex, text, new_from):
+                severity, category = ModerationSeverity.SEVERE, 'severe_content'
+                break
+        
+        if severity != ModerationSeverity.SEVERE:
+            for index, regex in enumerate(self.profanity_regexes):
+                hits = self._new_matches(regex, text, new_from)
+                if not hits:
+                    continue
+                self.profanity_counts[index] += hits
+                if self.profanity_counts[index] > self.PROFANITY_REPEAT_LIMIT:
+                    severity, category = ModerationSeverity.SEVERE, 'repeated_profanity'
+                    break
+                if _SEVERITY_RANK[severity] < _SEVERITY_RANK[ModerationSeverity.MILD]:
+                    severity, category = ModerationSeverity.MILD, 'mild_language'
+        
+        if _SEVERITY_RANK[severity] < _SEVERITY_RANK[ModerationSeverity.MODERATE]:
+            for regex in self.inappropriate_regexes:
+                if self._new_matches(regex, text, new_from):
+                    severity, category = ModerationSeverity.MODERATE, 'inappropriate_topic'
+                    break
+        
+        return self._escalate(severity, category)
+    
+    def _escalate(self, severity: ModerationSeverity, category: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Emit an event only when the session reaches a new, higher severity"""
+        if _SEVERITY_RANK[severity] <= _SEVERITY_RANK[self.current_severity]:
+            return None
+        self.current_severity = severity
+        if _SEVERITY_RANK[severity] < _SEVERITY_RANK[self.threshold]:
+            return None
+        
+        if severity == ModerationSeverity.SEVERE:
+            redirection = self.service._get_termination_message()
+            self._closed = True
+        else:
+            redirection = self.service._select_redirection_response(category)
+        
+        self.service._store_moderation_log({
+            'timestamp': self.service._get_timestamp(),
+            'user_id': self.user_id,
+            'session_id': self.session_id,
+            'event_type': 'streaming_moderation',
+            'severity': severity.value,
+            'category': category,
+            'transcript_offset': self.chars_consumed,
+            'assessment_type': 'speaking'
+        })
+        
+        return {
+            'session_id': self.session_id,
+            'severity': severity,
+            'category': category,
+            'continue_assessment': severity != ModerationSeverity.SEVERE,
+            'examiner_response': redirection,
+            'transcript_offset': self.chars_consumed
+        }
+
+# Streaming moderators idle longer than this belong to abandoned sessions and are dropped
+STREAMING_MODERATOR_IDLE_SECONDS = 1800
+# Upper bound on moderators held per container (least recently used are evicted first)
+MAX_STREAMING_MODERATORS = 1000
+
+# Active streaming moderators keyed by conversation/session id, least recently used first
+_streaming_moderators: "OrderedDict[str, Tuple[StreamingContentModerator, float]]" = OrderedDict()
+_streaming_moderators_lock = threading.Lock()
+
+def get_streaming_moderator(session_id: str, user_id: str = "anonymous") -> StreamingContentModerator:
+    """Get or create the streaming moderator for a speaking session"""
+    now = time.monotonic()
+    with _streaming_moderators_lock:
+        entry = _streaming_moderators.get(session_id)
+        if entry is None or now - entry[1] > STREAMING_MODERATOR_IDLE_SECONDS:
+            moderator = StreamingContentModerator(session_id, user_id)
+        else:
+            moderator = entry[0]
+        _streaming_moderators[session_id] = (moderator, now)
+        _streaming_moderators.move_to_end(session_id)
+        
+        # Oldest entries first: stop at the first one still in use and under the size bound
+        while _streaming_moderators:
+            oldest_id, (_, last_used) = next(iter(_streaming_moderators.items()))
+            if len(_streaming_moderators) <= MAX_STREAMING_MODERATORS and now - last_used <= STREAMING_MODERATOR_IDLE_SECONDS:
+                break
+            del _streaming_moderators[oldest_id]
+    return moderator
+
+def end_streaming_moderation(session_id: str) -> None:
+    """Drop per-session moderation state once the speaking session ends"""
+    with _streaming_moderators_lock:
+        _streaming_moderators.pop(session_id, None)
+
 if __name__ == "__main__":
     # Test the content moderation service
     test_cases = [
@@ -7,8 +7,14 @@ in accordance with Google Play's GenAI developer policies and AWS responsible AI
 """
 
 import json
+import os
 import re
+import time
+import glob
+import hashlib
+import threading
 import boto3
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 import logging
@@ -17,6 +23,199 @@ import logging
 logging.basicConfig(level=logging.INFO)
 safety_logger = logging.getLogger('content_safety')
 
+# AWS Comprehend limits
+COMPREHEND_MAX_TEXT_CHARS = 5000
+COMPREHEND_BATCH_SIZE = 25
+
+# Inputs shorter than this that pass the pattern pre-filter skip the remote sentiment call
+SHORT_INPUT_CHARS = 100
+
+# Maximum number of sentiment results kept in the per-container cache
+SENTIMENT_CACHE_SIZE = 2048
+
+# AWS clients are shared by every filter in the container (created on first use)
+_aws_clients: Dict[str, Any] = {}
+_aws_clients_lock = threading.Lock()
+
+def get_shared_client(service_name: str, region_name: str = 'us-east-1'):
+    """Get a boto3 client shared across the container"""
+    client = _aws_clients.get(service_name)
+    if client is None:
+        with _aws_clients_lock:
+            client = _aws_clients.get(service_name)
+            if client is None:
+                client = boto3.client(service_name, region_name=region_name)
+                _aws_clients[service_name] = client
+    return client
+
+# Per-process metric snapshots are written here so any worker can report totals for all workers
+SAFETY_METRICS_DIR = os.environ.get('SAFETY_METRICS_DIR', '/tmp/ielts_safety_metrics')
+SAFETY_METRICS_FLUSH_SECONDS = 10
+# Snapshots not rewritten for this long belong to workers that are gone
+SAFETY_METRICS_STALE_SECONDS = 6 * SAFETY_METRICS_FLUSH_SECONDS
+SAFETY_METRICS_NAMESPACE = 'IELTSGenAIPrep/ContentSafety'
+SAFETY_COUNTER_NAMES = ('total_requests', 'blocked_requests', 'flagged_content', 'educational_content')
+# EMF lines are printed on each background flush; on by default inside Lambda
+SAFETY_METRICS_EMF = os.environ.get(
+    'SAFETY_METRICS_EMF', 'true' if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') else 'false'
+).lower() == 'true'
+
+class ShardedCounters:
+    """
+    Counters sharded per thread and summed on read
+    
+    Each thread increments its own shard without locking; the registry lock is only taken the
+    first time a thread touches the counters. Shards of finished threads are folded into a
+    retired total so process totals never go backwards. A background thread writes the totals
+    for other workers every SAFETY_METRICS_FLUSH_SECONDS, off the request path.
+    """
+    
+    def __init__(self, names: Tuple[str, ...], on_flush=None):
+        self.names = names
+        self.on_flush = on_flush
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, Dict[str, int]]] = []
+        self._retired = dict.fromkeys(names, 0)
+        self._registry_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+        self._process_token = f"{os.getpid()}-{int(time.time() * 1000)}"
+    
+    def _shard(self) -> Dict[str, int]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = dict.fromkeys(self.names, 0)
+            with self._registry_lock:
+                self._shards.append((threading.current_thread(), shard))
+                self._start_flusher()
+            self._local.shard = shard
+        return shard
+    
+    def _start_flusher(self):
+        # Called under the registry lock; a forked worker needs its own thread
+        if self._flusher is not None and self._flusher.is_alive() and self._flusher_pid == os.getpid():
+            return
+        self._process_token = f"{os.getpid()}-{int(time.time() * 1000)}"
+        self._flusher_pid = os.getpid()
+        self._flusher = threading.Thread(target=self._flush_loop, name='safety-metrics-flush', daemon=True)
+        self._flusher.start()
+    
+    def _flush_loop(self):
+        while True:
+            time.sleep(SAFETY_METRICS_FLUSH_SECONDS)
+            try:
+                self.flush()
+            except Exception as e:
+                safety_logger.error(f"Safety metrics flush failed: {e}")
+    
+    def increment(self, name: str, amount: int = 1):
+        """Lock-free increment of this thread's shard"""
+        self._shard()[name] += amount
+    
+    def snapshot(self) -> Dict[str, int]:
+        """Sum all thread shards for this process, folding in shards of finished threads"""
+        with self._registry_lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    for name in self.names:
+                        self._retired[name] += shard[name]
+            self._shards = live
+            totals = dict(self._retired)
+            shards = [shard for _, shard in live]
+        for shard in shards:
+            for name in self.names:
+                totals[name] += shard[name]
+        return totals
+    
+    def flush(self):
+        """Write this process's totals for other workers to aggregate"""
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            os.makedirs(SAFETY_METRICS_DIR, exist_ok=True)
+            path = os.path.join(SAFETY_METRICS_DIR, f"{self._process_token}.json")
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            safety_logger.error(f"Safety metrics flush failed: {e}")
+        finally:
+            self._flush_lock.release()
+        if self.on_flush:
+            self.on_flush()
+    
+    @staticmethod
+    def _is_stale(path: str) -> bool:
+        """A snapshot whose worker has exited or stopped flushing"""
+        try:
+            pid = int(os.path.basename(path).split('-', 1)[0])
+            os.kill(pid, 0)
+        except (ValueError, ProcessLookupError):
+            return True
+        except PermissionError:
+            pass
+        try:
+            return time.time() - os.path.getmtime(path) > SAFETY_METRICS_STALE_SECONDS
+        except OSError:
+            return True
+    
+    def aggregate(self) -> Dict[str, int]:
+        """Sum totals across live worker processes, using live values for this one"""
+        totals = self.snapshot()
+        own_file = f"{self._process_token}.json"
+        for path in glob.glob(os.path.join(SAFETY_METRICS_DIR, '*.json')):
+            if os.path.basename(path) == own_file:
+                continue
+            if self._is_stale(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path) as f:
+                    process_totals = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name in self.names:
+                totals[name] += int(process_totals.get(name, 0))
+        return totals
+
+class SentimentCache:
+    """Bounded LRU cache of Comprehend sentiment results keyed by content hash"""
+    
+    def __init__(self, max_size: int = SENTIMENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def content_key(text: str) -> str:
+        """Hash the exact text sent to Comprehend"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+    
+    def put(self, key: str, result: Dict):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+# Sentiment results are shared by every filter in the container
+sentiment_cache = SentimentCache()
+
 class ContentSafetyFilter:
     """
     Comprehensive content safety filter implementing Google Play GenAI policy requirements
@@ -24,9 +223,6 @@ class ContentSafetyFilter:
     """
     
     def __init__(self):
-        self.comprehend = boto3.client('comprehend', region_name='us-east-1')
-        self.translate = boto3.client('translate', region_name='us-east-1')
-        
         # Educational context keywords that are acceptable
         self.educational_keywords = {
             'ielts', 'test', 'assessment', 'writing', 'speaking', 'academic', 'general',
@@ -45,13 +241,20 @@ class ContentSafetyFilter:
         ]
         
         # Initialize safety metrics tracking
-        self.safety_metrics = {
-            'total_requests': 0,
-            'blocked_requests': 0,
-            'flagged_content': 0,
-            'educational_content': 0,
-            'last_updated': datetime.now().isoformat()
-        }
+        self.safety_counters = ShardedCounters(
+            SAFETY_COUNTER_NAMES,
+            on_flush=self.emit_safety_metrics_emf if SAFETY_METRICS_EMF else None
+        )
+        self._emf_last_emitted = dict.fromkeys(SAFETY_COUNTER_NAMES, 0)
+        self._emf_lock = threading.Lock()
+    
+    @property
+    def comprehend(self):
+        return get_shared_client('comprehend')
+    
+    @property
+    def translate(self):
+        return get_shared_client('translate')
     
     def validate_user_input(self, user_input: str, context: str = "assessment") -> Tuple[bool, str, Dict]:
         """
@@ -64,73 +267,162 @@ class ContentSafetyFilter:
         Returns:
             Tuple of (is_safe: bool, sanitized_input: str, safety_report: dict)
         """
-        self.safety_metrics['total_requests'] += 1
-        
-        safety_report = {
-            'timestamp': datetime.now().isoformat(),
-            'context': context,
-            'original_length': len(user_input),
-            'safety_checks': []
-        }
+        return self.validate_user_inputs([(user_input, context)])[0]
+    
+    def validate_user_inputs(self, inputs: List[Tuple[str, str]]) -> List[Tuple[bool, str, Dict]]:
+        """
+        Validate many user inputs, batching the Comprehend calls
         
-        # 1. Basic content filtering
-        is_safe, violation_type = self._check_inappropriate_content(user_input)
-        safety_report['safety_checks'].append({
-            'check': 'inappropriate_content',
-            'passed': is_safe,
-            'violation_type': violation_type
-        })
+        The regex pre-filter runs first; blocked and short clean inputs never reach Comprehend,
+        cached sentiments are reused, and the rest go out in batch_detect_sentiment calls of 25.
         
-        if not is_safe:
-            self.safety_metrics['blocked_requests'] += 1
-            safety_logger.warning(f"Blocked inappropriate content: {violation_type}")
-            return False, "", safety_report
+        Args:
+            inputs: List of (user_input, context) pairs
+            
+        Returns:
+            List of (is_safe, sanitized_input, safety_report) in input order
+        """
+        results: List[Optional[Tuple[bool, str, Dict]]] = [None] * len(inputs)
+        reports: Dict[int, Dict] = {}
+        pending: Dict[str, List[int]] = {}
+        pending_texts: Dict[str, str] = {}
         
-        # 2. AWS Comprehend sentiment analysis
-        try:
-            sentiment_result = self.comprehend.detect_sentiment(
-                Text=user_input[:5000],  # AWS limit
-                LanguageCode='en'
-            )
+        for index, (user_input, context) in enumerate(inputs):
+            self.safety_counters.increment('total_requests')
+            
+            safety_report = {
+                'timestamp': datetime.now().isoformat(),
+                'context': context,
+                'original_length': len(user_input),
+                'safety_checks': []
+            }
             
+            # 1. Basic content filtering
+            is_safe, violation_type = self._check_inappropriate_content(user_input)
             safety_report['safety_checks'].append({
-                'check': 'sentiment_analysis',
-                'passed': True,
-                'sentiment': sentiment_result['Sentiment'],
-                'confidence': sentiment_result['SentimentScore']
+                'check': 'inappropriate_content',
+                'passed': is_safe,
+                'violation_type': violation_type
             })
             
-            # Flag extremely negative sentiment for review
-            if sentiment_result['Sentiment'] == 'NEGATIVE' and \
-               sentiment_result['SentimentScore']['Negative'] > 0.9:
-                self.safety_metrics['flagged_content'] += 1
-                safety_logger.info(f"Flagged highly negative content for review")
-                
-        except Exception as e:
-            safety_logger.error(f"Sentiment analysis failed: {e}")
+            if not is_safe:
+                self.safety_counters.increment('blocked_requests')
+                safety_logger.warning(f"Blocked inappropriate content: {violation_type}")
+                results[index] = (False, "", safety_report)
+                continue
+            
+            reports[index] = safety_report
+            
+            # Short inputs that passed the pre-filter are clearly clean
+            if len(user_input) < SHORT_INPUT_CHARS:
+                safety_report['safety_checks'].append({
+                    'check': 'sentiment_analysis',
+                    'passed': True,
+                    'skipped': 'short_clean_input'
+                })
+                continue
+            
+            text = user_input[:COMPREHEND_MAX_TEXT_CHARS]
+            key = sentiment_cache.content_key(text)
+            cached = sentiment_cache.get(key)
+            if cached is not None:
+                self._record_sentiment(safety_report, cached, cached=True)
+                continue
+            
+            pending.setdefault(key, []).append(index)
+            pending_texts[key] = text
+        
+        # 2. AWS Comprehend sentiment analysis for uncached inputs, deduplicated by content hash
+        if pending:
+            sentiments = self._detect_sentiments(list(pending_texts.items()))
+            for key, indexes in pending.items():
+                sentiment_result = sentiments.get(key)
+                for index in indexes:
+                    if isinstance(sentiment_result, dict):
+                        self._record_sentiment(reports[index], sentiment_result)
+                    else:
+                        reports[index]['safety_checks'].append({
+                            'check': 'sentiment_analysis',
+                            'passed': False,
+                            'error': sentiment_result or 'No sentiment result returned'
+                        })
+        
+        for index, safety_report in reports.items():
+            user_input, context = inputs[index]
+            
+            # 3. Educational content validation
+            is_educational = self._validate_educational_context(user_input)
             safety_report['safety_checks'].append({
-                'check': 'sentiment_analysis',
-                'passed': False,
-                'error': str(e)
+                'check': 'educational_context',
+                'passed': is_educational,
+                'educational_score': self._calculate_educational_score(user_input)
             })
+            
+            if is_educational:
+                self.safety_counters.increment('educational_content')
+            
+            # 4. Length and format validation for assessment context
+            sanitized_input = self._sanitize_assessment_input(user_input, context)
+            safety_report['sanitized_length'] = len(sanitized_input)
+            
+            safety_logger.info(f"Content safety validation completed: {context}")
+            results[index] = (True, sanitized_input, safety_report)
         
-        # 3. Educational content validation
-        is_educational = self._validate_educational_context(user_input)
-        safety_report['safety_checks'].append({
-            'check': 'educational_context',
-            'passed': is_educational,
-            'educational_score': self._calculate_educational_score(user_input)
-        })
+        return results
+    
+    def _detect_sentiments(self, items: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Run batch_detect_sentiment over (content_key, text) items
         
-        if is_educational:
-            self.safety_metrics['educational_content'] += 1
+        Returns:
+            Dict of content_key -> sentiment result dict, or error message string
+        """
+        sentiments: Dict[str, Any] = {}
+        
+        for start in range(0, len(items), COMPREHEND_BATCH_SIZE):
+            batch = items[start:start + COMPREHEND_BATCH_SIZE]
+            try:
+                response = self.comprehend.batch_detect_sentiment(
+                    TextList=[text for _, text in batch],
+                    LanguageCode='en'
+                )
+            except Exception as e:
+                safety_logger.error(f"Sentiment analysis failed: {e}")
+                for key, _ in batch:
+                    sentiments[key] = str(e)
+                continue
+            
+            for item in response.get('ResultList', []):
+                key = batch[item['Index']][0]
+                sentiment_result = {
+                    'Sentiment': item['Sentiment'],
+                    'SentimentScore': item['SentimentScore']
+                }
+                sentiment_cache.put(key, sentiment_result)
+                sentiments[key] = sentiment_result
+            
+            for item in response.get('ErrorList', []):
+                key = batch[item['Index']][0]
+                safety_logger.error(f"Sentiment analysis failed: {item.get('ErrorCode')}")
+                sentiments[key] = item.get('ErrorMessage', item.get('ErrorCode', 'Unknown error'))
         
-        # 4. Length and format validation for assessment context
-        sanitized_input = self._sanitize_assessment_input(user_input, context)
-        safety_report['sanitized_length'] = len(sanitized_input)
+        return sentiments
+    
+    def _record_sentiment(self, safety_report: Dict, sentiment_result: Dict, cached: bool = False):
+        """Add a sentiment check to the report and flag highly negative content"""
+        safety_report['safety_checks'].append({
+            'check': 'sentiment_analysis',
+            'passed': True,
+            'sentiment': sentiment_result['Sentiment'],
+            'confidence': sentiment_result['SentimentScore'],
+            'cached': cached
+        })
         
-        safety_logger.info(f"Content safety validation completed: {context}")
-        return True, sanitized_input, safety_report
+        # Flag extremely negative sentiment for review
+        if sentiment_result['Sentiment'] == 'NEGATIVE' and \
+           sentiment_result['SentimentScore']['Negative'] > 0.9:
+            self.safety_counters.increment('flagged_content')
+            safety_logger.info(f"Flagged highly negative content for review")
     
     def validate_ai_output(self, ai_output: str, assessment_type: str) -> Tuple[bool, str, Dict]:
         """
@@ -159,7 +451,7 @@ class ContentSafetyFilter:
         })
         
         if not is_safe:
-            self.safety_metrics['blocked_requests'] += 1
+            self.safety_counters.increment('blocked_requests')
             safety_logger.warning(f"Blocked inappropriate AI output: {violation_type}")
             return False, self._get_safe_fallback_response(assessment_type), safety_report
         
@@ -256,10 +548,50 @@ class ContentSafetyFilter:
         
         return fallback_responses.get(assessment_type, "I apologize, but I cannot process that content. Please try again with assessment-related content.")
     
-    def get_safety_metrics(self) -> Dict:
-        """Get current safety metrics for monitoring and compliance"""
-        self.safety_metrics['last_updated'] = datetime.now().isoformat()
-        return self.safety_metrics.copy()
+    @property
+    def safety_metrics(self) -> Dict:
+        """Read-only snapshot of this process's counters"""
+        return self.get_safety_metrics(all_processes=False)
+    
+    def get_safety_metrics(self, all_processes: bool = True) -> Dict:
+        """Get current safety metrics for monitoring and compliance (read-only)"""
+        if all_processes:
+            metrics = self.safety_counters.aggregate()
+        else:
+            metrics = self.safety_counters.snapshot()
+        
+        total = metrics['total_requests']
+        metrics['blocked_rate'] = metrics['blocked_requests'] / total if total else 0.0
+        metrics['flagged_rate'] = metrics['flagged_content'] / total if total else 0.0
+        metrics['scope'] = 'all_processes' if all_processes else 'process'
+        metrics['last_updated'] = datetime.now().isoformat()
+        return metrics
+    
+    def emit_safety_metrics_emf(self) -> Dict:
+        """
+        Emit this process's counter increments since the last emission as a CloudWatch
+        Embedded Metric Format log line; CloudWatch sums the deltas across workers
+        """
+        with self._emf_lock:
+            current = self.safety_counters.snapshot()
+            deltas = {name: current[name] - self._emf_last_emitted[name] for name in SAFETY_COUNTER_NAMES}
+            self._emf_last_emitted = current
+        
+        emf_record = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': SAFETY_METRICS_NAMESPACE,
+                    'Dimensions': [['Service']],
+                    'Metrics': [{'Name': name, 'Unit': 'Count'} for name in SAFETY_COUNTER_NAMES]
+                }]
+            },
+            'Service': 'content_safety'
+        }
+        emf_record.update(deltas)
+        
+        print(json.dumps(emf_record))
+        return emf_record
     
     def log_safety_incident(self, incident_type: str, details: Dict):
         """Log safety incidents for compliance monitoring"""
@@ -282,10 +614,14 @@ def validate_user_input_safe(user_input: str, context: str = "assessment") -> Tu
     """Global function for user input validation"""
     return content_safety.validate_user_input(user_input, context)
 
+def validate_user_inputs_safe(inputs: List[Tuple[str, str]]) -> List[Tuple[bool, str, Dict]]:
+    """Global function for batched user input validation"""
+    return content_safety.validate_user_inputs(inputs)
+
 def validate_ai_output_safe(ai_output: str, assessment_type: str) -> Tuple[bool, str, Dict]:
     """Global function for AI output validation"""
     return content_safety.validate_ai_output(ai_output, assessment_type)
 
 def get_safety_metrics() -> Dict:
     """Get current safety metrics"""
-    return content_safety.get_safety_metrics()
\ No newline at end of file
+    return content_safety.get_safety_metrics()
@@ -7,12 +7,73 @@ scores and feedback in user profiles for 1 year as required by data storage poli
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from botocore.exceptions import ClientError
 
 from question_bank_dal import get_question_bank_dal
 
 logger = logging.getLogger(__name__)
 
+# Session attributes holding conversation content, removed once an assessment is scored
+CONVERSATION_DATA_KEYS = (
+    'conversation_history',
+    'audio_recordings',
+    'transcript_data',
+    'user_responses',
+    'maya_responses',
+    'conversation_context',
+    'speech_analysis',
+    'detailed_conversation_log'
+)
+
+
+def strip_conversation_data(sessions_table, session_id: str, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """
+    Remove conversation data from a session with one UpdateItem (no read-modify-write)
+
+    Returns:
+        The UpdateItem response, or None if the session does not exist
+    """
+    names = {f'#c{i}': key for i, key in enumerate(CONVERSATION_DATA_KEYS)}
+    try:
+        return sessions_table.update_item(
+            Key={'session_id': session_id},
+            UpdateExpression=(f"REMOVE {', '.join(names)} "
+                              'SET conversation_data_cleaned = :true, data_cleanup_date = :now, last_updated = :now, '
+                              'retention_policy_applied = :true'),
+            ConditionExpression='attribute_exists(session_id)',
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues={':true': True, ':now': (now or datetime.utcnow()).isoformat()},
+            ReturnConsumedCapacity='TOTAL'
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return None
+        raise
+
+
+def active_history_records(records: List[Dict[str, Any]], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Records of an embedded assessment_history list that have not expired"""
+    current_time = now or datetime.utcnow()
+    active_records = []
+    for record in records:
+        expiry_date_str = record.get('expiry_date')
+        if expiry_date_str:
+            try:
+                expiry_date = datetime.fromisoformat(expiry_date_str.replace('Z', '+00:00')).replace(tzinfo=None)
+                if expiry_date > current_time:
+                    active_records.append(record)
+                else:
+                    logger.info(f"Removed expired assessment record: {record.get('session_id')}")
+            except ValueError:
+                # Keep records with invalid dates to be safe
+                active_records.append(record)
+        else:
+            # Keep records without expiry dates
+            active_records.append(record)
+    return active_records
+
 class ConversationDataRetentionManager:
     """Manages conversation data cleanup and user profile storage"""
     
@@ -121,58 +182,28 @@ class ConversationDataRetentionManager:
         session_id: str, 
         preserved_data: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Store preserved assessment data in user profile with 1-year retention"""
-        try:
-            # Get or create user profile
-            profile_result = self.question_dal.get_user_profile(user_email)
-            
-            if not profile_result.get('success'):
-                # Create new profile if doesn't exist
-                profile_data = {
-                    'user_email': user_email,
-                    'assessment_history': [],
-                    'created_date': datetime.utcnow().isoformat(),
-                    'last_updated': datetime.utcnow().isoformat()
-                }
-            else:
-                profile_data = profile_result['profile']
-                if 'assessment_history' not in profile_data:
-                    profile_data['assessment_history'] = []
-            
-            # Add preserved assessment data
-            assessment_record = {
-                'session_id': session_id,
-                'stored_date': datetime.utcnow().isoformat(),
-                'expiry_date': preserved_data['expiry_date'],
-                **preserved_data
+        """Store preserved assessment data with 1-year retention (history item + profile counter)"""
+        # Add preserved assessment data
+        assessment_record = {
+            'session_id': session_id,
+            'stored_date': datetime.utcnow().isoformat(),
+            'expiry_date': preserved_data['expiry_date'],
+            **preserved_data
+        }
+        
+        # Appended as its own item; expired records are removed by DynamoDB TTL
+        store_result = self.question_dal.append_assessment_history(user_email, assessment_record)
+        
+        if store_result.get('success'):
+            logger.info(f"Assessment data preserved in user profile for {user_email}")
+            return {
+                'success': True,
+                'message': 'Assessment data stored in user profile for 1 year'
             }
-            
-            profile_data['assessment_history'].append(assessment_record)
-            profile_data['last_updated'] = datetime.utcnow().isoformat()
-            
-            # Clean up expired records (older than 1 year)
-            self._cleanup_expired_profile_data(profile_data)
-            
-            # Store updated profile
-            store_result = self.question_dal.store_user_profile(user_email, profile_data)
-            
-            if store_result.get('success'):
-                logger.info(f"Assessment data preserved in user profile for {user_email}")
-                return {
-                    'success': True,
-                    'message': 'Assessment data stored in user profile for 1 year'
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': 'Failed to store profile data'
-                }
-                
-        except Exception as e:
-            logger.error(f"Error storing preserved data in profile: {e}")
+        else:
             return {
                 'success': False,
-                'error': f'Profile storage failed: {str(e)}'
+                'error': 'Failed to store profile data'
             }
     
     def _cleanup_conversation_data(self, session_id: str) -> Dict[str, Any]:
@@ -182,18 +213,8 @@ class ConversationDataRetentionManager:
             
             maya_engine = get_maya_engine()
             
-            # Clear conversation state if session exists
-            if hasattr(maya_engine, 'conversation_state'):
-                if maya_engine.conversation_state.get('session_id') == session_id:
-                    # Keep only essential non-conversation data
-                    maya_engine.conversation_state = {
-                        'session_id': None,
-                        'stage': None,
-                        'conversation_history': [],  # Clear all conversation history
-                        'user_context': {},  # Clear user context data
-                        'current_topics': [],  # Clear topics discussed
-                        'evaluation_notes': []  # Clear evaluation notes
-                    }
+            # Delete the session's stored conversation state (history, user context, topics, notes)
+            maya_engine.end_session(session_id)
             
             logger.info(f"Maya conversation data cleared for session {session_id}")
             return {
@@ -211,42 +232,14 @@ class ConversationDataRetentionManager:
     def _cleanup_session_conversation_data(self, session_id: str) -> Dict[str, Any]:
         """Remove conversation data from session storage"""
         try:
-            # Get session data
-            session_result = self.question_dal.get_assessment_session(session_id)
-            
-            if session_result.get('success'):
-                session_data = session_result['session']
-                
-                # Remove conversation-related data while keeping assessment structure
-                conversation_keys_to_remove = [
-                    'conversation_history',
-                    'audio_recordings',
-                    'transcript_data',
-                    'user_responses',
-                    'maya_responses',
-                    'conversation_context',
-                    'speech_analysis',
-                    'detailed_conversation_log'
-                ]
-                
-                for key in conversation_keys_to_remove:
-                    if key in session_data:
-                        del session_data[key]
-                
-                # Mark as data-cleaned and preserve only completion status
-                session_data['conversation_data_cleaned'] = True
-                session_data['data_cleanup_date'] = datetime.utcnow().isoformat()
-                session_data['retention_policy_applied'] = True
-                
-                # Update session without conversation data
-                update_result = self.question_dal.update_assessment_session(session_id, session_data)
-                
-                if update_result.get('success'):
-                    logger.info(f"Session conversation data cleaned for {session_id}")
-                    return {
-                        'success': True,
-                        'message': 'Session conversation data removed'
-                    }
+            # Remove conversation-related data while keeping assessment structure,
+            # and mark the session as data-cleaned
+            if strip_conversation_data(self.question_dal.sessions_table, session_id) is not None:
+                logger.info(f"Session conversation data cleaned for {session_id}")
+                return {
+                    'success': True,
+                    'message': 'Session conversation data removed'
+                }
             
             return {
                 'success': False,
@@ -260,53 +253,11 @@ class ConversationDataRetentionManager:
                 'error': f'Session cleanup failed: {str(e)}'
             }
     
-    def _cleanup_expired_profile_data(self, profile_data: Dict[str, Any]):
-        """Remove expired assessment records from user profile"""
-        if 'assessment_history' not in profile_data:
-            return
-        
-        current_time = datetime.utcnow()
-        active_records = []
-        
-        for record in profile_data['assessment_history']:
-            expiry_date_str = record.get('expiry_date')
-            if expiry_date_str:
-                try:
-                    expiry_date = datetime.fromisoformat(expiry_date_str.replace('Z', '+00:00'))
-                    if expiry_date > current_time:
-                        active_records.append(record)
-                    else:
-                        logger.info(f"Removed expired assessment record: {record.get('session_id')}")
-                except ValueError:
-                    # Keep records with invalid dates to be safe
-                    active_records.append(record)
-            else:
-                # Keep records without expiry dates
-                active_records.append(record)
-        
-        profile_data['assessment_history'] = active_records
-    
     def get_user_assessment_history(self, user_email: str, limit: int = 10) -> Dict[str, Any]:
         """Get user's preserved assessment history (scores and feedback only)"""
         try:
-            profile_result = self.question_dal.get_user_profile(user_email)
-            
-            if not profile_result.get('success'):
-                return {
-                    'success': True,
-                    'assessment_history': [],
-                    'message': 'No assessment history found'
-                }
-            
-            profile_data = profile_result['profile']
-            assessment_history = profile_data.get('assessment_history', [])
-            
-            # Sort by assessment date (most recent first) and limit results
-            sorted_history = sorted(
-                assessment_history,
-                key=lambda x: x.get('assessment_date', ''),
-                reverse=True
-            )[:limit]
+            # Newest first, read from the user's history items
+            sorted_history = self.question_dal.query_assessment_history(user_email, limit=limit)
             
             # Remove internal fields from response
             clean_history = []
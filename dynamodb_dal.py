@@ -6,6 +6,7 @@ import boto3
 from boto3.dynamodb.conditions import Key, Attr
 import json
 import os
+import time
 import secrets
 import hashlib
 from datetime import datetime, timedelta
@@ -14,8 +15,15 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from botocore.exceptions import ClientError
 import logging
 
+from pagination import HISTORY_SUMMARY_FIELDS, clamp_page_size, decode_cursor, encode_cursor
+import request_loader
+
 logger = logging.getLogger(__name__)
 
+# Retries of BatchGetItem's unprocessed keys, with exponential backoff from the base delay
+MAX_UNPROCESSED_RETRIES = 6
+RETRY_BASE_DELAY_SECONDS = 0.05
+
 class DynamoDBConnection:
     """Manages DynamoDB connection and region switching"""
     
@@ -90,6 +98,7 @@ class UserDAL:
                 raise ValueError("Username already exists")
             
             self.table.put_item(Item=user_item)
+            request_loader.invalidate(self.table.name, email.lower())
             return self._format_user_response(user_item)
             
         except ClientError as e:
@@ -112,15 +121,45 @@ class UserDAL:
     
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email - primary key lookup"""
+        item = self.load_user_item(email)
+        return self._format_user_response(item) if item else None
+    
+    def get_users_by_email(self, emails: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get several users by email with batched reads (None for unknown emails)"""
         try:
-            response = self.table.get_item(Key={'email': email.lower()})
-            if 'Item' in response:
-                return self._format_user_response(response['Item'])
-            return None
-        except ClientError as e:
+            items = request_loader.load_many(self.table.name, [email.lower() for email in emails],
+                                             self._batch_get_items)
+        except (ClientError, RuntimeError) as e:
+            logger.error(f"Failed to get users by email: {e}")
+            return {email: None for email in emails}
+        return {email: self._format_user_response(items[email.lower()]) if items[email.lower()] else None
+                for email in emails}
+    
+    def load_user_item(self, email: str) -> Optional[Dict[str, Any]]:
+        """Raw user item, read at most once per request scope"""
+        try:
+            return request_loader.load(self.table.name, email.lower(), self._batch_get_items)
+        except (ClientError, RuntimeError) as e:
             logger.error(f"Failed to get user by email {email}: {e}")
             return None
     
+    def _batch_get_items(self, emails: List[str]) -> Dict[str, Dict[str, Any]]:
+        """BatchGetItem of up to 100 users, retrying unprocessed keys"""
+        found = {}
+        request = {self.table.name: {'Keys': [{'email': email} for email in emails]}}
+        attempt = 0
+        while request:
+            response = self.conn.dynamodb.batch_get_item(RequestItems=request)
+            for item in response.get('Responses', {}).get(self.table.name, []):
+                found[item['email']] = item
+            request = response.get('UnprocessedKeys')
+            if request:
+                attempt += 1
+                if attempt > MAX_UNPROCESSED_RETRIES:
+                    raise RuntimeError(f"Keys left unprocessed in {self.table.name}")
+                time.sleep(RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1)))
+        return found
+    
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username - scan operation (consider adding GSI for performance)"""
         try:
@@ -165,6 +204,7 @@ class UserDAL:
                 ExpressionAttributeNames=expr_attr_names,
                 ExpressionAttributeValues=expr_attr_values
             )
+            request_loader.invalidate(self.table.name, email.lower())
             return True
         except ClientError as e:
             logger.error(f"Failed to update user {email}: {e}")
@@ -465,54 +505,96 @@ class AssessmentEntitlementDAL:
         
         try:
             self.table.put_item(Item=entitlement_item)
+            request_loader.invalidate(self.user_index_name, user_id)
             return entitlement_id
         except ClientError as e:
             logger.error(f"Failed to create entitlement: {e}")
             raise
     
+    @property
+    def user_index_name(self) -> str:
+        """Request loader name for the per-user GSI1 reads"""
+        return f'{self.table.name}#GSI1'
+    
     def get_user_entitlements(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all entitlements for a user"""
+        return [self._format_entitlement_response(item) for item in self.load_user_entitlement_items(user_id)]
+    
+    def load_user_entitlement_items(self, user_id: str) -> List[Dict[str, Any]]:
+        """Raw entitlement items of a user, queried at most once per request scope"""
         try:
-            response = self.table.query(
-                IndexName='GSI1',
-                KeyConditionExpression='GSI1PK = :pk',
-                ExpressionAttributeValues={':pk': f'USER#{user_id}'}
-            )
-            
-            return [self._format_entitlement_response(item) for item in response['Items']]
+            return request_loader.load(self.user_index_name, user_id, self._query_user_entitlements) or []
         except ClientError as e:
             logger.error(f"Failed to get entitlements for user {user_id}: {e}")
             return []
     
+    def _query_user_entitlements(self, user_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """GSI1 query per user (queries cannot be batched; the loader still memoizes them)"""
+        entitlements = {}
+        for user_id in user_ids:
+            query = {
+                'IndexName': 'GSI1',
+                'KeyConditionExpression': Key('GSI1PK').eq(f'USER#{user_id}')
+            }
+            items = []
+            while True:
+                response = self.table.query(**query)
+                items.extend(response['Items'])
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            entitlements[user_id] = items
+        return entitlements
+    
     def consume_entitlement(self, user_id: str, product_id: str) -> bool:
         """Consume one use of an entitlement"""
-        entitlements = self.get_user_entitlements(user_id)
+        return self.consume_entitlement_use(user_id, product_id) is not None
+    
+    def consume_entitlement_use(self, user_id: str, product_id: str) -> Optional[int]:
+        """
+        Consume one use of the user's entitlement for a product
         
-        # Find active entitlement for product
-        for entitlement in entitlements:
-            if (entitlement['product_id'] == product_id and 
-                entitlement['remaining_uses'] > 0):
-                
-                # Check expiration
-                if entitlement['expires_at']:
-                    if entitlement['expires_at'] <= datetime.utcnow():
-                        continue
-                
-                # Decrement usage
-                try:
-                    self.table.update_item(
-                        Key={'entitlement_id': entitlement['entitlement_id']},
-                        UpdateExpression='SET remaining_uses = remaining_uses - :dec',
-                        ConditionExpression='remaining_uses > :zero',
-                        ExpressionAttributeValues={':dec': 1, ':zero': 0}
-                    )
-                    return True
-                except ClientError as e:
-                    if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
-                        continue  # Try next entitlement
-                    logger.error(f"Failed to consume entitlement: {e}")
+        Candidates come from a keys-only GSI1 query narrowed to the product; each is then
+        consumed by a single conditional UpdateItem, so concurrent starts cannot double-spend.
         
-        return False
+        Returns:
+            Remaining uses after consumption, or None if no usable entitlement was left
+        """
+        try:
+            response = self.table.query(
+                IndexName='GSI1',
+                KeyConditionExpression=Key('GSI1PK').eq(f'USER#{user_id}') & Key('GSI1SK').begins_with(f'PRODUCT#{product_id}#'),
+                FilterExpression=Attr('remaining_uses').gt(0),
+                ProjectionExpression='entitlement_id'
+            )
+        except ClientError as e:
+            logger.error(f"Failed to get entitlements for user {user_id}: {e}")
+            return None
+        
+        for item in response['Items']:
+            remaining = self.consume_entitlement_by_id(item['entitlement_id'])
+            if remaining is not None:
+                request_loader.invalidate(self.user_index_name, user_id)
+                return remaining
+        return None
+    
+    def consume_entitlement_by_id(self, entitlement_id: str) -> Optional[int]:
+        """Atomically take one use if any remain and the entitlement has not expired"""
+        now = datetime.utcnow().isoformat()
+        try:
+            response = self.table.update_item(
+                Key={'entitlement_id': entitlement_id},
+                UpdateExpression='SET remaining_uses = remaining_uses - :one, last_used_at = :now',
+                ConditionExpression=('remaining_uses > :zero AND (attribute_not_exists(expires_at) '
+                                     'OR attribute_type(expires_at, :null) OR expires_at > :now)'),
+                ExpressionAttributeValues={':one': 1, ':zero': 0, ':now': now, ':null': 'NULL'},
+                ReturnValues='UPDATED_NEW'
+            )
+            return int(response['Attributes']['remaining_uses'])
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                logger.error(f"Failed to consume entitlement {entitlement_id}: {e}")
+            return None
     
     def _generate_entitlement_id(self) -> str:
         """Generate unique entitlement ID"""
@@ -535,6 +617,48 @@ class AssessmentEntitlementDAL:
         return entitlement
 
 
+class AssessmentResultDAL:
+    """Assessment Result Data Access Layer (history reads via the user-history-index GSI)"""
+    
+    HISTORY_INDEX = 'user-history-index'
+    
+    def __init__(self, connection: DynamoDBConnection):
+        self.conn = connection
+        stage = os.environ.get('STAGE', 'prod')
+        table_name = f'ielts-genai-prep-assessment-results-{stage}'
+        self.table = connection.get_table(table_name)
+    
+    def get_user_history(self, user_email: str, limit: Optional[int] = None,
+                         cursor: Optional[str] = None,
+                         projection: Optional[tuple] = HISTORY_SUMMARY_FIELDS) -> Dict[str, Any]:
+        """Newest-first page of a user's results as {'items': [...], 'next_cursor': str or None}"""
+        query = {
+            'IndexName': self.HISTORY_INDEX,
+            'KeyConditionExpression': Key('user_email').eq(user_email),
+            'ScanIndexForward': False,
+            'Limit': clamp_page_size(limit)
+        }
+        start_key = decode_cursor(cursor)
+        if start_key:
+            query['ExclusiveStartKey'] = start_key
+        if projection:
+            # 'timestamp' is a reserved word, so every attribute goes through a placeholder
+            names = {f'#a{i}': field for i, field in enumerate(projection)}
+            query['ProjectionExpression'] = ', '.join(names)
+            query['ExpressionAttributeNames'] = names
+        
+        try:
+            response = self.table.query(**query)
+        except ClientError as e:
+            logger.error(f"Failed to query assessment history for {user_email}: {e}")
+            return {'items': [], 'next_cursor': None}
+        
+        return {
+            'items': response.get('Items', []),
+            'next_cursor': encode_cursor(response.get('LastEvaluatedKey'))
+        }
+
+
 # Main DAL Manager
 class IELTSGenAIDAL:
     """Main Data Access Layer for IELTS GenAI Prep"""
@@ -544,6 +668,57 @@ class IELTSGenAIDAL:
         self.users = UserDAL(self.connection)
         self.qr_tokens = QRTokenDAL(self.connection)
         self.entitlements = AssessmentEntitlementDAL(self.connection)
+        self.assessment_results = AssessmentResultDAL(self.connection)
+    
+    def consume_assessment_attempt(self, user_email: str, assessment_type: str) -> Optional[int]:
+        """
+        Take one attempt from the user's entitlements (the assessment's own, then a package)
+        
+        Returns:
+            Attempts remaining on the consumed entitlement, or None if none was available
+        """
+        # Only the user_id is needed to find the entitlements
+        user = self.users.load_user_item(user_email)
+        if not user:
+            return None
+        for product_id in (assessment_type, 'all_assessments'):
+            remaining = self.entitlements.consume_entitlement_use(user['user_id'], product_id)
+            if remaining is not None:
+                return remaining
+        return None
+    
+    def use_assessment_attempt(self, user_email: str, assessment_type: str) -> bool:
+        """Consume one assessment attempt"""
+        return self.consume_assessment_attempt(user_email, assessment_type) is not None
+    
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Get user by email (memoized per request scope)"""
+        return self.users.get_user_by_email(email)
+    
+    def update_user(self, email: str, **kwargs) -> bool:
+        """Update user fields by email"""
+        return self.users.update_user(email, **kwargs)
+    
+    def get_user_assessment_counts(self, user_email: str) -> Dict[str, Dict[str, int]]:
+        """Attempts remaining per product across the user's unexpired entitlements"""
+        user = self.users.load_user_item(user_email)
+        if not user:
+            return {}
+        
+        now = datetime.utcnow().isoformat()
+        counts = {}
+        for item in self.entitlements.load_user_entitlement_items(user['user_id']):
+            if item.get('expires_at') and item['expires_at'] <= now:
+                continue
+            product_counts = counts.setdefault(item['product_id'], {'attempts_remaining': 0, 'entitlements': 0})
+            product_counts['attempts_remaining'] += int(item.get('remaining_uses', 0))
+            product_counts['entitlements'] += 1
+        return counts
+    
+    def has_assessment_access(self, user_email: str, assessment_type: str) -> bool:
+        """Check if the user has attempts remaining for this assessment type"""
+        counts = self.get_user_assessment_counts(user_email)
+        return counts.get(assessment_type, {}).get('attempts_remaining', 0) > 0
     
     def health_check(self) -> Dict[str, Any]:
         """Check DynamoDB connectivity and table status"""
@@ -0,0 +1,144 @@
+"""
+Evaluation Orchestrator
+Fans out one model call per IELTS criterion concurrently (bounded across the container),
+merges the criterion results and falls back to the single-call evaluation on failure
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+WRITING_CRITERIA = (
+    'task_achievement',
+    'coherence_and_cohesion',
+    'lexical_resource',
+    'grammatical_range_and_accuracy'
+)
+
+# How writing is evaluated: 'per_criterion' (concurrent Nova Micro call per criterion, single call
+# as fallback), 'single_call' (one Nova Micro call) or 'local' (content heuristics, no Bedrock)
+WRITING_EVALUATION_MODES = ('per_criterion', 'single_call', 'local')
+WRITING_EVALUATION_MODE = os.environ.get('WRITING_EVALUATION_MODE', 'local')
+if WRITING_EVALUATION_MODE not in WRITING_EVALUATION_MODES:
+    logger.warning("Unknown WRITING_EVALUATION_MODE %r, using 'local'", WRITING_EVALUATION_MODE)
+    WRITING_EVALUATION_MODE = 'local'
+
+# Maximum criterion calls in flight per container (shared by all concurrent submissions)
+MAX_CRITERION_CONCURRENCY = int(os.environ.get('NOVA_MICRO_MAX_CONCURRENCY', '8'))
+
+# Waiting longer than this for a call slot or a criterion result triggers the single-call fallback
+SLOT_TIMEOUT_SECONDS = 2.0
+CRITERION_TIMEOUT_SECONDS = 30.0
+
+CriterionEvaluator = Callable[[str], Dict[str, Any]]
+
+
+def round_band(score: float) -> float:
+    """Round to the nearest half band"""
+    return round(score * 2) / 2
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+class EvaluationOrchestrator:
+    """Concurrent per-criterion evaluation with a bounded number of in-flight model calls"""
+
+    def __init__(self, max_concurrency: int = MAX_CRITERION_CONCURRENCY,
+                 slot_timeout: float = SLOT_TIMEOUT_SECONDS,
+                 criterion_timeout: float = CRITERION_TIMEOUT_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.slot_timeout = slot_timeout
+        self.criterion_timeout = criterion_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='criterion-eval')
+
+    @staticmethod
+    def _run_criterion(evaluator: CriterionEvaluator, criterion: str) -> Tuple[str, Dict[str, Any], float]:
+        start = time.perf_counter()
+        result = evaluator(criterion)
+        return criterion, result, _elapsed_ms(start)
+
+    def _fan_out(self, criteria: Tuple[str, ...], evaluator: CriterionEvaluator,
+                 timings: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        futures = {}
+        try:
+            for criterion in criteria:
+                if not self._slots.acquire(timeout=self.slot_timeout):
+                    raise TimeoutError(f"No evaluation slot free for {criterion}")
+                future = self._executor.submit(self._run_criterion, evaluator, criterion)
+                # Released on completion or cancellation
+                future.add_done_callback(lambda _: self._slots.release())
+                futures[future] = criterion
+
+            results = {}
+            for future in as_completed(futures, timeout=self.criterion_timeout):
+                criterion, result, elapsed = future.result()
+                results[criterion] = result
+                timings['criteria'][criterion] = elapsed
+            return results
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def evaluate(self, criteria: Iterable[str], criterion_evaluator: CriterionEvaluator,
+                 single_call: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Evaluate all criteria concurrently
+
+        Args:
+            criteria: Criterion keys, e.g. WRITING_CRITERIA
+            criterion_evaluator: Returns {'score': band, 'feedback': str} for one criterion
+            single_call: Monolithic evaluation used when the fan-out fails
+
+        Returns:
+            Evaluation with criteria_scores, criteria_feedback, overall_band, evaluation_mode and timings (ms)
+        """
+        criteria = tuple(criteria)
+        start = time.perf_counter()
+        timings: Dict[str, Any] = {'criteria': {}}
+
+        try:
+            results = self._fan_out(criteria, criterion_evaluator, timings)
+            timings['fan_out'] = _elapsed_ms(start)
+        except Exception as e:
+            logger.warning(f"Per-criterion evaluation failed ({e}); falling back to single call")
+            timings['fan_out_failed'] = _elapsed_ms(start)
+            fallback_start = time.perf_counter()
+            evaluation = single_call()
+            timings['single_call'] = _elapsed_ms(fallback_start)
+            timings['total'] = _elapsed_ms(start)
+            evaluation['evaluation_mode'] = 'single_call'
+            evaluation['timings'] = timings
+            return evaluation
+
+        merge_start = time.perf_counter()
+        criteria_scores = {criterion: results[criterion]['score'] for criterion in criteria}
+        evaluation = {
+            'overall_band': round_band(sum(criteria_scores.values()) / len(criteria_scores)),
+            'criteria_scores': criteria_scores,
+            'criteria_feedback': {criterion: results[criterion].get('feedback', '') for criterion in criteria},
+            'evaluation_mode': 'per_criterion'
+        }
+        timings['merge'] = _elapsed_ms(merge_start)
+        timings['total'] = _elapsed_ms(start)
+        evaluation['timings'] = timings
+        return evaluation
+
+
+# Global orchestrator instance
+_orchestrator = None
+
+def get_evaluation_orchestrator() -> EvaluationOrchestrator:
+    """Get the global evaluation orchestrator"""
+    global _orchestrator
+    if _orchestrator is None:
+        _orchestrator = EvaluationOrchestrator()
+    return _orchestrator
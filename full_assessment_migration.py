@@ -443,6 +443,13 @@ def create_assessment_criteria_table():
     print(f"[MIGRATION] Created {len(criteria)} assessment criteria sets")
     return criteria
 
+def batch_put_all(table, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Write items 25 per batch call; returns the items that could not be stored"""
+    failed = []
+    for start in range(0, len(items), table.BATCH_WRITE_LIMIT):
+        failed.extend(table.batch_put(items[start:start + table.BATCH_WRITE_LIMIT]))
+    return failed
+
 def migrate_all_content():
     """Perform complete migration of all assessment content"""
     print("[MIGRATION] Starting full assessment content migration...")
@@ -461,23 +468,19 @@ def migrate_all_content():
     all_questions.extend(reading_content)
     all_questions.extend(speaking_content)
     
-    # Add questions to DynamoDB
+    # Add questions to DynamoDB in BatchWriteItem-sized chunks
     questions_table = aws_mock.assessment_results_table  # Reuse existing table
     
-    for question in all_questions:
-        success = questions_table.put_item(question)
-        if success:
-            print(f"[MIGRATION] Added question {question['id']} - {question['assessment_type']}")
-        else:
-            print(f"[MIGRATION ERROR] Failed to add question {question['id']}")
+    failed = batch_put_all(questions_table, all_questions)
+    for question in failed:
+        print(f"[MIGRATION ERROR] Failed to add question {question['id']}")
+    print(f"[MIGRATION] Added {len(all_questions) - len(failed)} questions")
     
     # Add criteria to rubrics table
-    for criteria in assessment_criteria:
-        success = aws_mock.assessment_rubrics_table.put_item(criteria)
-        if success:
-            print(f"[MIGRATION] Added criteria {criteria['id']}")
-        else:
-            print(f"[MIGRATION ERROR] Failed to add criteria {criteria['id']}")
+    failed = batch_put_all(aws_mock.assessment_rubrics_table, assessment_criteria)
+    for criteria in failed:
+        print(f"[MIGRATION ERROR] Failed to add criteria {criteria['id']}")
+    print(f"[MIGRATION] Added {len(assessment_criteria) - len(failed)} criteria sets")
     
     print(f"[MIGRATION] Migration complete:")
     print(f"  - Academic Writing: {len(academic_writing)} questions")
@@ -0,0 +1,215 @@
+"""
+GDPR Erasure Engine
+Enumerates a user's items through per-user indexes, deletes them with batched writes
+(25 per call, unprocessed items retried) in parallel across tables, deletes the user's
+GDPR export files and export requests, revokes the user's sessions and records a
+verifiable erasure receipt
+"""
+
+import time
+import uuid
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# BatchWriteItem accepts at most 25 requests per call
+BATCH_WRITE_LIMIT = 25
+
+# Tables erased concurrently
+MAX_ERASURE_WORKERS = 4
+
+# Retries of a batch's unprocessed items, with exponential backoff from the base delay
+MAX_UNPROCESSED_RETRIES = 6
+RETRY_BASE_DELAY_SECONDS = 0.05
+
+class ErasureIncompleteError(Exception):
+    """Raised when items are still unprocessed after all retries"""
+
+
+def user_hash(user_email: str) -> str:
+    """Pseudonymous user reference kept in receipts instead of the email"""
+    return hashlib.sha256(user_email.strip().lower().encode('utf-8')).hexdigest()
+
+
+def keys_digest(erased: Dict[str, List[Any]]) -> str:
+    """Order-independent digest of the erased (table, key) pairs"""
+    lines = sorted(f'{table}\x1f{key}' for table, keys in erased.items() for key in keys)
+    return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+def batch_delete(table, keys: List[Any], max_retries: int = MAX_UNPROCESSED_RETRIES,
+                 base_delay: float = RETRY_BASE_DELAY_SECONDS) -> int:
+    """
+    Delete keys in BatchWriteItem-sized chunks
+
+    table.batch_delete(chunk) returns the keys DynamoDB left unprocessed; those are
+    resubmitted with exponential backoff.
+    """
+    deleted = 0
+    for start in range(0, len(keys), BATCH_WRITE_LIMIT):
+        pending = keys[start:start + BATCH_WRITE_LIMIT]
+        attempt = 0
+        while pending:
+            unprocessed = table.batch_delete(pending) or []
+            deleted += len(pending) - len(unprocessed)
+            if not unprocessed:
+                break
+            attempt += 1
+            if attempt > max_retries:
+                raise ErasureIncompleteError(
+                    f"{len(unprocessed)} items left unprocessed in {table.table_name}")
+            time.sleep(base_delay * (2 ** (attempt - 1)))
+            pending = unprocessed
+    return deleted
+
+
+class ErasureEngine:
+    """Erases everything stored about a user across the mock service tables and the export store"""
+
+    def __init__(self, services, max_workers: int = MAX_ERASURE_WORKERS, export_service=None):
+        self.services = services
+        self.export_service = export_service
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gdpr-erasure')
+
+    def _exports(self):
+        """The export service holding these services' export requests (None if exports are not configured)"""
+        if self.export_service is None:
+            from gdpr_export import get_gdpr_export_service, ExportConfigurationError
+            try:
+                service = get_gdpr_export_service(self.services)
+            except ExportConfigurationError:
+                return None
+            # The global service belongs to whichever services initialised it first
+            if service.services is self.services:
+                self.export_service = service
+        return self.export_service
+
+    def _targets(self, user_email: str) -> List[Tuple[Any, List[Any]]]:
+        """(table, keys) for every table holding the user's data, each found through an index"""
+        services = self.services
+        user = services.users_table.get_item(user_email)
+        user_id = user.get('user_id') if user else None
+        targets = [
+            (services.assessment_results_table, services.assessment_results_table.keys_for(user_email)),
+            (services.completed_assessments_table, services.completed_assessments_table.keys_for(user_email)),
+            (services.gdpr_data_requests_table, services.gdpr_data_requests_table.keys_for(user_email)),
+            (services.gdpr_consents_table, [user_email] if user_email in services.gdpr_consents_table.items else []),
+            (services.gdpr_cookie_preferences_table,
+             [user_email] if user_email in services.gdpr_cookie_preferences_table.items else []),
+            (services.password_reset_table, services.password_reset_table.keys_for(user_id) if user_id else []),
+            (services.users_table, [user_email] if user else []),
+        ]
+        exports = self._exports()
+        if exports is not None and exports.requests_table is not services.gdpr_data_requests_table:
+            targets.append((exports.requests_table, exports.requests_table.keys_for(user_email)))
+        return [(table, keys) for table, keys in targets if keys]
+
+    def _export_file_targets(self, user_email: str) -> List[Tuple[Any, List[Any]]]:
+        """(export files, keys) for the user's export files, found through their export requests"""
+        exports = self._exports()
+        if exports is None:
+            return []
+        from gdpr_export import ExportFiles
+        requests = [exports.requests_table.get_item(key) for key in exports.requests_table.keys_for(user_email)]
+        keys = exports.store.export_keys([request for request in requests
+                                          if request and request.get('request_type') == 'data_export'])
+        return [(ExportFiles(exports.store), keys)] if keys else []
+
+    def revoke_sessions(self, user_email: str) -> int:
+        """Delete the user's sessions via the user -> session reverse index"""
+        revoked = 0
+        for session_id in self.services.user_sessions.pop(user_email, set()):
+            if self.services.session_cache.delete(session_id):
+                revoked += 1
+        return revoked
+
+    def erase_user(self, user_email: str, request_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Erase a user's data and store a receipt
+
+        Sessions are revoked first so the account cannot be used mid-erasure; export files
+        go next, then tables are erased concurrently (batches within one table run in order).
+        If export files cannot be deleted, the export requests naming them are kept so a
+        retried erasure still finds the files.
+
+        Returns:
+            The stored receipt (status 'completed' or 'incomplete')
+        """
+        started = time.perf_counter()
+        started_at = datetime.utcnow().isoformat()
+        revoked = self.revoke_sessions(user_email)
+
+        tables: Dict[str, int] = {}
+        erased: Dict[str, List[Any]] = {}
+        errors: List[str] = []
+        self._erase_targets(self._export_file_targets(user_email), tables, erased, errors)
+
+        targets = self._targets(user_email)
+        if errors:
+            exports = self._exports()
+            targets = [(table, keys) for table, keys in targets if table is not exports.requests_table]
+        self._erase_targets(targets, tables, erased, errors)
+
+        receipt = {
+            'receipt_id': request_id or str(uuid.uuid4()),
+            'user_hash': user_hash(user_email),
+            'status': 'incomplete' if errors else 'completed',
+            'tables': tables,
+            'sessions_revoked': revoked,
+            'items_erased': sum(tables.values()),
+            'keys_digest': keys_digest(erased),
+            'started_at': started_at,
+            'completed_at': datetime.utcnow().isoformat(),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+        if errors:
+            receipt['errors'] = errors
+        self.services.gdpr_erasure_receipts_table.put_item(dict(receipt))
+        logger.info(f"Erasure {receipt['receipt_id']}: {receipt['items_erased']} items, "
+                    f"{revoked} sessions, {receipt['duration_ms']}ms ({receipt['status']})")
+        return receipt
+
+    def _erase_targets(self, targets: List[Tuple[Any, List[Any]]], tables: Dict[str, int],
+                       erased: Dict[str, List[Any]], errors: List[str]):
+        """Erase targets concurrently, recording deleted counts, erased keys and failures"""
+        futures = {self._executor.submit(batch_delete, table, keys): (table, keys) for table, keys in targets}
+        for future, (table, keys) in futures.items():
+            try:
+                tables[table.table_name] = future.result()
+                erased[table.table_name] = keys
+            except Exception as e:
+                logger.error(f"Erasure of {table.table_name} failed: {e}")
+                errors.append(f'{table.table_name}: {e}')
+
+    def verify_erasure(self, user_email: str, receipt_id: str) -> Dict[str, Any]:
+        """Check a receipt belongs to the user and that no indexed data remains for them"""
+        receipt = self.services.gdpr_erasure_receipts_table.get_item(receipt_id)
+        if not receipt or receipt.get('user_hash') != user_hash(user_email):
+            return {'verified': False, 'reason': 'receipt not found for this user'}
+
+        remaining = {table.table_name: len(keys)
+                     for table, keys in self._export_file_targets(user_email) + self._targets(user_email)}
+        if self.services.user_sessions.get(user_email):
+            remaining['sessions'] = len(self.services.user_sessions[user_email])
+        return {
+            'verified': not remaining and receipt.get('status') == 'completed',
+            'receipt_id': receipt_id,
+            'remaining': remaining
+        }
+
+
+# Global erasure engine instance
+_erasure_engine = None
+
+def get_erasure_engine(services=None) -> ErasureEngine:
+    """Get the global erasure engine (services is required on first call)"""
+    global _erasure_engine
+    if _erasure_engine is None:
+        if services is None:
+            raise ValueError("services is required to initialise the erasure engine")
+        _erasure_engine = ErasureEngine(services)
+    return _erasure_engine
@@ -0,0 +1,455 @@
+"""
+GDPR Data Export Pipeline
+Streams a user's records from each source table page by page into a gzip-compressed
+JSON-lines or CSV file, publishes it to local storage or S3 and hands back a time-limited link
+
+Large exports run as a background job on a worker thread of a long-running server. On Lambda,
+which freezes a container once its response is sent, the export is built inside the request:
+the sources are read through the API's own data layer, which another function could not see.
+
+Local storage needs GDPR_EXPORT_SIGNING_KEY (shared by every worker that serves download links);
+set GDPR_EXPORT_BUCKET to publish to S3 instead.
+"""
+
+import io
+import os
+import csv
+import hmac
+import gzip
+import json
+import time
+import uuid
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Assessment results read per query while streaming
+EXPORT_PAGE_SIZE = 100
+
+# Accounts with more records than this are exported by a background job
+INLINE_EXPORT_MAX_RECORDS = 200
+
+# Lifetime of the download link
+EXPORT_LINK_TTL_SECONDS = 3600
+
+EXPORT_DIR = os.environ.get('GDPR_EXPORT_DIR', os.path.join(tempfile.gettempdir(), 'gdpr-exports'))
+EXPORT_BUCKET = os.environ.get('GDPR_EXPORT_BUCKET')
+EXPORT_MAX_WORKERS = 2
+
+# Export request rows are kept here when set, so every API container sees a job's status
+EXPORT_REQUESTS_TABLE = os.environ.get('DYNAMODB_GDPR_REQUESTS_TABLE')
+
+# Never leaves the service, even in a subject access export
+EXCLUDED_FIELDS = {'password_hash', 'password', 'salt'}
+
+Record = Tuple[str, Dict[str, Any]]
+
+
+class ExportConfigurationError(RuntimeError):
+    """The export pipeline has nowhere it can publish files"""
+
+
+def configuration_error() -> Optional[str]:
+    """Why exports cannot be served with the current environment (None when configured)"""
+    if EXPORT_BUCKET or os.environ.get('GDPR_EXPORT_SIGNING_KEY'):
+        return None
+    return "GDPR_EXPORT_SIGNING_KEY (local storage) or GDPR_EXPORT_BUCKET (S3) must be set to serve data exports"
+
+
+def _public(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in item.items() if not k.startswith('_') and k not in EXCLUDED_FIELDS}
+
+
+def iter_export_records(services, user_email: str, include_assessments: bool = True) -> Iterator[Record]:
+    """
+    Yield (record_type, record) for everything held about a user
+
+    Assessment results and completions are read one page at a time, so memory use does
+    not grow with the size of the account.
+    """
+    user = services.users_table.get_item(user_email) or {}
+    yield 'profile', {
+        'email': user.get('email', user_email),
+        'username': user.get('username'),
+        'created_at': user.get('created_at'),
+        'last_login': user.get('last_login')
+    }
+    for purchase in user.get('purchases', []):
+        yield 'purchase', _public(purchase)
+
+    if include_assessments:
+        for assessment_type, entitlement in services.get_user_assessments(user_email).items():
+            yield 'entitlement', {'assessment_type': assessment_type, **entitlement}
+
+        for record_type, query in (('assessment_result', services.query_assessment_history),
+                                   ('completed_assessment', services.get_completed_assessments)):
+            cursor = None
+            while True:
+                page = query(user_email, limit=EXPORT_PAGE_SIZE, cursor=cursor)
+                for item in page['items']:
+                    yield record_type, _public(item)
+                cursor = page['next_cursor']
+                if not cursor:
+                    break
+
+    yield 'consent', _public(services.get_user_consent(user_email))
+
+
+class JSONLinesExportWriter:
+    """One JSON object per line: {"record_type": ..., "data": {...}}"""
+    extension = 'jsonl'
+    content_type = 'application/x-ndjson'
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record_type: str, record: Dict[str, Any]):
+        self.stream.write(json.dumps({'record_type': record_type, 'data': record}, default=str))
+        self.stream.write('\n')
+
+
+class CSVExportWriter:
+    """
+    Long-format CSV (record_type, record_index, field, value)
+
+    Records from different tables have different fields, so one row per field keeps a
+    single fixed header without buffering to discover the columns.
+    """
+    extension = 'csv'
+    content_type = 'text/csv'
+    header = ('record_type', 'record_index', 'field', 'value')
+
+    def __init__(self, stream):
+        self.writer = csv.writer(stream)
+        self.writer.writerow(self.header)
+        self.counts: Dict[str, int] = {}
+
+    def write(self, record_type: str, record: Dict[str, Any]):
+        index = self.counts.get(record_type, 0)
+        self.counts[record_type] = index + 1
+        for field, value in record.items():
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, default=str)
+            self.writer.writerow((record_type, index, field, '' if value is None else value))
+
+
+EXPORT_WRITERS = {'json': JSONLinesExportWriter, 'csv': CSVExportWriter}
+
+
+def write_export(records: Iterator[Record], path: str, export_format: str = 'json') -> Dict[str, Any]:
+    """Stream records into a gzip file at path; returns record count and compressed size"""
+    writer_class = EXPORT_WRITERS.get(export_format, JSONLinesExportWriter)
+    count = 0
+    with open(path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as compressed, \
+            io.TextIOWrapper(compressed, encoding='utf-8', newline='') as stream:
+        writer = writer_class(stream)
+        for record_type, record in records:
+            writer.write(record_type, record)
+            count += 1
+    return {'record_count': count, 'size_bytes': os.path.getsize(path)}
+
+
+class LocalExportStore:
+    """Keeps exports on local disk behind HMAC-signed, expiring download links"""
+
+    def __init__(self, directory: str = EXPORT_DIR, signing_key: Optional[str] = None):
+        signing_key = signing_key or os.environ.get('GDPR_EXPORT_SIGNING_KEY')
+        if not signing_key:
+            # Every worker must sign and verify with the same key, so there is no per-process fallback
+            raise ExportConfigurationError("GDPR_EXPORT_SIGNING_KEY must be set to serve exports from local storage")
+        self.directory = directory
+        self.signing_key = signing_key.encode('utf-8')
+        os.makedirs(directory, exist_ok=True)
+
+    def _sign(self, request_id: str, expires: int) -> str:
+        return hmac.new(self.signing_key, f'{request_id}:{expires}'.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def publish(self, request_id: str, path: str, filename: str, content_type: str, ttl: int) -> Tuple[str, int]:
+        expires = int(time.time()) + ttl
+        url = (f'/gdpr/download-export?request_id={request_id}'
+               f'&expires={expires}&signature={self._sign(request_id, expires)}')
+        return url, expires
+
+    def resolve(self, request_id: str, expires: Any, signature: str) -> Optional[str]:
+        """Local path of an export if the link is authentic and unexpired"""
+        try:
+            expires = int(expires)
+        except (TypeError, ValueError):
+            return None
+        if expires < time.time() or not hmac.compare_digest(self._sign(request_id, expires), signature or ''):
+            return None
+        for writer_class in EXPORT_WRITERS.values():
+            path = os.path.join(self.directory, f'{request_id}.{writer_class.extension}.gz')
+            if os.path.exists(path):
+                return path
+        return None
+
+    @property
+    def location(self) -> str:
+        return self.directory
+
+    def export_keys(self, requests: List[Dict[str, Any]]) -> List[str]:
+        """Paths of the export files of the given requests that are on disk"""
+        paths = (os.path.join(self.directory, f"{request['request_id']}.{writer_class.extension}.gz")
+                 for request in requests for writer_class in EXPORT_WRITERS.values())
+        return [path for path in paths if os.path.exists(path)]
+
+    def delete_files(self, keys: List[str]) -> List[str]:
+        """Delete export files; returns the ones that could not be deleted"""
+        failed = []
+        for path in keys:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not delete export file {path}: {e}")
+                failed.append(path)
+        return failed
+
+
+class S3ExportStore:
+    """Uploads exports to an S3(-compatible) bucket and returns presigned links"""
+
+    def __init__(self, bucket: str, prefix: str = 'gdpr-exports/', endpoint_url: Optional[str] = None):
+        import boto3
+        self.bucket = bucket
+        self.prefix = prefix
+        # Local staging area; files are removed once uploaded
+        self.directory = EXPORT_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self.client = boto3.client('s3', endpoint_url=endpoint_url or os.environ.get('GDPR_EXPORT_S3_ENDPOINT'))
+
+    def publish(self, request_id: str, path: str, filename: str, content_type: str, ttl: int) -> Tuple[str, int]:
+        key = f'{self.prefix}{filename}'
+        # upload_file streams the file in multipart chunks
+        self.client.upload_file(path, self.bucket, key, ExtraArgs={
+            'ContentType': 'application/gzip',
+            'ContentDisposition': f'attachment; filename="{filename}"',
+            'ServerSideEncryption': 'AES256'
+        })
+        os.remove(path)
+        url = self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': key}, ExpiresIn=ttl
+        )
+        return url, int(time.time()) + ttl
+
+    @property
+    def location(self) -> str:
+        return f's3://{self.bucket}/{self.prefix}'
+
+    def export_keys(self, requests: List[Dict[str, Any]]) -> List[str]:
+        """Object keys of the given requests' published exports"""
+        return [f"{self.prefix}{request['filename']}" for request in requests if request.get('filename')]
+
+    def delete_files(self, keys: List[str]) -> List[str]:
+        """Delete export objects (one DeleteObjects call); returns the keys S3 reported errors for"""
+        if not keys:
+            return []
+        response = self.client.delete_objects(
+            Bucket=self.bucket, Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+        )
+        return [error['Key'] for error in response.get('Errors', [])]
+
+
+class ExportFiles:
+    """A store's export files as an erasure target, deleted in batches like table items"""
+
+    def __init__(self, store):
+        self.store = store
+        self.table_name = store.location
+
+    def batch_delete(self, keys: List[str]) -> List[str]:
+        return self.store.delete_files(keys)
+
+
+class DynamoDBExportRequestTable:
+    """Export request rows in DynamoDB, so the API and the export function share job status"""
+
+    # GSI on user_email (keys only), used to find a user's requests for erasure
+    USER_INDEX = 'user_email-index'
+
+    def __init__(self, table_name: str = EXPORT_REQUESTS_TABLE):
+        import boto3
+        self.table_name = table_name
+        self.table = boto3.resource('dynamodb', region_name=os.environ.get('AWS_REGION', 'us-east-1')).Table(table_name)
+
+    def get_item(self, request_id: str) -> Optional[Dict[str, Any]]:
+        return self.table.get_item(Key={'request_id': request_id}).get('Item')
+
+    def put_item(self, item: Dict[str, Any]):
+        self.table.put_item(Item=item)
+
+    def update_item(self, request_id: str, updates: Dict[str, Any]):
+        names = {f'#f{i}': field for i, field in enumerate(updates)}
+        values = {f':v{i}': value for i, value in enumerate(updates.values())}
+        self.table.update_item(
+            Key={'request_id': request_id},
+            UpdateExpression='SET ' + ', '.join(f'#f{i} = :v{i}' for i in range(len(updates))),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+
+    def keys_for(self, user_email: str) -> List[str]:
+        """request_ids of a user's requests, through the user_email-index"""
+        from boto3.dynamodb.conditions import Key
+        query = {'IndexName': self.USER_INDEX, 'KeyConditionExpression': Key('user_email').eq(user_email)}
+        keys = []
+        while True:
+            response = self.table.query(**query)
+            keys.extend(item['request_id'] for item in response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return keys
+            query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def batch_delete(self, keys: List[str]) -> List[str]:
+        """Delete up to 25 rows in one BatchWriteItem; returns the unprocessed request_ids"""
+        response = self.table.meta.client.batch_write_item(RequestItems={
+            self.table_name: [{'DeleteRequest': {'Key': {'request_id': key}}} for key in keys]
+        })
+        return [request['DeleteRequest']['Key']['request_id']
+                for request in response.get('UnprocessedItems', {}).get(self.table_name, [])]
+
+
+class ThreadExportDispatcher:
+    """Runs background exports on worker threads (long-running servers only)"""
+
+    def __init__(self, max_workers: int = EXPORT_MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gdpr-export')
+
+    def submit(self, run_export, request_id: str):
+        return self._executor.submit(run_export, request_id)
+
+
+def _default_dispatcher():
+    if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+        # A thread would be frozen with the container; build the export inside the request instead
+        return None
+    return ThreadExportDispatcher()
+
+
+class GdprExportService:
+    """Creates export requests and runs them inline (small accounts) or as background jobs"""
+
+    def __init__(self, services, store=None, requests_table=None, dispatcher=None,
+                 inline_max_records: int = INLINE_EXPORT_MAX_RECORDS, link_ttl: int = EXPORT_LINK_TTL_SECONDS):
+        self.services = services
+        self.store = store or (S3ExportStore(EXPORT_BUCKET) if EXPORT_BUCKET else LocalExportStore())
+        self.requests_table = requests_table or (DynamoDBExportRequestTable() if EXPORT_REQUESTS_TABLE
+                                                 else services.gdpr_data_requests_table)
+        self.dispatcher = dispatcher if dispatcher is not None else _default_dispatcher()
+        self.inline_max_records = inline_max_records
+        self.link_ttl = link_ttl
+        self._jobs: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _estimate_records(self, user: Dict[str, Any], include_assessments: bool) -> int:
+        estimate = 2 + len(user.get('purchases', []))
+        if include_assessments:
+            estimate += len(self.services.assessment_results_table.keys_for(user.get('email')))
+            estimate += len(self.services.completed_assessments_table.keys_for(user.get('email')))
+        return estimate
+
+    def start_export(self, user_email: str, export_format: str = 'json',
+                     include_assessments: bool = True) -> Optional[str]:
+        """
+        Create an export request and start building the file
+
+        Returns:
+            request_id (None if the user does not exist); poll get_gdpr_request_status for the link
+        """
+        user = self.services.users_table.get_item(user_email)
+        if not user:
+            return None
+
+        request_id = str(uuid.uuid4())
+        export_format = export_format if export_format in EXPORT_WRITERS else 'json'
+        estimate = self._estimate_records(user, include_assessments)
+        self.requests_table.put_item({
+            'request_id': request_id,
+            'user_email': user_email,
+            'request_type': 'data_export',
+            'format': export_format,
+            'include_assessments': include_assessments,
+            'status': 'pending',
+            'estimated_records': estimate,
+            'created_at': datetime.utcnow().isoformat()
+        })
+
+        if estimate <= self.inline_max_records or self.dispatcher is None:
+            self.run_export(request_id)
+        else:
+            job = self.dispatcher.submit(self.run_export, request_id)
+            if job is not None:
+                with self._lock:
+                    self._jobs[request_id] = job
+        return request_id
+
+    def get_export(self, request_id: str, user_email: str) -> Optional[Dict[str, Any]]:
+        """The export request if it exists and belongs to user_email"""
+        request = self.requests_table.get_item(request_id) if request_id else None
+        if not request or request.get('request_type') != 'data_export':
+            return None
+        if not user_email or not hmac.compare_digest(request.get('user_email', ''), user_email):
+            return None
+        return request
+
+    def run_export(self, request_id: str):
+        """Build and publish the export for a stored request"""
+        table = self.requests_table
+        request = table.get_item(request_id)
+        if not request:
+            return
+        table.update_item(request_id, {'status': 'processing', 'started_at': datetime.utcnow().isoformat()})
+
+        writer_class = EXPORT_WRITERS[request['format']]
+        filename = f"ielts-data-export-{request_id}.{writer_class.extension}.gz"
+        path = os.path.join(self.store.directory, f"{request_id}.{writer_class.extension}.gz")
+        try:
+            records = iter_export_records(self.services, request['user_email'], request['include_assessments'])
+            summary = write_export(records, path, request['format'])
+            url, expires = self.store.publish(request_id, path, filename, writer_class.content_type, self.link_ttl)
+            table.update_item(request_id, {
+                'status': 'completed',
+                'completed_at': datetime.utcnow().isoformat(),
+                'download_url': url,
+                'download_expires_at': datetime.utcfromtimestamp(expires).isoformat(),
+                'filename': filename,
+                **summary
+            })
+            logger.info(f"GDPR export {request_id}: {summary['record_count']} records, {summary['size_bytes']} bytes")
+        except Exception as e:
+            logger.error(f"GDPR export {request_id} failed: {e}")
+            table.update_item(request_id, {'status': 'failed', 'error': str(e)})
+            if os.path.exists(path):
+                os.remove(path)
+        finally:
+            with self._lock:
+                self._jobs.pop(request_id, None)
+
+    def wait(self, request_id: str, timeout: Optional[float] = None):
+        """Block until a background export finishes (no-op for inline exports)"""
+        with self._lock:
+            job = self._jobs.get(request_id)
+        if job is not None:
+            job.result(timeout=timeout)
+
+
+# Global export service instance
+_export_service = None
+
+def get_gdpr_export_service(services=None) -> GdprExportService:
+    """Get the global export service (services is required on first call)"""
+    global _export_service
+    if _export_service is None:
+        if services is None:
+            raise ValueError("services is required to initialise the export service")
+        _export_service = GdprExportService(services)
+    return _export_service
+
@@ -105,10 +105,21 @@ class GenAISafetyTester:
         
         safety_test_logger.info("Starting comprehensive GenAI safety testing")
         
+        # Validate every scenario input in one batched pass
+        validations = self._validate_inputs([
+            (scenario['test_input'], assessment_type)
+            for assessment_type, scenarios in self.test_scenarios.items()
+            for scenario in scenarios
+        ])
+        
         # Test each assessment type
+        offset = 0
         for assessment_type, scenarios in self.test_scenarios.items():
-            assessment_results = self._test_assessment_type(assessment_type, scenarios)
+            assessment_results = self._test_assessment_type(
+                assessment_type, scenarios, validations[offset:offset + len(scenarios)]
+            )
             test_session['results'].extend(assessment_results)
+            offset += len(scenarios)
         
         # Generate compliance report
         compliance_report = self._generate_compliance_report(test_session)
@@ -120,11 +131,25 @@ class GenAISafetyTester:
         
         return test_session
     
-    def _test_assessment_type(self, assessment_type: str, scenarios: List[Dict]) -> List[Dict]:
+    def _validate_inputs(self, inputs: List[Tuple[str, str]]) -> List:
+        """Batch-validate (test_input, context) pairs; a failed batch yields the exception per input"""
+        try:
+            return content_safety.validate_user_inputs(inputs)
+        except Exception as e:
+            safety_test_logger.error(f"Batch validation failed: {e}")
+            return [e] * len(inputs)
+    
+    def _test_assessment_type(self, assessment_type: str, scenarios: List[Dict],
+                              validations: Optional[List] = None) -> List[Dict]:
         """Test specific assessment type with given scenarios"""
         results = []
         
-        for scenario in scenarios:
+        if validations is None:
+            validations = self._validate_inputs([
+                (scenario['test_input'], assessment_type) for scenario in scenarios
+            ])
+        
+        for scenario, validation in zip(scenarios, validations):
             test_result = {
                 'test_id': str(uuid.uuid4()),
                 'assessment_type': assessment_type,
@@ -137,10 +162,9 @@ class GenAISafetyTester:
             
             try:
                 # Test user input validation
-                is_safe, sanitized_input, safety_report = content_safety.validate_user_input(
-                    scenario['test_input'], 
-                    assessment_type
-                )
+                if isinstance(validation, Exception):
+                    raise validation
+                is_safe, sanitized_input, safety_report = validation
                 
                 test_result['actual_result'] = {
                     'is_safe': is_safe,
@@ -253,7 +277,11 @@ class GenAISafetyTester:
             'scenarios': []
         }
         
-        for scenario in red_team_scenarios:
+        validations = self._validate_inputs([
+            (scenario['test_input'], scenario['target']) for scenario in red_team_scenarios
+        ])
+        
+        for scenario, validation in zip(red_team_scenarios, validations):
             result = {
                 'attack_type': scenario['attack_type'],
                 'target': scenario['target'],
@@ -264,10 +292,9 @@ class GenAISafetyTester:
             
             try:
                 # Test the scenario
-                is_safe, sanitized_input, safety_report = content_safety.validate_user_input(
-                    scenario['test_input'], 
-                    scenario['target']
-                )
+                if isinstance(validation, Exception):
+                    raise validation
+                is_safe, sanitized_input, safety_report = validation
                 
                 result['blocked'] = not is_safe
                 result['sanitized'] = sanitized_input != scenario['test_input']
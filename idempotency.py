@@ -0,0 +1,140 @@
+"""
+Idempotent Assessment Submissions
+Coalesces duplicate evaluation requests (client retries of the same essay/audio) so each
+submission is evaluated, stored and charged against the user's attempts only once
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Completed results are replayed to retries for this long
+IDEMPOTENCY_WINDOW_SECONDS = 15 * 60
+
+# How long a duplicate waits for the in-flight original before giving up
+IN_FLIGHT_WAIT_SECONDS = 60
+
+# Maximum number of completed results kept per container
+MAX_CACHED_RESULTS = 2048
+
+REPLAY_HEADER = 'X-Idempotent-Replay'
+
+
+def content_hash(content: Any) -> str:
+    """SHA-256 of submitted content (str or bytes)"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content or b'').hexdigest()
+
+
+def derive_idempotency_key(scope: str, user_email: str, question: Any = None,
+                           content: Any = None, client_key: Optional[str] = None) -> str:
+    """
+    Key identifying one logical submission
+
+    A client-supplied key is used when present (still scoped to the user and endpoint);
+    otherwise the key is derived from the question and a hash of the submitted content.
+    """
+    if client_key:
+        parts = (scope, user_email or '', 'client', str(client_key))
+    else:
+        parts = (scope, user_email or '', str(question or ''), content_hash(content))
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _is_cacheable(response: Dict[str, Any]) -> bool:
+    # Server errors are retried for real; everything else is the submission's outcome
+    return isinstance(response, dict) and response.get('statusCode', 500) < 500
+
+
+class IdempotencyCache:
+    """In-flight map plus bounded, time-windowed result cache for Lambda-style responses"""
+
+    def __init__(self, window_seconds: int = IDEMPOTENCY_WINDOW_SECONDS,
+                 max_results: int = MAX_CACHED_RESULTS, wait_seconds: float = IN_FLIGHT_WAIT_SECONDS):
+        self.window_seconds = window_seconds
+        self.max_results = max_results
+        self.wait_seconds = wait_seconds
+        self._results: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {'executed': 0, 'replayed': 0, 'coalesced': 0}
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._results[key]
+            return None
+        return entry[1]
+
+    @staticmethod
+    def _replay(response: Dict[str, Any]) -> Dict[str, Any]:
+        replay = dict(response)
+        replay['headers'] = {**response.get('headers', {}), REPLAY_HEADER: 'true'}
+        return replay
+
+    def run(self, key: str, handler: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run handler once per key
+
+        A completed response within the window is replayed; a concurrent duplicate waits
+        for the in-flight original and receives its response.
+        """
+        with self._lock:
+            cached = self._cached(key)
+            if cached is not None:
+                self.stats['replayed'] += 1
+                return self._replay(cached)
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.stats['coalesced'] += 1
+
+        if not owner:
+            logger.info(f"Coalescing duplicate submission {key[:12]}")
+            return self._replay(future.result(timeout=self.wait_seconds))
+
+        try:
+            response = handler()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self.stats['executed'] += 1
+            if _is_cacheable(response):
+                self._results[key] = (time.time() + self.window_seconds, response)
+                self._results.move_to_end(key)
+                while len(self._results) > self.max_results:
+                    self._results.popitem(last=False)
+            self._in_flight.pop(key, None)
+        future.set_result(response)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+# Global cache instance
+_idempotency_cache = None
+
+def get_idempotency_cache() -> IdempotencyCache:
+    """Get the global idempotency cache"""
+    global _idempotency_cache
+    if _idempotency_cache is None:
+        _idempotency_cache = IdempotencyCache()
+    return _idempotency_cache
@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional, Tuple
 from enum import Enum
 import statistics
 
+from text_features import extract_text_features
 from assessment_criteria.speaking_criteria import (
     SPEAKING_BAND_DESCRIPTORS,
     SPEAKING_ASSESSMENT_CRITERIA,
@@ -18,6 +19,90 @@ from assessment_criteria.speaking_criteria import (
 
 logger = logging.getLogger(__name__)
 
+
+def _band(score: float) -> float:
+    """Keep a per-response score within the band range"""
+    return max(1.0, min(9.0, score))
+
+
+def _speech_rate_adjustment(word_count: int, duration: float) -> float:
+    """Fluency adjustment for the speaking rate of one response"""
+    if duration > 0 and word_count > 0:
+        words_per_minute = (word_count / duration) * 60
+        if 120 <= words_per_minute <= 180:  # Natural speaking rate
+            return 1.0
+        if words_per_minute < 100 or words_per_minute > 200:
+            return -1.0
+    return 0.0
+
+
+def _stage_adjustment(stage: str, word_count: int) -> float:
+    """Fluency adjustment for a response length appropriate to its test part"""
+    if 'part1' in stage and 10 <= word_count <= 50:
+        return 0.5
+    elif 'part2' in stage and 150 <= word_count <= 300:
+        return 1.0
+    elif 'part3' in stage and 30 <= word_count <= 100:
+        return 0.5
+    elif word_count < 5:  # Very brief responses
+        return -1.5
+    return 0.0
+
+
+def _lexical_response_score(features) -> float:
+    """Lexical resource score of one response from its vocabulary variety and length"""
+    if not features.tokens:
+        return 3.0  # No vocabulary to assess
+    score = 5.0
+    variety_ratio = features.type_token_ratio
+    if variety_ratio > 0.8:
+        score += 1.5  # High variety
+    elif variety_ratio > 0.6:
+        score += 0.5  # Good variety
+    elif variety_ratio < 0.4:
+        score -= 1.0  # Poor variety
+    
+    # Response length bonus (more words = more vocabulary demonstrated)
+    if features.word_count > 100:
+        score += 0.5
+    elif features.word_count < 10:
+        score -= 0.5
+    return _band(score)
+
+
+def _overall_variety_bonus(overall_variety: float) -> float:
+    """Lexical resource adjustment for vocabulary variety across a whole session"""
+    if overall_variety > 0.7:
+        return 1.0
+    elif overall_variety > 0.5:
+        return 0.5
+    elif overall_variety < 0.3:
+        return -0.5
+    return 0.0
+
+
+def _grammar_response_score(features, word_count: int) -> float:
+    """Grammatical range score of one (non-empty) response"""
+    score = 5.0
+    
+    # Sentence variety
+    if features.sentence_count > 1:
+        score += 0.5  # Multiple sentences show structure variety
+    
+    # Word count indicates complexity potential
+    if word_count > 50:
+        score += 0.5  # Longer responses suggest complex structures
+    elif word_count > 100:
+        score += 1.0
+    
+    # Check for complex sentence indicators
+    complex_count = features.distinct_hits('complex_indicators')
+    if complex_count >= 3:
+        score += 1.0
+    elif complex_count >= 1:
+        score += 0.5
+    return _band(score)
+
 class ScoringCriterion(Enum):
     """IELTS Speaking assessment criteria"""
     FLUENCY_COHERENCE = "Fluency and Coherence"
@@ -292,92 +377,35 @@ class IELTSBandScorer:
         """Analyze fluency and coherence from responses"""
         scores = []
         
+        # Evaluation notes apply to the whole session, so scan them once
+        fluency_notes = [n.get('note', '').lower() for n in notes if n.get('criterion') == 'Fluency and Coherence']
+        note_penalty = 0.0
+        if any('hesitation' in n for n in fluency_notes):
+            note_penalty += 0.5
+        if any('slow speech' in n for n in fluency_notes):
+            note_penalty += 0.5
+        
         for response in responses:
-            score = 5.0  # Base score
-            
-            # Check response length appropriateness
             word_count = response.get('word_count', 0)
-            duration = response.get('duration', 0)
-            stage = response.get('stage', '')
-            
-            # Fluency indicators
-            if duration > 0 and word_count > 0:
-                words_per_minute = (word_count / duration) * 60
-                if 120 <= words_per_minute <= 180:  # Natural speaking rate
-                    score += 1.0
-                elif words_per_minute < 100 or words_per_minute > 200:
-                    score -= 1.0
-            
-            # Response appropriateness
-            if 'part1' in stage and 10 <= word_count <= 50:
-                score += 0.5
-            elif 'part2' in stage and 150 <= word_count <= 300:
-                score += 1.0
-            elif 'part3' in stage and 30 <= word_count <= 100:
-                score += 0.5
-            elif word_count < 5:  # Very brief responses
-                score -= 1.5
-            
-            # Check evaluation notes for fluency issues
-            fluency_notes = [n for n in notes if n.get('criterion') == 'Fluency and Coherence']
-            if any('hesitation' in n.get('note', '').lower() for n in fluency_notes):
-                score -= 0.5
-            if any('slow speech' in n.get('note', '').lower() for n in fluency_notes):
-                score -= 0.5
-                
-            scores.append(max(1.0, min(9.0, score)))  # Keep within band range
+            score = (5.0  # Base score
+                     + _speech_rate_adjustment(word_count, response.get('duration', 0))
+                     + _stage_adjustment(response.get('stage', ''), word_count))
+            
+            # Fluency issues flagged in evaluation notes
+            scores.append(_band(score - note_penalty))
         
         return statistics.mean(scores) if scores else 5.0
     
     def analyze_lexical_resource(self, responses: List[Dict[str, Any]], notes: List[Dict[str, Any]]) -> float:
         """Analyze lexical resource from responses"""
-        scores = []
-        all_words = []
-        
-        for response in responses:
-            score = 5.0  # Base score
-            text = response.get('text', '')
-            words = text.lower().split() if text else []
-            all_words.extend(words)
-            
-            if not words:
-                scores.append(3.0)  # No vocabulary to assess
-                continue
-                
-            # Vocabulary variety
-            unique_words = set(words)
-            variety_ratio = len(unique_words) / len(words) if words else 0
-            
-            if variety_ratio > 0.8:
-                score += 1.5  # High variety
-            elif variety_ratio > 0.6:
-                score += 0.5  # Good variety
-            elif variety_ratio < 0.4:
-                score -= 1.0  # Poor variety
-            
-            # Response length bonus (more words = more vocabulary demonstrated)
-            word_count = len(words)
-            if word_count > 100:
-                score += 0.5
-            elif word_count < 10:
-                score -= 0.5
-            
-            scores.append(max(1.0, min(9.0, score)))
+        features = [extract_text_features(response.get('text', '')) for response in responses]
+        scores = [_lexical_response_score(f) for f in features]
         
         # Overall vocabulary variety across all responses
-        if all_words:
-            total_unique = len(set(all_words))
-            total_words = len(all_words)
-            overall_variety = total_unique / total_words
-            
-            variety_bonus = 0
-            if overall_variety > 0.7:
-                variety_bonus = 1.0
-            elif overall_variety > 0.5:
-                variety_bonus = 0.5
-            elif overall_variety < 0.3:
-                variety_bonus = -0.5
-                
+        total_words = sum(f.word_count for f in features)
+        if total_words:
+            total_unique = len(frozenset().union(*(f.vocabulary for f in features)))
+            variety_bonus = _overall_variety_bonus(total_unique / total_words)
             scores = [s + variety_bonus for s in scores]
         
         return statistics.mean(scores) if scores else 5.0
@@ -387,36 +415,12 @@ class IELTSBandScorer:
         scores = []
         
         for response in responses:
-            score = 5.0  # Base score
             text = response.get('text', '')
-            
             if not text:
                 scores.append(3.0)
                 continue
             
-            sentences = [s.strip() for s in text.split('.') if s.strip()]
-            
-            # Sentence variety
-            if len(sentences) > 1:
-                score += 0.5  # Multiple sentences show structure variety
-            
-            # Word count indicates complexity potential
-            word_count = response.get('word_count', 0)
-            if word_count > 50:
-                score += 0.5  # Longer responses suggest complex structures
-            elif word_count > 100:
-                score += 1.0
-            
-            # Check for complex sentence indicators
-            complex_indicators = ['because', 'although', 'however', 'therefore', 'which', 'that', 'when', 'if']
-            complex_count = sum(1 for indicator in complex_indicators if indicator in text.lower())
-            
-            if complex_count >= 3:
-                score += 1.0
-            elif complex_count >= 1:
-                score += 0.5
-            
-            scores.append(max(1.0, min(9.0, score)))
+            scores.append(_grammar_response_score(extract_text_features(text), response.get('word_count', 0)))
         
         return statistics.mean(scores) if scores else 5.0
     
@@ -445,7 +449,119 @@ class IELTSBandScorer:
             base_score -= 0.5
         
         return max(3.0, min(8.0, base_score))  # Conservative range without audio
-    
+
+    def score_sessions_batch(self, conversations: List[Dict[str, Any]],
+                             ai_analyses: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+        """
+        Score many speaking sessions at once (re-scoring historical sessions)
+
+        The responses of all sessions are flattened into columns (word count, duration, stage,
+        text features) in one pass, each criterion is computed over the whole columns, and the
+        per-response scores are then averaged per session. Produces the same criterion and
+        overall band scores as evaluate_speaking_assessment, without the feedback report.
+
+        Args:
+            conversations: Conversation data dicts
+            ai_analyses: Optional AI analysis per conversation (same order)
+
+        Returns:
+            List of dicts with success, session_id, overall_band_score and criterion_scores
+        """
+        ai_analyses = ai_analyses or [None] * len(conversations)
+
+        # Response columns; session i owns rows offsets[i]:offsets[i + 1]
+        offsets = [0]
+        word_counts, durations, stages, texts = [], [], [], []
+        for conversation in conversations:
+            for response in conversation.get('user_responses', []):
+                word_counts.append(response.get('word_count', 0))
+                durations.append(response.get('duration', 0))
+                stages.append(response.get('stage', ''))
+                texts.append(response.get('text', ''))
+            offsets.append(len(texts))
+        features = [extract_text_features(text) for text in texts]
+
+        # Session columns from the evaluation notes
+        fluency_penalties, pronunciation_adjustments = [], []
+        for conversation in conversations:
+            fluency_penalty = pronunciation_adjustment = 0.0
+            fluency_flags = set()
+            for note in conversation.get('evaluation_notes', []):
+                criterion = note.get('criterion')
+                note_text = note.get('note', '').lower()
+                if criterion == 'Fluency and Coherence':
+                    fluency_flags.update(flag for flag in ('hesitation', 'slow speech') if flag in note_text)
+                elif criterion == 'Pronunciation':
+                    if 'unclear' in note_text or 'unintelligible' in note_text:
+                        pronunciation_adjustment -= 1.0
+                    elif 'strain' in note_text or 'effort' in note_text:
+                        pronunciation_adjustment -= 0.5
+            fluency_penalties.append(0.5 * len(fluency_flags))
+            pronunciation_adjustments.append(pronunciation_adjustment)
+
+        fluency = [
+            5.0 + _speech_rate_adjustment(word_count, duration) + _stage_adjustment(stage, word_count)
+            for word_count, duration, stage in zip(word_counts, durations, stages)
+        ]
+        lexical = [_lexical_response_score(f) for f in features]
+        grammar = [
+            _grammar_response_score(f, word_count) if text else 3.0
+            for f, word_count, text in zip(features, word_counts, texts)
+        ]
+
+        results = []
+        for i, (conversation, ai_analysis) in enumerate(zip(conversations, ai_analyses)):
+            start, end = offsets[i], offsets[i + 1]
+            if start == end:
+                results.append({
+                    'success': False,
+                    'session_id': conversation.get('session_id'),
+                    'error': 'No user responses found for evaluation'
+                })
+                continue
+
+            count = end - start
+            fluency_penalty = fluency_penalties[i]
+            session_features = features[start:end]
+            total_tokens = sum(f.word_count for f in session_features)
+            variety_bonus = 0.0
+            if total_tokens:
+                variety_bonus = _overall_variety_bonus(
+                    len(frozenset().union(*(f.vocabulary for f in session_features))) / total_tokens
+                )
+            total_words = sum(word_counts[start:end])
+            pronunciation = 6.0 + pronunciation_adjustments[i]
+            if total_words > 500:
+                pronunciation += 0.5
+            elif total_words < 100:
+                pronunciation -= 0.5
+
+            base = {
+                ScoringCriterion.FLUENCY_COHERENCE: sum(
+                    _band(score - fluency_penalty) for score in fluency[start:end]) / count,
+                ScoringCriterion.LEXICAL_RESOURCE: sum(lexical[start:end]) / count + variety_bonus,
+                ScoringCriterion.GRAMMATICAL_RANGE: sum(grammar[start:end]) / count,
+                ScoringCriterion.PRONUNCIATION: max(3.0, min(8.0, pronunciation))
+            }
+
+            criterion_scores = {}
+            for criterion, base_score in base.items():
+                key = criterion.value.lower().replace(' ', '_')
+                if ai_analysis and key in ai_analysis:
+                    adjusted_score = (ai_analysis[key].get('score', base_score) * 0.7) + (base_score * 0.3)
+                else:
+                    adjusted_score = base_score
+                criterion_scores[criterion.value] = round(adjusted_score * 2) / 2
+
+            results.append({
+                'success': True,
+                'session_id': conversation.get('session_id'),
+                'overall_band_score': calculate_speaking_band_score(criterion_scores),
+                'criterion_scores': criterion_scores
+            })
+
+        return results
+
     def generate_criterion_feedback(self, criterion: ScoringCriterion, score: float, 
                                   responses: List[Dict[str, Any]], notes: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate detailed feedback for specific criterion"""
@@ -548,7 +664,7 @@ class IELTSBandScorer:
                 continue
                 
             if criterion == ScoringCriterion.FLUENCY_COHERENCE:
-                if len(text.split()) > 25:  # Substantial response
+                if extract_text_features(text).word_count > 25:  # Substantial response
                     examples.append(f"Extended response in {response.get('stage', 'conversation')}: \"{text[:100]}{'...' if len(text) > 100 else ''}\"")
             
             elif criterion == ScoringCriterion.LEXICAL_RESOURCE:
@@ -557,8 +673,7 @@ class IELTSBandScorer:
                     examples.append(f"Vocabulary variety demonstrated: \"{text[:80]}{'...' if len(text) > 80 else ''}\"")
             
             elif criterion == ScoringCriterion.GRAMMATICAL_RANGE:
-                complex_indicators = ['because', 'although', 'however', 'when', 'if', 'which']
-                if any(indicator in text.lower() for indicator in complex_indicators):
+                if extract_text_features(text).distinct_hits('example_indicators'):
                     examples.append(f"Complex structure usage: \"{text[:80]}{'...' if len(text) > 80 else ''}\"")
         
         return examples[:2]  # Return top 2 examples
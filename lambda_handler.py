@@ -15,9 +15,8 @@ import urllib.error
 import secrets
 import re
 import logging
-from io import BytesIO
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Union, List
+from typing import Dict, Any, Optional, Union, List, Tuple
 from werkzeug.security import generate_password_hash, check_password_hash
 from jinja2 import Environment, FileSystemLoader
 
@@ -28,7 +27,32 @@ os.environ['REPLIT_ENVIRONMENT'] = 'true'
 from aws_mock_config import aws_mock
 
 # Import enhanced content moderation service with audio support
-from content_moderation_service import moderate_speaking_content, ModerationSeverity, ContentModerationService
+from content_moderation_service import moderate_speaking_content, ModerationSeverity, ContentModerationService, get_streaming_moderator, end_streaming_moderation
+
+# Shared single-pass text features for the speaking and writing evaluators
+from text_features import extract_text_features
+
+# Rubric prompt templates assembled once per assessment type, task and rubric version
+from prompt_cache import get_prompt_cache
+prompt_templates = get_prompt_cache(aws_mock.get_assessment_rubric)
+
+# Retried submissions are evaluated (and charged) once
+from idempotency import get_idempotency_cache, derive_idempotency_key
+
+# Concurrent per-criterion Nova Micro evaluation
+from evaluation_orchestrator import get_evaluation_orchestrator, round_band, WRITING_CRITERIA, WRITING_EVALUATION_MODE
+
+# Cursor-paged assessment history
+from pagination import DEFAULT_PAGE_SIZE, HISTORY_SUMMARY_FIELDS
+
+# Memoizes user reads for the duration of one invocation
+from request_loader import request_scoped
+
+# GDPR exports need somewhere to publish files; report a missing setting once at cold start
+from gdpr_export import configuration_error as gdpr_export_configuration_error
+_gdpr_export_config_error = gdpr_export_configuration_error()
+if _gdpr_export_config_error:
+    print(f"[GDPR] Data exports are disabled: {_gdpr_export_config_error}")
 
 # Nova Sonic Amy Integration for Maya voice
 def synthesize_maya_voice_nova_sonic(text: str) -> Optional[str]:
@@ -121,6 +145,34 @@ def handle_health_check() -> Dict[str, Any]:
             })
         }
 
+def handle_safety_metrics(headers: Dict[str, Any]) -> Dict[str, Any]:
+    """Report content safety counters (admin only, read-only)"""
+    try:
+        from lambda_security import is_admin_request
+        if not is_admin_request(headers):
+            return {
+                'statusCode': 403,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'success': False, 'error': 'Admin authorization required'})
+            }
+        
+        from content_safety import get_safety_metrics
+        return {
+            'statusCode': 200,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps(get_safety_metrics())
+        }
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({
+                'status': 'error',
+                'error': str(e),
+                'timestamp': datetime.utcnow().isoformat()
+            })
+        }
+
 def handle_nova_sonic_connection_test() -> Dict[str, Any]:
     """Test Nova Sonic connectivity and Amy voice synthesis"""
     test_text = "Hello, I'm Maya, your IELTS examiner. Welcome to your speaking assessment."
@@ -172,6 +224,10 @@ def handle_nova_sonic_stream(data: Dict[str, Any]) -> Dict[str, Any]:
         conversation_id = data.get('conversation_id', str(uuid.uuid4()))
         user_email = data.get('user_email', 'anonymous')
         
+        # Partial transcript deltas are moderated incrementally while the user is still speaking
+        if 'partial_transcript' in data:
+            return handle_partial_transcript_moderation(data, conversation_id, user_email)
+        
         # Prioritize audio input for speech-to-speech processing
         if user_audio:
             return handle_bidirectional_audio_conversation(user_audio, conversation_id, user_email)
@@ -197,6 +253,53 @@ def handle_nova_sonic_stream(data: Dict[str, Any]) -> Dict[str, Any]:
             })
         }
 
+def handle_partial_transcript_moderation(data: Dict[str, Any], conversation_id: str, user_email: str) -> Dict[str, Any]:
+    """
+    Moderate a partial transcript delta mid-utterance
+    Returns a moderation event as soon as the session crosses a severity threshold so Maya can redirect
+    """
+    try:
+        moderator = get_streaming_moderator(conversation_id, user_email)
+        event = moderator.feed(data.get('partial_transcript', ''), bool(data.get('is_final', False)))
+        
+        if data.get('end_session') or (event and not event['continue_assessment']):
+            end_streaming_moderation(conversation_id)
+        
+        body = {
+            'status': 'success',
+            'conversation_id': conversation_id,
+            'moderation_event': None,
+            'severity': moderator.current_severity.value
+        }
+        
+        if event:
+            body['moderation_event'] = {
+                'severity': event['severity'].value,
+                'category': event['category'],
+                'transcript_offset': event['transcript_offset']
+            }
+            body['maya_text'] = event['examiner_response']
+            body['terminate_assessment'] = not event['continue_assessment']
+            if body['terminate_assessment']:
+                body['status'] = 'assessment_terminated'
+        
+        return {
+            'statusCode': 200,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps(body)
+        }
+        
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({
+                'status': 'error',
+                'message': f'Streaming moderation failed: {str(e)}',
+                'conversation_id': conversation_id
+            })
+        }
+
 def handle_bidirectional_audio_conversation(user_audio: str, conversation_id: str, user_email: str) -> Dict[str, Any]:
     """
     Handle direct audio-to-audio conversation with real-time content moderation
@@ -441,17 +544,10 @@ def verify_recaptcha_v2(recaptcha_response: str, user_ip: Optional[str] = None)
 def generate_qr_code(data: str) -> str:
     """Generate QR code image as base64 string"""
     try:
-        import qrcode
+        from qr_rendering_service import qr_renderer
         
-        # Generate QR code using simple API
-        qr_img = qrcode.make(data)
-        
-        # Convert to base64
-        buffer = BytesIO()
-        qr_img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        return base64.b64encode(buffer.getvalue()).decode()
+        # Small box size and border keep the PNG compact
+        return qr_renderer.render_png_base64(data)
     except ImportError:
         print("[WARNING] QRCode library not available, using placeholder")
         return "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
@@ -841,6 +937,7 @@ def send_password_reset_email(email: str, reset_link: str, username: str) -> boo
         print(f"[ERROR] Failed to send password reset email: {str(e)}")
         return False
 
+@request_scoped
 def lambda_handler(event, context):
     """Main AWS Lambda handler for QR authentication"""
     try:
@@ -863,6 +960,8 @@ def lambda_handler(event, context):
             return handle_home_page()
         elif path == '/api/health':
             return handle_health_check()
+        elif path == '/api/metrics/safety' and method == 'GET':
+            return handle_safety_metrics(headers)
         elif path == '/forgot_password' and method == 'GET':
             return handle_forgot_password_page()
         elif path == '/api/forgot-password' and method == 'POST':
@@ -887,6 +986,8 @@ def lambda_handler(event, context):
             return handle_speaking_submission(data, headers)
         elif path == '/api/get-assessment-result' and method == 'GET':
             return handle_get_assessment_result(event.get('queryStringParameters', {}))
+        elif path == '/api/assessment-history' and method == 'GET':
+            return handle_get_assessment_history(event.get('queryStringParameters') or {}, headers)
         elif path == '/api/website/check-auth' and method == 'POST':
             return handle_website_auth_check(data)
         elif path == '/api/mobile/scan-qr' and method == 'POST':
@@ -901,12 +1002,14 @@ def lambda_handler(event, context):
             return handle_login_page()
         elif path == '/dashboard' and method == 'GET':
             return handle_dashboard_page(headers)
+        elif path == '/logout' and method == 'GET':
+            return handle_logout(headers)
         elif path == '/api/maya/introduction' and method == 'POST':
             return handle_maya_introduction(data)
         elif path == '/api/maya/conversation' and method == 'POST':
             return handle_maya_conversation(data)
         elif path == '/api/nova-micro/writing' and method == 'POST':
-            return handle_nova_micro_writing(data)
+            return handle_nova_micro_writing(data, headers)
         elif path == '/api/nova-micro/submit' and method == 'POST':
             return handle_nova_micro_submit(data)
         elif path == '/api/nova-sonic-connect' and method == 'POST':
@@ -944,6 +1047,10 @@ def lambda_handler(event, context):
             return handle_gdpr_request_data_export(headers)
         elif path == '/gdpr/export-data' and method == 'POST':
             return handle_gdpr_export_data(data, headers)
+        elif path == '/gdpr/export-status' and method == 'GET':
+            return handle_gdpr_export_status(event.get('queryStringParameters') or {}, headers)
+        elif path == '/gdpr/download-export' and method == 'GET':
+            return handle_gdpr_download_export(event.get('queryStringParameters') or {})
         elif path == '/gdpr/request-data-deletion' and method == 'GET':
             return handle_gdpr_request_data_deletion(headers)
         elif path == '/gdpr/delete-data' and method == 'POST':
@@ -1668,7 +1775,7 @@ def handle_dashboard_page(headers: Dict[str, Any]) -> Dict[str, Any]:
         
         # Get user's purchased assessments and attempts
         user_assessments = aws_mock.get_user_assessments(user_email)
-        assessment_history = aws_mock.get_assessment_history(user_email)
+        assessment_history = aws_mock.get_assessment_history(user_email, limit=5)
         
         html_content = f"""<!DOCTYPE html>
 <html lang="en">
@@ -2233,7 +2340,7 @@ def get_assessment_history_html(assessment_history: list) -> str:
             <tbody>
     """
     
-    for assessment in assessment_history[-5:]:  # Show last 5 assessments
+    for assessment in assessment_history:  # Newest first, already limited by the query
         assessment_type = assessment.get('assessment_type', 'Unknown').replace('-', ' ').title()
         date = assessment.get('timestamp', 'Unknown')
         band_score = assessment.get('overall_band', 'N/A')
@@ -2264,7 +2371,7 @@ def get_assessment_history_html(assessment_history: list) -> str:
 
 def get_user_assessment_history_html(user_email: str) -> str:
     """Generate HTML for user's assessment history in profile"""
-    assessment_history = aws_mock.get_assessment_history(user_email)
+    assessment_history = aws_mock.get_assessment_history(user_email, limit=3)
     
     if not assessment_history:
         return """
@@ -2278,7 +2385,7 @@ def get_user_assessment_history_html(user_email: str) -> str:
     <div class="row">
     """
     
-    for assessment in assessment_history[-3:]:  # Show last 3 assessments
+    for assessment in assessment_history:  # Newest first, already limited by the query
         assessment_type = assessment.get('assessment_type', 'Unknown').replace('-', ' ').title()
         date = assessment.get('timestamp', 'Unknown')
         band_score = assessment.get('overall_band', 'N/A')
@@ -2345,7 +2452,17 @@ def handle_account_deletion(data: Dict[str, Any]) -> Dict[str, Any]:
         send_account_deletion_email(email)
         
         # Delete user data from all tables
-        aws_mock.delete_user_completely(email)
+        receipt = aws_mock.erase_user_data(email)
+        if receipt['status'] != 'completed':
+            return {
+                'statusCode': 500,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({
+                    'success': False,
+                    'error': 'Account deletion did not complete, please try again',
+                    'erasure_receipt_id': receipt.get('receipt_id')
+                })
+            }
         
         print(f"[ACCOUNT_DELETION] Account deleted successfully: {email}")
         
@@ -2354,7 +2471,8 @@ def handle_account_deletion(data: Dict[str, Any]) -> Dict[str, Any]:
             'headers': {'Content-Type': 'application/json'},
             'body': json.dumps({
                 'success': True,
-                'message': 'Account deleted successfully'
+                'message': 'Account deleted successfully',
+                'erasure_receipt_id': receipt['receipt_id']
             })
         }
         
@@ -4289,7 +4407,37 @@ def get_assessment_template(assessment_type: str, user_email: str, session_id: s
     # Default fallback
     return f"<h1>Assessment type {assessment_type} not supported</h1>"
 
+def submission_identity(data: Dict[str, Any], headers: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """
+    Submitter identity used to scope idempotency keys
+
+    A signed-in web user owns the submission whatever the body claims. Mobile clients send
+    no cookie, so their submissions are keyed on the body's user_email, or on the
+    session_id the client attaches to every call.
+    """
+    user_email = get_session_user_email(headers)
+    if user_email:
+        return {**data, 'user_email': user_email}, user_email
+    if data.get('user_email'):
+        return data, data['user_email']
+    if data.get('session_id'):
+        return data, f"session:{data['session_id']}"
+    return data, ''
+
 def handle_speaking_submission(data: Dict[str, Any], headers: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle speaking response submission, replaying the result for retried submissions"""
+    headers = headers or {}
+    data, submitter = submission_identity(data, headers)
+    key = derive_idempotency_key(
+        'speaking',
+        submitter,
+        question=data.get('question_id'),
+        content=data.get('audio_data'),
+        client_key=data.get('idempotency_key') or headers.get('idempotency-key', headers.get('Idempotency-Key'))
+    )
+    return get_idempotency_cache().run(key, lambda: process_speaking_submission(data, headers))
+
+def process_speaking_submission(data: Dict[str, Any], headers: Dict[str, Any]) -> Dict[str, Any]:
     """Handle speaking response submission with complete evaluation flow"""
     try:
         audio_data = data.get('audio_data')
@@ -4328,11 +4476,9 @@ def handle_speaking_submission(data: Dict[str, Any], headers: Dict[str, Any]) ->
         # Use moderated transcription for evaluation
         final_transcription = moderated_transcription
         
-        # Step 3: Get IELTS rubric from AWS mock services
-        rubric = aws_mock.get_assessment_rubric(assessment_type)
-        if not rubric:
-            # Fallback to hardcoded rubric if DynamoDB is empty
-            rubric = get_fallback_speaking_rubric(assessment_type)
+        # Step 3: Get IELTS rubric and prompt template (cached per rubric version, fallback if DynamoDB is empty)
+        template = prompt_templates.get_template(assessment_type, get_fallback_speaking_rubric)
+        rubric = template.rubric
         
         # Step 4: Evaluate with Nova Micro or fallback (using moderated transcription)
         assessment_result = evaluate_speaking_with_nova_micro(final_transcription, rubric, assessment_type)
@@ -4476,24 +4622,21 @@ def evaluate_speaking_with_nova_micro(transcription: str, rubric: Dict[str, Any]
         
         import random
         
-        # Analyze transcription for realistic scoring
-        word_count = len(transcription.split())
-        sentence_count = transcription.count('.') + transcription.count('!') + transcription.count('?')
-        avg_sentence_length = word_count / max(sentence_count, 1)
-        
-        # Complex vocabulary indicators
-        complex_words = ['multicultural', 'responsibilities', 'conservation', 'authentic', 'dramatically', 'sustainable', 'environmentally', 'comprehensive', 'globalized']
-        complexity_score = sum(1 for word in complex_words if word in transcription.lower())
+        # Analyze transcription for realistic scoring (single pass, shared with other evaluators)
+        features = extract_text_features(transcription)
+        word_count = features.word_count
+        avg_sentence_length = features.avg_sentence_length
         
-        # Grammar complexity indicators
-        complex_structures = ['have been', 'would use', 'which is', 'that requires', 'increasingly']
-        grammar_score = sum(1 for structure in complex_structures if structure in transcription.lower())
+        # Complex vocabulary and grammar complexity indicators
+        complexity_score = features.distinct_hits('speaking_complex_words')
+        grammar_score = features.distinct_hits('speaking_complex_structures')
         
         # Calculate base scores based on content analysis
         base_fluency = min(8.5, 6.0 + (word_count / 50) + (avg_sentence_length / 15))
         base_lexical = min(8.5, 6.0 + (complexity_score / 5) + (word_count / 80))
         base_grammar = min(8.5, 6.0 + (grammar_score / 4) + (avg_sentence_length / 12))
-        base_pronunciation = 7.0 + random.uniform(-0.5, 1.0)
+        # Pronunciation variation is seeded by the transcript so re-scoring the same response is reproducible
+        base_pronunciation = 7.0 + random.Random(transcription).uniform(-0.5, 1.0)
         
         # Apply realistic variations
         def round_band(score):
@@ -4532,7 +4675,20 @@ def evaluate_speaking_with_nova_micro(transcription: str, rubric: Dict[str, Any]
             'assessment_type': assessment_type
         }
 
-def handle_nova_micro_writing(data: Dict[str, Any]) -> Dict[str, Any]:
+def handle_nova_micro_writing(data: Dict[str, Any], headers: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle Nova Micro writing assessment, replaying the result for retried submissions"""
+    headers = headers or {}
+    data, submitter = submission_identity(data, headers)
+    key = derive_idempotency_key(
+        'writing',
+        submitter,
+        question=f"{data.get('assessment_type', 'academic-writing')}:{data.get('prompt', '')}",
+        content=data.get('essay_text', ''),
+        client_key=data.get('idempotency_key') or headers.get('idempotency-key', headers.get('Idempotency-Key'))
+    )
+    return get_idempotency_cache().run(key, lambda: process_nova_micro_writing(data))
+
+def process_nova_micro_writing(data: Dict[str, Any]) -> Dict[str, Any]:
     """Handle Nova Micro writing assessment with IELTS rubric processing"""
     try:
         # Extract submission data
@@ -4550,19 +4706,25 @@ def handle_nova_micro_writing(data: Dict[str, Any]) -> Dict[str, Any]:
             }
         
         print(f"[NOVA_MICRO] Processing writing assessment for {user_email}")
-        print(f"[NOVA_MICRO] Essay length: {len(essay_text)} characters, {len(essay_text.split())} words")
+        pipeline_start = time.perf_counter()
+        stage_timings = {}  # milliseconds per pipeline stage
+        print(f"[NOVA_MICRO] Essay length: {len(essay_text)} characters, {extract_text_features(essay_text).word_count} words")
         
-        # Get IELTS rubric from AWS mock services
-        rubric = aws_mock.get_assessment_rubric(assessment_type)
-        if not rubric:
-            # Fallback to hardcoded rubric
-            rubric = get_fallback_writing_rubric(assessment_type)
+        # Get IELTS rubric and prompt template (cached per task and rubric version, fallback if DynamoDB is empty)
+        task_number = int(data.get('task_number', 2))
+        stage_start = time.perf_counter()
+        template = prompt_templates.get_template(assessment_type, get_fallback_writing_rubric, task_number)
+        rubric = template.rubric
+        stage_timings['prompt'] = round((time.perf_counter() - stage_start) * 1000, 1)
         
-        # Evaluate with Nova Micro
-        assessment_result = evaluate_writing_with_nova_micro(essay_text, prompt, rubric, assessment_type)
+        # Evaluate with Nova Micro (per criterion or single call, per WRITING_EVALUATION_MODE)
+        assessment_result = evaluate_writing_concurrently(essay_text, prompt, template, assessment_type)
+        stage_timings['evaluation'] = assessment_result.get('timings', {})
         
         # Structure feedback according to IELTS criteria
+        stage_start = time.perf_counter()
         structured_feedback = structure_ielts_writing_feedback(assessment_result, rubric)
+        stage_timings['feedback'] = round((time.perf_counter() - stage_start) * 1000, 1)
         
         # Store result in AWS mock services
         assessment_id = str(uuid.uuid4())
@@ -4574,11 +4736,12 @@ def handle_nova_micro_writing(data: Dict[str, Any]) -> Dict[str, Any]:
             'prompt': prompt,
             'overall_band': structured_feedback['overall_band'],
             'criteria_scores': structured_feedback['criteria_scores'],
+            'criteria_feedback': structured_feedback.get('criteria_feedback', {}),
             'detailed_feedback': structured_feedback['detailed_feedback'],
             'strengths': structured_feedback['strengths'],
             'improvements': structured_feedback['improvements'],
             'timestamp': datetime.utcnow().isoformat(),
-            'word_count': len(essay_text.split())
+            'word_count': extract_text_features(essay_text).word_count
         }
         
         # Store in mock DynamoDB
@@ -4589,6 +4752,7 @@ def handle_nova_micro_writing(data: Dict[str, Any]) -> Dict[str, Any]:
         
         aws_mock.log_event('WritingAssessment', f'Assessment completed: {assessment_id} - Band {structured_feedback["overall_band"]}')
         
+        processing_seconds = time.perf_counter() - pipeline_start
         return {
             'statusCode': 200,
             'headers': {'Content-Type': 'application/json'},
@@ -4596,7 +4760,9 @@ def handle_nova_micro_writing(data: Dict[str, Any]) -> Dict[str, Any]:
                 'success': True,
                 'assessment_id': assessment_id,
                 'assessment_result': structured_feedback,
-                'processing_time': '2.8s',
+                'processing_time': f'{processing_seconds:.1f}s',
+                'evaluation_mode': assessment_result.get('evaluation_mode', 'single_call'),
+                'stage_timings': stage_timings,
                 'pipeline_steps': [
                     'Essay text received',
                     'Nova Micro analysis',
@@ -4724,6 +4890,83 @@ Assess the following writing response according to official IELTS General Traini
 Provide band scores (6.0-9.0 in 0.5 increments) and specific feedback for each criterion.'''
         }
 
+def writing_criterion_base_score(criterion: str, features) -> float:
+    """Content-based base score for one writing criterion (before rounding to a half band)"""
+    word_count = features.word_count
+    if criterion == 'task_achievement':
+        return min(8.5, 6.0 + (features.distinct_hits('writing_task_words') / 3) + (1 if word_count >= 150 else 0))
+    if criterion == 'coherence_and_cohesion':
+        return min(8.5, 6.0 + (features.distinct_hits('coherence_words') / 3) + (features.paragraph_count / 4))
+    if criterion == 'lexical_resource':
+        return min(8.5, 6.0 + (features.distinct_hits('writing_complex_words') / 4) + (word_count / 100))
+    if criterion == 'grammatical_range_and_accuracy':
+        return min(8.5, 6.0 + (features.distinct_hits('complex_grammar') / 4) + (features.avg_sentence_length / 15))
+    raise ValueError(f"Unknown writing criterion: {criterion}")
+
+def invoke_nova_micro_json(request_body: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one Nova Micro request and parse the JSON object in its reply"""
+    import boto3
+    bedrock_client = boto3.client('bedrock-runtime', region_name='us-east-1')
+    response = bedrock_client.invoke_model(
+        modelId="amazon.nova-micro-v1:0",
+        body=json.dumps(request_body),
+        contentType="application/json"
+    )
+    result = json.loads(response['body'].read())
+    text = result['output']['message']['content'][0]['text']
+    return json.loads(text[text.index('{'):text.rindex('}') + 1])
+
+def evaluate_writing_criterion_with_nova_micro(criterion: str, essay_text: str, prompt: str, template) -> Dict[str, Any]:
+    """Evaluate a single writing criterion with one Nova Micro call"""
+    criterion_name = criterion.replace('_', ' ').title()
+    request_body = template.build_request(
+        essay_text,
+        question=prompt,
+        instruction=f'Assess only {criterion_name}. Respond with JSON: {{"band": <score>, "feedback": "<feedback>"}}'
+    )
+    evaluation = invoke_nova_micro_json(request_body)
+    return {'score': round_band(float(evaluation['band'])), 'feedback': evaluation.get('feedback', '')}
+
+def evaluate_writing_single_call_with_nova_micro(essay_text: str, prompt: str, template) -> Dict[str, Any]:
+    """Evaluate all writing criteria with one Nova Micro call"""
+    criteria_json = ', '.join(f'"{criterion}": {{"band": <score>, "feedback": "<feedback>"}}' for criterion in WRITING_CRITERIA)
+    request_body = template.build_request(
+        essay_text,
+        question=prompt,
+        instruction=f'Assess every criterion. Respond with JSON: {{{criteria_json}}}'
+    )
+    evaluation = invoke_nova_micro_json(request_body)
+    criteria_scores = {criterion: round_band(float(evaluation[criterion]['band'])) for criterion in WRITING_CRITERIA}
+    return {
+        'overall_band': round_band(sum(criteria_scores.values()) / len(criteria_scores)),
+        'criteria_scores': criteria_scores,
+        'criteria_feedback': {criterion: evaluation[criterion].get('feedback', '') for criterion in WRITING_CRITERIA}
+    }
+
+def evaluate_writing_concurrently(essay_text: str, prompt: str, template, assessment_type: str) -> Dict[str, Any]:
+    """Evaluate writing as configured by WRITING_EVALUATION_MODE"""
+    if WRITING_EVALUATION_MODE == 'per_criterion':
+        evaluation = get_evaluation_orchestrator().evaluate(
+            WRITING_CRITERIA,
+            lambda criterion: evaluate_writing_criterion_with_nova_micro(criterion, essay_text, prompt, template),
+            lambda: evaluate_writing_single_call_with_nova_micro(essay_text, prompt, template)
+        )
+    else:
+        start = time.perf_counter()
+        if WRITING_EVALUATION_MODE == 'single_call':
+            evaluation = evaluate_writing_single_call_with_nova_micro(essay_text, prompt, template)
+        else:
+            evaluation = evaluate_writing_with_nova_micro(essay_text, prompt, template.rubric, assessment_type)
+        elapsed = round((time.perf_counter() - start) * 1000, 1)
+        evaluation['evaluation_mode'] = WRITING_EVALUATION_MODE
+        evaluation['timings'] = {WRITING_EVALUATION_MODE: elapsed, 'total': elapsed}
+    
+    word_count = extract_text_features(essay_text).word_count
+    evaluation.setdefault('detailed_feedback', f"Assessment completed with {word_count} words analyzed using Nova Micro evaluation engine.")
+    evaluation.setdefault('word_count', word_count)
+    evaluation.setdefault('assessment_type', assessment_type)
+    return evaluation
+
 def evaluate_writing_with_nova_micro(essay_text: str, prompt: str, rubric: Dict[str, Any], assessment_type: str) -> Dict[str, Any]:
     """Evaluate writing using Nova Micro with IELTS rubrics"""
     try:
@@ -4732,43 +4975,13 @@ def evaluate_writing_with_nova_micro(essay_text: str, prompt: str, rubric: Dict[
         
         import random
         
-        # Analyze essay for realistic scoring
-        word_count = len(essay_text.split())
-        sentence_count = essay_text.count('.') + essay_text.count('!') + essay_text.count('?')
-        paragraph_count = essay_text.count('\n\n') + 1
-        avg_sentence_length = word_count / max(sentence_count, 1)
-        
-        # Task achievement indicators
-        task_words = ['shows', 'illustrates', 'demonstrates', 'according to', 'overall', 'in conclusion', 'however', 'furthermore']
-        task_score = sum(1 for word in task_words if word.lower() in essay_text.lower())
-        
-        # Coherence indicators
-        coherence_words = ['firstly', 'secondly', 'moreover', 'furthermore', 'in addition', 'however', 'nevertheless', 'in conclusion']
-        coherence_score = sum(1 for word in coherence_words if word.lower() in essay_text.lower())
-        
-        # Lexical resource indicators
-        complex_words = ['significant', 'approximately', 'dramatically', 'proportion', 'accommodation', 'correspondingly', 'predominant']
-        lexical_score = sum(1 for word in complex_words if word.lower() in essay_text.lower())
-        
-        # Grammar indicators
-        complex_grammar = ['which', 'that', 'although', 'despite', 'having', 'been', 'would', 'could', 'should']
-        grammar_score = sum(1 for structure in complex_grammar if structure.lower() in essay_text.lower())
-        
-        # Calculate base scores
-        base_task = min(8.5, 6.0 + (task_score / 3) + (1 if word_count >= 150 else 0))
-        base_coherence = min(8.5, 6.0 + (coherence_score / 3) + (paragraph_count / 4))
-        base_lexical = min(8.5, 6.0 + (lexical_score / 4) + (word_count / 100))
-        base_grammar = min(8.5, 6.0 + (grammar_score / 4) + (avg_sentence_length / 15))
-        
-        # Apply realistic variations
-        def round_band(score):
-            return round(score * 2) / 2  # Round to nearest 0.5
+        # Analyze essay for realistic scoring (single pass, shared with other evaluators)
+        features = extract_text_features(essay_text)
+        word_count = features.word_count
         
         criteria_scores = {
-            'task_achievement': round_band(base_task),
-            'coherence_and_cohesion': round_band(base_coherence),
-            'lexical_resource': round_band(base_lexical),
-            'grammatical_range_and_accuracy': round_band(base_grammar)
+            criterion: round_band(writing_criterion_base_score(criterion, features))
+            for criterion in WRITING_CRITERIA
         }
         
         # Calculate overall band
@@ -4802,6 +5015,8 @@ def structure_ielts_writing_feedback(assessment_result: Dict[str, Any], rubric:
     try:
         overall_band = assessment_result.get('overall_band', 6.5)
         criteria_scores = assessment_result.get('criteria_scores', {})
+        # Examiner comments per criterion (present when each criterion was evaluated by its own call)
+        criteria_feedback = assessment_result.get('criteria_feedback', {})
         
         # Generate detailed feedback for each criterion
         detailed_feedback = []
@@ -4820,6 +5035,9 @@ def structure_ielts_writing_feedback(assessment_result: Dict[str, Any], rubric:
             else:
                 detailed_feedback.append(f"📚 {criterion_name}: Needs development (Band {score})")
                 improvements.append(f"{criterion_name}: Requires significant improvement in this area")
+            
+            if criteria_feedback.get(criterion):
+                detailed_feedback.append(f"   {criteria_feedback[criterion]}")
         
         # Add overall feedback
         performance_level = get_performance_level(overall_band)
@@ -4828,6 +5046,7 @@ def structure_ielts_writing_feedback(assessment_result: Dict[str, Any], rubric:
         return {
             'overall_band': overall_band,
             'criteria_scores': criteria_scores,
+            'criteria_feedback': criteria_feedback,
             'detailed_feedback': '\n'.join(detailed_feedback),
             'strengths': strengths,
             'improvements': improvements,
@@ -5001,6 +5220,53 @@ def handle_get_assessment_result(query_params: Dict[str, Any]) -> Dict[str, Any]
             'body': json.dumps({'error': str(e)})
         }
 
+def handle_get_assessment_history(query_params: Dict[str, Any], headers: Dict[str, Any]) -> Dict[str, Any]:
+    """Page through the signed-in user's assessment history (newest first)"""
+    try:
+        cookie_header = headers.get('cookie', '')
+        session_id = None
+        for cookie in cookie_header.split(';'):
+            if 'web_session_id=' in cookie:
+                session_id = cookie.split('=', 1)[1].strip()
+                break
+
+        session_data = aws_mock.get_session(session_id) if session_id else None
+        if not session_data:
+            return {
+                'statusCode': 401,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'error': 'Authentication required'})
+            }
+
+        query_params = query_params or {}
+        try:
+            limit = int(query_params.get('limit', DEFAULT_PAGE_SIZE))
+            page = aws_mock.query_assessment_history(
+                session_data.get('user_email'),
+                limit=limit,
+                cursor=query_params.get('cursor'),
+                projection=HISTORY_SUMMARY_FIELDS
+            )
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'error': str(e)})
+            }
+
+        return {
+            'statusCode': 200,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'assessments': page['items'], 'next_cursor': page['next_cursor']}, default=str)
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': str(e)})
+        }
+
 # GDPR Compliance Handler Functions
 def handle_gdpr_my_data(headers: Dict[str, Any]) -> Dict[str, Any]:
     """Handle GDPR My Data dashboard page"""
@@ -5352,10 +5618,66 @@ def handle_gdpr_request_data_export(headers: Dict[str, Any]) -> Dict[str, Any]:
             'body': f'<h1>Error</h1><p>{str(e)}</p>'
         }
 
+def get_session_id(headers: Dict[str, Any]) -> Optional[str]:
+    """Value of the web_session_id cookie, if any"""
+    headers = headers or {}
+    cookie_header = headers.get('cookie', headers.get('Cookie', ''))
+    for cookie in cookie_header.split(';'):
+        if 'web_session_id=' in cookie:
+            return cookie.split('=', 1)[1].strip()
+    return None
+
+def get_session_user_email(headers: Dict[str, Any]) -> Optional[str]:
+    """Email of the user signed in through the web_session_id cookie (None without a valid session)"""
+    session_id = get_session_id(headers)
+    session_data = aws_mock.get_session(session_id) if session_id else None
+    return session_data.get('user_email') if session_data else None
+
+def handle_logout(headers: Dict[str, Any]) -> Dict[str, Any]:
+    """End the web session and clear its cookie"""
+    session_id = get_session_id(headers)
+    if session_id:
+        aws_mock.delete_session(session_id)
+    return {
+        'statusCode': 302,
+        'headers': {
+            'Location': '/login',
+            'Set-Cookie': 'web_session_id=; path=/; max-age=0'
+        },
+        'body': ''
+    }
+
+def gdpr_export_unavailable(error: str, html: bool = False) -> Dict[str, Any]:
+    """503 for export endpoints when exports are not configured"""
+    print(f"[GDPR] Data export unavailable: {error}")
+    if html:
+        return {
+            'statusCode': 503,
+            'headers': {'Content-Type': 'text/html'},
+            'body': '<h1>Data export unavailable</h1><p>Data exports are not configured on this server.</p>'
+        }
+    return {
+        'statusCode': 503,
+        'headers': {'Content-Type': 'application/json'},
+        'body': json.dumps({'error': 'Data export is not configured'})
+    }
+
 def handle_gdpr_export_data(data: Dict[str, Any], headers: Dict[str, Any]) -> Dict[str, Any]:
-    """Handle GDPR data export processing"""
+    """Handle GDPR data export processing (redirects to the download link once the file is ready)"""
+    from gdpr_export import get_gdpr_export_service, ExportConfigurationError
+    
     try:
-        user_email = 'test@ieltsgenaiprep.com'
+        user_email = get_session_user_email(headers)
+        if not user_email:
+            return {
+                'statusCode': 302,
+                'headers': {'Location': '/login', 'Content-Type': 'text/html'},
+                'body': ''
+            }
+        try:
+            get_gdpr_export_service(aws_mock)
+        except ExportConfigurationError as e:
+            return gdpr_export_unavailable(str(e), html=True)
         export_format = data.get('format', 'json')
         include_assessments = data.get('include_assessments', False)
         
@@ -5368,31 +5690,25 @@ def handle_gdpr_export_data(data: Dict[str, Any], headers: Dict[str, Any]) -> Di
                 'body': '<h1>Error</h1><p>Unable to process export request</p>'
             }
         
-        export_request = aws_mock.get_gdpr_request_status(request_id)
+        export_request = get_gdpr_export_service(aws_mock).get_export(request_id, user_email) or {}
+        status = export_request.get('status')
         
-        if export_request and export_request.get('status') == 'completed':
-            export_data = export_request.get('export_data', {})
-            
-            if export_format == 'json':
-                return {
-                    'statusCode': 200,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Content-Disposition': f'attachment; filename="ielts-data-export-{request_id}.json"'
-                    },
-                    'body': json.dumps(export_data, indent=2)
-                }
-            else:
-                csv_content = f"Email,Created At,Last Login\\n{user_email},{export_data.get('user_profile', {}).get('created_at', '')},{export_data.get('user_profile', {}).get('last_login', '')}"
-                
-                return {
-                    'statusCode': 200,
-                    'headers': {
-                        'Content-Type': 'text/csv',
-                        'Content-Disposition': f'attachment; filename="ielts-data-export-{request_id}.csv"'
-                    },
-                    'body': csv_content
-                }
+        if status == 'completed':
+            return {
+                'statusCode': 303,
+                'headers': {'Location': export_request['download_url']},
+                'body': ''
+            }
+        
+        if status in ('pending', 'processing'):
+            # Large accounts are exported by a background job; the status endpoint returns the link
+            status_url = f'/gdpr/export-status?request_id={request_id}'
+            return {
+                'statusCode': 202,
+                'headers': {'Content-Type': 'text/html'},
+                'body': f'<h1>Export in progress</h1><p>Your data export is being prepared. '
+                        f'<a href="{status_url}">Check its status</a> to get the download link.</p>'
+            }
         
         return {
             'statusCode': 500,
@@ -5407,6 +5723,72 @@ def handle_gdpr_export_data(data: Dict[str, Any], headers: Dict[str, Any]) -> Di
             'body': f'<h1>Error</h1><p>{str(e)}</p>'
         }
 
+def handle_gdpr_export_status(query_params: Dict[str, Any], headers: Dict[str, Any]) -> Dict[str, Any]:
+    """Report the state of the signed-in user's data export request and, once ready, its download link"""
+    from gdpr_export import get_gdpr_export_service, ExportConfigurationError
+    
+    user_email = get_session_user_email(headers)
+    if not user_email:
+        return {
+            'statusCode': 401,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': 'Authentication required'})
+        }
+    try:
+        service = get_gdpr_export_service(aws_mock)
+    except ExportConfigurationError as e:
+        return gdpr_export_unavailable(str(e))
+    
+    # Requests owned by someone else are reported as missing
+    export_request = service.get_export((query_params or {}).get('request_id', ''), user_email)
+    
+    if not export_request:
+        return {
+            'statusCode': 404,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': 'Export request not found'})
+        }
+    
+    fields = ('request_id', 'status', 'format', 'created_at', 'completed_at', 'record_count',
+              'size_bytes', 'download_url', 'download_expires_at', 'error')
+    return {
+        'statusCode': 200,
+        'headers': {'Content-Type': 'application/json'},
+        'body': json.dumps({field: export_request[field] for field in fields if field in export_request}, default=str)
+    }
+
+def handle_gdpr_download_export(query_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Serve a locally stored export behind its signed link (S3 exports use presigned URLs instead)"""
+    from gdpr_export import get_gdpr_export_service, ExportConfigurationError
+    
+    query_params = query_params or {}
+    try:
+        store = get_gdpr_export_service(aws_mock).store
+    except ExportConfigurationError as e:
+        return gdpr_export_unavailable(str(e), html=True)
+    request_id = query_params.get('request_id', '')
+    path = store.resolve(request_id, query_params.get('expires'), query_params.get('signature', '')) \
+        if hasattr(store, 'resolve') else None
+    
+    if not path:
+        return {
+            'statusCode': 403,
+            'headers': {'Content-Type': 'text/html'},
+            'body': '<h1>Link expired</h1><p>This download link is invalid or has expired. Please request a new export.</p>'
+        }
+    
+    with open(path, 'rb') as export_file:
+        content = base64.b64encode(export_file.read()).decode('ascii')
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/gzip',
+            'Content-Disposition': f'attachment; filename="ielts-data-export-{os.path.basename(path)}"'
+        },
+        'body': content,
+        'isBase64Encoded': True
+    }
+
 def handle_gdpr_request_data_deletion(headers: Dict[str, Any]) -> Dict[str, Any]:
     """Handle GDPR data deletion request page"""
     try:
@@ -594,6 +594,14 @@ SCHEMAS = {
     }
 }
 
+def is_admin_request(headers: Optional[Dict[str, Any]]) -> bool:
+    """True if the request carries the admin API key (X-Admin-Key, compared in constant time)"""
+    admin_key = os.environ.get('ADMIN_API_KEY')
+    if not admin_key:
+        return False
+    provided = next((value for name, value in (headers or {}).items() if name.lower() == 'x-admin-key'), None)
+    return bool(provided) and hmac.compare_digest(str(provided).encode('utf-8'), admin_key.encode('utf-8'))
+
 # Initialize global instances
 rate_limiter = RateLimiter()
 token_manager = TokenManager()
@@ -607,6 +615,7 @@ __all__ = [
     'TokenManager',
     'RecaptchaValidator',
     'validate_request_data',
+    'is_admin_request',
     'SCHEMAS',
     'rate_limiter',
     'token_manager'
@@ -12,6 +12,7 @@ from lambda_security import security_middleware
 from assessment_access_control import get_assessment_controller
 from question_bank_dal import get_question_bank_dal
 from maya_conversation_engine import get_maya_engine
+from nova_sonic_service import run_async
 from ielts_band_scoring import get_band_scorer
 from conversation_data_retention import get_retention_manager
 
@@ -85,14 +86,9 @@ def handle_start_maya_conversation(event: Dict[str, Any], context: Any) -> Dict[
                 })
             }
         
-        # Initialize Maya conversation (async)
-        import asyncio
+        # Initialize Maya conversation on the long-lived worker loop
         maya_engine = get_maya_engine()
-        
-        # Run async conversation initialization
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        conversation_result = loop.run_until_complete(
+        conversation_result = run_async(
             maya_engine.initialize_session({
                 'session_id': session_id,
                 'assessment_type': assessment_type,
@@ -213,15 +209,10 @@ def handle_maya_conversation_turn(event: Dict[str, Any], context: Any) -> Dict[s
                 })
             }
         
-        # Process conversation turn (async)
-        import asyncio
+        # Process conversation turn on the long-lived worker loop
         maya_engine = get_maya_engine()
-        
-        # Run async conversation processing
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        conversation_turn = loop.run_until_complete(
-            maya_engine.process_user_response(user_response, audio_duration)
+        conversation_turn = run_async(
+            maya_engine.process_user_response(user_response, audio_duration, session_id=session_id)
         )
         
         if conversation_turn['success']:
@@ -236,7 +227,7 @@ def handle_maya_conversation_turn(event: Dict[str, Any], context: Any) -> Dict[s
             
             # If complete, generate band score report
             if is_complete:
-                conversation_summary = maya_engine.get_conversation_summary()
+                conversation_summary = maya_engine.get_conversation_summary(session_id)
                 band_scorer = get_band_scorer()
                 
                 # Generate comprehensive evaluation
@@ -270,7 +261,7 @@ def handle_maya_conversation_turn(event: Dict[str, Any], context: Any) -> Dict[s
             }
         else:
             return {
-                'statusCode': 500,
+                'statusCode': 409 if conversation_turn.get('conflict') else 500,
                 'headers': {'Content-Type': 'application/json'},
                 'body': json.dumps({
                     'success': False,
@@ -362,7 +353,7 @@ def handle_get_conversation_summary(event: Dict[str, Any], context: Any) -> Dict
         
         # Get conversation summary
         maya_engine = get_maya_engine()
-        conversation_summary = maya_engine.get_conversation_summary()
+        conversation_summary = maya_engine.get_conversation_summary(session_id)
         
         return {
             'statusCode': 200,
@@ -507,7 +498,7 @@ def handle_generate_band_score_report(event: Dict[str, Any], context: Any) -> Di
         else:
             # Data not yet cleaned - get from conversation summary
             maya_engine = get_maya_engine()
-            conversation_summary = maya_engine.get_conversation_summary()
+            conversation_summary = maya_engine.get_conversation_summary(session_id)
             
             # Generate band score report
             band_scorer = get_band_scorer()
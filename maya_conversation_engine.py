@@ -4,17 +4,31 @@ Natural speaking triggers and evaluation flow for authentic IELTS examiner exper
 """
 
 import json
+import asyncio
 import logging
 import random
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 from enum import Enum
 
-from nova_sonic_service import get_nova_sonic_service, NovaSonicService
+from nova_sonic_service import get_nova_sonic_service, run_async, NovaSonicService, StreamingSessionRegistry
+from text_features import extract_text_features
+from maya_conversation_state import (
+    ConversationState, ConversationStateConflict, ConversationStateStore, get_conversation_store
+)
+from maya_prompt_window import append_exchange, get_maya_prompt_assembler
 
 logger = logging.getLogger(__name__)
 
+# How long end_session waits for Bedrock to close a conversation's stream
+STREAM_CLOSE_TIMEOUT_SECONDS = 5.0
+
+# Conversation state bound to the current turn (per thread / asyncio task)
+_current_state: ContextVar[Optional[ConversationState]] = ContextVar('maya_conversation_state', default=None)
+
 class ConversationStage(Enum):
     """Maya conversation stages"""
     INITIAL_GREETING = "initial_greeting"
@@ -44,7 +58,7 @@ class MayaConversationEngine:
     Provides natural, human-like conversation flow and evaluation triggers
     """
     
-    def __init__(self):
+    def __init__(self, store: Optional[ConversationStateStore] = None):
         # Initialize Nova Sonic service for voice synthesis
         self.nova_sonic = get_nova_sonic_service()
         
@@ -66,23 +80,61 @@ class MayaConversationEngine:
             "part3_focus": "abstract_discussion_related_to_part2"
         }
         
-        # Enhanced conversation state with AI context tracking
-        self.conversation_state = {
-            "stage": ConversationStage.INITIAL_GREETING,
-            "part1_questions_asked": 0,
-            "part2_prep_time": 0,
-            "part2_speaking_time": 0,
-            "part3_questions_asked": 0,
-            "total_time": 0,
-            "start_time": None,
-            "stage_start_time": None,
-            "user_responses": [],
-            "conversation_history": [],  # Full conversation context for AI
-            "user_context": {},  # What we've learned about the user
-            "current_topics": [],  # Active discussion topics
-            "evaluation_notes": [],
-            "streaming_session": None  # Active Nova Sonic session
-        }
+        # Per-session state lives in the conversation store; the engine itself is stateless
+        self.store = store or get_conversation_store()
+        
+        # Active Nova Sonic streaming sessions are process-local, not serialized, and bounded by count and idle time
+        self._streaming_sessions = StreamingSessionRegistry(self.nova_sonic)
+        
+        # Token-budgeted prompt assembly with per-session prefix reuse
+        self.prompt_assembler = get_maya_prompt_assembler()
+    
+    @property
+    def conversation_state(self) -> ConversationState:
+        """State of the conversation bound to the current turn"""
+        state = _current_state.get()
+        if state is None:
+            raise RuntimeError("No Maya conversation state bound - use a session_id")
+        return state
+    
+    @property
+    def _stage(self) -> ConversationStage:
+        return ConversationStage(self.conversation_state.stage)
+    
+    @_stage.setter
+    def _stage(self, stage: ConversationStage):
+        self.conversation_state.stage = stage.value
+    
+    @contextmanager
+    def _bind(self, state: ConversationState):
+        """Bind state to the current thread/task for the duration of one turn"""
+        token = _current_state.set(state)
+        try:
+            yield state
+        finally:
+            _current_state.reset(token)
+    
+    def _load_state(self, session_id: str) -> ConversationState:
+        state = self.store.load(session_id)
+        if state is None:
+            raise KeyError(f"No Maya conversation for session {session_id}")
+        return state
+    
+    def _get_streaming_session(self) -> Optional[Dict[str, Any]]:
+        return self._streaming_sessions.get(self.conversation_state.session_id)
+    
+    def end_session(self, session_id: str):
+        """Drop stored conversation state and close any streaming session"""
+        self.store.delete(session_id)
+        streaming_session = self._streaming_sessions.pop(session_id)
+        self.prompt_assembler.forget(session_id)
+        
+        stream = streaming_session.get('stream') if streaming_session else None
+        if stream is not None:
+            try:
+                run_async(self.nova_sonic.close_stream(stream), timeout=STREAM_CLOSE_TIMEOUT_SECONDS)
+            except Exception as e:
+                logger.warning(f"Failed to close Nova Sonic stream for {session_id}: {e}")
     
     async def initialize_session(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
         """Initialize Maya conversation session"""
@@ -91,53 +143,66 @@ class MayaConversationEngine:
             assessment_type = session_data.get('assessment_type')
             questions = session_data.get('questions', {})
             
-            # Reset conversation state
-            self.conversation_state = {
-                "session_id": session_id,
-                "assessment_type": assessment_type,
-                "stage": ConversationStage.INITIAL_GREETING,
-                "questions": questions,
-                "part1_questions_asked": 0,
-                "part2_prep_time": 0,
-                "part2_speaking_time": 0,
-                "part3_questions_asked": 0,
-                "total_time": 0,
-                "started_at": datetime.utcnow().isoformat(),
-                "user_responses": [],
-                "evaluation_notes": []
-            }
+            # Fresh conversation state for this session
+            state = ConversationState(
+                session_id=session_id,
+                assessment_type=assessment_type,
+                stage=ConversationStage.INITIAL_GREETING.value,
+                questions=questions,
+                started_at=datetime.utcnow().isoformat()
+            )
+            
+            with self._bind(state):
+                response = await self._start_conversation(state, assessment_type)
+            
+            if response.get("success"):
+                self.store.save(state)
+            return response
             
-            # Initialize Nova Sonic session for streaming (if available)
+        except ConversationStateConflict as e:
+            logger.warning(f"Maya session already initialized: {e}")
+            return {
+                "success": False,
+                "error": "Conversation already started for this session"
+            }
+        except Exception as e:
+            logger.error(f"Failed to initialize Maya session: {e}")
+            return {
+                "success": False,
+                "error": "Failed to initialize conversation"
+            }
+    
+    async def _start_conversation(self, state: ConversationState, assessment_type: Optional[str]) -> Dict[str, Any]:
+        """Open the streaming session and produce Maya's greeting for bound state"""
+        try:
+            # Prepare a Nova Sonic streaming session (if available); its stream is opened on first use
             streaming_context = None
             try:
-                import asyncio
-                # Attempt to initialize streaming session
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                streaming_result = loop.run_until_complete(
-                    self.nova_sonic.start_maya_conversation(
-                        system_prompt=self.nova_sonic.get_maya_ielts_system_prompt(assessment_type or "academic_speaking"),
-                        voice_id="matthew"
-                    )
+                streaming_result = await self.nova_sonic.start_maya_conversation(
+                    system_prompt=self.nova_sonic.get_maya_ielts_system_prompt(assessment_type or "academic_speaking"),
+                    voice_id="matthew"
                 )
                 
                 if streaming_result.get('success'):
                     streaming_context = {
-                        'stream': streaming_result.get('stream'),
                         'session_id': streaming_result.get('session_id'),
+                        'config': streaming_result.get('config'),
+                        'system_prompt': streaming_result.get('system_prompt'),
                         'voice_id': streaming_result.get('voice_id'),
                         'status': streaming_result.get('status')
                     }
-                    logger.info(f"Nova Sonic streaming session initialized: {streaming_result.get('session_id')}")
+                    logger.info(f"Nova Sonic streaming session prepared: {streaming_result.get('session_id')}")
                 else:
                     logger.warning(f"Nova Sonic streaming failed: {streaming_result.get('error', 'Unknown error')}")
             except Exception as e:
                 logger.warning(f"Failed to initialize Nova Sonic streaming: {e}")
             
             # Set start times for time management
-            self.conversation_state["start_time"] = time.time()
-            self.conversation_state["stage_start_time"] = time.time()
-            self.conversation_state["streaming_session"] = streaming_context
+            state.start_time = time.time()
+            state.stage_start_time = time.time()
+            if streaming_context:
+                self._streaming_sessions.put(state.session_id, streaming_context)
+                state.streaming_session_id = streaming_context.get('session_id')
             
             # Generate initial greeting using AI
             initial_message = await self.generate_contextual_response(
@@ -161,19 +226,49 @@ class MayaConversationEngine:
                 "error": "Failed to initialize conversation"
             }
     
-    async def process_user_response(self, user_input: str, audio_duration: float = 0) -> Dict[str, Any]:
+    async def process_user_response(self, user_input: str, audio_duration: float = 0,
+                                    session_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Process user response and generate Maya's next natural response
         
         Args:
             user_input: User's spoken text (transcribed)
             audio_duration: Duration of user's audio in seconds
+            session_id: Conversation to load from the store (defaults to the bound state)
             
         Returns:
             Dict with Maya's response and conversation state
         """
+        if session_id is None:
+            return await self._process_bound_response(user_input, audio_duration)
+        
         try:
-            current_stage = self.conversation_state["stage"]
+            state = self._load_state(session_id)
+            with self._bind(state):
+                response = await self._process_bound_response(user_input, audio_duration)
+            
+            # Optimistic concurrency: a concurrent turn for the same session makes this save fail
+            self.store.save(state)
+            return response
+            
+        except KeyError as e:
+            logger.error(f"Failed to process user response: {e}")
+            return {
+                "success": False,
+                "error": "Conversation not found"
+            }
+        except ConversationStateConflict as e:
+            logger.warning(f"Concurrent Maya turn rejected: {e}")
+            return {
+                "success": False,
+                "error": "Conversation was updated by another request - please retry",
+                "conflict": True
+            }
+    
+    async def _process_bound_response(self, user_input: str, audio_duration: float) -> Dict[str, Any]:
+        """Process a user turn against the bound conversation state"""
+        try:
+            current_stage = self._stage
             
             # Record user response
             response_record = {
@@ -181,16 +276,19 @@ class MayaConversationEngine:
                 "stage": current_stage.value,
                 "text": user_input,
                 "duration": audio_duration,
-                "word_count": len(user_input.split()) if user_input else 0
+                "word_count": extract_text_features(user_input).word_count
             }
-            self.conversation_state["user_responses"].append(response_record)
-            
-            # Generate evaluation notes
-            evaluation_notes = self.evaluate_response(user_input, audio_duration, current_stage)
-            self.conversation_state["evaluation_notes"].extend(evaluation_notes)
+            self.conversation_state.user_responses.append(response_record)
             
-            # Determine next stage and response using AI
-            next_response = await self.determine_next_response(user_input, current_stage)
+            # Evaluate the turn in a worker thread while Maya's reply is generated and synthesized
+            evaluation = asyncio.ensure_future(
+                asyncio.to_thread(self.evaluate_response, user_input, audio_duration, current_stage)
+            )
+            try:
+                next_response = await self.determine_next_response(user_input, current_stage)
+            finally:
+                evaluation_notes = await evaluation
+            self.conversation_state.evaluation_notes.extend(evaluation_notes)
             
             return next_response
             
@@ -211,7 +309,7 @@ class MayaConversationEngine:
             context = self._build_conversation_context(user_input, stage, time_remaining)
             
             # Use Nova Sonic's AI to generate contextual response
-            if self.conversation_state.get('streaming_session'):
+            if self._get_streaming_session():
                 # Use active streaming session for real-time conversation
                 response = await self._generate_streaming_response(context)
             else:
@@ -226,25 +324,29 @@ class MayaConversationEngine:
         except Exception as e:
             logger.error(f"AI response generation failed: {e}")
             # Fallback to stage-appropriate response if AI fails
-            return self._get_fallback_response(stage or self.conversation_state['stage'])
+            return self._get_fallback_response(stage or self._stage)
     
     def _build_conversation_context(self, 
                                   user_input: str, 
                                   stage: ConversationStage, 
                                   time_remaining: Optional[int]) -> Dict[str, Any]:
         """Build comprehensive context for AI response generation"""
-        return {
-            "current_stage": stage.value if stage else self.conversation_state['stage'].value,
+        context = {
+            "current_stage": stage.value if stage else self._stage.value,
             "user_input": user_input,
-            "conversation_history": self.conversation_state['conversation_history'][-10:],  # Last 10 exchanges
-            "user_context": self.conversation_state['user_context'],
-            "current_topics": self.conversation_state['current_topics'],
+            "user_context": self.conversation_state.user_context,
+            "current_topics": self.conversation_state.current_topics,
             "time_remaining": time_remaining,
             "total_time_elapsed": self._get_elapsed_time(),
             "ielts_requirements": self._get_stage_requirements(stage),
-            "questions_asked": self.conversation_state.get('part1_questions_asked', 0),
-            "assessment_type": self.conversation_state.get('assessment_type', 'academic_speaking')
+            "questions_asked": self.conversation_state.part1_questions_asked,
+            "assessment_type": self.conversation_state.assessment_type or 'academic_speaking'
         }
+        # Most recent exchanges that fit the prompt token budget
+        context["history_start"], context["conversation_history"] = \
+            self.prompt_assembler.build_context_window(self.conversation_state, context)
+        context["history_summary"] = self.conversation_state.history_summary
+        return context
     
     async def _generate_ai_response(self, context: Dict[str, Any]) -> str:
         """Generate AI response using Nova Sonic's conversational capabilities"""
@@ -261,30 +363,8 @@ class MayaConversationEngine:
         return self._create_contextual_response(context)
     
     def _create_conversation_prompt(self, context: Dict[str, Any]) -> str:
-        """Create AI prompt with full conversation context"""
-        stage = context['current_stage']
-        user_input = context['user_input']
-        history = context['conversation_history']
-        time_remaining = context['time_remaining']
-        
-        prompt = f"""You are Maya, an experienced IELTS examiner. Current situation:
-
-**Stage**: {stage}
-**User just said**: "{user_input}"
-**Time remaining**: {time_remaining}s
-**What you know about the user**: {context['user_context']}
-**Recent conversation**: {history[-3:] if history else 'Beginning of assessment'}
-
-Generate a natural, contextual response that:
-1. Acknowledges what the user said specifically
-2. Shows genuine interest in their response
-3. Follows IELTS examination standards
-4. Manages time appropriately
-5. Asks relevant follow-up questions when needed
-
-Respond as Maya would, naturally and professionally."""
-        
-        return prompt
+        """Create AI prompt with conversation context (static prefix and history reused across turns)"""
+        return self.prompt_assembler.build_prompt(self.conversation_state, context)
     
     def _create_contextual_response(self, context: Dict[str, Any]) -> str:
         """Create contextual response based on conversation context (temporary implementation)"""
@@ -294,7 +374,7 @@ Respond as Maya would, naturally and professionally."""
         
         # Extract context from user input to generate relevant responses
         user_context = self._extract_user_context(user_input)
-        self.conversation_state['user_context'].update(user_context)
+        self.conversation_state.user_context.update(user_context)
         
         if stage == 'initial_greeting':
             return "Hello! I'm Maya, your IELTS examiner today. I can see you're ready to begin - that's wonderful! Before we start, could you please tell me your full name?"
@@ -333,7 +413,7 @@ Respond as Maya would, naturally and professionally."""
         
         return "Thank you for sharing that with me. That's very interesting."
     
-    def _synthesize_maya_response(self, text: str, session_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def _synthesize_maya_response(self, text: str, session_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Synthesize Maya's text response to audio using Nova Sonic
         
@@ -346,7 +426,7 @@ Respond as Maya would, naturally and professionally."""
         """
         try:
             # Use Nova Sonic service to synthesize Maya's speech
-            synthesis_result = self.nova_sonic.synthesize_maya_speech(
+            synthesis_result = await self.nova_sonic.synthesize_maya_speech_async(
                 text=text,
                 voice_id="matthew",  # Nova Sonic compatible voice
                 session_context=session_context
@@ -411,12 +491,12 @@ Respond as Maya would, naturally and professionally."""
         """
         # Update conversation state if transitioning
         if stage_transition:
-            self.conversation_state["stage"] = stage
-            self.conversation_state["stage_start_time"] = time.time()
+            self._stage = stage
+            self.conversation_state.stage_start_time = time.time()
         
         # Synthesize Maya's speech using streaming session if available
-        session_context = session_context or self.conversation_state.get('streaming_session')
-        synthesis_data = self._synthesize_maya_response(text, session_context)
+        session_context = session_context or self._get_streaming_session()
+        synthesis_data = await self._synthesize_maya_response(text, session_context)
         
         # Build complete response with time awareness
         response = {
@@ -428,8 +508,8 @@ Respond as Maya would, naturally and professionally."""
             "time_remaining": time_remaining,
             "stage_transition": stage_transition,
             "conversation_context": {
-                "topics_discussed": self.conversation_state["current_topics"],
-                "user_context": self.conversation_state["user_context"]
+                "topics_discussed": self.conversation_state.current_topics,
+                "user_context": self.conversation_state.user_context
             },
             **kwargs
         }
@@ -468,10 +548,10 @@ Respond as Maya would, naturally and professionally."""
     
     def _calculate_time_remaining(self, stage: ConversationStage) -> Optional[int]:
         """Calculate remaining time for current stage"""
-        if not self.conversation_state.get('stage_start_time'):
+        if not self.conversation_state.stage_start_time:
             return None
             
-        elapsed = time.time() - self.conversation_state['stage_start_time']
+        elapsed = time.time() - self.conversation_state.stage_start_time
         time_limits = self.time_limits.get(stage, {})
         
         if stage == ConversationStage.PART1_QUESTIONS:
@@ -497,7 +577,7 @@ Respond as Maya would, naturally and professionally."""
         
         # Content-based transitions (e.g., enough Part 1 questions asked)
         if current_stage == ConversationStage.PART1_QUESTIONS:
-            questions_asked = self.conversation_state.get('part1_questions_asked', 0)
+            questions_asked = self.conversation_state.part1_questions_asked
             if questions_asked >= 5:  # Standard IELTS Part 1 has 4-6 questions
                 return ConversationStage.PART2_BRIEFING, True
         
@@ -561,23 +641,13 @@ Respond as Maya would, naturally and professionally."""
         return context
     
     def _update_conversation_history(self, user_input: str, maya_response: str):
-        """Update conversation history with new exchange"""
-        exchange = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "user": user_input,
-            "maya": maya_response
-        }
-        self.conversation_state['conversation_history'].append(exchange)
-        
-        # Keep only last 20 exchanges to manage memory
-        if len(self.conversation_state['conversation_history']) > 20:
-            self.conversation_state['conversation_history'] = \
-                self.conversation_state['conversation_history'][-20:]
+        """Update conversation history with new exchange (older exchanges are summarized)"""
+        append_exchange(self.conversation_state, user_input, maya_response, self.conversation_state.stage)
     
     def _get_elapsed_time(self) -> int:
         """Get total elapsed time since assessment start"""
-        if self.conversation_state.get('start_time'):
-            return int(time.time() - self.conversation_state['start_time'])
+        if self.conversation_state.start_time:
+            return int(time.time() - self.conversation_state.start_time)
         return 0
     
     def _get_stage_requirements(self, stage: Optional[ConversationStage]) -> Dict[str, Any]:
@@ -642,29 +712,29 @@ Respond as Maya would, naturally and professionally."""
     
     async def _generate_streaming_response(self, context: Dict[str, Any]) -> str:
         """Generate response using active Nova Sonic streaming session"""
-        # This would use the bidirectional streaming session
-        # For now, fall back to AI response generation
+        # A reader of the bidirectional stream gets it from self._streaming_sessions.stream(),
+        # which opens it on first use. Until one exists, fall back to AI response generation
         return await self._generate_ai_response(context)
     
     def get_conversation_summary(self) -> Dict[str, Any]:
         """Get comprehensive conversation summary for evaluation"""
         return {
-            "session_id": self.conversation_state.get('session_id'),
+            "session_id": self.conversation_state.session_id,
             "total_duration": self._get_elapsed_time(),
-            "conversation_history": self.conversation_state['conversation_history'],
-            "user_context": self.conversation_state['user_context'],
-            "stages_completed": self.conversation_state['stage'].value,
+            "conversation_history": self.conversation_state.conversation_history,
+            "user_context": self.conversation_state.user_context,
+            "stages_completed": self._stage.value,
             "questions_asked": {
-                "part1": self.conversation_state.get('part1_questions_asked', 0),
-                "part3": self.conversation_state.get('part3_questions_asked', 0)
+                "part1": self.conversation_state.part1_questions_asked,
+                "part3": self.conversation_state.part3_questions_asked
             },
-            "evaluation_notes": self.conversation_state['evaluation_notes'],
-            "assessment_complete": self.conversation_state['stage'] == ConversationStage.CLOSING
+            "evaluation_notes": self.conversation_state.evaluation_notes,
+            "assessment_complete": self._stage == ConversationStage.CLOSING
         }
     
     def handle_identity_confirmation(self) -> Dict[str, Any]:
         """Handle identity confirmation stage"""
-        self.conversation_state["stage"] = ConversationStage.IDENTITY_CONFIRMATION
+        self._stage = ConversationStage.IDENTITY_CONFIRMATION
         
         message = self.get_stage_response(ConversationStage.IDENTITY_CONFIRMATION)
         
@@ -678,7 +748,7 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_part1_start(self) -> Dict[str, Any]:
         """Handle Part 1 introduction"""
-        self.conversation_state["stage"] = ConversationStage.PART1_INTRODUCTION
+        self._stage = ConversationStage.PART1_INTRODUCTION
         
         message = self.get_stage_response(ConversationStage.PART1_INTRODUCTION)
         
@@ -692,10 +762,10 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_part1_questions(self) -> Dict[str, Any]:
         """Handle Part 1 questions"""
-        self.conversation_state["stage"] = ConversationStage.PART1_QUESTIONS
+        self._stage = ConversationStage.PART1_QUESTIONS
         
         # Get first Part 1 question
-        part1_questions = self.conversation_state["questions"].get("speaking_part1", [])
+        part1_questions = self.conversation_state.questions.get("speaking_part1", [])
         
         if not part1_questions:
             # Fallback question
@@ -703,7 +773,7 @@ Respond as Maya would, naturally and professionally."""
         else:
             question_text = part1_questions[0].get("content", {}).get("text", "Tell me about yourself.")
         
-        self.conversation_state["part1_questions_asked"] = 1
+        self.conversation_state.part1_questions_asked = 1
         
         return {
             "success": True,
@@ -715,8 +785,8 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_part1_progression(self, user_input: str) -> Dict[str, Any]:
         """Handle progression through Part 1 questions"""
-        questions_asked = self.conversation_state["part1_questions_asked"]
-        part1_questions = self.conversation_state["questions"].get("speaking_part1", [])
+        questions_asked = self.conversation_state.part1_questions_asked
+        part1_questions = self.conversation_state.questions.get("speaking_part1", [])
         
         # Natural encouragement
         encouragement = random.choice(self.encouragement_phrases)
@@ -727,7 +797,7 @@ Respond as Maya would, naturally and professionally."""
             next_question = part1_questions[questions_asked]
             question_text = next_question.get("content", {}).get("text", "Tell me more about that.")
             
-            self.conversation_state["part1_questions_asked"] += 1
+            self.conversation_state.part1_questions_asked += 1
             
             # Natural transition
             transition = random.choice(self.transition_phrases)
@@ -746,10 +816,10 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_part2_briefing(self) -> Dict[str, Any]:
         """Handle Part 2 briefing and topic card presentation"""
-        self.conversation_state["stage"] = ConversationStage.PART2_BRIEFING
+        self._stage = ConversationStage.PART2_BRIEFING
         
         # Get Part 2 topic
-        part2_questions = self.conversation_state["questions"].get("speaking_part2", [])
+        part2_questions = self.conversation_state.questions.get("speaking_part2", [])
         if part2_questions:
             topic_card = part2_questions[0].get("content", {}).get("text", "Describe something important to you.")
         else:
@@ -770,7 +840,7 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_part2_preparation(self) -> Dict[str, Any]:
         """Handle Part 2 preparation time"""
-        self.conversation_state["stage"] = ConversationStage.PART2_PREPARATION
+        self._stage = ConversationStage.PART2_PREPARATION
         
         return {
             "success": True,
@@ -783,7 +853,7 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_part2_speaking(self) -> Dict[str, Any]:
         """Handle Part 2 speaking phase"""
-        self.conversation_state["stage"] = ConversationStage.PART2_SPEAKING
+        self._stage = ConversationStage.PART2_SPEAKING
         
         # Generate follow-up questions
         follow_up_questions = [
@@ -804,7 +874,7 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_part2_completion(self, user_input: str) -> Dict[str, Any]:
         """Handle Part 2 completion"""
-        self.conversation_state["stage"] = ConversationStage.PART2_FOLLOWUP
+        self._stage = ConversationStage.PART2_FOLLOWUP
         
         return {
             "success": True,
@@ -815,7 +885,7 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_part3_start(self) -> Dict[str, Any]:
         """Handle Part 3 introduction"""
-        self.conversation_state["stage"] = ConversationStage.PART3_INTRODUCTION
+        self._stage = ConversationStage.PART3_INTRODUCTION
         
         message = self.get_stage_response(ConversationStage.PART3_INTRODUCTION)
         
@@ -829,17 +899,17 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_part3_questions(self) -> Dict[str, Any]:
         """Handle Part 3 questions"""
-        self.conversation_state["stage"] = ConversationStage.PART3_DISCUSSION
+        self._stage = ConversationStage.PART3_DISCUSSION
         
         # Get first Part 3 question
-        part3_questions = self.conversation_state["questions"].get("speaking_part3", [])
+        part3_questions = self.conversation_state.questions.get("speaking_part3", [])
         
         if part3_questions:
             question_text = part3_questions[0].get("content", {}).get("text", "What are your thoughts on this topic in general?")
         else:
             question_text = "What do you think about the role this plays in modern society?"
         
-        self.conversation_state["part3_questions_asked"] = 1
+        self.conversation_state.part3_questions_asked = 1
         
         return {
             "success": True,
@@ -851,8 +921,8 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_part3_progression(self, user_input: str) -> Dict[str, Any]:
         """Handle progression through Part 3 discussion"""
-        questions_asked = self.conversation_state["part3_questions_asked"]
-        part3_questions = self.conversation_state["questions"].get("speaking_part3", [])
+        questions_asked = self.conversation_state.part3_questions_asked
+        part3_questions = self.conversation_state.questions.get("speaking_part3", [])
         
         # Natural encouragement
         encouragement = random.choice(self.encouragement_phrases)
@@ -863,7 +933,7 @@ Respond as Maya would, naturally and professionally."""
             next_question = part3_questions[questions_asked]
             question_text = next_question.get("content", {}).get("text", "What's your opinion on this?")
             
-            self.conversation_state["part3_questions_asked"] += 1
+            self.conversation_state.part3_questions_asked += 1
             
             # Natural transition for abstract discussion
             transitions = [
@@ -888,7 +958,7 @@ Respond as Maya would, naturally and professionally."""
     
     def handle_closing(self) -> Dict[str, Any]:
         """Handle assessment closing"""
-        self.conversation_state["stage"] = ConversationStage.CLOSING
+        self._stage = ConversationStage.CLOSING
         
         message = self.get_stage_response(ConversationStage.CLOSING)
         
@@ -916,7 +986,8 @@ Respond as Maya would, naturally and professionally."""
             })
             return evaluation_notes
         
-        word_count = len(user_input.split())
+        features = extract_text_features(user_input)
+        word_count = features.word_count
         
         # Fluency and Coherence evaluation
         if audio_duration > 0:
@@ -935,8 +1006,7 @@ Respond as Maya would, naturally and professionally."""
                 })
         
         # Lexical Resource evaluation
-        unique_words = set(user_input.lower().split())
-        lexical_variety = len(unique_words) / word_count if word_count > 0 else 0
+        lexical_variety = features.type_token_ratio
         
         if lexical_variety > 0.8:
             evaluation_notes.append({
@@ -975,23 +1045,27 @@ Respond as Maya would, naturally and professionally."""
         
         return evaluation_notes
     
-    def get_conversation_summary(self) -> Dict[str, Any]:
+    def get_conversation_summary(self, session_id: Optional[str] = None) -> Dict[str, Any]:
         """Get complete conversation summary for evaluation"""
+        if session_id is not None:
+            with self._bind(self._load_state(session_id)):
+                return self.get_conversation_summary()
+        
         return {
-            "session_id": self.conversation_state.get("session_id"),
-            "assessment_type": self.conversation_state.get("assessment_type"),
+            "session_id": self.conversation_state.session_id,
+            "assessment_type": self.conversation_state.assessment_type,
             "conversation_flow": {
-                "total_responses": len(self.conversation_state["user_responses"]),
-                "part1_responses": len([r for r in self.conversation_state["user_responses"] if "part1" in r["stage"]]),
-                "part2_responses": len([r for r in self.conversation_state["user_responses"] if "part2" in r["stage"]]),
-                "part3_responses": len([r for r in self.conversation_state["user_responses"] if "part3" in r["stage"]]),
+                "total_responses": len(self.conversation_state.user_responses),
+                "part1_responses": len([r for r in self.conversation_state.user_responses if "part1" in r["stage"]]),
+                "part2_responses": len([r for r in self.conversation_state.user_responses if "part2" in r["stage"]]),
+                "part3_responses": len([r for r in self.conversation_state.user_responses if "part3" in r["stage"]]),
             },
-            "user_responses": self.conversation_state["user_responses"],
-            "evaluation_notes": self.conversation_state["evaluation_notes"],
-            "completion_status": self.conversation_state["stage"] == ConversationStage.CLOSING
+            "user_responses": self.conversation_state.user_responses,
+            "evaluation_notes": self.conversation_state.evaluation_notes,
+            "completion_status": self._stage == ConversationStage.CLOSING
         }
 
-# Global instance
+# Global instance (stateless - safe to share across concurrent sessions)
 _maya_engine = None
 
 def get_maya_engine() -> MayaConversationEngine:
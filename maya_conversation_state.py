@@ -0,0 +1,270 @@
+"""
+Maya Conversation State
+Compact, versioned per-session conversation state and pluggable stores so Maya turns
+can run concurrently in one container and land on any container
+"""
+
+import json
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from typing import Dict, Any, List, Optional
+
+try:
+    import msgpack
+except ImportError:  # JSON is used when msgpack is not packaged
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when ConversationState fields change incompatibly
+STATE_SCHEMA_VERSION = 1
+
+# Conversation state expires with the assessment session (2 hours)
+STATE_TTL_SECONDS = 2 * 60 * 60
+
+_CODEC_MSGPACK = b'M'
+_CODEC_JSON = b'J'
+
+
+class ConversationStateConflict(Exception):
+    """Raised when a save loses an optimistic concurrency race"""
+
+
+@dataclass(slots=True)
+class ConversationState:
+    """Serializable state of one Maya conversation"""
+    session_id: str
+    assessment_type: Optional[str] = None
+    stage: str = "initial_greeting"
+    questions: Dict[str, Any] = field(default_factory=dict)
+    part1_questions_asked: int = 0
+    part2_prep_time: int = 0
+    part2_speaking_time: int = 0
+    part3_questions_asked: int = 0
+    total_time: int = 0
+    started_at: Optional[str] = None
+    start_time: Optional[float] = None
+    stage_start_time: Optional[float] = None
+    user_responses: List[Dict[str, Any]] = field(default_factory=list)
+    conversation_history: List[Dict[str, Any]] = field(default_factory=list)
+    # Running token estimate of conversation_history, plus the summary of evicted exchanges
+    history_tokens: int = 0
+    history_summary: List[str] = field(default_factory=list)
+    summary_tokens: int = 0
+    summarized_exchanges: int = 0
+    user_context: Dict[str, Any] = field(default_factory=dict)
+    current_topics: List[str] = field(default_factory=list)
+    evaluation_notes: List[Dict[str, Any]] = field(default_factory=list)
+    streaming_session_id: Optional[str] = None
+    schema_version: int = STATE_SCHEMA_VERSION
+    # Incremented on every successful save; used for optimistic concurrency
+    revision: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ConversationState':
+        version = data.get('schema_version', STATE_SCHEMA_VERSION)
+        if version > STATE_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported conversation state version: {version}")
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    def to_bytes(self) -> bytes:
+        """Serialize with msgpack when available, JSON otherwise (1-byte codec prefix)"""
+        if msgpack is not None:
+            return _CODEC_MSGPACK + msgpack.packb(self.to_dict(), use_bin_type=True)
+        return _CODEC_JSON + json.dumps(self.to_dict(), separators=(',', ':')).encode('utf-8')
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> 'ConversationState':
+        codec, body = payload[:1], payload[1:]
+        if codec == _CODEC_MSGPACK:
+            if msgpack is None:
+                raise ValueError("msgpack-encoded conversation state but msgpack is not installed")
+            return cls.from_dict(msgpack.unpackb(body, raw=False))
+        return cls.from_dict(json.loads(body.decode('utf-8')))
+
+
+class ConversationStateStore:
+    """Base class for conversation state stores"""
+
+    def load(self, session_id: str) -> Optional[ConversationState]:
+        raise NotImplementedError
+
+    def save(self, state: ConversationState) -> ConversationState:
+        """
+        Save state if nobody else saved since it was loaded
+
+        Raises:
+            ConversationStateConflict: if the stored revision moved on
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+
+class InMemoryConversationStore(ConversationStateStore):
+    """Bounded LRU store for tests and single-container development"""
+
+    def __init__(self, max_sessions: int = 1024):
+        self.max_sessions = max_sessions
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[ConversationState]:
+        with self._lock:
+            payload = self._items.get(session_id)
+            if payload is None:
+                return None
+            self._items.move_to_end(session_id)
+        return ConversationState.from_bytes(payload)
+
+    def save(self, state: ConversationState) -> ConversationState:
+        with self._lock:
+            current = self._items.get(state.session_id)
+            current_revision = ConversationState.from_bytes(current).revision if current else 0
+            if current_revision != state.revision:
+                raise ConversationStateConflict(
+                    f"Session {state.session_id} is at revision {current_revision}, expected {state.revision}"
+                )
+            state.revision += 1
+            self._items[state.session_id] = state.to_bytes()
+            self._items.move_to_end(state.session_id)
+            while len(self._items) > self.max_sessions:
+                self._items.popitem(last=False)
+        return state
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._items.pop(session_id, None)
+
+
+class DynamoDBConversationStore(ConversationStateStore):
+    """DynamoDB store using a conditional put on the revision attribute"""
+
+    def __init__(self, table=None):
+        if table is None:
+            from dynamodb_dal import get_dal
+            stage = os.environ.get('STAGE', 'prod')
+            table_name = os.environ.get('DYNAMODB_MAYA_STATE_TABLE', f'ielts-maya-conversation-state-{stage}')
+            table = get_dal().connection.dynamodb.Table(table_name)
+        self.table = table
+
+    def load(self, session_id: str) -> Optional[ConversationState]:
+        response = self.table.get_item(Key={'session_id': session_id}, ConsistentRead=True)
+        item = response.get('Item')
+        if not item:
+            return None
+        state = ConversationState.from_bytes(bytes(item['state']))
+        state.revision = int(item['revision'])
+        return state
+
+    def save(self, state: ConversationState) -> ConversationState:
+        from botocore.exceptions import ClientError
+
+        expected_revision = state.revision
+        state.revision = expected_revision + 1
+        try:
+            if expected_revision == 0:
+                condition = {'ConditionExpression': 'attribute_not_exists(session_id)'}
+            else:
+                condition = {
+                    'ConditionExpression': '#revision = :expected',
+                    'ExpressionAttributeNames': {'#revision': 'revision'},
+                    'ExpressionAttributeValues': {':expected': expected_revision}
+                }
+            self.table.put_item(
+                Item={
+                    'session_id': state.session_id,
+                    'revision': state.revision,
+                    'state': state.to_bytes(),
+                    'ttl': int(time.time()) + STATE_TTL_SECONDS
+                },
+                **condition
+            )
+        except ClientError as e:
+            state.revision = expected_revision
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise ConversationStateConflict(f"Session {state.session_id} was updated concurrently")
+            raise
+        return state
+
+    def delete(self, session_id: str):
+        self.table.delete_item(Key={'session_id': session_id})
+
+
+class RedisConversationStore(ConversationStateStore):
+    """Redis store using WATCH/MULTI on a per-session hash"""
+
+    def __init__(self, client=None, key_prefix: str = 'maya:state:'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    def load(self, session_id: str) -> Optional[ConversationState]:
+        item = self.client.hgetall(self._key(session_id))
+        if not item:
+            return None
+        state = ConversationState.from_bytes(item[b'state'])
+        state.revision = int(item[b'revision'])
+        return state
+
+    def save(self, state: ConversationState) -> ConversationState:
+        import redis
+
+        key = self._key(state.session_id)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = pipe.hget(key, 'revision')
+                current_revision = int(current) if current is not None else 0
+                if current_revision != state.revision:
+                    raise ConversationStateConflict(
+                        f"Session {state.session_id} is at revision {current_revision}, expected {state.revision}"
+                    )
+                pipe.multi()
+                pipe.hset(key, mapping={'revision': state.revision + 1, 'state': state.to_bytes()})
+                pipe.expire(key, STATE_TTL_SECONDS)
+                pipe.execute()
+            except redis.WatchError:
+                raise ConversationStateConflict(f"Session {state.session_id} was updated concurrently")
+        state.revision += 1
+        return state
+
+    def delete(self, session_id: str):
+        self.client.delete(self._key(session_id))
+
+
+# Global store instance
+_conversation_store = None
+
+def get_conversation_store() -> ConversationStateStore:
+    """Get the configured store (MAYA_STATE_STORE = memory | dynamodb | redis)"""
+    global _conversation_store
+    if _conversation_store is None:
+        backend = os.environ.get('MAYA_STATE_STORE', 'memory').lower()
+        if backend == 'dynamodb':
+            _conversation_store = DynamoDBConversationStore()
+        elif backend == 'redis':
+            _conversation_store = RedisConversationStore()
+        else:
+            _conversation_store = InMemoryConversationStore()
+        logger.info(f"Maya conversation state store: {backend}")
+    return _conversation_store
+
+def set_conversation_store(store: ConversationStateStore):
+    """Override the global store (tests, custom backends)"""
+    global _conversation_store
+    _conversation_store = store
@@ -0,0 +1,192 @@
+"""
+Maya Prompt Window
+Bounded conversation history with running token estimates; Maya prompts are assembled under a
+token budget from a static prefix, a summary of evicted turns and the most recent exchanges
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from maya_conversation_state import ConversationState
+
+# Token budget for one Maya conversation prompt
+MAYA_PROMPT_TOKEN_BUDGET = int(os.environ.get('MAYA_PROMPT_TOKEN_BUDGET', '1200'))
+
+# Exchanges kept verbatim in the state; older ones are folded into the summary
+MAX_HISTORY_EXCHANGES = 20
+
+# Upper bound on the summary of evicted exchanges
+SUMMARY_TOKEN_BUDGET = 200
+SUMMARY_WORDS_PER_SIDE = 12
+
+# Rough English average for Nova tokenizers
+CHARS_PER_TOKEN = 4
+
+# Sessions whose assembled history prefix is kept for reuse on the next turn
+MAX_CACHED_PREFIXES = 512
+
+# Static instructions; identical for every turn and session so it leads the prompt
+MAYA_PROMPT_PREFIX = """You are Maya, an experienced IELTS examiner.
+
+Generate a natural, contextual response that:
+1. Acknowledges what the user said specifically
+2. Shows genuine interest in their response
+3. Follows IELTS examination standards
+4. Manages time appropriately
+5. Asks relevant follow-up questions when needed
+
+Respond as Maya would, naturally and professionally."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer round trip)"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _clip(text: str, words: int) -> str:
+    parts = text.split()
+    return ' '.join(parts[:words]) + (' ...' if len(parts) > words else '')
+
+
+def _render_exchange(exchange: Dict[str, Any]) -> str:
+    return f"Candidate: {exchange.get('user', '')}\nMaya: {exchange.get('maya', '')}\n"
+
+
+def _summarize_exchange(exchange: Dict[str, Any]) -> str:
+    stage = exchange.get('stage') or 'conversation'
+    return (f"- [{stage}] Candidate: {_clip(exchange.get('user', ''), SUMMARY_WORDS_PER_SIDE)} / "
+            f"Maya: {_clip(exchange.get('maya', ''), SUMMARY_WORDS_PER_SIDE)}")
+
+
+def append_exchange(state: ConversationState, user_input: str, maya_response: str,
+                    stage: Optional[str] = None):
+    """
+    Record an exchange, evicting (and summarizing once) the oldest beyond MAX_HISTORY_EXCHANGES
+    """
+    exchange = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "stage": stage,
+        "user": user_input,
+        "maya": maya_response
+    }
+    exchange["tokens"] = estimate_tokens(_render_exchange(exchange))
+    state.conversation_history.append(exchange)
+    state.history_tokens += exchange["tokens"]
+
+    overflow = len(state.conversation_history) - MAX_HISTORY_EXCHANGES
+    if overflow > 0:
+        evicted = state.conversation_history[:overflow]
+        del state.conversation_history[:overflow]
+        for old in evicted:
+            state.history_tokens -= old.get("tokens", 0)
+            line = _summarize_exchange(old)
+            state.history_summary.append(line)
+            state.summary_tokens += estimate_tokens(line) + 1
+        state.summarized_exchanges += overflow
+        # The summary itself is bounded; its oldest lines go first
+        while state.summary_tokens > SUMMARY_TOKEN_BUDGET and state.history_summary:
+            state.summary_tokens -= estimate_tokens(state.history_summary.pop(0)) + 1
+
+
+def select_recent(state: ConversationState, token_budget: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """Most recent exchanges fitting the budget, as (absolute index of the first, exchanges)"""
+    history = state.conversation_history
+    used = 0
+    start = len(history)
+    while start > 0:
+        tokens = history[start - 1].get("tokens") or estimate_tokens(_render_exchange(history[start - 1]))
+        if used + tokens > token_budget:
+            break
+        used += tokens
+        start -= 1
+    return state.summarized_exchanges + start, history[start:]
+
+
+class MayaPromptAssembler:
+    """
+    Assembles Maya prompts, reusing each session's history prefix between turns
+
+    The prompt is ordered static instructions, summary, exchanges (oldest first), then the
+    per-turn situation, so consecutive turns share everything up to the newest exchange.
+    """
+
+    def __init__(self, token_budget: int = MAYA_PROMPT_TOKEN_BUDGET, max_sessions: int = MAX_CACHED_PREFIXES):
+        self.token_budget = token_budget
+        self.max_sessions = max_sessions
+        self._prefix_tokens = estimate_tokens(MAYA_PROMPT_PREFIX)
+        # session_id -> (summarized_exchanges, first index, end index, last exchange timestamp, prefix)
+        self._prefixes: "OrderedDict[str, Tuple[int, int, int, Optional[str], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _history_prefix(self, state: ConversationState, start: int, exchanges: List[Dict[str, Any]]) -> str:
+        end = start + len(exchanges)
+        with self._lock:
+            cached = self._prefixes.get(state.session_id)
+
+        reusable = (
+            cached is not None
+            and cached[0] == state.summarized_exchanges
+            and cached[1] == start < cached[2] <= end
+            # Guards against a prefix built by a turn whose save later lost a conflict
+            and exchanges[cached[2] - start - 1].get('timestamp') == cached[3]
+        )
+        if reusable:
+            # Same summary and window start: only render the exchanges added since
+            prefix = cached[4] + ''.join(_render_exchange(e) for e in exchanges[cached[2] - start:])
+        else:
+            sections = [MAYA_PROMPT_PREFIX, ""]
+            if state.history_summary:
+                sections.append("**Earlier in the assessment**:\n" + "\n".join(state.history_summary) + "\n")
+            sections.append("**Recent conversation**:\n" if exchanges else "**Recent conversation**: Beginning of assessment\n")
+            prefix = "\n".join(sections) + ''.join(_render_exchange(e) for e in exchanges)
+
+        with self._lock:
+            last_timestamp = exchanges[-1].get('timestamp') if exchanges else None
+            self._prefixes[state.session_id] = (state.summarized_exchanges, start, end, last_timestamp, prefix)
+            self._prefixes.move_to_end(state.session_id)
+            while len(self._prefixes) > self.max_sessions:
+                self._prefixes.popitem(last=False)
+        return prefix
+
+    @staticmethod
+    def render_turn(context: Dict[str, Any]) -> str:
+        return f"""
+**Stage**: {context['current_stage']}
+**User just said**: "{context['user_input']}"
+**Time remaining**: {context['time_remaining']}s
+**What you know about the user**: {context['user_context']}"""
+
+    def build_context_window(self, state: ConversationState, context: Dict[str, Any]) -> Tuple[int, List[Dict[str, Any]]]:
+        """Exchanges to include given the tokens already needed for the prefix, summary and this turn"""
+        reserved = self._prefix_tokens + state.summary_tokens + estimate_tokens(self.render_turn(context))
+        return select_recent(state, max(0, self.token_budget - reserved))
+
+    def build_prompt(self, state: ConversationState, context: Dict[str, Any]) -> str:
+        """
+        Assemble the Maya prompt for a turn
+
+        Uses the window chosen in the context ('history_start' / 'conversation_history') when present.
+        """
+        if 'history_start' in context:
+            start, exchanges = context['history_start'], context['conversation_history']
+        else:
+            start, exchanges = self.build_context_window(state, context)
+        return self._history_prefix(state, start, exchanges) + self.render_turn(context)
+
+    def forget(self, session_id: str):
+        with self._lock:
+            self._prefixes.pop(session_id, None)
+
+
+# Global assembler instance
+_prompt_assembler = None
+
+def get_maya_prompt_assembler() -> MayaPromptAssembler:
+    """Get the global Maya prompt assembler"""
+    global _prompt_assembler
+    if _prompt_assembler is None:
+        _prompt_assembler = MayaPromptAssembler()
+    return _prompt_assembler
@@ -49,17 +49,19 @@ def populate_questions():
         }
         
         questions_count = 0
-        for assessment_type, questions in question_sets.items():
-            for question in questions:
-                item = {
-                    'assessment_type': assessment_type,
-                    'question_id': question['id'],
-                    'question_data': question,
-                    'created_at': '2025-07-08T11:10:00Z',
-                    'active': True
-                }
-                table.put_item(Item=item)
-                questions_count += 1
+        # batch_writer groups puts into BatchWriteItem calls and resends unprocessed items
+        with table.batch_writer() as batch:
+            for assessment_type, questions in question_sets.items():
+                for question in questions:
+                    item = {
+                        'assessment_type': assessment_type,
+                        'question_id': question['id'],
+                        'question_data': question,
+                        'created_at': '2025-07-08T11:10:00Z',
+                        'active': True
+                    }
+                    batch.put_item(Item=item)
+                    questions_count += 1
         
         print(f"✅ Populated {questions_count} questions in DynamoDB")
         return True
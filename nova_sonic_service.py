@@ -9,12 +9,83 @@ import base64
 import asyncio
 import logging
 import os
-from typing import Dict, Any, Optional, AsyncGenerator, Callable
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, AsyncGenerator, Awaitable, Callable, TypeVar
 from datetime import datetime
 import uuid
 
+try:
+    # Bidirectional streaming is only exposed by the experimental Smithy-based Bedrock SDK
+    from aws_sdk_bedrock_runtime.client import (
+        BedrockRuntimeClient, InvokeModelWithBidirectionalStreamOperationInput
+    )
+    from aws_sdk_bedrock_runtime.config import Config, HTTPAuthSchemeResolver, SigV4AuthScheme
+    from aws_sdk_bedrock_runtime.models import (
+        BidirectionalInputPayloadPart, InvokeModelWithBidirectionalStreamInputChunk
+    )
+    from smithy_aws_core.credentials_resolvers.environment import EnvironmentCredentialsResolver
+    BIDIRECTIONAL_STREAMING_AVAILABLE = True
+except ImportError:
+    BIDIRECTIONAL_STREAMING_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# Upper bound on how long a synchronous caller waits for a coroutine on the worker loop
+DEFAULT_RUN_TIMEOUT_SECONDS = 60.0
+
+# Streaming sessions kept per worker process, and how long an unused one is kept before its stream is closed
+MAX_STREAMING_SESSIONS = int(os.environ.get('NOVA_SONIC_MAX_STREAMING_SESSIONS', '64'))
+STREAM_IDLE_TTL_SECONDS = float(os.environ.get('NOVA_SONIC_STREAM_IDLE_TTL_SECONDS', '300'))
+
+
+class WorkerEventLoop:
+    """
+    Long-lived asyncio loop running on a daemon thread, one per worker process
+
+    Synchronous handlers submit coroutines here instead of creating a loop per call,
+    so Bedrock streams opened in one request stay usable from later turns.
+    """
+    
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # A forked worker inherits the object but not the loop thread
+            if self._loop is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='nova-sonic-loop', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+            return self._loop
+    
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = DEFAULT_RUN_TIMEOUT_SECONDS) -> T:
+        """Run a coroutine on the worker loop and block until it finishes"""
+        loop = self.loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError("WorkerEventLoop.run() called from the worker loop - await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+# Global worker loop shared by all Maya handlers in this process
+worker_loop = WorkerEventLoop()
+
+def run_async(coro: Awaitable[T], timeout: Optional[float] = DEFAULT_RUN_TIMEOUT_SECONDS) -> T:
+    """Run a coroutine on the process-wide worker loop from synchronous code"""
+    return worker_loop.run(coro, timeout)
+
 class NovaSonicService:
     """Service for Nova Sonic speech-to-speech conversations using bidirectional streaming"""
     
@@ -22,6 +93,7 @@ class NovaSonicService:
         self.region = region or os.environ.get('BEDROCK_REGION', 'us-east-1')
         self.model_id = "amazon.nova-sonic-v1:0"
         self.client = None
+        self._stream_client = None
         self._initialize_client()
     
     def _initialize_client(self):
@@ -33,6 +105,49 @@ class NovaSonicService:
             logger.error(f"Failed to initialize Nova Sonic client: {e}")
             raise
     
+    def _get_stream_client(self):
+        """Lazily create the async bidirectional-stream client (shared by all sessions)"""
+        if self._stream_client is None:
+            config = Config(
+                endpoint_uri=f"https://bedrock-runtime.{self.region}.amazonaws.com",
+                region=self.region,
+                aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
+                http_auth_scheme_resolver=HTTPAuthSchemeResolver(),
+                http_auth_schemes={"aws.auth.sigv4": SigV4AuthScheme()}
+            )
+            self._stream_client = BedrockRuntimeClient(config=config)
+        return self._stream_client
+    
+    async def send_event(self, stream, event: Dict[str, Any]):
+        """Send one JSON event on an open bidirectional stream"""
+        chunk = InvokeModelWithBidirectionalStreamInputChunk(
+            value=BidirectionalInputPayloadPart(bytes_=json.dumps(event).encode('utf-8'))
+        )
+        await stream.input_stream.send(chunk)
+    
+    async def _open_bidirectional_stream(self, session_id: str, config: Dict[str, Any], system_prompt: str):
+        """Open a Nova Sonic bidirectional stream and send the session setup events"""
+        client = self._get_stream_client()
+        stream = await client.invoke_model_with_bidirectional_stream(
+            InvokeModelWithBidirectionalStreamOperationInput(model_id=self.model_id)
+        )
+        async for event in self._create_input_event_stream(session_id, config, system_prompt):
+            await self.send_event(stream, event)
+        return stream
+    
+    async def open_conversation_stream(self, session: Dict[str, Any]):
+        """Open the bidirectional stream for a session returned by start_maya_conversation"""
+        if not BIDIRECTIONAL_STREAMING_AVAILABLE:
+            raise RuntimeError("aws_sdk_bedrock_runtime is not installed")
+        return await self._open_bidirectional_stream(session['session_id'], session['config'], session['system_prompt'])
+    
+    async def close_stream(self, stream):
+        """End the Nova Sonic session and close the stream's input side"""
+        try:
+            await self.send_event(stream, {"event": {"sessionEnd": {}}})
+        finally:
+            await stream.input_stream.close()
+    
     def get_session_config(self, 
                           voice_id: str = "matthew",
                           max_tokens: int = 1024,
@@ -126,7 +241,7 @@ class NovaSonicService:
             on_audio_response: Callback for audio responses
         
         Returns:
-            Conversation session information
+            Conversation session information; pass it to open_conversation_stream to open the stream
         """
         try:
             # Create conversation session
@@ -136,35 +251,28 @@ class NovaSonicService:
             # Get session configuration
             config = self.get_session_config(voice_id=voice_id)
             
-            # Initialize bidirectional stream
-            logger.info(f"Starting Nova Sonic bidirectional stream: {session_id}")
+            session = {
+                "session_id": session_id,
+                "prompt_name": prompt_name,
+                "config": config,
+                "voice_id": voice_id,
+                "system_prompt": system_prompt
+            }
             
-            # Attempt real bidirectional streaming with Nova Sonic
-            try:
-                # Create input event stream for Nova Sonic
-                input_events = self._create_input_event_stream(session_id, config, system_prompt)
-                
-                # Attempt Nova Sonic streaming with proper event-stream protocol
-                # Note: Nova Sonic requires bidirectional streaming protocol
-                # For now, mark streaming as attempted but not fully implemented
-                logger.info("Nova Sonic streaming requires complex event-stream protocol - not yet fully implemented")
-                raise Exception("Nova Sonic bidirectional streaming requires specialized implementation")
-                
-            except Exception as bedrock_error:
-                logger.warning(f"Bedrock streaming failed: {bedrock_error}")
-                # Return fallback session for development
+            # The bidirectional stream is opened by open_conversation_stream when a consumer reads it;
+            # an unread stream would only hold a Bedrock connection open
+            if not BIDIRECTIONAL_STREAMING_AVAILABLE:
+                logger.warning("Nova Sonic streaming not available: aws_sdk_bedrock_runtime is not installed")
                 return {
-                    "success": False,  # Be honest about streaming failure
-                    "session_id": session_id,
-                    "prompt_name": prompt_name,
-                    "config": config,
-                    "voice_id": voice_id,
-                    "system_prompt": system_prompt,
+                    **session,
+                    "success": False,  # Be honest about streaming being unavailable
                     "status": "fallback",
-                    "error": "Nova Sonic streaming not available",
-                    "bedrock_error": str(bedrock_error)
+                    "error": "Nova Sonic streaming not available"
                 }
             
+            logger.info(f"Nova Sonic streaming session prepared: {session_id}")
+            return {**session, "success": True, "status": "ready"}
+            
         except Exception as e:
             logger.error(f"Failed to start Maya conversation: {e}")
             return {
@@ -179,7 +287,8 @@ class NovaSonicService:
                              session_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Synthesize Maya's speech using Nova Sonic
-        This is a simplified implementation for development/testing
+        
+        Audio is produced by direct synthesis, so no bidirectional stream is opened for it.
         
         Args:
             text: Text to synthesize
@@ -189,12 +298,7 @@ class NovaSonicService:
             Audio synthesis result
         """
         try:
-            # Check if we have a streaming session context
-            if session_context and session_context.get('stream'):
-                return self._synthesize_with_stream(text, voice_id, session_context)
-            else:
-                # Use direct synthesis or fallback to supported TTS service
-                return self._synthesize_direct(text, voice_id)
+            return self._synthesize_direct(text, voice_id)
             
         except Exception as e:
             logger.error(f"Speech synthesis failed: {e}")
@@ -204,6 +308,18 @@ class NovaSonicService:
                 "text": text
             }
     
+    async def synthesize_maya_speech_async(self,
+                                           text: str,
+                                           voice_id: str = "matthew",
+                                           session_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Async variant of synthesize_maya_speech
+        
+        The blocking boto3 invoke_model call runs in the loop's default executor
+        so other turns and evaluation keep running while audio is generated.
+        """
+        return await asyncio.to_thread(self.synthesize_maya_speech, text, voice_id, session_context)
+    
     def get_maya_ielts_system_prompt(self, assessment_type: str = "academic_speaking") -> str:
         """Get system prompt for Maya IELTS examiner"""
         if assessment_type == "academic_speaking":
@@ -256,33 +372,6 @@ Keep the conversation natural and focused on everyday topics."""
             
         return event_generator()
     
-    def _synthesize_with_stream(self, 
-                               text: str, 
-                               voice_id: str,
-                               session_context: Dict[str, Any]) -> Dict[str, Any]:
-        """Synthesize speech using active streaming session"""
-        try:
-            stream = session_context.get('stream')
-            if not stream:
-                return self._synthesize_direct(text, voice_id)
-            
-            # Process streaming response (simplified for development)
-            # In production, this would handle bidirectional stream events
-            return {
-                "success": True,
-                "audio_base64": base64.b64encode(f"stream_audio_{text}".encode()).decode(),
-                "text": text,
-                "voice_id": voice_id,
-                "format": "audio/lpcm",
-                "sample_rate": 24000,
-                "streaming": True,
-                "session_id": session_context.get('session_id')
-            }
-            
-        except Exception as e:
-            logger.error(f"Stream synthesis failed: {e}")
-            return self._synthesize_direct(text, voice_id)
-    
     def _synthesize_direct(self, text: str, voice_id: str) -> Dict[str, Any]:
         """Direct speech synthesis using Nova Sonic invoke_model with real Bedrock calls"""
         try:
@@ -344,6 +433,97 @@ Keep the conversation natural and focused on everyday topics."""
                 "text": text
             }
 
+class StreamingSessionRegistry:
+    """
+    Process-local streaming sessions, bounded by count and idle time
+
+    A session's stream is opened on first use by stream(). Sessions idle for longer than
+    idle_ttl, or least recently used beyond max_sessions, are dropped and their streams closed.
+    """
+    
+    def __init__(self, service: NovaSonicService, max_sessions: int = MAX_STREAMING_SESSIONS,
+                 idle_ttl: float = STREAM_IDLE_TTL_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.service = service
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def put(self, session_id: str, context: Dict[str, Any]):
+        """Register a session (replacing any previous one) and evict expired or surplus sessions"""
+        with self._lock:
+            evicted = [self._sessions.pop(session_id)] if session_id in self._sessions else []
+            self._sessions[session_id] = context
+            self._last_used[session_id] = self.clock()
+            evicted.extend(self._evict())
+        self._close_all(evicted)
+    
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Session context if it is still live, marking it as used"""
+        with self._lock:
+            evicted = self._evict()
+            context = self._sessions.get(session_id)
+            if context is not None:
+                self._sessions.move_to_end(session_id)
+                self._last_used[session_id] = self.clock()
+        self._close_all(evicted)
+        return context
+    
+    def pop(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a session without closing its stream (the caller owns it)"""
+        with self._lock:
+            self._last_used.pop(session_id, None)
+            return self._sessions.pop(session_id, None)
+    
+    async def stream(self, session_id: str):
+        """The session's bidirectional stream, opened on first use; None if the session is gone"""
+        context = self.get(session_id)
+        if context is None:
+            return None
+        if context.get('stream') is None:
+            stream = await self.service.open_conversation_stream(context)
+            with self._lock:
+                # The session may have been evicted, or its stream opened by another turn, meanwhile
+                live = self._sessions.get(session_id) is context
+                if live and context.get('stream') is None:
+                    context['stream'] = stream
+                    return stream
+            self._close_all([{'session_id': session_id, 'stream': stream}])
+            return context.get('stream') if live else None
+        return context['stream']
+    
+    def _evict(self):
+        """Drop idle and least recently used sessions (lock held); returns their contexts"""
+        evicted = []
+        now = self.clock()
+        for session_id in list(self._sessions):
+            if now - self._last_used[session_id] > self.idle_ttl or len(self._sessions) > self.max_sessions:
+                evicted.append(self._sessions.pop(session_id))
+                del self._last_used[session_id]
+            else:
+                break
+        return evicted
+    
+    def _close_all(self, contexts):
+        """Close evicted streams on the worker loop without waiting for Bedrock"""
+        for context in contexts:
+            stream = context.pop('stream', None)
+            if stream is None:
+                continue
+            logger.info(f"Closing idle Nova Sonic stream: {context.get('session_id')}")
+            future = asyncio.run_coroutine_threadsafe(self.service.close_stream(stream), worker_loop.loop)
+            future.add_done_callback(_log_close_failure)
+
+
+def _log_close_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f"Failed to close Nova Sonic stream: {future.exception()}")
+
 # Global Nova Sonic service instance
 nova_sonic_service = None
 
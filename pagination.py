@@ -0,0 +1,52 @@
+"""
+Paged Query Helpers
+Opaque cursors for DynamoDB-style LastEvaluatedKey pagination and the attribute projection
+used by the assessment history views
+"""
+
+import json
+import base64
+from typing import Any, Dict, Iterable, Optional
+
+# Default and maximum page size for assessment history queries
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+# Attributes the dashboard and profile history widgets render
+HISTORY_SUMMARY_FIELDS = ('assessment_id', 'assessment_type', 'overall_band', 'timestamp', 'completed')
+
+
+def encode_cursor(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Encode a LastEvaluatedKey as a URL-safe cursor (None when there are no more pages)"""
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, sort_keys=True, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode a cursor produced by encode_cursor; raises ValueError for a malformed cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {e}")
+    if not isinstance(key, dict):
+        raise ValueError("Invalid pagination cursor")
+    return key
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Page size within 1..MAX_PAGE_SIZE"""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def project(item: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Keep only the requested attributes (all of them when fields is None)"""
+    if fields is None:
+        return dict(item)
+    return {field: item[field] for field in fields if field in item}
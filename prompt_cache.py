@@ -0,0 +1,215 @@
+"""
+Nova Micro Prompt Template Cache
+Assembles the static rubric / band descriptor / guidance prefix of the evaluation prompts once
+per (assessment type, task, rubric version) and appends only the candidate text per request
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from assessment_criteria.context_loader import get_ielts_context_for_assessment
+
+logger = logging.getLogger(__name__)
+
+# How long a resolved rubric is trusted before it is looked up again
+RUBRIC_TTL_SECONDS = 300
+
+# Maximum number of assembled templates kept per container
+MAX_TEMPLATES = 64
+
+# Marks the end of the static system prefix for Bedrock prompt caching
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+
+NOVA_MICRO_INFERENCE_CONFIG = {"maxTokens": 1500, "temperature": 0.2}
+
+RubricLoader = Callable[[str], Optional[Dict[str, Any]]]
+
+
+@dataclass(frozen=True, slots=True)
+class PromptTemplate:
+    """Assembled evaluation prompt prefix (shared between requests - treat rubric as read-only)"""
+    assessment_type: str
+    task: Optional[int]
+    rubric_version: str
+    system_prefix: str
+    prefix_hash: str
+    rubric: Dict[str, Any]
+
+    def build_request(self, candidate_text: str, question: Optional[str] = None,
+                      inference_config: Optional[Dict[str, Any]] = None,
+                      instruction: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build a Nova Micro request body for one candidate response
+
+        The system prefix is byte-identical for every request using this template and is
+        followed by a cache point, so only the user message is new input per request.
+        A per-call instruction (e.g. a single criterion) goes in the user message for the same reason.
+        """
+        parts = []
+        if question:
+            parts.append(f"Question:\n{question}")
+        parts.append(f"Candidate response:\n{candidate_text}")
+        if instruction:
+            parts.append(instruction)
+        return {
+            "system": [{"text": self.system_prefix}, CACHE_POINT],
+            "messages": [{"role": "user", "content": [{"text": "\n\n".join(parts)}]}],
+            "inferenceConfig": dict(inference_config or NOVA_MICRO_INFERENCE_CONFIG)
+        }
+
+
+def rubric_version(rubric: Dict[str, Any]) -> str:
+    """Version label for a rubric: its rubric_id (if any) plus a content hash"""
+    content = {k: v for k, v in rubric.items() if not k.startswith('_')}
+    digest = hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    return f"{rubric.get('rubric_id', 'fallback')}:{digest[:12]}"
+
+
+def _skill(assessment_type: str) -> str:
+    return 'speaking' if 'speaking' in assessment_type else 'writing'
+
+
+def _format_band_descriptors(descriptors: Dict[Any, Dict[str, str]]) -> str:
+    lines = []
+    for band in sorted(descriptors, key=lambda b: int(b), reverse=True):
+        lines.append(f"Band {band}:")
+        for criterion, text in descriptors[band].items():
+            lines.append(f"- {criterion}: {text}")
+    return "\n".join(lines)
+
+
+def _rubric_instructions(rubric: Dict[str, Any], task: Optional[int]) -> str:
+    """Examiner instructions from either rubric shape (fallback or DynamoDB)"""
+    if rubric.get('nova_micro_prompt'):
+        return rubric['nova_micro_prompt'].strip()
+    prompts = rubric.get('nova_micro_prompts') or rubric.get('nova_sonic_prompts') or {}
+    lines = [prompts.get('system_prompt', 'You are an expert IELTS examiner.')]
+    if task and prompts.get(f'task_{task}_requirements'):
+        lines.append(f"Task {task} requirements: {prompts[f'task_{task}_requirements']}")
+    return "\n".join(lines)
+
+
+def assemble_system_prefix(assessment_type: str, task: Optional[int], rubric: Dict[str, Any]) -> str:
+    """Static part of the evaluation prompt: examiner instructions, guidance and band descriptors"""
+    sections = [_rubric_instructions(rubric, task)]
+
+    if _skill(assessment_type) == 'writing':
+        test_type = 'academic' if 'academic' in assessment_type else 'general'
+        context = get_ielts_context_for_assessment('writing', test_type, task or 2)
+        guidance = [context.get('assessment_guidance', '').strip()]
+    else:
+        parts = [task] if task else [1, 2, 3]
+        context = {}
+        guidance = []
+        for part in parts:
+            context = get_ielts_context_for_assessment('speaking', task_number=part)
+            guidance.append(context.get('guidance', '').strip())
+
+    sections.extend(text for text in guidance if text)
+    if context.get('band_descriptors'):
+        sections.append("Official band descriptors:\n" + _format_band_descriptors(context['band_descriptors']))
+    sections.append("Return band scores for each criterion and the overall band as JSON, "
+                    "with specific feedback for each criterion.")
+    return "\n\n".join(sections)
+
+
+class PromptTemplateCache:
+    """Per-container cache of rubrics (with TTL) and assembled prompt templates"""
+
+    def __init__(self, rubric_loader: RubricLoader, ttl_seconds: int = RUBRIC_TTL_SECONDS,
+                 max_templates: int = MAX_TEMPLATES):
+        self.rubric_loader = rubric_loader
+        self.ttl_seconds = ttl_seconds
+        self.max_templates = max_templates
+        self._rubrics: Dict[str, Tuple[float, Dict[str, Any], str]] = {}
+        self._templates: Dict[Tuple[str, Optional[int], str], PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _resolve_rubric(self, assessment_type: str, fallback: RubricLoader) -> Tuple[Dict[str, Any], str]:
+        now = time.time()
+        with self._lock:
+            cached = self._rubrics.get(assessment_type)
+        if cached and cached[0] > now:
+            return cached[1], cached[2]
+
+        rubric = self.rubric_loader(assessment_type)
+        if not rubric:
+            # Fallback rubric when DynamoDB has none for this type
+            rubric = fallback(assessment_type)
+        version = rubric_version(rubric)
+        with self._lock:
+            self._rubrics[assessment_type] = (now + self.ttl_seconds, rubric, version)
+        return rubric, version
+
+    def get_template(self, assessment_type: str, fallback: RubricLoader,
+                     task: Optional[int] = None) -> PromptTemplate:
+        """
+        Get the prompt template for an assessment, assembling it on first use
+
+        Args:
+            assessment_type: e.g. 'academic_speaking', 'academic-writing'
+            fallback: Builds the hardcoded rubric when none is stored
+            task: Writing task (1/2) or speaking part (1-3); None for the whole test
+
+        Returns:
+            PromptTemplate for the current rubric version
+        """
+        rubric, version = self._resolve_rubric(assessment_type, fallback)
+        key = (assessment_type, task, version)
+
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self.hits += 1
+                return template
+            self.misses += 1
+
+        prefix = assemble_system_prefix(assessment_type, task, rubric)
+        template = PromptTemplate(
+            assessment_type=assessment_type,
+            task=task,
+            rubric_version=version,
+            system_prefix=prefix,
+            prefix_hash=hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:16],
+            rubric=rubric
+        )
+        with self._lock:
+            # Templates for superseded rubric versions are dropped first
+            stale = [k for k in self._templates if k[0] == assessment_type and k[2] != version]
+            for stale_key in stale:
+                del self._templates[stale_key]
+            while len(self._templates) >= self.max_templates:
+                self._templates.pop(next(iter(self._templates)))
+            template = self._templates.setdefault(key, template)
+        logger.info(f"Assembled prompt template {assessment_type} task={task} "
+                    f"rubric={version} prefix={template.prefix_hash} ({len(prefix)} chars)")
+        return template
+
+    def clear(self):
+        with self._lock:
+            self._rubrics.clear()
+            self._templates.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'templates': len(self._templates), 'hits': self.hits, 'misses': self.misses}
+
+
+# Global cache instance
+_prompt_cache = None
+
+def get_prompt_cache(rubric_loader: Optional[RubricLoader] = None) -> PromptTemplateCache:
+    """Get the global prompt template cache (rubric_loader is required on first call)"""
+    global _prompt_cache
+    if _prompt_cache is None:
+        if rubric_loader is None:
+            raise ValueError("rubric_loader is required to initialise the prompt cache")
+        _prompt_cache = PromptTemplateCache(rubric_loader)
+    return _prompt_cache
@@ -0,0 +1,199 @@
+"""
+QR Code Rendering Service for IELTS GenAI Prep
+Renders compact SVG (or tuned PNG) QR images for the QR login flow as inline data URIs
+and pre-generates website login tokens in the background
+"""
+
+import io
+import json
+import time
+import uuid
+import base64
+import logging
+import threading
+import urllib.parse
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Optional
+
+import qrcode
+from qrcode.constants import ERROR_CORRECT_L, ERROR_CORRECT_M
+
+logger = logging.getLogger(__name__)
+
+# Quiet zone in modules, as required by the QR code specification
+QR_BORDER_MODULES = 4
+# PNG pixels per module; the login page displays the code at 180px
+QR_PNG_BOX_SIZE = 4
+# Pre-generated website tokens kept ready, and how long one stays usable before it is discarded
+QR_POOL_TARGET_SIZE = 32
+QR_POOL_MAX_AGE_SECONDS = 120
+
+
+@lru_cache(maxsize=64)
+def _svg_header(size: int) -> str:
+    """Static SVG prefix for a QR symbol of `size` modules including the border"""
+    return (
+        f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {size} {size}' "
+        f"shape-rendering='crispEdges'><rect width='{size}' height='{size}' fill='#fff'/>"
+        f"<path fill='#000' d='"
+    )
+
+
+_SVG_FOOTER = "'/></svg>"
+
+# Left unescaped in SVG data URIs; attributes are single-quoted so the URI fits in a src="..."
+_SVG_URI_SAFE = " '/=:"
+
+
+class QRRenderingService:
+    """Render QR images for login tokens"""
+
+    def _matrix(self, data: str, error_correction: int = ERROR_CORRECT_L):
+        qr = qrcode.QRCode(error_correction=error_correction, border=QR_BORDER_MODULES)
+        qr.add_data(data)
+        qr.make(fit=True)
+        return qr.get_matrix()
+
+    def render_svg(self, data: str) -> str:
+        """
+        Render a QR code as compact SVG
+
+        Dark modules are merged into horizontal runs and emitted as a single path,
+        which keeps a login token QR code to a couple of kilobytes.
+        """
+        matrix = self._matrix(data)
+        parts = []
+        for y, row in enumerate(matrix):
+            x = 0
+            width = len(row)
+            while x < width:
+                if row[x]:
+                    start = x
+                    while x < width and row[x]:
+                        x += 1
+                    run = x - start
+                    parts.append(f"M{start} {y}h{run}v1h-{run}z")
+                else:
+                    x += 1
+        return _svg_header(len(matrix)) + "".join(parts) + _SVG_FOOTER
+
+    def render_png(self, data: str, box_size: int = QR_PNG_BOX_SIZE,
+                   error_correction: int = ERROR_CORRECT_M) -> bytes:
+        """Render a QR code as PNG with a small box size and border"""
+        qr = qrcode.QRCode(error_correction=error_correction, box_size=box_size, border=QR_BORDER_MODULES)
+        qr.add_data(data)
+        qr.make(fit=True)
+        buffer = io.BytesIO()
+        qr.make_image().save(buffer, format='PNG')
+        return buffer.getvalue()
+
+    def render_png_base64(self, data: str) -> str:
+        """Render a PNG QR code and return it base64 encoded"""
+        return base64.b64encode(self.render_png(data)).decode()
+
+    def svg_data_uri(self, data: Optional[str] = None, svg: Optional[str] = None) -> str:
+        """
+        Inline SVG data URI, usable directly as an <img src> on the website and in the app
+
+        The SVG is percent-encoded rather than base64 encoded: only <, >, # and % are
+        escaped, so the URI stays close to the SVG's own size (base64 adds a third) and
+        still gzips like text.
+        """
+        svg = svg if svg is not None else self.render_svg(data)
+        return "data:image/svg+xml," + urllib.parse.quote(svg, safe=_SVG_URI_SAFE)
+
+
+class WebsiteQRTokenPool:
+    """
+    Background pool of pre-generated website login tokens with their SVG images
+
+    Website login QR codes carry no user data, so tokens and images can be prepared
+    ahead of time and handed out without rendering on the request path.
+    """
+
+    def __init__(self, renderer: QRRenderingService, domain: str = 'ieltsaiprep.com',
+                 target_size: int = QR_POOL_TARGET_SIZE):
+        self.renderer = renderer
+        self.domain = domain
+        self.target_size = target_size
+        self._ready: Deque[Dict[str, Any]] = deque()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _generate(self) -> Dict[str, Any]:
+        token_id = str(uuid.uuid4())
+        created_at = int(time.time())
+        qr_data = json.dumps({
+            'token': token_id,
+            'domain': self.domain,
+            'type': 'website_auth',
+            'timestamp': created_at
+        })
+        return {
+            'token_id': token_id,
+            'created_at': created_at,
+            'qr_data': qr_data,
+            'svg': self.renderer.render_svg(qr_data)
+        }
+
+    def start(self):
+        """Start the background refill thread (idempotent)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='qr-token-pool', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        # Refills only when acquire() runs the pool low, so an idle worker renders nothing
+        while True:
+            try:
+                self._discard_stale()
+                while len(self._ready) < self.target_size:
+                    self._ready.append(self._generate())
+            except Exception as e:
+                logger.error(f"QR pool refill failed: {e}")
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+    def _discard_stale(self):
+        cutoff = time.time() - QR_POOL_MAX_AGE_SECONDS
+        while self._ready and self._ready[0]['created_at'] < cutoff:
+            try:
+                self._ready.popleft()
+            except IndexError:
+                break
+
+    def acquire(self) -> Dict[str, Any]:
+        """
+        Take a ready token, or render one inline if the pool is empty
+
+        Returns:
+            Dict with token_id, created_at, qr_data and svg
+        """
+        self.start()
+        
+        entry = None
+        cutoff = time.time() - QR_POOL_MAX_AGE_SECONDS
+        while True:
+            try:
+                entry = self._ready.popleft()
+            except IndexError:
+                entry = None
+                break
+            if entry['created_at'] >= cutoff:
+                break
+
+        if len(self._ready) < self.target_size // 2:
+            self._wakeup.set()
+
+        if entry is None:
+            entry = self._generate()
+        return entry
+
+
+# Global renderer and website token pool for use across the application
+qr_renderer = QRRenderingService()
+website_qr_pool = WebsiteQRTokenPool(qr_renderer)
@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import Dict, Any, List
 
 from question_bank_dal import QuestionCategory, RepeatPolicy, get_question_bank_dal
+from question_pool_counters import QuestionPoolCounters
+from question_ingest import BulkQuestionIngestor
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +20,7 @@ class QuestionBankAdmin:
     
     def __init__(self):
         self.question_dal = get_question_bank_dal()
+        self.counters = QuestionPoolCounters(self.question_dal)
         self.shard_count = 128
     
     def add_question(self, assessment_type: str, category: str, content: Dict[str, Any],
@@ -61,8 +64,8 @@ class QuestionBankAdmin:
                 'version': 1
             }
             
-            # Add to DynamoDB
-            self.question_dal.questions_table.put_item(Item=question_data)
+            # Add to DynamoDB together with the pool counters
+            self.counters.write(self.counters.put_question_transaction(question_data))
             
             logger.info(f"Question added: {question_id} to {pool_id}")
             
@@ -80,25 +83,20 @@ class QuestionBankAdmin:
                 'error': 'Failed to add question'
             }
     
-    def batch_add_questions(self, questions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Add multiple questions in batch"""
+    def batch_add_questions(self, questions: List[Dict[str, Any]], dry_run: bool = False) -> Dict[str, Any]:
+        """Add multiple questions with batched parallel writes (see question_ingest)"""
         try:
-            results = []
-            failed_count = 0
-            
-            for question_spec in questions:
-                result = self.add_question(**question_spec)
-                results.append(result)
-                
-                if not result['success']:
-                    failed_count += 1
+            ingestor = BulkQuestionIngestor(self.question_dal, self.counters, dry_run=dry_run,
+                                            collect_results=True)
+            report = ingestor.ingest(questions)
             
             return {
                 'success': True,
                 'total_questions': len(questions),
-                'successful': len(questions) - failed_count,
-                'failed': failed_count,
-                'results': results
+                'successful': report['written'] if not dry_run else report['valid'],
+                'failed': report['invalid'] + report['failed'],
+                'dry_run': dry_run,
+                'results': report['results']
             }
             
         except Exception as e:
@@ -108,30 +106,60 @@ class QuestionBankAdmin:
                 'error': 'Failed to batch add questions'
             }
     
-    def get_question_pool_stats(self, assessment_type: str = None) -> Dict[str, Any]:
-        """Get statistics about question pools"""
+    def deactivate_question(self, pool_id: str, question_id: str) -> Dict[str, Any]:
+        """Take a question out of selection (counters updated in the same transaction)"""
+        return self._set_question_active(pool_id, question_id, False)
+    
+    def reactivate_question(self, pool_id: str, question_id: str) -> Dict[str, Any]:
+        """Return a deactivated question to selection"""
+        return self._set_question_active(pool_id, question_id, True)
+    
+    def _set_question_active(self, pool_id: str, question_id: str, active: bool) -> Dict[str, Any]:
         try:
-            # This would require scanning - in production, consider maintaining counters
-            # For now, return basic structure
-            
-            stats = {
-                'success': True,
-                'assessment_types': {
-                    'academic_speaking': self._get_assessment_stats('academic_speaking'),
-                    'general_speaking': self._get_assessment_stats('general_speaking'),
-                    'academic_writing': self._get_assessment_stats('academic_writing'),
-                    'general_writing': self._get_assessment_stats('general_writing')
+            response = self.question_dal.questions_table.get_item(
+                Key={'pool_id': pool_id, 'question_id': question_id}
+            )
+            question = response.get('Item')
+            if not question:
+                return {
+                    'success': False,
+                    'error': 'Question not found'
                 }
+            
+            if bool(question.get('active', True)) == active:
+                return {'success': True, 'question_id': question_id, 'active': active, 'changed': False}
+            
+            self.counters.write(self.counters.set_active_transaction(question, active))
+            logger.info(f"Question {question_id} in {pool_id} set active={active}")
+            
+            return {'success': True, 'question_id': question_id, 'active': active, 'changed': True}
+            
+        except Exception as e:
+            logger.error(f"Failed to update question {question_id}: {e}")
+            return {
+                'success': False,
+                'error': 'Failed to update question'
             }
+    
+    def get_question_pool_stats(self, assessment_type: str = None) -> Dict[str, Any]:
+        """Get exact question pool counts (maintained counters, one BatchGetItem)"""
+        try:
+            assessment_types = [assessment_type] if assessment_type else [
+                'academic_speaking', 'general_speaking', 'academic_writing', 'general_writing'
+            ]
+            counts = self.counters.get_pool_counts(assessment_types)
             
             if assessment_type:
-                stats = {
+                return {
                     'success': True,
                     'assessment_type': assessment_type,
-                    'stats': stats['assessment_types'].get(assessment_type, {})
+                    'stats': counts.get(assessment_type, {})
                 }
             
-            return stats
+            return {
+                'success': True,
+                'assessment_types': counts
+            }
             
         except Exception as e:
             logger.error(f"Failed to get question pool stats: {e}")
@@ -140,51 +168,33 @@ class QuestionBankAdmin:
                 'error': 'Failed to get statistics'
             }
     
-    def _get_assessment_stats(self, assessment_type: str) -> Dict[str, Any]:
-        """Get stats for specific assessment type"""
+    def check_pool_exhaustion(self) -> Dict[str, Any]:
+        """Pools running low on active questions"""
         try:
-            # Sample a few shards to estimate totals (production implementation)
-            sample_shards = [0, 1, 2, 3, 4]  # Sample first 5 shards
-            category_stats = {}
-            
-            for category in QuestionCategory:
-                if not self._category_applies_to_assessment(category, assessment_type):
-                    continue
-                    
-                total_estimate = 0
-                active_estimate = 0
-                
-                for shard in sample_shards:
-                    pool_id = f"{assessment_type}#{category.value}#{shard}"
-                    
-                    try:
-                        response = self.question_dal.questions_table.query(
-                            KeyConditionExpression='pool_id = :pool_id',
-                            ExpressionAttributeValues={':pool_id': pool_id}
-                        )
-                        
-                        items = response.get('Items', [])
-                        shard_total = len(items)
-                        shard_active = sum(1 for item in items if item.get('active', True))
-                        
-                        total_estimate += shard_total
-                        active_estimate += shard_active
-                        
-                    except Exception:
-                        continue
-                
-                # Extrapolate to all shards
-                multiplier = self.shard_count / len(sample_shards)
-                category_stats[category.value] = {
-                    'estimated_total': int(total_estimate * multiplier),
-                    'estimated_active': int(active_estimate * multiplier)
-                }
-            
-            return category_stats
-            
+            return {
+                'success': True,
+                'low_pools': self.counters.check_pool_exhaustion()
+            }
         except Exception as e:
-            logger.warning(f"Failed to get stats for {assessment_type}: {e}")
-            return {}
+            logger.error(f"Failed to check question pools: {e}")
+            return {
+                'success': False,
+                'error': 'Failed to check question pools'
+            }
+    
+    def reconcile_counters(self) -> Dict[str, Any]:
+        """Rescan all pools and correct counter drift"""
+        try:
+            return {
+                'success': True,
+                'pools': self.counters.reconcile_all()
+            }
+        except Exception as e:
+            logger.error(f"Failed to reconcile question counters: {e}")
+            return {
+                'success': False,
+                'error': 'Failed to reconcile counters'
+            }
     
     def _category_applies_to_assessment(self, category: QuestionCategory, assessment_type: str) -> bool:
         """Check if category applies to assessment type"""
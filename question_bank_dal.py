@@ -32,12 +32,17 @@ class RepeatPolicy(Enum):
     INTRO = "intro"  # Can repeat (Maya's introduction)
     UNIQUE = "unique"  # Must be unique per user per assessment type
 
+def _plain_numbers(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Decimals read from DynamoDB back to int/float so records stay JSON-serializable"""
+    return json.loads(json.dumps(item, default=lambda value: int(value) if value == value.to_integral_value()
+                                 else float(value)))
+
 class QuestionBankDAL:
     """Data Access Layer for Question Bank Management"""
     
     def __init__(self):
         import os
-        self.dynamodb = get_dal().dynamodb  # Use existing DynamoDB resource
+        self.dynamodb = get_dal().connection.dynamodb  # Use existing DynamoDB resource
         stage = os.environ.get('STAGE', 'prod')
         
         # Table names
@@ -45,12 +50,16 @@ class QuestionBankDAL:
         self.sessions_table_name = f'ielts-assessment-sessions-{stage}'
         self.usage_table_name = f'ielts-user-question-usage-{stage}'
         self.profiles_table_name = f'ielts-user-profiles-{stage}'
+        self.counters_table_name = f'ielts-question-pool-counters-{stage}'
+        self.history_table_name = f'ielts-assessment-history-{stage}'
         
         # Get tables
         self.questions_table = self.dynamodb.Table(self.questions_table_name)
         self.sessions_table = self.dynamodb.Table(self.sessions_table_name)
         self.usage_table = self.dynamodb.Table(self.usage_table_name)
         self.profiles_table = self.dynamodb.Table(self.profiles_table_name)
+        self.counters_table = self.dynamodb.Table(self.counters_table_name)
+        self.history_table = self.dynamodb.Table(self.history_table_name)
         
         # Question requirements per assessment type
         self.question_requirements = {
@@ -449,6 +458,78 @@ class QuestionBankDAL:
                 'error': 'Failed to store user profile'
             }
     
+    def append_assessment_history(self, user_email: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Append a preserved assessment as its own history item (user_email HASH, recorded_at RANGE)
+        
+        The profile only keeps summary counters, bumped in the same transaction, so it no longer
+        grows with every assessment. Items expire through DynamoDB TTL on expires_at.
+        """
+        try:
+            from decimal import Decimal
+            now = datetime.utcnow()
+            expiry = record.get('expiry_date')
+            expires_at = datetime.fromisoformat(expiry) if expiry else now + timedelta(days=365)
+            # Round-trip through JSON so floats (band scores) become Decimals
+            item = json.loads(json.dumps({
+                **record,
+                'user_email': user_email,
+                'recorded_at': f"{now.isoformat()}#{record.get('session_id', '')}",
+                'expires_at': int(expires_at.timestamp())
+            }, default=str), parse_float=Decimal)
+            
+            self.dynamodb.meta.client.transact_write_items(TransactItems=[
+                {
+                    'Put': {
+                        'TableName': self.history_table_name,
+                        'Item': item,
+                        'ConditionExpression': 'attribute_not_exists(recorded_at)'
+                    }
+                },
+                {
+                    'Update': {
+                        'TableName': self.profiles_table_name,
+                        'Key': {'user_email': user_email},
+                        'UpdateExpression': ('ADD assessment_count :one '
+                                             'SET last_assessment_date = :now, last_updated = :now, '
+                                             'created_date = if_not_exists(created_date, :now)'),
+                        'ExpressionAttributeValues': {':one': 1, ':now': now.isoformat()}
+                    }
+                }
+            ])
+            
+            logger.info(f"Assessment history appended for {user_email}")
+            return {
+                'success': True,
+                'recorded_at': item['recorded_at']
+            }
+            
+        except Exception as e:
+            logger.error(f"Error appending assessment history for {user_email}: {e}")
+            return {
+                'success': False,
+                'error': 'Failed to store assessment history'
+            }
+    
+    def query_assessment_history(self, user_email: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Newest-first unexpired history items (TTL deletion can lag, so expiry is checked here too)"""
+        now = int(datetime.utcnow().timestamp())
+        query = {
+            'KeyConditionExpression': 'user_email = :user_email',
+            'ExpressionAttributeValues': {':user_email': user_email},
+            'ScanIndexForward': False,
+            'Limit': limit
+        }
+        records = []
+        while len(records) < limit:
+            response = self.history_table.query(**query)
+            records.extend(_plain_numbers(item) for item in response.get('Items', [])
+                           if int(item.get('expires_at', now + 1)) > now)
+            if 'LastEvaluatedKey' not in response:
+                break
+            query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return records[:limit]
+    
     def update_assessment_session(self, session_id: str, session_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update assessment session data"""
         try:
@@ -0,0 +1,102 @@
+"""
+Indexed Mock Question Bank
+Loads the mock question bank from mock_question_bank.json once per process into per-type
+arrays with question_id -> index maps, and samples unused questions in expected O(1)
+"""
+
+import os
+import json
+import random
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+QUESTION_BANK_PATH = os.environ.get(
+    'MOCK_QUESTION_BANK_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_question_bank.json')
+)
+
+# Random draws before falling back to enumerating the unused questions
+MAX_SAMPLE_ATTEMPTS = 8
+
+
+class QuestionBankIndex:
+    """
+    Per-assessment-type question arrays with id -> position maps
+
+    Questions are shared across requests; callers read them and must not mutate them.
+    """
+
+    def __init__(self, banks: Dict[str, List[Dict[str, Any]]]):
+        self._questions = {assessment_type: tuple(questions) for assessment_type, questions in banks.items()}
+        self._positions = {
+            assessment_type: {question['question_id']: position for position, question in enumerate(questions)}
+            for assessment_type, questions in self._questions.items()
+        }
+
+    @classmethod
+    def from_file(cls, path: str = QUESTION_BANK_PATH) -> 'QuestionBankIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def questions(self, assessment_type: str) -> List[Dict[str, Any]]:
+        return list(self._questions.get(assessment_type, ()))
+
+    def counts(self) -> Dict[str, int]:
+        return {assessment_type: len(questions) for assessment_type, questions in self._questions.items()}
+
+    def get(self, assessment_type: str, question_id: str) -> Optional[Dict[str, Any]]:
+        position = self._positions.get(assessment_type, {}).get(question_id)
+        return None if position is None else self._questions[assessment_type][position]
+
+    def used_mask(self, assessment_type: str, used_question_ids: Iterable[str]) -> int:
+        """Bitmap of the positions of the used questions (ids not in the bank are ignored)"""
+        positions = self._positions.get(assessment_type, {})
+        mask = 0
+        for question_id in used_question_ids:
+            position = positions.get(question_id)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def sample_unused(self, assessment_type: str, used_question_ids: Iterable[str],
+                      rng: Optional[random.Random] = None) -> Optional[Dict[str, Any]]:
+        """
+        A random question the user has not used, or any question once all have been used
+
+        Draws uniformly and rejects used positions, which is O(1) expected while most of the
+        bank is unused; past that it picks from the enumerated remainder.
+        """
+        questions = self._questions.get(assessment_type)
+        if not questions:
+            return None
+        rng = rng or random
+        mask = self.used_mask(assessment_type, used_question_ids)
+        if not mask:
+            return questions[rng.randrange(len(questions))]
+
+        remaining = len(questions) - bin(mask).count('1')
+        if remaining <= 0:
+            # Every question has been used; reuse is allowed
+            return questions[rng.randrange(len(questions))]
+
+        for _ in range(MAX_SAMPLE_ATTEMPTS):
+            position = rng.randrange(len(questions))
+            if not (mask >> position) & 1:
+                return questions[position]
+        unused = [position for position in range(len(questions)) if not (mask >> position) & 1]
+        return questions[rng.choice(unused)]
+
+
+# Global question bank index, loaded on first use
+_question_bank_index = None
+_load_lock = threading.Lock()
+
+def get_question_bank_index() -> QuestionBankIndex:
+    """Get the process-wide question bank index"""
+    global _question_bank_index
+    if _question_bank_index is None:
+        with _load_lock:
+            if _question_bank_index is None:
+                _question_bank_index = QuestionBankIndex.from_file()
+                print(f"[COMPREHENSIVE] Loaded question bank: {_question_bank_index.counts()}")
+    return _question_bank_index
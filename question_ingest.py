@@ -0,0 +1,442 @@
+"""
+Bulk Question Ingestion
+Streams question files (JSONL/CSV, optionally gzipped), validates each question, places it
+on the pool shard derived from its id and writes it with BatchWriteItem from a thread pool,
+with backoff on throttling, resumable checkpoints and a dry-run mode
+"""
+
+import os
+import csv
+import gzip
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from question_bank_dal import RepeatPolicy
+
+logger = logging.getLogger(__name__)
+
+# BatchWriteItem accepts at most 25 requests per call
+BATCH_WRITE_LIMIT = 25
+DEFAULT_WORKERS = 8
+
+# Batches in flight per worker; bounds memory however large the input file is
+MAX_PENDING_PER_WORKER = 2
+
+# Retries of throttled calls and unprocessed items, exponential backoff with full jitter
+MAX_WRITE_RETRIES = 8
+RETRY_BASE_DELAY_SECONDS = 0.05
+RETRY_MAX_DELAY_SECONDS = 5.0
+THROTTLING_ERRORS = {'ProvisionedThroughputExceededException', 'ThrottlingException',
+                     'RequestLimitExceeded', 'InternalServerError'}
+
+# Checkpoint (and flush counter increments) after this many completed batches
+CHECKPOINT_EVERY_BATCHES = 40
+
+VALID_DIFFICULTIES = {'easy', 'medium', 'hard'}
+MAX_REPORTED_ERRORS = 50
+
+
+def _open_text(path: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def _csv_question(row: Dict[str, str]) -> Dict[str, Any]:
+    """CSV columns: assessment_type, category, content (JSON object or plain text), difficulty, tags (a|b), ..."""
+    spec = {k: v for k, v in row.items() if k and v not in (None, '')}
+    content = spec.get('content')
+    if content is not None:
+        try:
+            parsed = json.loads(content)
+            spec['content'] = parsed if isinstance(parsed, dict) else {'text': content}
+        except ValueError:
+            spec['content'] = {'text': content}
+    if 'tags' in spec:
+        spec['tags'] = [tag.strip() for tag in spec['tags'].split('|') if tag.strip()]
+    return spec
+
+
+def iter_question_file(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield question specs one at a time from a .jsonl/.ndjson or .csv file (optionally .gz)
+
+    Lines that cannot be parsed are yielded as {'_error': ...} so positions stay aligned
+    with the file for checkpointing.
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    with _open_text(path) as f:
+        if name.endswith('.csv'):
+            for row in csv.DictReader(f):
+                yield _csv_question(row)
+            return
+        if not name.endswith(('.jsonl', '.ndjson')):
+            raise ValueError(f"Unsupported question file type: {path}")
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError:
+                yield {'_error': f'invalid JSON on line {line_number}'}
+                continue
+            yield spec if isinstance(spec, dict) else {'_error': f'line {line_number} is not an object'}
+
+
+def validate_question(spec: Dict[str, Any], question_requirements: Dict[str, Any]) -> Optional[str]:
+    """Reason the question spec cannot be loaded, or None if it is valid"""
+    if '_error' in spec:
+        return spec['_error']
+    assessment_type = spec.get('assessment_type')
+    if assessment_type not in question_requirements:
+        return f"unknown assessment_type {assessment_type!r}"
+    categories = {category.value for category in question_requirements[assessment_type]}
+    if spec.get('category') not in categories:
+        return f"category {spec.get('category')!r} does not apply to {assessment_type}"
+    content = spec.get('content')
+    if not isinstance(content, dict) or not content:
+        return 'content must be a non-empty object'
+    if spec.get('difficulty', 'medium') not in VALID_DIFFICULTIES:
+        return f"invalid difficulty {spec.get('difficulty')!r}"
+    if spec.get('repeat_policy', RepeatPolicy.UNIQUE.value) not in {p.value for p in RepeatPolicy}:
+        return f"invalid repeat_policy {spec.get('repeat_policy')!r}"
+    tags = spec.get('tags', [])
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        return 'tags must be a list of strings'
+    return None
+
+
+def content_question_id(assessment_type: str, category: str, content: Dict[str, Any]) -> str:
+    """
+    Deterministic id from the question content
+
+    A retried batch or a rerun of the same file yields the same ids, so questions already
+    loaded are recognised instead of duplicated.
+    """
+    digest = hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    prefix = f"{assessment_type}_{category}".replace('_', '')[:20]
+    return f"{prefix}_{digest[:16]}"
+
+
+def question_shard(question_id: str, shard_count: int) -> int:
+    """
+    Shard of a question, derived from its id
+
+    A rerun (with or without a checkpoint) looks a question up on the same shard, so it
+    finds the existing item instead of adding a copy under another pool_id.
+    """
+    return int(hashlib.sha1(question_id.encode('utf-8')).hexdigest()[:8], 16) % shard_count
+
+
+class BulkQuestionIngestor:
+    """Loads question specs into the sharded question pools with batched parallel writes"""
+
+    def __init__(self, question_dal, counters, workers: int = DEFAULT_WORKERS,
+                 checkpoint_path: Optional[str] = None, dry_run: bool = False,
+                 collect_results: bool = False):
+        self.dal = question_dal
+        self.counters = counters
+        # The resource's client serializes plain Python values for batch calls
+        self.client = question_dal.dynamodb.meta.client
+        self.table_name = question_dal.questions_table_name
+        self.workers = max(1, workers)
+        self.checkpoint_path = checkpoint_path
+        self.dry_run = dry_run
+        self.collect_results = collect_results
+
+    # Checkpoints
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_checkpoint(self, state: Dict[str, Any]):
+        if not self.checkpoint_path or self.dry_run:
+            return
+        state['updated_at'] = datetime.utcnow().isoformat()
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        # Atomic replace so a crash never leaves a half-written checkpoint
+        os.replace(temp_path, self.checkpoint_path)
+
+    # Writes
+
+    def _retry_delay(self, attempt: int, remaining: int):
+        if attempt > MAX_WRITE_RETRIES:
+            raise RuntimeError(f"{remaining} questions still unprocessed after {MAX_WRITE_RETRIES} retries")
+        delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1)))
+        time.sleep(random.uniform(0, delay))
+
+    def existing_question_ids(self, items: List[Dict[str, Any]]) -> set:
+        """Ids of the items already in the table (one BatchGetItem, retrying unprocessed keys)"""
+        keys = [{'pool_id': item['pool_id'], 'question_id': item['question_id']} for item in items]
+        existing = set()
+        attempt = 0
+        while keys:
+            try:
+                response = self.client.batch_get_item(RequestItems={
+                    self.table_name: {'Keys': keys, 'ProjectionExpression': 'question_id'}
+                })
+                existing.update(item['question_id'] for item in response.get('Responses', {}).get(self.table_name, []))
+                keys = response.get('UnprocessedKeys', {}).get(self.table_name, {}).get('Keys', [])
+            except ClientError as e:
+                if e.response['Error']['Code'] not in THROTTLING_ERRORS:
+                    raise
+            if not keys:
+                break
+            attempt += 1
+            self._retry_delay(attempt, len(keys))
+        return existing
+
+    def write_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        One BatchWriteItem (<= 25 puts) of the items not yet in the table, retrying
+        throttling and unprocessed items
+
+        Questions already loaded are left as they are (an admin may have deactivated them)
+        and are not counted again.
+
+        Returns:
+            The items written
+        """
+        existing = self.existing_question_ids(items)
+        new_items = [item for item in items if item['question_id'] not in existing]
+        requests = [{'PutRequest': {'Item': item}} for item in new_items]
+        attempt = 0
+        while requests:
+            try:
+                response = self.client.batch_write_item(RequestItems={self.table_name: requests})
+                requests = response.get('UnprocessedItems', {}).get(self.table_name, [])
+            except ClientError as e:
+                if e.response['Error']['Code'] not in THROTTLING_ERRORS:
+                    raise
+            if not requests:
+                break
+            attempt += 1
+            self._retry_delay(attempt, len(requests))
+        return new_items
+
+    def _question_item(self, spec: Dict[str, Any], now: str) -> Dict[str, Any]:
+        assessment_type, category = spec['assessment_type'], spec['category']
+        question_id = spec.get('question_id') or content_question_id(assessment_type, category, spec['content'])
+        shard = question_shard(question_id, self.dal.shard_count)
+        return {
+            'pool_id': f"{assessment_type}#{category}#{shard}",
+            'question_id': question_id,
+            'assessment_type': assessment_type,
+            'category': category,
+            'shard': shard,
+            'content': spec['content'],
+            'difficulty': spec.get('difficulty', 'medium'),
+            'tags': spec.get('tags', []),
+            'repeat_policy': spec.get('repeat_policy', RepeatPolicy.UNIQUE.value),
+            'active': True,
+            'created_at': now,
+            'version': 1
+        }
+
+    def _flush_counters(self, deltas: Dict[Tuple[str, str, int], int]):
+        if deltas and not self.dry_run:
+            self.counters.apply_deltas({key: (count, count) for key, count in deltas.items()})
+        deltas.clear()
+
+    def ingest(self, specs: Iterable[Dict[str, Any]], source: Optional[str] = None,
+               reconcile: bool = False) -> Dict[str, Any]:
+        """
+        Validate, shard and write question specs
+
+        With a checkpoint_path, progress is saved as the contiguous prefix of input records
+        whose batches have all been written; rerunning with the same checkpoint skips that
+        prefix. Each question's shard is derived from its id, so a rerun finds the questions
+        it wrote before and skips them; pool counters are incremented only for questions
+        actually added.
+
+        Returns:
+            Report with counts, the first validation/write errors and, if collect_results,
+            per-question results in input order
+        """
+        started = time.perf_counter()
+        checkpoint = self._load_checkpoint()
+        if checkpoint and source and checkpoint.get('source') != source:
+            raise ValueError(f"Checkpoint {self.checkpoint_path} belongs to {checkpoint.get('source')}")
+        resume_from = checkpoint.get('position', 0)
+
+        state = {
+            'source': source,
+            'position': resume_from,
+            'written': checkpoint.get('written', 0),
+            'invalid': checkpoint.get('invalid', 0)
+        }
+        report = {
+            'dry_run': self.dry_run,
+            'resumed_from': resume_from,
+            'total': 0,
+            'valid': 0,
+            'written': 0,
+            'already_present': 0,
+            'invalid': 0,
+            'failed': 0,
+            'pools': {},
+            'errors': []
+        }
+        results: Dict[int, Dict[str, Any]] = {}
+        seen = set()
+
+        def record_error(position: int, error: str):
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'position': position, 'error': error})
+            if self.collect_results:
+                results[position] = {'success': False, 'error': error}
+
+        # Batches complete out of order; the checkpoint only advances over a finished prefix
+        executor = None if self.dry_run else ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='question-ingest')
+        pending = {}
+        batch_ends: Dict[int, int] = {}
+        finished: Dict[int, bool] = {}
+        next_to_commit = 0
+        batches_since_checkpoint = 0
+        deltas: Dict[Tuple[str, str, int], int] = {}
+
+        def complete(future):
+            nonlocal next_to_commit, batches_since_checkpoint
+            seq, batch = pending.pop(future)
+            error = future.exception()
+            if error is None:
+                new_items = future.result()
+                report['written'] += len(new_items)
+                report['already_present'] += len(batch) - len(new_items)
+                state['written'] += len(new_items)
+                for item in new_items:
+                    key = (item['assessment_type'], item['category'], item['shard'])
+                    deltas[key] = deltas.get(key, 0) + 1
+                for position, item in batch:
+                    if self.collect_results:
+                        results[position] = {'success': True, 'question_id': item['question_id'],
+                                             'pool_id': item['pool_id'], 'shard': item['shard']}
+            else:
+                logger.error(f"Question batch {seq} failed: {error}")
+                report['failed'] += len(batch)
+                for position, _ in batch:
+                    record_error(position, f'write failed: {error}')
+            finished[seq] = error is None
+            # A failed batch holds the checkpoint back so a rerun retries it
+            while finished.get(next_to_commit):
+                state['position'] = batch_ends.pop(next_to_commit)
+                del finished[next_to_commit]
+                next_to_commit += 1
+            batches_since_checkpoint += 1
+            if batches_since_checkpoint >= CHECKPOINT_EVERY_BATCHES:
+                self._flush_counters(deltas)
+                self._save_checkpoint(state)
+                batches_since_checkpoint = 0
+
+        def submit(seq: int, batch: List[Tuple[int, Dict[str, Any]]], end: int):
+            if self.dry_run:
+                if self.collect_results:
+                    for position, item in batch:
+                        results[position] = {'success': True, 'question_id': item['question_id'],
+                                             'pool_id': item['pool_id'], 'shard': item['shard']}
+                return
+            batch_ends[seq] = end
+            while len(pending) >= self.workers * MAX_PENDING_PER_WORKER:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    complete(future)
+            pending[executor.submit(self.write_batch, [item for _, item in batch])] = (seq, batch)
+
+        now = datetime.utcnow().isoformat()
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        seq = 0
+        position = 0
+        try:
+            for position, spec in enumerate(specs):
+                error = validate_question(spec, self.dal.question_requirements)
+                if error is None:
+                    item = self._question_item(spec, now)
+                    # Ids are unique across a pool's shards, not just within one partition
+                    if item['question_id'] in seen:
+                        error = f"duplicate question {item['question_id']}"
+                    seen.add(item['question_id'])
+                # Records before the checkpoint are replayed only to detect later duplicates
+                if position < resume_from:
+                    continue
+                report['total'] += 1
+                if error is not None:
+                    report['invalid'] += 1
+                    state['invalid'] += 1
+                    record_error(position, error)
+                    continue
+                report['valid'] += 1
+                pool = f"{item['assessment_type']}#{item['category']}"
+                report['pools'][pool] = report['pools'].get(pool, 0) + 1
+                batch.append((position, item))
+                if len(batch) == BATCH_WRITE_LIMIT:
+                    submit(seq, batch, position + 1)
+                    seq, batch = seq + 1, []
+            end = position + 1 if report['total'] else resume_from
+            if batch:
+                submit(seq, batch, end)
+                seq += 1
+            if not self.dry_run:
+                while pending:
+                    done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        complete(future)
+                if next_to_commit == seq:
+                    state['position'] = max(state['position'], end)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            self._flush_counters(deltas)
+            self._save_checkpoint(state)
+
+        if reconcile and not self.dry_run:
+            report['reconciled'] = [self.counters.reconcile(*pool.split('#', 1)) for pool in report['pools']]
+
+        report['success'] = report['failed'] == 0
+        report['position'] = state['position']
+        report['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+        if self.collect_results:
+            report['results'] = [results[p] for p in sorted(results)]
+        logger.info(f"Question ingestion{' (dry run)' if self.dry_run else ''}: {report['written']} written, "
+                    f"{report['invalid']} invalid, {report['failed']} failed in {report['elapsed_seconds']}s")
+        return report
+
+
+def ingest_question_file(path: str, workers: int = DEFAULT_WORKERS, checkpoint_path: Optional[str] = None,
+                         dry_run: bool = False, reconcile: bool = False) -> Dict[str, Any]:
+    """Stream a JSONL/CSV question file into the question bank"""
+    from question_bank_dal import get_question_bank_dal
+    from question_pool_counters import get_question_pool_counters
+    ingestor = BulkQuestionIngestor(get_question_bank_dal(), get_question_pool_counters(), workers=workers,
+                                    checkpoint_path=checkpoint_path, dry_run=dry_run)
+    return ingestor.ingest(iter_question_file(path), source=os.path.abspath(path), reconcile=reconcile)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bulk load questions into the question bank')
+    parser.add_argument('path', help='.jsonl/.ndjson or .csv file, optionally gzipped')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--checkpoint', help='checkpoint file for resumable loads')
+    parser.add_argument('--dry-run', action='store_true', help='validate and assign shards without writing')
+    parser.add_argument('--reconcile', action='store_true', help='rescan the loaded pools afterwards')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = ingest_question_file(args.path, workers=args.workers, checkpoint_path=args.checkpoint,
+                                  dry_run=args.dry_run, reconcile=args.reconcile)
+    print(json.dumps({k: v for k, v in result.items() if k != 'reconciled'}, indent=2))
@@ -0,0 +1,299 @@
+"""
+Question Pool Counters
+Exact per-shard and per-pool question counts maintained in the same DynamoDB transaction as
+question writes, read back with BatchGetItem and periodically reconciled against the pools
+"""
+
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# BatchGetItem accepts at most 100 keys per call
+BATCH_GET_LIMIT = 100
+# TransactWriteItems accepts at most 100 actions per call
+TRANSACT_WRITE_LIMIT = 100
+MAX_UNPROCESSED_RETRIES = 5
+RETRY_BASE_DELAY_SECONDS = 0.05
+
+# Pools with fewer active questions than this multiple of one assessment's requirement are flagged
+EXHAUSTION_FACTOR = 5
+
+def shard_counter_id(assessment_type: str, category: str, shard: int) -> str:
+    """Same key as the question pool partition it counts"""
+    return f"{assessment_type}#{category}#{shard}"
+
+
+def rollup_counter_id(assessment_type: str, category: str) -> str:
+    return f"ROLLUP#{assessment_type}#{category}"
+
+
+class QuestionPoolCounters:
+    """Counter items in the question pool counters table (counter_id HASH)"""
+
+    def __init__(self, question_dal):
+        self.dal = question_dal
+        # The resource's client serializes plain Python values for transactions and batch calls
+        self.client = question_dal.dynamodb.meta.client
+        self.table_name = question_dal.counters_table_name
+        self.shard_count = question_dal.shard_count
+
+    def categories_for(self, assessment_type: str) -> List[str]:
+        return [category.value for category in self.dal.question_requirements.get(assessment_type, {})]
+
+    def counter_updates(self, assessment_type: str, category: str, shard: int,
+                        total_delta: int, active_delta: int) -> List[Dict[str, Any]]:
+        """TransactWriteItems entries adjusting the shard counter and the pool rollup"""
+        now = datetime.utcnow().isoformat()
+        updates = []
+        for counter_id in (shard_counter_id(assessment_type, category, shard),
+                           rollup_counter_id(assessment_type, category)):
+            updates.append({
+                'Update': {
+                    'TableName': self.table_name,
+                    'Key': {'counter_id': counter_id},
+                    'UpdateExpression': ('ADD #total :total, #active :active '
+                                         'SET assessment_type = :type, category = :category, updated_at = :now'),
+                    'ExpressionAttributeNames': {'#total': 'total', '#active': 'active'},
+                    'ExpressionAttributeValues': {
+                        ':total': total_delta, ':active': active_delta,
+                        ':type': assessment_type, ':category': category, ':now': now
+                    }
+                }
+            })
+        return updates
+
+    def put_question_transaction(self, question: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Question put plus counter increments, to be written as one transaction"""
+        put = {
+            'Put': {
+                'TableName': self.dal.questions_table_name,
+                'Item': question,
+                'ConditionExpression': 'attribute_not_exists(question_id)'
+            }
+        }
+        active = 1 if question.get('active', True) else 0
+        return [put] + self.counter_updates(question['assessment_type'], question['category'],
+                                            question['shard'], 1, active)
+
+    def set_active_transaction(self, question: Dict[str, Any], active: bool) -> List[Dict[str, Any]]:
+        """Flip a question's active flag (only if it changes) and adjust the active counters"""
+        update = {
+            'Update': {
+                'TableName': self.dal.questions_table_name,
+                'Key': {'pool_id': question['pool_id'], 'question_id': question['question_id']},
+                'UpdateExpression': 'SET #active = :active, updated_at = :now',
+                'ConditionExpression': 'attribute_exists(question_id) AND #active <> :active',
+                'ExpressionAttributeNames': {'#active': 'active'},
+                'ExpressionAttributeValues': {':active': active, ':now': datetime.utcnow().isoformat()}
+            }
+        }
+        return [update] + self.counter_updates(question['assessment_type'], question['category'],
+                                               question['shard'], 0, 1 if active else -1)
+
+    def write(self, transact_items: List[Dict[str, Any]]):
+        self.client.transact_write_items(TransactItems=transact_items)
+
+    def increment(self, assessment_type: str, category: str, shard: int, total_delta: int, active_delta: int):
+        """Adjust counters outside a question transaction (e.g. after a bulk load)"""
+        self.write(self.counter_updates(assessment_type, category, shard, total_delta, active_delta))
+
+    def apply_deltas(self, deltas: Dict[Tuple[str, str, int], Tuple[int, int]]):
+        """
+        Apply (total, active) deltas keyed by (assessment_type, category, shard) after a bulk load
+
+        Each pool's rollup is updated once with the pool's sum, packed with the shard updates
+        into transactions of up to 100 actions.
+        """
+        rollups: Dict[Tuple[str, str], List[int]] = {}
+        updates = []
+        for (assessment_type, category, shard), (total, active) in deltas.items():
+            updates.append(self.counter_updates(assessment_type, category, shard, total, active)[0])
+            rollup = rollups.setdefault((assessment_type, category), [0, 0])
+            rollup[0] += total
+            rollup[1] += active
+        for (assessment_type, category), (total, active) in rollups.items():
+            # Rollup update only; the shard is irrelevant
+            updates.append(self.counter_updates(assessment_type, category, 0, total, active)[1])
+        for start in range(0, len(updates), TRANSACT_WRITE_LIMIT):
+            self.write(updates[start:start + TRANSACT_WRITE_LIMIT])
+
+    def batch_get(self, counter_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Counter items by id, 100 keys per BatchGetItem with unprocessed-key retry"""
+        counter_ids = list(dict.fromkeys(counter_ids))
+        counters = {}
+        for start in range(0, len(counter_ids), BATCH_GET_LIMIT):
+            request = {self.table_name: {
+                'Keys': [{'counter_id': counter_id}
+                         for counter_id in counter_ids[start:start + BATCH_GET_LIMIT]]
+            }}
+            attempt = 0
+            while request:
+                response = self.client.batch_get_item(RequestItems=request)
+                for item in response.get('Responses', {}).get(self.table_name, []):
+                    counters[item['counter_id']] = item
+                request = response.get('UnprocessedKeys') or {}
+                if request:
+                    attempt += 1
+                    if attempt > MAX_UNPROCESSED_RETRIES:
+                        raise RuntimeError(f"BatchGetItem left keys unprocessed in {self.table_name}")
+                    time.sleep(RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1)))
+        return counters
+
+    def get_pool_counts(self, assessment_types: Iterable[str]) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Exact {assessment_type: {category: {'total', 'active'}}} from the rollups in one BatchGetItem"""
+        pools = [(assessment_type, category) for assessment_type in assessment_types
+                 for category in self.categories_for(assessment_type)]
+        rollups = self.batch_get(rollup_counter_id(*pool) for pool in pools)
+
+        counts: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for assessment_type, category in pools:
+            rollup = rollups.get(rollup_counter_id(assessment_type, category), {})
+            counts.setdefault(assessment_type, {})[category] = {
+                'total': int(rollup.get('total', 0)),
+                'active': int(rollup.get('active', 0))
+            }
+        return counts
+
+    def check_pool_exhaustion(self, assessment_types: Optional[Iterable[str]] = None,
+                              factor: int = EXHAUSTION_FACTOR) -> List[Dict[str, Any]]:
+        """Pools whose active questions cover fewer than `factor` assessments"""
+        assessment_types = list(assessment_types or self.dal.question_requirements)
+        alerts = []
+        for assessment_type, categories in self.get_pool_counts(assessment_types).items():
+            requirements = {c.value: n for c, n in self.dal.question_requirements[assessment_type].items()}
+            for category, count in categories.items():
+                threshold = requirements[category] * factor
+                if count['active'] < threshold:
+                    alerts.append({'assessment_type': assessment_type, 'category': category,
+                                   'active': count['active'], 'threshold': threshold})
+                    logger.warning(f"Question pool low: {assessment_type}/{category} "
+                                   f"{count['active']} active (threshold {threshold})")
+        return alerts
+
+    def _count_shard(self, pool_id: str) -> Tuple[int, int]:
+        """Exact (total, active) for one pool shard, paging through the partition"""
+        total = active = 0
+        query = {
+            'KeyConditionExpression': 'pool_id = :pool_id',
+            'ExpressionAttributeValues': {':pool_id': pool_id},
+            'ProjectionExpression': '#active',
+            'ExpressionAttributeNames': {'#active': 'active'}
+        }
+        while True:
+            response = self.dal.questions_table.query(**query)
+            for item in response.get('Items', []):
+                total += 1
+                active += 1 if item.get('active', True) else 0
+            if 'LastEvaluatedKey' not in response:
+                return total, active
+            query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def _correct(self, counter_id: str, expected: Dict[str, Any], total: int, active: int,
+                 assessment_type: str, category: str) -> bool:
+        """Overwrite a counter only if it still holds the values read before the rescan"""
+        names = {'#total': 'total', '#active': 'active'}
+        values = {':total': total, ':active': active, ':type': assessment_type,
+                  ':category': category, ':now': datetime.utcnow().isoformat()}
+        if expected:
+            condition = '#total = :old_total AND #active = :old_active'
+            values.update({':old_total': expected.get('total', 0), ':old_active': expected.get('active', 0)})
+        else:
+            condition = 'attribute_not_exists(counter_id)'
+        try:
+            self.dal.counters_table.update_item(
+                Key={'counter_id': counter_id},
+                UpdateExpression=('SET #total = :total, #active = :active, assessment_type = :type, '
+                                  'category = :category, updated_at = :now, reconciled_at = :now'),
+                ConditionExpression=condition,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                # Written to concurrently; the next reconciliation run picks it up
+                return False
+            raise
+
+    def reconcile(self, assessment_type: str, category: str) -> Dict[str, Any]:
+        """Rescan every shard of a pool and correct counters that drifted"""
+        shard_ids = [shard_counter_id(assessment_type, category, shard) for shard in range(self.shard_count)]
+        rollup_id = rollup_counter_id(assessment_type, category)
+        stored = self.batch_get(shard_ids + [rollup_id])
+
+        corrected, skipped = [], []
+        pool_total = pool_active = 0
+        for shard, counter_id in enumerate(shard_ids):
+            total, active = self._count_shard(counter_id)
+            pool_total += total
+            pool_active += active
+            current = stored.get(counter_id, {})
+            if (int(current.get('total', 0)), int(current.get('active', 0))) == (total, active):
+                continue
+            if not current and not total:
+                continue
+            if self._correct(counter_id, current, total, active, assessment_type, category):
+                corrected.append(shard)
+            else:
+                skipped.append(shard)
+
+        rollup = stored.get(rollup_id, {})
+        rollup_drift = (int(rollup.get('total', 0)), int(rollup.get('active', 0))) != (pool_total, pool_active)
+        rollup_corrected = False
+        # The rollup is only rewritten from a consistent set of shard counts
+        if rollup_drift and not skipped:
+            rollup_corrected = self._correct(rollup_id, rollup, pool_total, pool_active, assessment_type, category)
+            if not rollup_corrected:
+                skipped.append('rollup')
+
+        result = {
+            'assessment_type': assessment_type,
+            'category': category,
+            'total': pool_total,
+            'active': pool_active,
+            'corrected_shards': corrected,
+            'rollup_corrected': rollup_corrected,
+            'skipped': skipped
+        }
+        if corrected or rollup_drift:
+            logger.info(f"Reconciled {assessment_type}/{category}: {len(corrected)} shards corrected, "
+                        f"rollup drift={rollup_drift}, skipped={skipped}")
+        return result
+
+    def reconcile_all(self) -> List[Dict[str, Any]]:
+        """Reconciliation job over every pool"""
+        return [self.reconcile(assessment_type, category)
+                for assessment_type in self.dal.question_requirements
+                for category in self.categories_for(assessment_type)]
+
+
+# Global counters instance
+_pool_counters = None
+
+def get_question_pool_counters() -> QuestionPoolCounters:
+    """Get the global question pool counters"""
+    global _pool_counters
+    if _pool_counters is None:
+        from question_bank_dal import get_question_bank_dal
+        _pool_counters = QuestionPoolCounters(get_question_bank_dal())
+    return _pool_counters
+
+
+def reconcile_question_counters_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled Lambda: correct counter drift and report low question pools"""
+    counters = get_question_pool_counters()
+    results = counters.reconcile_all()
+    stats = {
+        'pools': len(results),
+        'corrected_shards': sum(len(result['corrected_shards']) for result in results),
+        'corrected_rollups': sum(1 for result in results if result['rollup_corrected']),
+        'low_pools': counters.check_pool_exhaustion()
+    }
+    logger.info(f"Question counter reconciliation: {stats}")
+    return {'statusCode': 200, 'body': json.dumps(stats)}
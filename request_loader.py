@@ -0,0 +1,129 @@
+"""
+Request-Scoped Data Loaders
+Identity map of items read during one invocation: reads are memoized by key per table and
+reads of several keys are batched into one call, so the handler, DAL and access controller
+can each ask for the same user without going back to DynamoDB
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# BatchGetItem accepts at most 100 keys per call
+MAX_BATCH_SIZE = 100
+
+# batch_load(keys) -> {key: item} for the keys that exist; missing keys are simply absent
+BatchLoadFn = Callable[[list], Dict[Hashable, Any]]
+
+
+class DataLoader:
+    """
+    Memoizing, batching loader for one table (or index) within one request
+
+    Misses are cached too, so a user that does not exist is only looked up once. Callers
+    that write an item must clear() its key so later reads in the request see the write.
+    """
+
+    def __init__(self, name: str, batch_load: BatchLoadFn, max_batch_size: int = MAX_BATCH_SIZE):
+        self.name = name
+        self.batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self._cache: Dict[Hashable, Any] = {}
+        self.reads = 0
+        self.hits = 0
+
+    def load(self, key: Hashable) -> Optional[Any]:
+        return self.load_many([key])[key]
+
+    def load_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Optional[Any]]:
+        """Items for keys (None for missing ones), fetching uncached keys in batches"""
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if key not in self._cache]
+        self.hits += len(keys) - len(missing)
+        for start in range(0, len(missing), self.max_batch_size):
+            chunk = missing[start:start + self.max_batch_size]
+            found = self.batch_load(chunk)
+            self.reads += 1
+            for key in chunk:
+                self._cache[key] = found.get(key)
+        return {key: self._cache[key] for key in keys}
+
+    def clear(self, key: Hashable):
+        self._cache.pop(key, None)
+
+
+class RequestScope:
+    """The loaders of one invocation, created on first use"""
+
+    def __init__(self):
+        self.loaders: Dict[str, DataLoader] = {}
+
+    def loader(self, name: str, batch_load: BatchLoadFn) -> DataLoader:
+        loader = self.loaders.get(name)
+        if loader is None:
+            loader = self.loaders[name] = DataLoader(name, batch_load)
+        return loader
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: {'reads': loader.reads, 'hits': loader.hits} for name, loader in self.loaders.items()}
+
+
+# Scope bound to the current invocation (per thread / asyncio task)
+_current_scope: ContextVar[Optional[RequestScope]] = ContextVar('request_loader_scope', default=None)
+
+
+@contextmanager
+def request_scope() -> Iterator[RequestScope]:
+    """Bind a loader scope for one invocation; nested uses share the outer scope"""
+    scope = _current_scope.get()
+    if scope is not None:
+        yield scope
+        return
+    scope = RequestScope()
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        if scope.loaders:
+            logger.debug(f"Request loaders: {scope.stats()}")
+
+
+def request_scoped(func: Callable) -> Callable:
+    """Run func (a handler or entry point) inside a request scope"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with request_scope():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def load(name: str, key: Hashable, batch_load: BatchLoadFn) -> Optional[Any]:
+    """Item for key through the request's loader for name (a direct read outside a scope)"""
+    scope = _current_scope.get()
+    if scope is None:
+        return batch_load([key]).get(key)
+    return scope.loader(name, batch_load).load(key)
+
+
+def load_many(name: str, keys: Iterable[Hashable], batch_load: BatchLoadFn) -> Dict[Hashable, Optional[Any]]:
+    """Items for keys through the request's loader for name (one uncached batch outside a scope)"""
+    scope = _current_scope.get()
+    if scope is None:
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), MAX_BATCH_SIZE):
+            found.update(batch_load(keys[start:start + MAX_BATCH_SIZE]))
+        return {key: found.get(key) for key in keys}
+    return scope.loader(name, batch_load).load_many(keys)
+
+
+def invalidate(name: str, key: Hashable):
+    """Forget a cached item after writing it (no-op outside a scope)"""
+    scope = _current_scope.get()
+    if scope is not None and name in scope.loaders:
+        scope.loaders[name].clear(key)
@@ -0,0 +1,240 @@
+"""
+Retention Sweeper
+Scheduled enforcement of the 1-year retention policy: walks the assessment history,
+profile and session tables in parallel scan segments, prunes expired history and leftover
+conversation data in batches, and keeps writes within a write-capacity budget
+"""
+
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List
+
+from botocore.exceptions import ClientError
+
+from conversation_data_retention import CONVERSATION_DATA_KEYS, active_history_records, strip_conversation_data
+
+logger = logging.getLogger(__name__)
+
+# Parallel scan segments per table
+DEFAULT_TOTAL_SEGMENTS = 4
+
+# Write capacity units per second the sweep may consume across all segments
+DEFAULT_WCU_BUDGET = 25.0
+
+SCAN_PAGE_SIZE = 100
+
+# BatchWriteItem accepts at most 25 requests per call
+BATCH_WRITE_LIMIT = 25
+MAX_UNPROCESSED_RETRIES = 6
+RETRY_BASE_DELAY_SECONDS = 0.05
+
+
+class WriteBudget:
+    """
+    Token bucket of write capacity units shared by all sweep workers
+
+    Writes acquire an estimate up front; the capacity DynamoDB reports as consumed is then
+    settled against the bucket, so larger-than-estimated items are paid for by later writes.
+    """
+
+    def __init__(self, units_per_second: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = float(units_per_second)
+        self.tokens = self.rate
+        self.consumed = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.rate, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, units: float):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= units or self.tokens >= self.rate:
+                    self.tokens -= units
+                    self.consumed += units
+                    return
+                wait = (min(units, self.rate) - self.tokens) / self.rate
+            self._sleep(wait)
+
+    def settle(self, estimated: float, response: Dict[str, Any]):
+        """Charge the difference between the estimate and the reported ConsumedCapacity"""
+        capacity = response.get('ConsumedCapacity')
+        if isinstance(capacity, list):
+            actual = sum(entry.get('CapacityUnits', 0) for entry in capacity)
+        elif capacity:
+            actual = capacity.get('CapacityUnits', estimated)
+        else:
+            return
+        with self._lock:
+            self.tokens -= actual - estimated
+            self.consumed += actual - estimated
+
+
+def parallel_scan_segment(table, segment: int, total_segments: int, **scan_kwargs) -> Iterator[List[Dict[str, Any]]]:
+    """Pages of one Segment of a parallel Scan"""
+    scan_kwargs.update(Segment=segment, TotalSegments=total_segments, Limit=SCAN_PAGE_SIZE)
+    while True:
+        response = table.scan(**scan_kwargs)
+        yield response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+class RetentionSweeper:
+    """Prunes expired retention data for all users, active or not"""
+
+    def __init__(self, question_dal, total_segments: int = DEFAULT_TOTAL_SEGMENTS,
+                 wcu_per_second: float = DEFAULT_WCU_BUDGET):
+        self.dal = question_dal
+        self.client = question_dal.dynamodb.meta.client
+        self.total_segments = max(1, total_segments)
+        self.budget = WriteBudget(wcu_per_second)
+
+    def _batch_delete(self, table_name: str, keys: List[Dict[str, Any]]) -> int:
+        requests = [{'DeleteRequest': {'Key': key}} for key in keys]
+        attempt = 0
+        while requests:
+            self.budget.acquire(len(requests))
+            estimated = len(requests)
+            response = self.client.batch_write_item(RequestItems={table_name: requests},
+                                                    ReturnConsumedCapacity='TOTAL')
+            self.budget.settle(estimated, response)
+            requests = response.get('UnprocessedItems', {}).get(table_name, [])
+            if requests:
+                attempt += 1
+                if attempt > MAX_UNPROCESSED_RETRIES:
+                    raise RuntimeError(f"{len(requests)} deletes left unprocessed in {table_name}")
+                time.sleep(RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1)))
+        return len(keys)
+
+    def sweep_history_segment(self, segment: int, now: int) -> Dict[str, int]:
+        """Delete history items past expires_at that TTL has not removed yet"""
+        counts = {'scanned': 0, 'pruned': 0}
+        pending: List[Dict[str, Any]] = []
+        pages = parallel_scan_segment(
+            self.dal.history_table, segment, self.total_segments,
+            FilterExpression='expires_at < :now',
+            ProjectionExpression='user_email, recorded_at',
+            ExpressionAttributeValues={':now': now}
+        )
+        for items in pages:
+            counts['scanned'] += len(items)
+            pending.extend(items)
+            while len(pending) >= BATCH_WRITE_LIMIT:
+                counts['pruned'] += self._batch_delete(self.dal.history_table_name, pending[:BATCH_WRITE_LIMIT])
+                pending = pending[BATCH_WRITE_LIMIT:]
+        if pending:
+            counts['pruned'] += self._batch_delete(self.dal.history_table_name, pending)
+        return counts
+
+    def sweep_profiles_segment(self, segment: int, now: datetime) -> Dict[str, int]:
+        """Prune expired records from profiles still carrying an embedded assessment_history"""
+        counts = {'scanned': 0, 'pruned': 0, 'profiles_updated': 0}
+        pages = parallel_scan_segment(
+            self.dal.profiles_table, segment, self.total_segments,
+            FilterExpression='attribute_exists(assessment_history)'
+        )
+        for profiles in pages:
+            for profile in profiles:
+                counts['scanned'] += 1
+                history = profile.get('assessment_history', [])
+                active = active_history_records(history, now)
+                if len(active) == len(history):
+                    continue
+                # Only rewrite the list if nobody updated the profile since it was scanned
+                self.budget.acquire(1)
+                try:
+                    response = self.dal.profiles_table.update_item(
+                        Key={'user_email': profile['user_email']},
+                        UpdateExpression='SET assessment_history = :active, last_updated = :now',
+                        ConditionExpression='last_updated = :seen' if 'last_updated' in profile
+                        else 'attribute_not_exists(last_updated)',
+                        ExpressionAttributeValues={':active': active, ':now': now.isoformat(),
+                                                   **({':seen': profile['last_updated']}
+                                                      if 'last_updated' in profile else {})},
+                        ReturnConsumedCapacity='TOTAL'
+                    )
+                except ClientError as e:
+                    if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                        continue  # Picked up by the next sweep
+                    raise
+                self.budget.settle(1, response)
+                counts['pruned'] += len(history) - len(active)
+                counts['profiles_updated'] += 1
+        return counts
+
+    def sweep_sessions_segment(self, segment: int, now: datetime) -> Dict[str, int]:
+        """Strip conversation data left on completed sessions"""
+        counts = {'scanned': 0, 'pruned': 0}
+        names = {f'#c{i}': key for i, key in enumerate(CONVERSATION_DATA_KEYS)}
+        has_conversation = ' OR '.join(f'attribute_exists({name})' for name in names)
+        pages = parallel_scan_segment(
+            self.dal.sessions_table, segment, self.total_segments,
+            FilterExpression=f'#status = :completed AND ({has_conversation})',
+            ProjectionExpression='session_id',
+            ExpressionAttributeNames={'#status': 'status', **names},
+            ExpressionAttributeValues={':completed': 'completed'}
+        )
+        for sessions in pages:
+            for session in sessions:
+                counts['scanned'] += 1
+                self.budget.acquire(1)
+                response = strip_conversation_data(self.dal.sessions_table, session['session_id'], now)
+                if response is not None:
+                    self.budget.settle(1, response)
+                    counts['pruned'] += 1
+        return counts
+
+    def sweep(self) -> Dict[str, Any]:
+        """Run every table's segments in parallel and report per-table counts"""
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        tasks = {
+            self.dal.history_table_name: (self.sweep_history_segment, int(now.timestamp())),
+            self.dal.profiles_table_name: (self.sweep_profiles_segment, now),
+            self.dal.sessions_table_name: (self.sweep_sessions_segment, now),
+        }
+        report: Dict[str, Any] = {'tables': {}, 'errors': []}
+        with ThreadPoolExecutor(max_workers=self.total_segments * len(tasks),
+                                thread_name_prefix='retention-sweep') as executor:
+            futures = {
+                executor.submit(sweep_segment, segment, argument): table_name
+                for table_name, (sweep_segment, argument) in tasks.items()
+                for segment in range(self.total_segments)
+            }
+            for future, table_name in futures.items():
+                totals = report['tables'].setdefault(table_name, {})
+                try:
+                    for key, value in future.result().items():
+                        totals[key] = totals.get(key, 0) + value
+                except Exception as e:
+                    logger.error(f"Retention sweep of {table_name} failed: {e}")
+                    report['errors'].append(f'{table_name}: {e}')
+
+        report['wcu_consumed'] = round(self.budget.consumed, 1)
+        report['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return report
+
+
+def retention_sweep_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled Lambda: enforce conversation data retention across all users"""
+    from question_bank_dal import get_question_bank_dal
+    event = event or {}
+    sweeper = RetentionSweeper(get_question_bank_dal(),
+                               total_segments=int(event.get('total_segments', DEFAULT_TOTAL_SEGMENTS)),
+                               wcu_per_second=float(event.get('wcu_per_second', DEFAULT_WCU_BUDGET)))
+    report = sweeper.sweep()
+    logger.info(f"Retention sweep: {report}")
+    return {'statusCode': 500 if report['errors'] else 200, 'body': json.dumps(report)}
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Offline Calibration and Regression Benchmark for IELTS Band Scoring
+Runs a deterministic labeled corpus through every scorer, reports throughput, latency
+percentiles, band distributions and agreement with reference bands, and fails when
+bands shift against the stored baseline
+
+Usage:
+    python scoring_benchmark.py                    # compare against the baseline
+    python scoring_benchmark.py --update-baseline  # accept current scores as the baseline
+    python scoring_benchmark.py --batch            # also time batch band scoring against per-session
+
+Record the baseline from the scorer as it was before a change (e.g. in a git worktree of
+the parent commit), then run the comparison on the change; a baseline recorded after the
+change would accept any shift it introduced.
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import statistics
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_benchmark_baseline.json')
+KNOWLEDGE_BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge_base_export')
+
+REFERENCE_BANDS = [4.0, 4.5, 5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5]
+
+# Synthetic text is assembled from these pools; higher reference bands draw more from the richer pools
+BASIC_WORDS = (
+    "people think good bad many things time work life city home family friends like very really "
+    "important because also more some help make get go see know want use day year place way"
+).split()
+ADVANCED_WORDS = (
+    "significant approximately dramatically proportion accommodation correspondingly predominant "
+    "multicultural responsibilities conservation authentic sustainable environmentally comprehensive "
+    "globalized substantial perspective consequently infrastructure"
+).split()
+COHESIVE_DEVICES = [
+    'Firstly,', 'Secondly,', 'Moreover,', 'Furthermore,', 'In addition,', 'However,',
+    'Nevertheless,', 'In conclusion,', 'Overall,'
+]
+COMPLEX_FRAMES = [
+    'which is', 'that requires', 'have been', 'although', 'despite', 'having', 'would', 'could', 'because'
+]
+WRITING_PROMPTS = {
+    'academic-writing': [
+        "The chart shows the proportion of household income spent on accommodation in five countries.",
+        "Some people believe universities should focus on job skills. To what extent do you agree?",
+        "The graph illustrates energy consumption by source between 1990 and 2020."
+    ],
+    'general-writing': [
+        "Write a letter to your landlord about a problem with your accommodation.",
+        "Some people prefer to live in a big city, while others prefer small towns. Discuss both views.",
+        "Write a letter to a friend inviting them to visit your hometown."
+    ]
+}
+STAGES = ['part1_questions', 'part2_speaking', 'part3_discussion']
+
+_QUESTION_RE = re.compile(r'^\s*\d+\.\s+(.*\S)\s*$')
+
+
+def load_knowledge_base_questions() -> List[str]:
+    """Speaking questions from knowledge_base_export, used as prompts for the speaking corpus"""
+    questions = []
+    for part in (1, 2, 3):
+        path = os.path.join(KNOWLEDGE_BASE_DIR, f'speaking_part_{part}_questions.txt')
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            questions.extend(m.group(1) for m in map(_QUESTION_RE.match, f) if m)
+    return questions or ["Tell me about your hometown."]
+
+
+def _prompt_words(prompt: str) -> List[str]:
+    return [w.lower() for w in re.findall(r"[A-Za-z]+", prompt) if len(w) > 4]
+
+
+def _sentence(rng: random.Random, band: float, topic_words: List[str], length: int) -> str:
+    """One synthetic sentence whose vocabulary and structure scale with the reference band"""
+    richness = (band - 4.0) / 5.0
+    words = []
+    for _ in range(length):
+        roll = rng.random()
+        if roll < richness * 0.25:
+            words.append(rng.choice(ADVANCED_WORDS))
+        elif roll < 0.35 and topic_words:
+            words.append(rng.choice(topic_words))
+        else:
+            words.append(rng.choice(BASIC_WORDS))
+    if rng.random() < richness:
+        words.insert(rng.randrange(len(words)), rng.choice(COMPLEX_FRAMES))
+    if rng.random() < richness:
+        words.insert(0, rng.choice(COHESIVE_DEVICES))
+    text = ' '.join(words)
+    return text[0].upper() + text[1:] + '.'
+
+
+def generate_writing_corpus(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Labeled synthetic essays spread evenly over the reference bands"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        band = REFERENCE_BANDS[i % len(REFERENCE_BANDS)]
+        assessment_type = rng.choice(list(WRITING_PROMPTS))
+        prompt = rng.choice(WRITING_PROMPTS[assessment_type])
+        topic_words = _prompt_words(prompt)
+        paragraphs = []
+        target_words = int(110 + (band - 4.0) * 45 + rng.randint(-20, 20))
+        paragraph_count = 2 + int(band >= 5.5) + int(band >= 7.0)
+        sentence_length = int(8 + (band - 4.0) * 2)
+        for _ in range(paragraph_count):
+            sentences = []
+            for _ in range(max(1, target_words // paragraph_count // sentence_length)):
+                sentences.append(_sentence(rng, band, topic_words, max(4, sentence_length + rng.randint(-3, 3))))
+            paragraphs.append(' '.join(sentences))
+        corpus.append({
+            'id': f'writing-{i:05d}',
+            'reference_band': band,
+            'assessment_type': assessment_type,
+            'prompt': prompt,
+            'text': '\n\n'.join(paragraphs)
+        })
+    return corpus
+
+
+def generate_speaking_corpus(count: int, seed: int, questions: List[str]) -> List[Dict[str, Any]]:
+    """Labeled synthetic speaking sessions (Maya conversation shape plus a joined transcript)"""
+    rng = random.Random(seed + 1)
+    corpus = []
+    for i in range(count):
+        band = REFERENCE_BANDS[i % len(REFERENCE_BANDS)]
+        responses = []
+        for _ in range(rng.randint(8, 14)):
+            stage = rng.choice(STAGES)
+            question = rng.choice(questions)
+            base_length = {'part1_questions': 25, 'part2_speaking': 170, 'part3_discussion': 55}[stage]
+            length = max(3, int(base_length * (0.45 + (band - 4.0) * 0.13) + rng.randint(-5, 5)))
+            sentences = []
+            remaining = length
+            while remaining > 0:
+                size = min(remaining, max(4, int(6 + (band - 4.0) * 2) + rng.randint(-2, 2)))
+                sentences.append(_sentence(rng, band, _prompt_words(question), size))
+                remaining -= size
+            text = ' '.join(sentences)
+            words_per_minute = 80 + (band - 4.0) * 16 + rng.uniform(-10, 10)
+            word_count = len(text.split())
+            responses.append({
+                'stage': stage,
+                'text': text,
+                'word_count': word_count,
+                'duration': word_count / words_per_minute * 60
+            })
+        notes = []
+        if band < 5.5:
+            notes.append({'criterion': 'Fluency and Coherence', 'note': 'Slow speech rate - may indicate hesitation'})
+        if band < 5.0:
+            notes.append({'criterion': 'Pronunciation', 'note': 'Some unclear sounds require listener effort'})
+        corpus.append({
+            'id': f'speaking-{i:05d}',
+            'reference_band': band,
+            'assessment_type': rng.choice(['academic_speaking', 'general_speaking']),
+            'conversation': {
+                'session_id': f'benchmark-speaking-{i:05d}',
+                'user_responses': responses,
+                'evaluation_notes': notes
+            },
+            'transcript': ' '.join(r['text'] for r in responses)
+        })
+    return corpus
+
+
+def _scorers() -> Dict[str, Tuple[str, Callable[[Dict[str, Any]], float]]]:
+    """Scorer name -> (corpus kind, item -> overall band)"""
+    from lambda_handler import (
+        evaluate_writing_with_nova_micro, evaluate_speaking_with_nova_micro,
+        get_fallback_writing_rubric, get_fallback_speaking_rubric
+    )
+    from ielts_band_scoring import IELTSBandScorer
+
+    scorer = IELTSBandScorer()
+    writing_rubrics = {t: get_fallback_writing_rubric(t) for t in WRITING_PROMPTS}
+    speaking_rubric = get_fallback_speaking_rubric('academic_speaking')
+
+    def nova_micro_writing(item):
+        rubric = writing_rubrics[item['assessment_type']]
+        return evaluate_writing_with_nova_micro(item['text'], item['prompt'], rubric, item['assessment_type'])['overall_band']
+
+    def nova_micro_speaking(item):
+        return evaluate_speaking_with_nova_micro(item['transcript'], speaking_rubric, item['assessment_type'])['overall_band']
+
+    def band_scorer(item):
+        return scorer.evaluate_speaking_assessment(item['conversation'])['overall_band_score']
+
+    return {
+        'nova_micro_writing': ('writing', nova_micro_writing),
+        'nova_micro_speaking': ('speaking', nova_micro_speaking),
+        'band_scorer_speaking': ('speaking', band_scorer)
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct * len(sorted_values) / 100.0))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_scorer(score: Callable[[Dict[str, Any]], float], corpus: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Score every item, timing each call"""
+    bands = {}
+    latencies = []
+    started = time.perf_counter()
+    for item in corpus:
+        call_started = time.perf_counter()
+        bands[item['id']] = float(score(item))
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = [bands[item['id']] - item['reference_band'] for item in corpus]
+    absolute = [abs(e) for e in errors]
+    return {
+        'bands': bands,
+        'metrics': {
+            'items': len(corpus),
+            'items_per_second': round(len(corpus) / elapsed, 1) if elapsed else 0.0,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 50), 3),
+                'p90': round(percentile(latencies, 90), 3),
+                'p99': round(percentile(latencies, 99), 3),
+                'max': round(latencies[-1], 3) if latencies else 0.0
+            },
+            'band_distribution': {str(b): n for b, n in sorted(Counter(bands.values()).items())},
+            'agreement': {
+                'exact': round(sum(1 for a in absolute if a == 0) / len(corpus), 4),
+                'within_half_band': round(sum(1 for a in absolute if a <= 0.5) / len(corpus), 4),
+                'within_one_band': round(sum(1 for a in absolute if a <= 1.0) / len(corpus), 4),
+                'mean_absolute_error': round(statistics.mean(absolute), 4),
+                'bias': round(statistics.mean(errors), 4)
+            }
+        }
+    }
+
+
+def compare_to_baseline(name: str, result: Dict[str, Any], baseline: Dict[str, Any],
+                        max_shifted: int, max_slowdown: Optional[float]) -> List[str]:
+    """Return regression messages for one scorer"""
+    failures = []
+    expected = baseline.get('bands', {})
+    shifted = [(item_id, expected[item_id], band) for item_id, band in result['bands'].items()
+               if item_id in expected and expected[item_id] != band]
+    if len(shifted) > max_shifted:
+        examples = ', '.join(f"{item_id}: {old} -> {new}" for item_id, old, new in shifted[:5])
+        failures.append(f"{name}: {len(shifted)} band(s) shifted (allowed {max_shifted}) - {examples}")
+
+    missing = set(expected) - set(result['bands'])
+    if missing:
+        failures.append(f"{name}: {len(missing)} baseline item(s) were not scored")
+
+    if max_slowdown is not None:
+        baseline_rate = baseline.get('metrics', {}).get('items_per_second')
+        current_rate = result['metrics']['items_per_second']
+        if baseline_rate and current_rate < baseline_rate * (1 - max_slowdown):
+            failures.append(f"{name}: throughput {current_rate}/s is more than {max_slowdown:.0%} "
+                            f"below baseline {baseline_rate}/s")
+    return failures
+
+
+def run_batch_comparison(corpus: List[Dict[str, Any]], repeat: int = 5) -> Dict[str, Any]:
+    """Time IELTSBandScorer per-session scoring against score_sessions_batch on the speaking corpus"""
+    from ielts_band_scoring import IELTSBandScorer, ScoringCriterion
+
+    scorer = IELTSBandScorer()
+    conversations = [item['conversation'] for item in corpus]
+
+    def per_session():
+        return [
+            {criterion.value: scorer.evaluate_criterion(
+                criterion, c['user_responses'], c['evaluation_notes'])[0] for criterion in ScoringCriterion}
+            for c in conversations
+        ]
+
+    def batch():
+        return [result['criterion_scores'] for result in scorer.score_sessions_batch(conversations)]
+
+    timings = {}
+    outputs = {}
+    # Interleave the runs and keep the best of each, so machine noise affects both paths alike
+    for _ in range(repeat):
+        for name, run in (('per_session', per_session), ('batch', batch)):
+            started = time.perf_counter()
+            outputs[name] = run()
+            elapsed = time.perf_counter() - started
+            timings[name] = min(elapsed, timings.get(name, elapsed))
+
+    return {
+        'sessions': len(conversations),
+        'per_session_per_second': round(len(conversations) / timings['per_session'], 1),
+        'batch_per_second': round(len(conversations) / timings['batch'], 1),
+        'speed_up': round(timings['per_session'] / timings['batch'], 2),
+        'mismatched_sessions': sum(1 for a, b in zip(outputs['per_session'], outputs['batch']) if a != b)
+    }
+
+
+def print_report(name: str, metrics: Dict[str, Any]):
+    latency = metrics['latency_ms']
+    agreement = metrics['agreement']
+    print(f"\n{name}")
+    print(f"  items: {metrics['items']}  throughput: {metrics['items_per_second']:,.1f}/s")
+    print(f"  latency ms: p50 {latency['p50']}  p90 {latency['p90']}  p99 {latency['p99']}  max {latency['max']}")
+    print(f"  agreement: exact {agreement['exact']:.1%}  ±0.5 {agreement['within_half_band']:.1%}  "
+          f"±1.0 {agreement['within_one_band']:.1%}  MAE {agreement['mean_absolute_error']}  bias {agreement['bias']:+}")
+    print(f"  bands: {metrics['band_distribution']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='IELTS band scoring calibration and regression benchmark')
+    parser.add_argument('--writing-items', type=int, default=500, help='Synthetic essays in the corpus')
+    parser.add_argument('--speaking-items', type=int, default=300, help='Synthetic speaking sessions in the corpus')
+    parser.add_argument('--seed', type=int, default=20250601, help='Corpus seed (must match the baseline)')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Write current results as the new baseline')
+    parser.add_argument('--max-shifted', type=int, default=0, help='Items allowed to change band before failing')
+    parser.add_argument('--max-slowdown', type=float, default=None,
+                        help='Fail if throughput drops by more than this fraction of the baseline (e.g. 0.3)')
+    parser.add_argument('--scorer', action='append', help='Only run the named scorer(s)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Also compare batch band scoring (score_sessions_batch) with per-session scoring')
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    questions = load_knowledge_base_questions()
+    corpora = {
+        'writing': generate_writing_corpus(args.writing_items, args.seed),
+        'speaking': generate_speaking_corpus(args.speaking_items, args.seed, questions)
+    }
+
+    scorers = _scorers()
+    selected = args.scorer or list(scorers)
+
+    results = {}
+    for name in selected:
+        kind, score = scorers[name]
+        # The scorers print per-call diagnostics; keep the report readable
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            results[name] = run_scorer(score, corpora[kind])
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        print_report(name, results[name]['metrics'])
+
+    batch_failures = []
+    if args.batch:
+        comparison = run_batch_comparison(corpora['speaking'])
+        print("\nband_scorer_speaking batch vs per-session")
+        print(f"  sessions: {comparison['sessions']}  per-session: {comparison['per_session_per_second']:,.1f}/s  "
+              f"batch: {comparison['batch_per_second']:,.1f}/s  speed-up: {comparison['speed_up']}x")
+        if comparison['mismatched_sessions']:
+            batch_failures.append(f"score_sessions_batch: {comparison['mismatched_sessions']} session(s) "
+                                  f"scored differently from per-session scoring")
+
+    if args.update_baseline:
+        baseline = {'seed': args.seed, 'scorers': results}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                previous = json.load(f)
+            if previous.get('seed') == args.seed:
+                previous['scorers'].update(results)
+                baseline = previous
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline} - run with --update-baseline first")
+        return 1
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('seed') != args.seed:
+        print(f"\nBaseline was recorded with seed {baseline.get('seed')}, not {args.seed}")
+        return 1
+
+    failures = batch_failures
+    for name, result in results.items():
+        if name not in baseline['scorers']:
+            failures.append(f"{name}: no baseline recorded")
+            continue
+        failures.extend(compare_to_baseline(name, result, baseline['scorers'][name],
+                                            args.max_shifted, args.max_slowdown))
+
+    if failures:
+        print("\nREGRESSIONS:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+
+    print("\nNo band shifts against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,6 +14,7 @@ from enum import Enum
 from flask import session, g
 from dynamodb_dal import get_dal
 from assessment_encryption import get_assessment_encryption
+from auto_advance_scheduler import AutoAdvanceTimer, get_auto_advance_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -180,6 +181,7 @@ class AssessmentSessionManager:
     def __init__(self):
         self.dal = get_dal()
         self.encryption = get_assessment_encryption()
+        self.scheduler = get_auto_advance_scheduler()
     
     def create_session(self, user_id: str, assessment_type: str, 
                       entitlement_id: str = None) -> Optional[SessionState]:
@@ -341,7 +343,7 @@ class AssessmentSessionManager:
                 
                 # Set up auto-advance if enabled
                 if section_config.auto_advance:
-                    self._schedule_auto_advance(session_id, section_id, timer.expires_at)
+                    self._schedule_auto_advance(session_id, user_id, section_id, timer.expires_at)
             
             return success
             
@@ -374,6 +376,8 @@ class AssessmentSessionManager:
             # Complete the section
             session_state.section_progress[section_id] = SectionStatus.COMPLETED
             timer = session_state.timers[section_id]
+            if timer.auto_advance_at:
+                self.scheduler.cancel(session_id, section_id)
             
             if timer.started_at:
                 elapsed = (datetime.utcnow() - timer.started_at).total_seconds()
@@ -436,13 +440,10 @@ class AssessmentSessionManager:
             if not timer or not timer.started_at:
                 return timer.time_remaining if timer else None
             
-            # Calculate real-time remaining
-            elapsed = (datetime.utcnow() - timer.started_at).total_seconds()
-            elapsed -= timer.paused_duration
+            # Remaining time from the section deadline (expiry itself is driven by the scheduler)
+            remaining = self._remaining_seconds(timer)
             
-            remaining = max(0, timer.time_remaining - elapsed)
-            
-            # Auto-advance if time expired
+            # Auto-advance if time expired and the scheduler has not fired yet
             if remaining == 0 and session_state.section_progress[target_section] == SectionStatus.IN_PROGRESS:
                 self._auto_advance_section(session_id, user_id, target_section)
             
@@ -462,13 +463,20 @@ class AssessmentSessionManager:
             session_state.status = SessionStatus.PAUSED
             
             # Pause current section timer
+            timer = None
             if session_state.current_section:
                 timer = session_state.timers[session_state.current_section]
                 timer.paused_at = datetime.utcnow()
             
             session_state.updated_at = datetime.utcnow()
             
-            return self._store_session_state(session_state)
+            success = self._store_session_state(session_state)
+            
+            # A paused section must not auto-advance; resume_session schedules it again
+            if success and timer and timer.auto_advance_at:
+                self.scheduler.cancel(session_id, session_state.current_section)
+            
+            return success
             
         except Exception as e:
             logger.error(f"Failed to pause session: {e}")
@@ -483,17 +491,27 @@ class AssessmentSessionManager:
             
             session_state.status = SessionStatus.IN_PROGRESS
             
-            # Resume current section timer
+            # Resume current section timer, moving its deadline out by the time spent paused
+            timer = None
             if session_state.current_section:
                 timer = session_state.timers[session_state.current_section]
                 if timer.paused_at:
                     pause_duration = (datetime.utcnow() - timer.paused_at).total_seconds()
                     timer.paused_duration += pause_duration
                     timer.paused_at = None
+                if timer.started_at:
+                    timer.expires_at = timer.started_at + timedelta(seconds=timer.time_remaining + timer.paused_duration)
+                    if timer.auto_advance_at:
+                        timer.auto_advance_at = timer.expires_at
             
             session_state.updated_at = datetime.utcnow()
             
-            return self._store_session_state(session_state)
+            success = self._store_session_state(session_state)
+            
+            if success and timer and timer.auto_advance_at:
+                self._schedule_auto_advance(session_id, user_id, session_state.current_section, timer.auto_advance_at)
+            
+            return success
             
         except Exception as e:
             logger.error(f"Failed to resume session: {e}")
@@ -506,6 +524,10 @@ class AssessmentSessionManager:
             if not session_state:
                 return
             
+            # Already completed or advanced (timers are delivered at least once)
+            if session_state.section_progress.get(section_id) != SectionStatus.IN_PROGRESS:
+                return
+            
             # Mark section as expired and advance
             session_state.section_progress[section_id] = SectionStatus.EXPIRED
             
@@ -516,10 +538,20 @@ class AssessmentSessionManager:
         except Exception as e:
             logger.error(f"Auto-advance failed: {e}")
     
-    def _schedule_auto_advance(self, session_id: str, section_id: str, advance_time: datetime):
-        """Schedule auto-advance (implementation depends on job scheduler)"""
-        # In a real implementation, this would use AWS Lambda scheduled events
-        # or a job queue like Celery for auto-advance functionality
+    def advance_expired_sections(self, timers: List[AutoAdvanceTimer]):
+        """Auto-advance a batch of expired sections (timer wheel or sweeper callback)"""
+        for timer in timers:
+            self._auto_advance_section(timer.session_id, timer.user_id, timer.section_id)
+        logger.info(f"Auto-advanced {len(timers)} expired sections")
+    
+    def _remaining_seconds(self, timer: SessionTimer) -> float:
+        """Seconds left on a section timer (frozen while the session is paused)"""
+        deadline = timer.started_at + timedelta(seconds=timer.time_remaining + timer.paused_duration)
+        return max(0.0, (deadline - (timer.paused_at or datetime.utcnow())).total_seconds())
+    
+    def _schedule_auto_advance(self, session_id: str, user_id: str, section_id: str, advance_time: datetime):
+        """Schedule auto-advance in the due-time index (and the worker's timer wheel)"""
+        self.scheduler.schedule(session_id, user_id, section_id, advance_time)
         logger.info(f"Scheduled auto-advance for {session_id}/{section_id} at {advance_time}")
     
     def _generate_session_id(self, user_id: str, assessment_type: str) -> str:
@@ -610,4 +642,11 @@ def create_assessment_session(user_id: str, assessment_type: str,
 def get_session_time_remaining(session_id: str, user_id: str, 
                              section_id: str = None) -> Optional[int]:
     """Convenience function to get time remaining"""
-    return get_session_manager().get_time_remaining(session_id, user_id, section_id)
\ No newline at end of file
+    return get_session_manager().get_time_remaining(session_id, user_id, section_id)
+
+def auto_advance_sweep_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled Lambda: advance every section whose time has expired"""
+    manager = get_session_manager()
+    stats = manager.scheduler.sweep(manager.advance_expired_sections)
+    logger.info(f"Auto-advance sweep: {stats}")
+    return {'statusCode': 200, 'body': json.dumps(stats)}
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Assessment Attempt Consumption Tests
+The conditional consume must never hand out more attempts than were purchased, however
+many submissions race for the last ones
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aws_mock_config import AWSMockServices
+
+
+@pytest.mark.unit
+class TestConditionalConsume:
+    """Test attempt consumption under concurrency"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.services = AWSMockServices()
+        self.user_email = 'racer@example.com'
+        self.services.users_table.put_item({
+            'email': self.user_email,
+            'purchases': [
+                {'assessment_type': 'academic_writing', 'assessments_remaining': 4, 'assessments_used': 0},
+                {'assessment_type': 'general_writing', 'assessments_remaining': 2, 'assessments_used': 0}
+            ]
+        })
+
+    def purchase(self, assessment_type):
+        user = self.services.users_table.get_item(self.user_email)
+        return next(p for p in user['purchases'] if p['assessment_type'] == assessment_type)
+
+    def test_01_sequential_consumption(self):
+        """Test 1: Each consume returns the attempts left and stops at zero"""
+        results = [self.services.consume_assessment_attempt(self.user_email, 'academic_writing') for _ in range(6)]
+
+        assert results == [3, 2, 1, 0, None, None]
+        assert self.purchase('academic_writing')['assessments_used'] == 4
+        assert self.purchase('general_writing')['assessments_remaining'] == 2
+
+    def test_02_concurrent_submissions_race_for_the_last_attempts(self):
+        """Test 2: Of many simultaneous consumes exactly the purchased number succeed"""
+        start = threading.Barrier(32)
+
+        def consume(_):
+            start.wait()
+            return self.services.consume_assessment_attempt(self.user_email, 'academic_writing')
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            results = list(executor.map(consume, range(32)))
+
+        successes = sorted(result for result in results if result is not None)
+        assert successes == [0, 1, 2, 3]
+        assert results.count(None) == 28
+        assert self.purchase('academic_writing')['assessments_remaining'] == 0
+        assert self.purchase('academic_writing')['assessments_used'] == 4
+
+    def test_03_unknown_user_or_product(self):
+        """Test 3: Nothing is consumed without a matching purchase"""
+        assert self.services.consume_assessment_attempt('nobody@example.com', 'academic_writing') is None
+        assert self.services.consume_assessment_attempt(self.user_email, 'academic_speaking') is None
+        assert self.purchase('academic_writing')['assessments_remaining'] == 4
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Assessment History Paging Tests
+Opaque cursors and newest-first paging through a user's assessment results
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from aws_mock_config import AWSMockServices
+from pagination import (clamp_page_size, decode_cursor, encode_cursor, HISTORY_SUMMARY_FIELDS,
+                        MAX_PAGE_SIZE)
+
+
+@pytest.mark.unit
+class TestCursors:
+    """Test cursor encoding"""
+
+    def test_01_cursor_round_trip(self):
+        """Test 1: A LastEvaluatedKey survives encoding as a URL-safe cursor"""
+        key = {'user_email': 'a@example.com', 'timestamp': '2025-01-02T03:04:05', 'assessment_id': 'x/y+z'}
+        cursor = encode_cursor(key)
+
+        assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+        assert decode_cursor(cursor) == key
+
+    def test_02_no_more_pages(self):
+        """Test 2: An empty LastEvaluatedKey has no cursor and no cursor means the first page"""
+        assert encode_cursor(None) is None
+        assert encode_cursor({}) is None
+        assert decode_cursor(None) is None
+
+    def test_03_malformed_cursor(self):
+        """Test 3: Tampered cursors are rejected"""
+        for cursor in ('not-base64!', encode_cursor({'a': 1})[:-3], 'WzEsMl0'):  # last one decodes to a list
+            with pytest.raises(ValueError):
+                decode_cursor(cursor)
+
+    def test_04_page_size_is_clamped(self):
+        """Test 4: Page sizes stay within 1..MAX_PAGE_SIZE"""
+        assert clamp_page_size(None) == clamp_page_size(0) > 0
+        assert clamp_page_size(-5) == 1
+        assert clamp_page_size(MAX_PAGE_SIZE * 10) == MAX_PAGE_SIZE
+
+
+@pytest.mark.unit
+class TestAssessmentHistoryPaging:
+    """Test query_assessment_history paging"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.services = AWSMockServices()
+        self.user_email = 'history@example.com'
+        start = datetime(2025, 1, 1)
+        for i in range(23):
+            self.services.store_assessment_result({
+                'assessment_id': f'result-{i:02d}',
+                'user_email': self.user_email,
+                'assessment_type': 'academic_writing',
+                'overall_band': 6.5,
+                'essay_text': 'not part of the summary',
+                'timestamp': (start + timedelta(hours=i)).isoformat()
+            })
+        # Another user's results never appear in the pages
+        self.services.store_assessment_result({'assessment_id': 'other', 'user_email': 'other@example.com',
+                                               'timestamp': start.isoformat()})
+
+    def all_pages(self, limit, **kwargs):
+        pages, cursor = [], None
+        while True:
+            page = self.services.query_assessment_history(self.user_email, limit=limit, cursor=cursor, **kwargs)
+            pages.append(page['items'])
+            cursor = page['next_cursor']
+            if not cursor:
+                return pages
+
+    def test_01_pages_cover_every_result_once_newest_first(self):
+        """Test 1: Following next_cursor returns every result exactly once, newest first"""
+        pages = self.all_pages(10)
+        ids = [item['assessment_id'] for page in pages for item in page]
+
+        assert [len(page) for page in pages] == [10, 10, 3]
+        assert ids == [f'result-{i:02d}' for i in reversed(range(23))]
+
+    def test_02_exact_multiple_of_page_size(self):
+        """Test 2: The last page has no cursor when the results divide evenly"""
+        self.services.store_assessment_result({'assessment_id': 'result-23', 'user_email': self.user_email,
+                                               'timestamp': datetime(2025, 1, 2).isoformat()})
+        pages = self.all_pages(8)
+
+        assert [len(page) for page in pages] == [8, 8, 8]
+
+    def test_03_projection(self):
+        """Test 3: Summary projection drops attributes the history views do not render"""
+        item = self.services.query_assessment_history(self.user_email, limit=1,
+                                                      projection=HISTORY_SUMMARY_FIELDS)['items'][0]
+
+        assert 'essay_text' not in item
+        assert set(item) <= set(HISTORY_SUMMARY_FIELDS)
+
+    def test_04_new_results_do_not_shift_later_pages(self):
+        """Test 4: A result stored mid-paging does not duplicate or skip older results"""
+        first = self.services.query_assessment_history(self.user_email, limit=10)
+        self.services.store_assessment_result({'assessment_id': 'newest', 'user_email': self.user_email,
+                                               'timestamp': datetime(2026, 1, 1).isoformat()})
+        second = self.services.query_assessment_history(self.user_email, limit=10, cursor=first['next_cursor'])
+
+        assert [item['assessment_id'] for item in second['items']] == \
+            [f'result-{i:02d}' for i in reversed(range(3, 13))]
+
+    def test_05_unknown_user(self):
+        """Test 5: A user without results gets one empty page"""
+        page = self.services.query_assessment_history('nobody@example.com', limit=10)
+
+        assert page == {'items': [], 'next_cursor': None}
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Batch Band Scoring Tests
+score_sessions_batch must give every session the bands evaluate_speaking_assessment gives it
+"""
+
+import pytest
+
+from ielts_band_scoring import IELTSBandScorer
+from scoring_benchmark import generate_speaking_corpus
+
+
+@pytest.mark.unit
+class TestScoreSessionsBatch:
+    """Test the columnar batch scorer against per-session scoring"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.scorer = IELTSBandScorer()
+        self.conversations = [item['conversation'] for item in
+                              generate_speaking_corpus(60, 7, ["Describe a place you like to visit."])]
+
+    def expected(self, conversation, ai_analysis=None):
+        result = self.scorer.evaluate_speaking_assessment(conversation, ai_analysis)
+        return result['overall_band_score'], result['criterion_scores']
+
+    def test_01_matches_per_session_scoring(self):
+        """Test 1: Criterion and overall bands equal the per-session path for every session"""
+        results = self.scorer.score_sessions_batch(self.conversations)
+
+        assert [r['session_id'] for r in results] == [c['session_id'] for c in self.conversations]
+        for conversation, result in zip(self.conversations, results):
+            assert (result['overall_band_score'], result['criterion_scores']) == self.expected(conversation)
+
+    def test_02_notes_and_edge_responses(self):
+        """Test 2: Evaluation notes, empty texts and missing fields are scored as in the analyzers"""
+        conversation = {
+            'session_id': 'edge',
+            'user_responses': [
+                {'text': '', 'stage': 'part1_questions', 'word_count': 0, 'duration': 0},
+                {'text': 'Well, although it rains, which I like, I have been there.', 'word_count': 11},
+                {'text': 'Yes.', 'stage': 'part3_discussion', 'word_count': 1, 'duration': 2}
+            ],
+            'evaluation_notes': [
+                {'criterion': 'Fluency and Coherence', 'note': 'Hesitation before answering'},
+                {'criterion': 'Fluency and Coherence', 'note': 'More hesitation'},
+                {'criterion': 'Pronunciation', 'note': 'Unclear vowels'},
+                {'criterion': 'Pronunciation', 'note': 'Listener effort required'}
+            ]
+        }
+        result = self.scorer.score_sessions_batch([conversation])[0]
+
+        assert (result['overall_band_score'], result['criterion_scores']) == self.expected(conversation)
+
+    def test_03_ai_analysis_and_empty_sessions(self):
+        """Test 3: AI analysis is blended per session; sessions without responses fail on their own"""
+        ai_analysis = {'fluency_and_coherence': {'score': 8.0}, 'pronunciation': {'score': 4.0}}
+        conversations = [self.conversations[0], {'session_id': 'empty', 'user_responses': []}, self.conversations[1]]
+        results = self.scorer.score_sessions_batch(conversations, [ai_analysis, None, None])
+
+        assert (results[0]['overall_band_score'], results[0]['criterion_scores']) == \
+            self.expected(self.conversations[0], ai_analysis)
+        assert results[1] == {'success': False, 'session_id': 'empty',
+                              'error': 'No user responses found for evaluation'}
+        assert results[2]['criterion_scores'] == self.expected(self.conversations[1])[1]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Completed Assessment Log Tests
+Completions are appended as log items; the user item keeps only summary counters
+"""
+
+import pytest
+
+from aws_mock_config import AWSMockServices
+from gdpr_erasure import ErasureEngine
+
+
+@pytest.mark.unit
+class TestCompletedAssessmentLog:
+    """Test the append-only completed-assessment log of the mock services"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.services = AWSMockServices()
+        self.user_email = 'log.me@example.com'
+        self.services.create_user({'email': self.user_email, 'password': 'correct horse battery staple'})
+        self.log = self.services.completed_assessments_table
+
+    def complete(self, assessment_type, question_id, band=7.0):
+        assert self.services.record_completed_assessment(self.user_email, assessment_type, question_id,
+                                                         {'overall_band': band})
+
+    def test_01_user_item_keeps_counters_only(self):
+        """Test 1: Each completion is one log item; the user item holds counts, not the list"""
+        self.complete('academic_writing', 'aw_task2_001')
+        self.complete('academic_writing', 'aw_task2_002')
+        self.complete('academic_speaking', 'as_part1_001')
+
+        user = self.services.users_table.get_item(self.user_email)
+        assert 'completed_assessments' not in user
+        assert user['completed_assessment_count'] == 3
+        assert user['completed_counts'] == {'academic_writing': 2, 'academic_speaking': 1}
+        assert len(self.log.keys_for(self.user_email)) == 3
+
+    def test_02_used_questions_come_from_the_log(self):
+        """Test 2: The per-type read model of used questions follows appends and deletes"""
+        self.complete('academic_writing', 'aw_task2_001')
+        self.complete('academic_writing', 'aw_task2_001')
+        self.complete('general_writing', 'gw_task2_001')
+
+        assert self.log.used_question_ids(self.user_email, 'academic_writing') == {'aw_task2_001'}
+        first, second = self.log.keys_for(self.user_email)[:2]
+        self.log.batch_delete([first])
+        assert self.log.used_question_ids(self.user_email, 'academic_writing') == {'aw_task2_001'}
+        self.log.batch_delete([second])
+        assert self.log.used_question_ids(self.user_email, 'academic_writing') == set()
+
+    def test_03_history_pages_newest_first(self):
+        """Test 3: get_completed_assessments walks the log newest-first with cursors"""
+        for i in range(5):
+            self.complete('academic_writing', f'aw_task2_00{i}')
+
+        seen, cursor = [], None
+        while True:
+            page = self.services.get_completed_assessments(self.user_email, limit=2, cursor=cursor)
+            seen.extend(item['question_id'] for item in page['items'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+
+        assert seen == [f'aw_task2_00{i}' for i in reversed(range(5))]
+
+    def test_04_erasure_removes_the_log(self):
+        """Test 4: GDPR erasure deletes the user's log items and their read model"""
+        self.complete('academic_writing', 'aw_task2_001')
+        receipt = ErasureEngine(self.services).erase_user(self.user_email)
+
+        assert receipt['tables'][self.log.table_name] == 1
+        assert self.log.keys_for(self.user_email) == []
+        assert self.log.used_question_ids(self.user_email, 'academic_writing') == set()
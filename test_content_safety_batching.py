@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Content Safety Batching Tests
+validate_user_inputs pre-filters locally, reuses cached sentiments and batches Comprehend calls
+"""
+
+import pytest
+
+import content_safety
+from content_safety import COMPREHEND_BATCH_SIZE, SHORT_INPUT_CHARS, ContentSafetyFilter, SentimentCache
+
+
+class FakeComprehendClient:
+    """batch_detect_sentiment that records each batch; texts containing 'awful' are strongly negative"""
+
+    def __init__(self, error=None, failing_index=None):
+        self.error = error
+        self.failing_index = failing_index
+        self.batches = []
+
+    def batch_detect_sentiment(self, TextList, LanguageCode):
+        self.batches.append(list(TextList))
+        if self.error:
+            raise self.error
+        results, errors = [], []
+        for index, text in enumerate(TextList):
+            if index == self.failing_index:
+                errors.append({'Index': index, 'ErrorCode': 'TextSizeLimitExceededException',
+                               'ErrorMessage': 'Text too long'})
+            elif 'awful' in text:
+                results.append({'Index': index, 'Sentiment': 'NEGATIVE',
+                                'SentimentScore': {'Positive': 0.0, 'Negative': 0.95, 'Neutral': 0.05, 'Mixed': 0.0}})
+            else:
+                results.append({'Index': index, 'Sentiment': 'NEUTRAL',
+                                'SentimentScore': {'Positive': 0.1, 'Negative': 0.1, 'Neutral': 0.8, 'Mixed': 0.0}})
+        return {'ResultList': results, 'ErrorList': errors}
+
+
+def essay(i):
+    """A clean writing response long enough to need a sentiment check"""
+    return f"Essay {i}: in my IELTS writing practice I argue that public libraries support learning " * 2
+
+
+@pytest.mark.unit
+class TestValidateUserInputs:
+    """Test the batched user input validation path"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(content_safety, 'SAFETY_METRICS_DIR', str(tmp_path))
+        monkeypatch.setattr(content_safety, 'sentiment_cache', SentimentCache())
+        self.monkeypatch = monkeypatch
+        self.use_client(FakeComprehendClient())
+        self.filter = ContentSafetyFilter()
+
+    def use_client(self, client):
+        self.client = client
+        self.monkeypatch.setitem(content_safety._aws_clients, 'comprehend', client)
+
+    @staticmethod
+    def sentiment_check(report):
+        return next(check for check in report['safety_checks'] if check['check'] == 'sentiment_analysis')
+
+    def test_01_only_long_clean_inputs_reach_comprehend(self):
+        """Test 1: Blocked and short inputs skip Comprehend; the rest go out 25 per call"""
+        inputs = [('This promotes violence', 'writing'), ('I like tea.', 'speaking')]
+        inputs += [(essay(i), 'writing') for i in range(COMPREHEND_BATCH_SIZE + 5)]
+        results = self.filter.validate_user_inputs(inputs)
+
+        assert [len(batch) for batch in self.client.batches] == [COMPREHEND_BATCH_SIZE, 5]
+        assert results[0][0] is False and results[0][1] == ''
+        assert len(inputs[1][0]) < SHORT_INPUT_CHARS
+        assert self.sentiment_check(results[1][2])['skipped'] == 'short_clean_input'
+        assert all(self.sentiment_check(report)['sentiment'] == 'NEUTRAL' for _, _, report in results[2:])
+
+    def test_02_repeated_texts_are_sent_once_and_cached(self):
+        """Test 2: Duplicates share one Comprehend item and later validations hit the cache"""
+        results = self.filter.validate_user_inputs([(essay(1), 'writing'), (essay(1), 'speaking')])
+        assert self.client.batches == [[essay(1)]]
+        assert all(self.sentiment_check(report)['cached'] is False for _, _, report in results)
+
+        is_safe, _, report = self.filter.validate_user_input(essay(1), 'writing')
+        assert is_safe
+        assert len(self.client.batches) == 1
+        assert self.sentiment_check(report)['cached'] is True
+
+    def test_03_comprehend_failures_are_reported_per_input(self):
+        """Test 3: Failed batches and per-item errors mark the sentiment check failed, not the input unsafe"""
+        self.use_client(FakeComprehendClient(failing_index=1))
+        results = self.filter.validate_user_inputs([(essay(1), 'writing'), (essay(2), 'writing')])
+        assert self.sentiment_check(results[0][2])['passed'] is True
+        assert self.sentiment_check(results[1][2]) == {'check': 'sentiment_analysis', 'passed': False,
+                                                       'error': 'Text too long'}
+
+        self.use_client(FakeComprehendClient(error=RuntimeError('ThrottlingException')))
+        is_safe, _, report = self.filter.validate_user_input(essay(3), 'writing')
+        assert is_safe
+        assert self.sentiment_check(report)['error'] == 'ThrottlingException'
+
+    def test_04_highly_negative_content_is_flagged(self):
+        """Test 4: Strongly negative sentiment counts as flagged content"""
+        self.filter.validate_user_inputs([(essay(1) + ' awful', 'writing'), (essay(2), 'writing')])
+
+        metrics = self.filter.safety_metrics
+        assert metrics['total_requests'] == 2
+        assert metrics['flagged_content'] == 1
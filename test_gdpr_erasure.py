@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+GDPR Erasure Tests
+Erasure receipts, session revocation, export cleanup and receipt verification of the ErasureEngine
+"""
+
+import time
+
+import os
+
+import pytest
+
+import gdpr_erasure
+from aws_mock_config import AWSMockServices, MockDynamoDBTable
+from gdpr_erasure import ErasureEngine, user_hash
+from gdpr_export import GdprExportService, LocalExportStore
+
+
+@pytest.mark.unit
+class TestErasureEngine:
+    """Test erasure and its receipts"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.setattr(gdpr_erasure, 'RETRY_BASE_DELAY_SECONDS', 0)
+        self.services = AWSMockServices()
+        self.engine = ErasureEngine(self.services)
+        self.user_email = 'erase.me@example.com'
+        self.other_email = 'keep.me@example.com'
+        for email in (self.user_email, self.other_email):
+            self.services.create_user({'email': email, 'password': 'correct horse battery staple'})
+            for i in range(30):
+                self.services.store_assessment_result({'assessment_id': f'{email}-{i}', 'user_email': email,
+                                                       'overall_band': 7.0})
+            self.services.record_completed_assessment(email, 'academic_writing', 'q1', {'overall_band': 7.0})
+            self.services.update_user_consent(email, {'marketing': False})
+            self.services.create_session({'session_id': f'session-{email}', 'user_email': email})
+        user_id = self.services.users_table.get_item(self.user_email)['user_id']
+        self.services.store_password_reset_token(user_id, 'reset-token', int(time.time()) + 3600)
+
+    def test_01_erasure_removes_the_users_data_only(self):
+        """Test 1: Every indexed item of the user is deleted and nobody else's"""
+        receipt = self.engine.erase_user(self.user_email)
+
+        assert receipt['status'] == 'completed'
+        assert receipt['items_erased'] == sum(receipt['tables'].values())
+        assert receipt['tables'][self.services.assessment_results_table.table_name] == 30
+        assert self.services.users_table.get_item(self.user_email) is None
+        assert self.services.assessment_results_table.keys_for(self.user_email) == []
+        assert self.services.password_reset_table.get_item('reset-token') is None
+        assert self.services.users_table.get_item(self.other_email) is not None
+        assert len(self.services.assessment_results_table.keys_for(self.other_email)) == 30
+
+    def test_02_sessions_are_revoked(self):
+        """Test 2: The user's sessions stop working and leave the reverse index"""
+        receipt = self.engine.erase_user(self.user_email)
+
+        assert receipt['sessions_revoked'] == 1
+        assert self.services.get_session(f'session-{self.user_email}') is None
+        assert self.user_email not in self.services.user_sessions
+        assert self.services.get_session(f'session-{self.other_email}') is not None
+
+    def test_03_receipt_is_stored_without_the_email(self):
+        """Test 3: The stored receipt identifies the user by hash only"""
+        receipt = self.engine.erase_user(self.user_email, request_id='erasure-1')
+        stored = self.services.gdpr_erasure_receipts_table.get_item('erasure-1')
+
+        assert stored['user_hash'] == user_hash(self.user_email) == user_hash(' Erase.Me@example.com ')
+        assert stored['keys_digest'] == receipt['keys_digest']
+        assert self.user_email not in repr({k: v for k, v in stored.items() if not k.startswith('_')})
+
+    def test_04_verification(self):
+        """Test 4: A completed receipt verifies for its user and for nobody else"""
+        receipt = self.engine.erase_user(self.user_email)
+
+        verification = self.engine.verify_erasure(self.user_email, receipt['receipt_id'])
+        assert verification['verified'] and verification['remaining'] == {}
+        assert not self.engine.verify_erasure(self.other_email, receipt['receipt_id'])['verified']
+        assert not self.engine.verify_erasure(self.user_email, 'unknown-receipt')['verified']
+
+    def test_05_data_written_after_erasure_fails_verification(self):
+        """Test 5: Verification reports data that reappeared after the erasure"""
+        receipt = self.engine.erase_user(self.user_email)
+        self.services.store_assessment_result({'assessment_id': 'late', 'user_email': self.user_email})
+
+        verification = self.engine.verify_erasure(self.user_email, receipt['receipt_id'])
+        assert not verification['verified']
+        assert verification['remaining'] == {self.services.assessment_results_table.table_name: 1}
+
+    def test_06_unprocessed_deletes_make_an_incomplete_receipt(self):
+        """Test 6: Deletes still unprocessed after every retry are reported, not hidden"""
+        table = self.services.assessment_results_table
+        table.batch_delete = lambda keys: list(keys)
+
+        receipt = self.engine.erase_user(self.user_email)
+
+        assert receipt['status'] == 'incomplete'
+        assert table.table_name not in receipt['tables']
+        assert any(error.startswith(table.table_name) for error in receipt['errors'])
+        assert not self.engine.verify_erasure(self.user_email, receipt['receipt_id'])['verified']
+
+
+@pytest.mark.unit
+class TestExportErasure:
+    """Test that export requests and their files are erased with the user"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(gdpr_erasure, 'RETRY_BASE_DELAY_SECONDS', 0)
+        monkeypatch.delenv('AWS_LAMBDA_FUNCTION_NAME', raising=False)
+        self.services = AWSMockServices()
+        self.store = LocalExportStore(directory=str(tmp_path), signing_key='test-signing-key')
+        self.user_email = 'erase.me@example.com'
+        self.other_email = 'keep.me@example.com'
+        for email in (self.user_email, self.other_email):
+            self.services.create_user({'email': email, 'password': 'correct horse battery staple'})
+
+    def export(self, requests_table=None):
+        exports = GdprExportService(self.services, store=self.store, requests_table=requests_table)
+        request_ids = {email: exports.start_export(email, 'csv') for email in (self.user_email, self.other_email)}
+        return exports, request_ids
+
+    def test_01_export_files_and_requests_are_erased(self):
+        """Test 1: The user's export file and request go; the receipt lists both"""
+        exports, request_ids = self.export()
+        path = self.store.export_keys([exports.requests_table.get_item(request_ids[self.user_email])])[0]
+        engine = ErasureEngine(self.services, export_service=exports)
+
+        receipt = engine.erase_user(self.user_email)
+
+        assert receipt['status'] == 'completed'
+        assert receipt['tables'][self.store.location] == 1
+        assert receipt['tables'][exports.requests_table.table_name] == 1
+        assert not os.path.exists(path)
+        assert exports.get_export(request_ids[self.user_email], self.user_email) is None
+        assert exports.get_export(request_ids[self.other_email], self.other_email)['status'] == 'completed'
+        assert engine.verify_erasure(self.user_email, receipt['receipt_id'])['verified']
+
+    def test_02_separate_requests_table_is_erased(self):
+        """Test 2: Requests kept outside the service tables (DYNAMODB_GDPR_REQUESTS_TABLE) are erased too"""
+        requests_table = MockDynamoDBTable('gdpr-requests', key_attribute='request_id', index_attribute='user_email')
+        exports, request_ids = self.export(requests_table)
+        engine = ErasureEngine(self.services, export_service=exports)
+
+        receipt = engine.erase_user(self.user_email)
+
+        assert receipt['tables']['gdpr-requests'] == 1
+        assert requests_table.keys_for(self.user_email) == []
+        assert requests_table.get_item(request_ids[self.other_email]) is not None
+
+    def test_03_failed_file_delete_keeps_the_request(self):
+        """Test 3: A file that cannot be deleted keeps its request, so verification and a retry find it"""
+        exports, request_ids = self.export()
+        engine = ErasureEngine(self.services, export_service=exports)
+        self.store.delete_files = lambda keys: list(keys)
+
+        receipt = engine.erase_user(self.user_email)
+
+        assert receipt['status'] == 'incomplete'
+        assert exports.get_export(request_ids[self.user_email], self.user_email) is not None
+        verification = engine.verify_erasure(self.user_email, receipt['receipt_id'])
+        assert verification['remaining'] == {self.store.location: 1,
+                                             self.services.gdpr_data_requests_table.table_name: 1}
+
+        del self.store.delete_files
+        assert engine.erase_user(self.user_email)['status'] == 'completed'
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+GDPR Export Tests
+Streaming export files, background jobs, signed links and ownership checks of GdprExportService
+"""
+
+import gzip
+import json
+
+import pytest
+
+import gdpr_export
+import lambda_handler
+from aws_mock_config import AWSMockServices
+from gdpr_export import (ExportConfigurationError, GdprExportService, LocalExportStore,
+                         ThreadExportDispatcher)
+
+
+@pytest.mark.unit
+class TestGdprExportService:
+    """Test export jobs and their download links"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        monkeypatch.delenv('AWS_LAMBDA_FUNCTION_NAME', raising=False)
+        self.services = AWSMockServices()
+        self.store = LocalExportStore(directory=str(tmp_path), signing_key='test-signing-key')
+        self.user_email = 'export.me@example.com'
+        self.services.create_user({'email': self.user_email, 'password': 'correct horse battery staple'})
+        for i in range(30):
+            self.services.store_assessment_result({'assessment_id': f'result-{i}', 'user_email': self.user_email,
+                                                   'overall_band': 7.0})
+
+    def service(self, **kwargs):
+        return GdprExportService(self.services, store=self.store, **kwargs)
+
+    def read_export(self, service, request_id):
+        request = service.get_export(request_id, self.user_email)
+        query = dict(part.split('=', 1) for part in request['download_url'].split('?', 1)[1].split('&'))
+        path = self.store.resolve(request_id, query['expires'], query['signature'])
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_01_small_account_is_exported_inline(self):
+        """Test 1: A small account's export is complete when start_export returns"""
+        service = self.service(dispatcher=ThreadExportDispatcher())
+        request_id = service.start_export(self.user_email)
+
+        request = service.get_export(request_id, self.user_email)
+        assert request['status'] == 'completed'
+        records = self.read_export(service, request_id)
+        assert sum(1 for r in records if r['record_type'] == 'assessment_result') == 30
+        assert all('password_hash' not in r['data'] for r in records)
+
+    def test_02_large_account_runs_in_the_background(self):
+        """Test 2: A large account is exported by a worker thread of this process, from the same data"""
+        service = self.service(dispatcher=ThreadExportDispatcher(), inline_max_records=5)
+        request_id = service.start_export(self.user_email)
+        service.wait(request_id, timeout=10)
+
+        assert service.get_export(request_id, self.user_email)['record_count'] == len(self.read_export(service, request_id))
+        assert sum(1 for r in self.read_export(service, request_id) if r['record_type'] == 'assessment_result') == 30
+
+    def test_03_lambda_builds_the_export_in_the_request(self, monkeypatch):
+        """Test 3: On Lambda there is no background dispatcher, so large exports finish inline"""
+        monkeypatch.setenv('AWS_LAMBDA_FUNCTION_NAME', 'api')
+        service = self.service(inline_max_records=5)
+        request_id = service.start_export(self.user_email)
+
+        assert service.dispatcher is None
+        assert service.get_export(request_id, self.user_email)['status'] == 'completed'
+
+    def test_04_requests_are_private_to_their_owner(self):
+        """Test 4: Another user cannot read an export request"""
+        service = self.service()
+        request_id = service.start_export(self.user_email)
+
+        assert service.get_export(request_id, 'someone.else@example.com') is None
+        assert service.get_export('unknown', self.user_email) is None
+
+    def test_05_tampered_or_expired_links_are_rejected(self):
+        """Test 5: A link only resolves with its own signature and before it expires"""
+        service = self.service()
+        request_id = service.start_export(self.user_email)
+        url = service.get_export(request_id, self.user_email)['download_url']
+        query = dict(part.split('=', 1) for part in url.split('?', 1)[1].split('&'))
+
+        assert self.store.resolve(request_id, query['expires'], 'forged') is None
+        assert self.store.resolve(request_id, int(query['expires']) + 60, query['signature']) is None
+        assert self.store.resolve(request_id, 0, self.store._sign(request_id, 0)) is None
+
+
+@pytest.mark.unit
+class TestExportConfiguration:
+    """Test behaviour without a signing key or bucket"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.delenv('GDPR_EXPORT_SIGNING_KEY', raising=False)
+        monkeypatch.setattr(gdpr_export, 'EXPORT_BUCKET', None)
+        monkeypatch.setattr(gdpr_export, '_export_service', None)
+
+    def test_01_missing_signing_key_is_reported(self):
+        """Test 1: The configuration error names the missing settings"""
+        assert 'GDPR_EXPORT_SIGNING_KEY' in gdpr_export.configuration_error()
+        with pytest.raises(ExportConfigurationError):
+            LocalExportStore()
+
+    def test_02_endpoints_answer_503(self):
+        """Test 2: Export endpoints report an unconfigured service instead of failing with a 500"""
+        lambda_handler.aws_mock.create_session({'session_id': 'export-config-1', 'user_email': 'test@ieltsgenaiprep.com'})
+        headers = {'Cookie': 'web_session_id=export-config-1'}
+        try:
+            status = lambda_handler.handle_gdpr_export_status({'request_id': 'x'}, headers)
+            export = lambda_handler.handle_gdpr_export_data({}, headers)
+            download = lambda_handler.handle_gdpr_download_export({'request_id': 'x'})
+        finally:
+            lambda_handler.aws_mock.delete_session('export-config-1')
+
+        assert (status['statusCode'], export['statusCode'], download['statusCode']) == (503, 503, 503)
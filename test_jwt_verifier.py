@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+JWT Verifier Tests
+Key rotation by kid, legacy kid-less tokens and the verified-claims cache of JWTVerifier
+"""
+
+import time
+
+import jwt
+import pytest
+
+import auth_jwt
+import aws_secrets_manager
+from auth_jwt import JWTVerifier
+
+
+class FakeSecretsManager:
+    """get_secret that serves a mutable JWT secret and counts reads"""
+
+    def __init__(self, jwt_secret):
+        self.jwt_secret = jwt_secret
+        self.reads = 0
+
+    def get_secret(self, name):
+        self.reads += 1
+        return dict(self.jwt_secret)
+
+
+def make_token(secret, kid=None, expires_in=900, user_id='user-1'):
+    payload = {'user_id': user_id, 'exp': int(time.time()) + expires_in,
+               'iss': 'ielts-genai-prep', 'aud': 'mobile-app'}
+    return jwt.encode(payload, secret, 'HS256', headers={'kid': kid} if kid else None)
+
+
+@pytest.mark.unit
+class TestJWTVerifier:
+    """Test verification across key rotation and claims caching"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.secrets = FakeSecretsManager({
+            'JWT_SECRET': 'legacy-secret',
+            'JWT_KEYS': [{'kid': 'k1', 'secret': 'secret-one'}, {'kid': 'k2', 'secret': 'secret-two'}],
+            'JWT_ACTIVE_KID': 'k2'
+        })
+        monkeypatch.setattr(aws_secrets_manager, 'secrets_manager', self.secrets)
+        self.decodes = 0
+        decode = jwt.decode
+
+        def counting_decode(*args, **kwargs):
+            self.decodes += 1
+            return decode(*args, **kwargs)
+
+        monkeypatch.setattr(auth_jwt.jwt, 'decode', counting_decode)
+        self.verifier = JWTVerifier(cache_size=3)
+
+    def test_01_every_accepted_kid_verifies(self):
+        """Test 1: Tokens signed with any listed key, and kid-less tokens with JWT_SECRET, verify"""
+        assert self.verifier.verify(make_token('secret-one', 'k1'))['user_id'] == 'user-1'
+        assert self.verifier.verify(make_token('secret-two', 'k2'))['user_id'] == 'user-1'
+        assert self.verifier.verify(make_token('legacy-secret'))['user_id'] == 'user-1'
+        assert self.verifier.verify(make_token('secret-two')) is None
+        assert self.verifier.verify(make_token('secret-one', 'k2')) is None
+
+    def test_02_generated_tokens_use_the_active_kid(self):
+        """Test 2: New tokens carry JWT_ACTIVE_KID and verify"""
+        token = auth_jwt.generate_jwt_token('user-7')
+
+        assert jwt.get_unverified_header(token)['kid'] == 'k2'
+        assert self.verifier.verify(token)['user_id'] == 'user-7'
+
+    def test_03_verified_claims_are_cached_until_exp(self):
+        """Test 3: A repeated token is not decoded again; an expired one is rejected"""
+        token = make_token('secret-one', 'k1')
+        first = self.verifier.verify(token)
+        first['user_id'] = 'tampered'
+
+        assert self.verifier.verify(token)['user_id'] == 'user-1'
+        assert self.decodes == 1
+        assert self.verifier.verify(make_token('secret-one', 'k1', expires_in=-10)) is None
+        assert self.verifier.verify_many([token, None, token]) == [self.verifier.verify(token), None,
+                                                                   self.verifier.verify(token)]
+        assert self.decodes == 2
+
+    def test_04_unknown_kid_refreshes_keys_at_most_once(self):
+        """Test 4: A newly rotated kid is picked up early; repeated unknown kids do not hammer the store"""
+        self.verifier.verify(make_token('secret-one', 'k1'))
+        self.secrets.jwt_secret['JWT_KEYS'] = self.secrets.jwt_secret['JWT_KEYS'] + [
+            {'kid': 'k3', 'secret': 'secret-three'}]
+
+        assert self.verifier.verify(make_token('secret-three', 'k3'))['user_id'] == 'user-1'
+        reads = self.secrets.reads
+        assert self.verifier.verify(make_token('x', 'k9')) is None
+        assert self.verifier.verify(make_token('x', 'k10')) is None
+        assert self.secrets.reads == reads
+
+    def test_05_retired_kid_invalidates_cached_claims(self):
+        """Test 5: Once a key is removed, its cached tokens stop verifying"""
+        token = make_token('secret-one', 'k1')
+        assert self.verifier.verify(token)
+
+        self.secrets.jwt_secret['JWT_KEYS'] = [{'kid': 'k2', 'secret': 'secret-two'}]
+        self.verifier._load_keys()
+
+        assert self.verifier.verify(token) is None
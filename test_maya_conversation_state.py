@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Maya Conversation State Tests
+Versioned per-session state, optimistic-concurrency stores and the stateless engine driving them
+"""
+
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+
+import maya_conversation_state
+import nova_sonic_service
+from maya_conversation_state import (STATE_SCHEMA_VERSION, ConversationState, ConversationStateConflict,
+                                     DynamoDBConversationStore, InMemoryConversationStore)
+
+
+class FakeStateTable:
+    """get_item/put_item/delete_item honouring the store's two condition expressions"""
+
+    def __init__(self):
+        self.items = {}
+
+    def get_item(self, Key, ConsistentRead=False):
+        item = self.items.get(Key['session_id'])
+        return {'Item': dict(item)} if item else {}
+
+    def put_item(self, Item, ConditionExpression, ExpressionAttributeNames=None, ExpressionAttributeValues=None):
+        current = self.items.get(Item['session_id'])
+        if ConditionExpression == 'attribute_not_exists(session_id)':
+            failed = current is not None
+        else:
+            failed = current is None or current['revision'] != ExpressionAttributeValues[':expected']
+        if failed:
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'PutItem')
+        self.items[Item['session_id']] = dict(Item)
+
+    def delete_item(self, Key):
+        self.items.pop(Key['session_id'], None)
+
+
+def sample_state(session_id='session-1'):
+    return ConversationState(session_id=session_id, assessment_type='academic_speaking',
+                             stage='part1_questions', user_responses=[{'text': 'Hello', 'word_count': 1}],
+                             user_context={'hometown': 'Lagos'})
+
+
+@pytest.mark.unit
+class TestConversationState:
+    """Test state serialization"""
+
+    def test_01_round_trips_with_either_codec(self, monkeypatch):
+        """Test 1: State survives to_bytes/from_bytes with msgpack (when installed) and with JSON"""
+        state = sample_state()
+        assert ConversationState.from_bytes(state.to_bytes()) == state
+
+        monkeypatch.setattr(maya_conversation_state, 'msgpack', None)
+        payload = state.to_bytes()
+        assert payload[:1] == b'J'
+        assert ConversationState.from_bytes(payload) == state
+
+    def test_02_schema_versions(self):
+        """Test 2: Unknown fields are ignored; state from a newer schema is refused"""
+        data = sample_state().to_dict()
+        data['field_from_the_future'] = 1
+        assert ConversationState.from_dict(data) == sample_state()
+
+        data['schema_version'] = STATE_SCHEMA_VERSION + 1
+        with pytest.raises(ValueError):
+            ConversationState.from_dict(data)
+
+
+@pytest.mark.unit
+class TestConversationStores:
+    """Test optimistic concurrency in the in-memory and DynamoDB stores"""
+
+    @pytest.fixture(params=['memory', 'dynamodb'])
+    def store(self, request):
+        if request.param == 'memory':
+            return InMemoryConversationStore()
+        return DynamoDBConversationStore(table=FakeStateTable())
+
+    def test_01_save_load_and_delete(self, store):
+        """Test 1: Saved state loads with its revision and is gone after delete"""
+        store.save(sample_state())
+        loaded = store.load('session-1')
+
+        assert loaded.revision == 1
+        assert loaded.user_context == {'hometown': 'Lagos'}
+        store.delete('session-1')
+        assert store.load('session-1') is None
+
+    def test_02_stale_save_conflicts(self, store):
+        """Test 2: Of two turns that loaded the same revision, only the first save wins"""
+        store.save(sample_state())
+        first, second = store.load('session-1'), store.load('session-1')
+        first.stage = 'part2_preparation'
+        store.save(first)
+
+        second.stage = 'closing'
+        with pytest.raises(ConversationStateConflict):
+            store.save(second)
+        assert store.load('session-1').stage == 'part2_preparation'
+        with pytest.raises(ConversationStateConflict):
+            store.save(sample_state())
+
+    def test_03_memory_store_is_bounded(self):
+        """Test 3: The in-memory store keeps only the most recently used sessions"""
+        store = InMemoryConversationStore(max_sessions=2)
+        for session_id in ('a', 'b'):
+            store.save(sample_state(session_id))
+        store.load('a')
+        store.save(sample_state('c'))
+
+        assert store.load('b') is None
+        assert store.load('a') is not None and store.load('c') is not None
+
+
+@pytest.mark.unit
+class TestStatelessEngine:
+    """Test that the engine keeps no per-session state of its own"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.setattr(nova_sonic_service, 'BIDIRECTIONAL_STREAMING_AVAILABLE', False)
+        from maya_conversation_engine import MayaConversationEngine
+        self.store = InMemoryConversationStore()
+        self.engine = MayaConversationEngine(store=self.store)
+
+    def test_01_sessions_are_independent(self):
+        """Test 1: Interleaved turns of two sessions update only their own stored state"""
+        async def run():
+            for session_id in ('s1', 's2'):
+                assert (await self.engine.initialize_session({'session_id': session_id,
+                                                              'assessment_type': 'academic_speaking'}))['success']
+            await self.engine.process_user_response('I am fine, thank you.', 3, session_id='s1')
+            await self.engine.process_user_response('Very well.', 2, session_id='s2')
+            await self.engine.process_user_response('I live in a small town by the sea.', 5, session_id='s1')
+
+        asyncio.run(run())
+
+        assert self.engine.get_conversation_summary('s1')['conversation_flow']['total_responses'] == 2
+        assert self.engine.get_conversation_summary('s2')['conversation_flow']['total_responses'] == 1
+        with pytest.raises(RuntimeError):
+            self.engine.conversation_state
+
+    def test_02_concurrent_turn_is_rejected(self):
+        """Test 2: Two simultaneous turns of one session: one is saved, the other gets a conflict"""
+        async def run():
+            await self.engine.initialize_session({'session_id': 's1', 'assessment_type': 'academic_speaking'})
+            return await asyncio.gather(
+                self.engine.process_user_response('First answer.', 2, session_id='s1'),
+                self.engine.process_user_response('Second answer.', 2, session_id='s1'))
+
+        results = asyncio.run(run())
+
+        assert sorted(bool(result.get('conflict')) for result in results) == [False, True]
+        assert self.engine.get_conversation_summary('s1')['conversation_flow']['total_responses'] == 1
+
+    def test_03_end_session_deletes_the_state(self):
+        """Test 3: Ending a session removes it from the store"""
+        asyncio.run(self.engine.initialize_session({'session_id': 's1', 'assessment_type': 'academic_speaking'}))
+        self.engine.end_session('s1')
+
+        assert self.store.load('s1') is None
+        assert asyncio.run(self.engine.process_user_response('Hello?', 1, session_id='s1'))['success'] is False
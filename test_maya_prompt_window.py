@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Maya Prompt Window Tests
+Bounded, summarized conversation history and token-budgeted Maya prompts with prefix reuse
+"""
+
+import copy
+
+import pytest
+
+from maya_conversation_state import ConversationState
+from maya_prompt_window import (MAX_HISTORY_EXCHANGES, SUMMARY_TOKEN_BUDGET, MayaPromptAssembler,
+                                append_exchange, estimate_tokens)
+
+
+def turn_context(user_input='I enjoy hiking.'):
+    return {'current_stage': 'part1_questions', 'user_input': user_input, 'time_remaining': 120,
+            'user_context': {'hobby': 'hiking'}}
+
+
+def add_exchanges(state, start, count):
+    for i in range(start, start + count):
+        append_exchange(state, f'Answer number {i} about my hometown and the weather there in spring.',
+                        f'Thank you. Question {i + 1}: what do you like most about it?', 'part1_questions')
+
+
+@pytest.mark.unit
+class TestConversationHistory:
+    """Test the bounded history kept in the conversation state"""
+
+    def test_01_history_is_bounded_and_summarized(self):
+        """Test 1: Old exchanges leave the history once, as summary lines, and token totals stay exact"""
+        state = ConversationState(session_id='s1')
+        add_exchanges(state, 0, MAX_HISTORY_EXCHANGES + 5)
+
+        assert len(state.conversation_history) == MAX_HISTORY_EXCHANGES
+        assert state.summarized_exchanges == 5
+        assert state.conversation_history[0]['user'].startswith('Answer number 5 ')
+        assert state.history_tokens == sum(e['tokens'] for e in state.conversation_history)
+        assert state.history_summary[-1].startswith('- [part1_questions] Candidate: Answer number 4 ')
+
+    def test_02_summary_is_bounded(self):
+        """Test 2: The summary keeps its newest lines within SUMMARY_TOKEN_BUDGET"""
+        state = ConversationState(session_id='s1')
+        add_exchanges(state, 0, MAX_HISTORY_EXCHANGES + 40)
+
+        assert state.summary_tokens <= SUMMARY_TOKEN_BUDGET
+        assert state.summary_tokens == sum(estimate_tokens(line) + 1 for line in state.history_summary)
+        assert 'Answer number 39 ' in state.history_summary[-1]
+
+
+@pytest.mark.unit
+class TestMayaPromptAssembler:
+    """Test prompt assembly under a token budget"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.assembler = MayaPromptAssembler(token_budget=600)
+        self.state = ConversationState(session_id='s1')
+
+    def test_01_recent_exchanges_fit_the_budget(self):
+        """Test 1: The newest exchanges are kept, the oldest dropped, and the prompt stays near the budget"""
+        add_exchanges(self.state, 0, 15)
+        prompt = self.assembler.build_prompt(self.state, turn_context())
+
+        assert 'Answer number 14 ' in prompt
+        assert 'Answer number 0 ' not in prompt
+        assert estimate_tokens(prompt) <= self.assembler.token_budget + 20
+        assert prompt.rstrip().endswith("{'hobby': 'hiking'}")
+
+    def test_02_reused_prefix_matches_a_fresh_assembly(self):
+        """Test 2: Turn after turn, including across evictions, the cached prefix gives the same prompt"""
+        for turn in range(MAX_HISTORY_EXCHANGES + 5):
+            add_exchanges(self.state, turn, 1)
+            context = turn_context(f'Reply {turn}')
+            expected = MayaPromptAssembler(token_budget=600).build_prompt(self.state, context)
+
+            assert self.assembler.build_prompt(self.state, context) == expected
+
+    def test_03_prefix_from_a_lost_turn_is_not_reused(self):
+        """Test 3: A prefix built from state whose save lost a conflict is rebuilt"""
+        add_exchanges(self.state, 0, 3)
+        self.assembler.build_prompt(self.state, turn_context())
+        lost = copy.deepcopy(self.state)
+        append_exchange(lost, 'A turn that was never saved.', 'Ignored.', 'part1_questions')
+        self.assembler.build_prompt(lost, turn_context())
+
+        append_exchange(self.state, 'The turn that was saved.', 'Noted.', 'part1_questions')
+        prompt = self.assembler.build_prompt(self.state, turn_context())
+
+        assert 'never saved' not in prompt
+        assert prompt == MayaPromptAssembler(token_budget=600).build_prompt(self.state, turn_context())
+
+    def test_04_forget_drops_the_session_prefix(self):
+        """Test 4: Ending a session removes its cached prefix"""
+        add_exchanges(self.state, 0, 2)
+        self.assembler.build_prompt(self.state, turn_context())
+        self.assembler.forget('s1')
+
+        assert 's1' not in self.assembler._prefixes
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Maya Streaming Session Tests
+Nova Sonic streams are opened only when read, and idle or surplus sessions close their streams
+"""
+
+import asyncio
+
+import pytest
+
+import nova_sonic_service
+from nova_sonic_service import NovaSonicService, StreamingSessionRegistry, run_async
+
+
+class FakeStreamService:
+    """open_conversation_stream/close_stream that record which streams were opened and closed"""
+
+    def __init__(self):
+        self.opened = []
+        self.closed = []
+
+    async def open_conversation_stream(self, session):
+        stream = f"stream-{session['session_id']}"
+        self.opened.append(stream)
+        return stream
+
+    async def close_stream(self, stream):
+        self.closed.append(stream)
+
+
+def settle():
+    """Wait until closes scheduled on the worker loop have run"""
+    run_async(asyncio.sleep(0))
+
+
+@pytest.mark.unit
+class TestStreamingSessionRegistry:
+    """Test the bounded streaming session registry"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.now = 0.0
+        self.service = FakeStreamService()
+        self.registry = StreamingSessionRegistry(self.service, max_sessions=2, idle_ttl=60,
+                                                 clock=lambda: self.now)
+
+    def open(self, session_id):
+        self.registry.put(session_id, {'session_id': session_id})
+        return run_async(self.registry.stream(session_id))
+
+    def test_01_stream_is_opened_on_first_use(self):
+        """Test 1: Registering a session opens nothing; the first stream() opens it once"""
+        self.registry.put('a', {'session_id': 'a'})
+        assert self.service.opened == []
+
+        assert run_async(self.registry.stream('a')) == 'stream-a'
+        assert run_async(self.registry.stream('a')) == 'stream-a'
+        assert self.service.opened == ['stream-a']
+
+    def test_02_idle_sessions_are_closed(self):
+        """Test 2: A session unused for longer than the TTL is dropped and its stream closed"""
+        self.open('a')
+        self.now = 61
+        assert self.registry.get('a') is None
+        settle()
+
+        assert self.service.closed == ['stream-a']
+        assert run_async(self.registry.stream('a')) is None
+
+    def test_03_least_recently_used_is_evicted(self):
+        """Test 3: Beyond max_sessions the least recently used session's stream is closed"""
+        self.open('a')
+        self.open('b')
+        self.registry.get('a')
+        self.open('c')
+        settle()
+
+        assert self.service.closed == ['stream-b']
+        assert len(self.registry) == 2
+        assert self.registry.get('a') is not None
+
+    def test_04_pop_hands_the_stream_to_the_caller(self):
+        """Test 4: pop() removes a session without closing its stream"""
+        self.open('a')
+        context = self.registry.pop('a')
+        settle()
+
+        assert context['stream'] == 'stream-a'
+        assert self.service.closed == []
+        assert self.registry.get('a') is None
+
+
+@pytest.mark.unit
+class TestStartMayaConversation:
+    """Test that starting a conversation does not open a Bedrock stream"""
+
+    def test_01_no_stream_is_opened(self, monkeypatch):
+        """Test 1: The session is prepared without calling Bedrock"""
+        monkeypatch.setattr(nova_sonic_service, 'BIDIRECTIONAL_STREAMING_AVAILABLE', True)
+        service = NovaSonicService()
+
+        async def fail(*args, **kwargs):
+            raise AssertionError('stream opened')
+
+        monkeypatch.setattr(service, '_open_bidirectional_stream', fail)
+        session = asyncio.run(service.start_maya_conversation('You are Maya.'))
+
+        assert session['success'] is True
+        assert session['status'] == 'ready'
+        assert 'stream' not in session
+
+    def test_02_engine_registers_the_session_and_ends_it(self, monkeypatch):
+        """Test 2: The engine keeps the prepared session (without a stream) until end_session"""
+        monkeypatch.setattr(nova_sonic_service, 'BIDIRECTIONAL_STREAMING_AVAILABLE', True)
+        from maya_conversation_engine import MayaConversationEngine
+        engine = MayaConversationEngine()
+
+        asyncio.run(engine.initialize_session({'session_id': 'stream-test-1', 'assessment_type': 'academic_speaking'}))
+        context = engine._streaming_sessions.get('stream-test-1')
+        engine.end_session('stream-test-1')
+
+        assert context is not None and 'stream' not in context
+        assert engine._streaming_sessions.get('stream-test-1') is None
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Prompt Template Cache Tests
+Rubric prompt prefixes are assembled once per assessment type, task and rubric version
+"""
+
+import pytest
+
+import prompt_cache
+from prompt_cache import CACHE_POINT, PromptTemplateCache, rubric_version
+
+
+def stored_rubric(version_text='Assess strictly.'):
+    return {'rubric_id': 'academic-writing-v1', 'nova_micro_prompt': version_text}
+
+
+def fallback_rubric(assessment_type):
+    return {'nova_micro_prompts': {'system_prompt': f'You are an IELTS examiner for {assessment_type}.',
+                                   'task_2_requirements': 'At least 250 words.'}}
+
+
+@pytest.mark.unit
+class TestPromptTemplateCache:
+    """Test template assembly, reuse and invalidation"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.now = 1000.0
+        monkeypatch.setattr(prompt_cache.time, 'time', lambda: self.now)
+        self.rubrics = {'academic-writing': stored_rubric()}
+        self.lookups = []
+
+        def loader(assessment_type):
+            self.lookups.append(assessment_type)
+            return self.rubrics.get(assessment_type)
+
+        self.cache = PromptTemplateCache(loader, ttl_seconds=60, max_templates=3)
+
+    def test_01_template_is_assembled_once(self):
+        """Test 1: Repeated requests reuse the template and the rubric lookup"""
+        first = self.cache.get_template('academic-writing', fallback_rubric, 2)
+        second = self.cache.get_template('academic-writing', fallback_rubric, 2)
+
+        assert second is first
+        assert self.lookups == ['academic-writing']
+        assert self.cache.get_stats() == {'templates': 1, 'hits': 1, 'misses': 1}
+        assert first.system_prefix.startswith('Assess strictly.')
+        assert 'Band 9:' in first.system_prefix
+
+    def test_02_fallback_rubric_and_tasks(self):
+        """Test 2: Types without a stored rubric use the fallback; each task has its own template"""
+        task1 = self.cache.get_template('general-writing', fallback_rubric, 1)
+        task2 = self.cache.get_template('general-writing', fallback_rubric, 2)
+
+        assert task1 is not task2
+        assert task1.rubric_version.startswith('fallback:')
+        assert 'At least 250 words.' in task2.system_prefix
+        assert 'At least 250 words.' not in task1.system_prefix
+
+    def test_03_new_rubric_version_replaces_the_template(self):
+        """Test 3: After the TTL a changed rubric produces a new template and drops the old one"""
+        old = self.cache.get_template('academic-writing', fallback_rubric, 2)
+        self.rubrics['academic-writing'] = stored_rubric('Assess very strictly.')
+
+        assert self.cache.get_template('academic-writing', fallback_rubric, 2) is old
+        self.now += 61
+        new = self.cache.get_template('academic-writing', fallback_rubric, 2)
+
+        assert new.rubric_version != old.rubric_version
+        assert new.system_prefix.startswith('Assess very strictly.')
+        assert self.cache.get_stats()['templates'] == 1
+
+    def test_04_request_shares_the_prefix(self):
+        """Test 4: Requests differ only in the user message; the prefix ends at a cache point"""
+        template = self.cache.get_template('academic-writing', fallback_rubric, 2)
+        first = template.build_request('Essay one.', question='Discuss both views.')
+        second = template.build_request('Essay two.', instruction='Assess only lexical_resource.')
+
+        assert first['system'] == second['system'] == [{'text': template.system_prefix}, CACHE_POINT]
+        assert 'Question:\nDiscuss both views.' in first['messages'][0]['content'][0]['text']
+        assert second['messages'][0]['content'][0]['text'].endswith('Assess only lexical_resource.')
+
+    def test_05_rubric_version_ignores_private_fields(self):
+        """Test 5: Underscore fields (e.g. load metadata) do not change the version"""
+        rubric = stored_rubric()
+
+        assert rubric_version(dict(rubric, _loaded_at=1)) == rubric_version(rubric)
+        assert rubric_version(dict(rubric, nova_micro_prompt='Other.')) != rubric_version(rubric)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+QR Rendering Tests
+Compact SVG QR images, their inline data URIs and the pre-generated website token pool
+"""
+
+import re
+import time
+import json
+import base64
+import urllib.parse
+
+import pytest
+
+from qr_rendering_service import (QR_BORDER_MODULES, QR_POOL_MAX_AGE_SECONDS, QRRenderingService,
+                                  WebsiteQRTokenPool)
+
+
+@pytest.mark.unit
+class TestQRRenderingService:
+    """Test SVG rendering and data URIs"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.renderer = QRRenderingService()
+        self.data = json.dumps({'token': '0b8d4e0c-1c9f-4b7e-9a1e-0f3c2a1b5d6e', 'domain': 'ieltsaiprep.com',
+                                'type': 'website_auth', 'timestamp': 1760000000})
+
+    def test_01_svg_matches_the_matrix_with_a_quiet_zone(self):
+        """Test 1: Path runs cover exactly the dark modules and none of the 4-module border"""
+        matrix = self.renderer._matrix(self.data)
+        svg = self.renderer.render_svg(self.data)
+        size = len(matrix)
+
+        assert f"viewBox='0 0 {size} {size}'" in svg
+        dark = set()
+        for x, y, run in re.findall(r'M(\d+) (\d+)h(\d+)v1h-\d+z', svg):
+            dark.update((int(x) + i, int(y)) for i in range(int(run)))
+        assert dark == {(x, y) for y, row in enumerate(matrix) for x, cell in enumerate(row) if cell}
+        assert all(QR_BORDER_MODULES <= x < size - QR_BORDER_MODULES and
+                   QR_BORDER_MODULES <= y < size - QR_BORDER_MODULES for x, y in dark)
+
+    def test_02_data_uri_is_percent_encoded_svg(self):
+        """Test 2: The data URI decodes to the SVG, is smaller than base64 and fits a double-quoted src"""
+        svg = self.renderer.render_svg(self.data)
+        uri = self.renderer.svg_data_uri(svg=svg)
+        prefix = 'data:image/svg+xml,'
+
+        assert uri.startswith(prefix)
+        assert urllib.parse.unquote(uri[len(prefix):]) == svg
+        assert not set('"<>#') & set(uri)
+        assert len(uri) < len('data:image/svg+xml;base64,' + base64.b64encode(svg.encode()).decode())
+        assert self.renderer.svg_data_uri(self.data) == uri
+
+
+@pytest.mark.unit
+class TestWebsiteQRTokenPool:
+    """Test handing out pre-generated website tokens"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.pool = WebsiteQRTokenPool(QRRenderingService(), target_size=2)
+
+    def test_01_tokens_are_unique_website_tokens(self):
+        """Test 1: Each acquire hands out a different token with its rendered SVG"""
+        entries = [self.pool.acquire() for _ in range(5)]
+
+        assert len({entry['token_id'] for entry in entries}) == 5
+        for entry in entries:
+            assert json.loads(entry['qr_data'])['token'] == entry['token_id']
+            assert json.loads(entry['qr_data'])['type'] == 'website_auth'
+            assert entry['svg'].startswith('<svg')
+
+    def test_02_stale_tokens_are_not_handed_out(self):
+        """Test 2: A pooled token older than QR_POOL_MAX_AGE_SECONDS is discarded"""
+        stale = self.pool._generate()
+        stale['created_at'] = int(time.time()) - QR_POOL_MAX_AGE_SECONDS - 1
+        self.pool._ready.appendleft(stale)
+
+        assert self.pool.acquire()['token_id'] != stale['token_id']
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Question Bank Index Tests
+The mock question bank is loaded once into indexed per-type arrays and sampled without reusing questions
+"""
+
+import random
+
+import pytest
+
+from aws_mock_config import AWSMockServices
+from question_bank_index import QuestionBankIndex, get_question_bank_index
+
+
+def bank(count=10):
+    return {'academic_writing': [{'question_id': f'aw_{i:03d}', 'prompt': f'Prompt {i}'} for i in range(count)]}
+
+
+@pytest.mark.unit
+class TestQuestionBankIndex:
+    """Test lookups and unused-question sampling"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.index = QuestionBankIndex(bank())
+        self.rng = random.Random(7)
+
+    def test_01_lookup_by_id(self):
+        """Test 1: Questions are found by type and id; unknown ids and types are None"""
+        assert self.index.get('academic_writing', 'aw_003')['prompt'] == 'Prompt 3'
+        assert self.index.get('academic_writing', 'missing') is None
+        assert self.index.get('general_writing', 'aw_003') is None
+        assert self.index.counts() == {'academic_writing': 10}
+
+    def test_02_samples_only_unused_questions(self):
+        """Test 2: With most of the bank used, only the unused questions are drawn"""
+        used = {f'aw_{i:03d}' for i in range(10) if i not in (2, 8)} | {'not_in_bank'}
+        drawn = {self.index.sample_unused('academic_writing', used, self.rng)['question_id'] for _ in range(200)}
+
+        assert drawn == {'aw_002', 'aw_008'}
+
+    def test_03_all_used_allows_reuse(self):
+        """Test 3: Once every question is used any question may be drawn; empty types give None"""
+        used = {f'aw_{i:03d}' for i in range(10)}
+
+        assert self.index.sample_unused('academic_writing', used, self.rng)['question_id'] in used
+        assert self.index.sample_unused('general_writing', set(), self.rng) is None
+
+    def test_04_draws_cover_the_bank(self):
+        """Test 4: Sampling with nothing used reaches every question"""
+        drawn = {self.index.sample_unused('academic_writing', (), self.rng)['question_id'] for _ in range(500)}
+
+        assert len(drawn) == 10
+
+
+@pytest.mark.unit
+class TestMockQuestionBank:
+    """Test the shipped question bank and its use by the mock services"""
+
+    def test_01_bank_is_loaded_once(self):
+        """Test 1: The process-wide index is shared and every assessment type has questions"""
+        index = get_question_bank_index()
+
+        assert get_question_bank_index() is index
+        for assessment_type in ('academic_writing', 'general_writing', 'academic_speaking', 'general_speaking'):
+            questions = index.questions(assessment_type)
+            assert questions
+            assert len({q['question_id'] for q in questions}) == len(questions)
+
+    def test_02_users_get_questions_they_have_not_done(self):
+        """Test 2: get_unique_assessment_question skips the user's completed questions"""
+        services = AWSMockServices()
+        email = 'questions@example.com'
+        services.create_user({'email': email, 'password': 'correct horse battery staple'})
+        questions = get_question_bank_index().questions('academic_writing')
+        for question in questions[:-1]:
+            services.record_completed_assessment(email, 'academic_writing', question['question_id'],
+                                                 {'overall_band': 7.0})
+
+        assert services.get_unique_assessment_question(email, 'academic_writing')['question_id'] \
+            == questions[-1]['question_id']
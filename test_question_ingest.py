@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Bulk Question Ingestion Tests
+Checkpoint/resume and failed-batch handling of BulkQuestionIngestor against an in-memory table
+"""
+
+import json
+import threading
+
+import pytest
+from botocore.exceptions import ClientError
+
+import question_ingest
+from question_bank_dal import QuestionCategory
+from question_ingest import BulkQuestionIngestor, BATCH_WRITE_LIMIT, question_shard
+
+
+class FakeBatchClient:
+    """batch_write_item over a dict; questions whose text starts with a failing prefix are rejected"""
+
+    def __init__(self):
+        self.items = {}
+        self.calls = 0
+        self.failing_prefixes = set()
+        self.unprocessed_once = False
+        self._lock = threading.Lock()
+
+    def batch_write_item(self, RequestItems):
+        (table_name, requests), = RequestItems.items()
+        with self._lock:
+            self.calls += 1
+            texts = [request['PutRequest']['Item']['content']['text'] for request in requests]
+            if any(text.startswith(tuple(self.failing_prefixes)) for text in texts):
+                raise ClientError({'Error': {'Code': 'ValidationException', 'Message': 'rejected'}}, 'BatchWriteItem')
+            if self.unprocessed_once:
+                # DynamoDB accepted the first request and handed the rest back
+                self.unprocessed_once = False
+                accepted, requests = requests[:1], requests[1:]
+            else:
+                accepted, requests = requests, []
+            for request in accepted:
+                item = request['PutRequest']['Item']
+                self.items[(item['pool_id'], item['question_id'])] = item
+        return {'UnprocessedItems': {table_name: requests} if requests else {}}
+
+    def batch_get_item(self, RequestItems):
+        (table_name, request), = RequestItems.items()
+        with self._lock:
+            found = [self.items[(key['pool_id'], key['question_id'])] for key in request['Keys']
+                     if (key['pool_id'], key['question_id']) in self.items]
+        return {'Responses': {table_name: [{'question_id': item['question_id']} for item in found]}}
+
+
+class FakeQuestionDAL:
+    def __init__(self, client):
+        self.dynamodb = type('Resource', (), {'meta': type('Meta', (), {'client': client})})()
+        self.questions_table_name = 'ielts-questions-test'
+        self.shard_count = 4
+        self.question_requirements = {'academic_writing': {QuestionCategory.WRITING_TASK2: 1}}
+
+
+class FakeCounters:
+    def __init__(self):
+        self.totals = {}
+
+    def apply_deltas(self, deltas):
+        for key, (total, available) in deltas.items():
+            self.totals[key] = self.totals.get(key, 0) + total
+
+
+def question_specs(count, prefix='essay'):
+    return [{
+        'assessment_type': 'academic_writing',
+        'category': 'writing_task2',
+        'content': {'text': f'{prefix} {i}: discuss both views and give your opinion'}
+    } for i in range(count)]
+
+
+@pytest.mark.unit
+class TestBulkQuestionIngestor:
+    """Test checkpointed bulk loading"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(question_ingest, 'RETRY_BASE_DELAY_SECONDS', 0)
+        self.client = FakeBatchClient()
+        self.counters = FakeCounters()
+        self.checkpoint_path = str(tmp_path / 'ingest.checkpoint.json')
+
+    def ingestor(self, **kwargs):
+        kwargs.setdefault('checkpoint_path', self.checkpoint_path)
+        return BulkQuestionIngestor(FakeQuestionDAL(self.client), self.counters, **kwargs)
+
+    def checkpoint(self):
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_01_full_run_writes_everything_and_checkpoints_the_end(self):
+        """Test 1: Every valid question is written and the checkpoint covers the whole input"""
+        specs = question_specs(60) + [{'assessment_type': 'academic_writing', 'category': 'speaking_part1',
+                                       'content': {'text': 'wrong category'}}]
+        report = self.ingestor(workers=4).ingest(specs, source='questions.jsonl')
+
+        assert report['success']
+        assert (report['written'], report['invalid'], report['failed']) == (60, 1, 0)
+        assert len(self.client.items) == 60
+        assert self.checkpoint()['position'] == 61
+        assert sum(self.counters.totals.values()) == 60
+
+    def test_02_resume_skips_the_checkpointed_prefix(self):
+        """Test 2: A rerun with the same checkpoint writes only the records after it"""
+        specs = question_specs(80)
+        first = self.ingestor(workers=1).ingest(specs[:50], source='questions.jsonl')
+        assert first['position'] == 50
+
+        self.client.calls = 0
+        resumed = self.ingestor(workers=1).ingest(specs, source='questions.jsonl')
+
+        assert resumed['resumed_from'] == 50
+        assert resumed['written'] == 30
+        assert self.client.calls == 2  # 25 + 5
+        assert len(self.client.items) == 80
+        assert self.checkpoint()['position'] == 80
+
+    def test_03_shards_are_derived_from_question_ids(self):
+        """Test 3: A question's shard depends only on its id, whatever was loaded before it"""
+        specs = question_specs(70)
+        self.ingestor(workers=1).ingest(specs[:30], source='questions.jsonl')
+        self.ingestor(workers=1).ingest(specs, source='questions.jsonl')
+
+        assert all(item['shard'] == question_shard(item['question_id'], 4) for item in self.client.items.values())
+        assert len({item['shard'] for item in self.client.items.values()}) == 4
+
+    def test_04_failed_batch_holds_the_checkpoint_back(self):
+        """Test 4: A failed batch keeps the checkpoint before it so the rerun retries it"""
+        specs = question_specs(BATCH_WRITE_LIMIT) + question_specs(BATCH_WRITE_LIMIT, 'bad') + question_specs(10, 'late')
+        self.client.failing_prefixes.add('bad')
+
+        report = self.ingestor(workers=1).ingest(specs, source='questions.jsonl')
+
+        assert not report['success']
+        assert report['failed'] == BATCH_WRITE_LIMIT
+        assert report['written'] == BATCH_WRITE_LIMIT + 10
+        assert self.checkpoint()['position'] == BATCH_WRITE_LIMIT
+
+        self.client.failing_prefixes.clear()
+        retry = self.ingestor(workers=1).ingest(specs, source='questions.jsonl')
+
+        assert retry['success']
+        assert retry['resumed_from'] == BATCH_WRITE_LIMIT
+        assert len(self.client.items) == len(specs)
+        assert self.checkpoint()['position'] == len(specs)
+
+    def test_05_checkpoint_from_another_file_is_rejected(self):
+        """Test 5: A checkpoint is only resumed for the file that wrote it"""
+        self.ingestor().ingest(question_specs(5), source='questions.jsonl')
+        with pytest.raises(ValueError):
+            self.ingestor().ingest(question_specs(5), source='other.jsonl')
+
+    def test_06_unprocessed_items_are_resubmitted(self):
+        """Test 6: Items DynamoDB leaves unprocessed are written by a retry"""
+        self.client.unprocessed_once = True
+        report = self.ingestor(checkpoint_path=None).ingest(question_specs(BATCH_WRITE_LIMIT))
+
+        assert report['written'] == BATCH_WRITE_LIMIT
+        assert len(self.client.items) == BATCH_WRITE_LIMIT
+        assert self.client.calls == 2
+
+    def test_07_rerun_without_checkpoint_neither_duplicates_nor_recounts(self):
+        """Test 7: Loading the same file again skips the questions it finds and counts only new ones"""
+        specs = question_specs(60)
+        self.ingestor(checkpoint_path=None, workers=4).ingest(specs)
+        rerun = self.ingestor(checkpoint_path=None, workers=4).ingest(specs + question_specs(5, 'new'))
+
+        assert len(self.client.items) == 65
+        assert (rerun['written'], rerun['already_present']) == (5, 60)
+        assert sum(self.counters.totals.values()) == 65
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Question Pool Counter Tests
+Exact pool counts kept by transactions, read by BatchGetItem and reconciled against the shards
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import ClientError
+
+import question_pool_counters
+from question_bank_dal import QuestionCategory
+from question_pool_counters import QuestionPoolCounters, rollup_counter_id, shard_counter_id
+
+
+class FakeDynamoDB:
+    """Counters and questions with the TransactWriteItems, BatchGetItem, UpdateItem and Query used by the counters"""
+
+    def __init__(self):
+        self.counters = {}
+        self.questions = []
+        self.batch_get_calls = 0
+        self.unprocessed_once = False
+        self.conflicting_counter = None
+
+    # Client API
+    def transact_write_items(self, TransactItems):
+        for action in TransactItems:
+            if 'Put' in action:
+                self.questions.append(dict(action['Put']['Item']))
+            elif action['Update']['TableName'] == 'questions':
+                key = action['Update']['Key']
+                question = next(q for q in self.questions if q['question_id'] == key['question_id'])
+                question['active'] = action['Update']['ExpressionAttributeValues'][':active']
+            else:
+                values = action['Update']['ExpressionAttributeValues']
+                counter = self.counters.setdefault(action['Update']['Key']['counter_id'],
+                                                   {'counter_id': action['Update']['Key']['counter_id']})
+                counter['total'] = counter.get('total', 0) + values[':total']
+                counter['active'] = counter.get('active', 0) + values[':active']
+
+    def batch_get_item(self, RequestItems):
+        self.batch_get_calls += 1
+        keys = RequestItems['counters']['Keys']
+        unprocessed = {}
+        if self.unprocessed_once and len(keys) > 1:
+            self.unprocessed_once = False
+            unprocessed = {'counters': {'Keys': keys[1:]}}
+            keys = keys[:1]
+        items = [dict(self.counters[k['counter_id']]) for k in keys if k['counter_id'] in self.counters]
+        return {'Responses': {'counters': items}, 'UnprocessedKeys': unprocessed}
+
+    # counters_table
+    def update_item(self, Key, UpdateExpression, ConditionExpression, ExpressionAttributeNames,
+                    ExpressionAttributeValues):
+        current = self.counters.get(Key['counter_id'])
+        if ConditionExpression == 'attribute_not_exists(counter_id)':
+            failed = current is not None
+        else:
+            failed = current is None or (current.get('total'), current.get('active')) != (
+                ExpressionAttributeValues[':old_total'], ExpressionAttributeValues[':old_active'])
+        if failed or Key['counter_id'] == self.conflicting_counter:
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+        self.counters[Key['counter_id']] = {'counter_id': Key['counter_id'],
+                                            'total': ExpressionAttributeValues[':total'],
+                                            'active': ExpressionAttributeValues[':active']}
+
+    # questions_table
+    def query(self, KeyConditionExpression, ExpressionAttributeValues, ExclusiveStartKey=None, **kwargs):
+        items = [q for q in self.questions if q['pool_id'] == ExpressionAttributeValues[':pool_id']]
+        start = ExclusiveStartKey['offset'] if ExclusiveStartKey else 0
+        response = {'Items': items[start:start + 2]}
+        if start + 2 < len(items):
+            response['LastEvaluatedKey'] = {'offset': start + 2}
+        return response
+
+
+def make_question(question_id, category='writing_task2', shard=0, active=True):
+    return {'question_id': question_id, 'pool_id': shard_counter_id('academic_writing', category, shard),
+            'assessment_type': 'academic_writing', 'category': category, 'shard': shard, 'active': active}
+
+
+@pytest.mark.unit
+class TestQuestionPoolCounters:
+    """Test counter maintenance, reads and reconciliation"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.setattr(question_pool_counters, 'RETRY_BASE_DELAY_SECONDS', 0)
+        self.db = FakeDynamoDB()
+        dal = SimpleNamespace(
+            dynamodb=SimpleNamespace(meta=SimpleNamespace(client=self.db)),
+            counters_table_name='counters', questions_table_name='questions', shard_count=4,
+            counters_table=self.db, questions_table=self.db,
+            question_requirements={'academic_writing': {QuestionCategory.WRITING_TASK1: 1,
+                                                        QuestionCategory.WRITING_TASK2: 1}}
+        )
+        self.counters = QuestionPoolCounters(dal)
+
+    def add(self, question):
+        self.counters.write(self.counters.put_question_transaction(question))
+
+    def test_01_question_writes_move_shard_and_rollup_counters(self):
+        """Test 1: Adding and deactivating questions adjusts the shard counter and the pool rollup"""
+        self.add(make_question('q1', shard=1))
+        self.add(make_question('q2', shard=2))
+        self.add(make_question('q3', shard=2, active=False))
+        self.counters.write(self.counters.set_active_transaction(self.db.questions[0], False))
+
+        assert self.db.counters[shard_counter_id('academic_writing', 'writing_task2', 2)] \
+            == {'counter_id': 'academic_writing#writing_task2#2', 'total': 2, 'active': 1}
+        rollup = self.db.counters[rollup_counter_id('academic_writing', 'writing_task2')]
+        assert (rollup['total'], rollup['active']) == (3, 1)
+
+    def test_02_pool_counts_come_from_one_batch_read(self):
+        """Test 2: Rollups are read with BatchGetItem, retrying unprocessed keys; missing pools count zero"""
+        self.add(make_question('q1', category='writing_task1'))
+        self.add(make_question('q2'))
+        self.db.unprocessed_once = True
+
+        counts = self.counters.get_pool_counts(['academic_writing'])
+
+        assert counts == {'academic_writing': {'writing_task1': {'total': 1, 'active': 1},
+                                               'writing_task2': {'total': 1, 'active': 1}}}
+        assert self.db.batch_get_calls == 2
+
+    def test_03_low_pools_are_flagged(self):
+        """Test 3: Pools with fewer active questions than factor x requirement are reported"""
+        for i in range(5):
+            self.add(make_question(f'q{i}', category='writing_task1'))
+        self.add(make_question('q9'))
+
+        alerts = self.counters.check_pool_exhaustion(factor=5)
+
+        assert alerts == [{'assessment_type': 'academic_writing', 'category': 'writing_task2',
+                           'active': 1, 'threshold': 5}]
+
+    def test_04_bulk_deltas_update_rollups_once_per_pool(self):
+        """Test 4: apply_deltas writes each shard and one summed rollup per pool"""
+        self.counters.apply_deltas({('academic_writing', 'writing_task2', 0): (3, 2),
+                                    ('academic_writing', 'writing_task2', 3): (4, 4)})
+
+        rollup = self.db.counters[rollup_counter_id('academic_writing', 'writing_task2')]
+        assert (rollup['total'], rollup['active']) == (7, 6)
+
+    def test_05_reconcile_corrects_drift(self):
+        """Test 5: Shard and rollup counters are rewritten from a rescan of the pool"""
+        for i in range(5):
+            self.add(make_question(f'q{i}', shard=i % 2, active=i != 0))
+        self.db.counters[shard_counter_id('academic_writing', 'writing_task2', 1)]['total'] = 40
+        self.db.counters[rollup_counter_id('academic_writing', 'writing_task2')]['active'] = 0
+
+        result = self.counters.reconcile('academic_writing', 'writing_task2')
+
+        assert result['corrected_shards'] == [1]
+        assert result['rollup_corrected'] is True
+        assert (result['total'], result['active']) == (5, 4)
+        assert self.counters.get_pool_counts(['academic_writing'])['academic_writing']['writing_task2'] \
+            == {'total': 5, 'active': 4}
+
+    def test_06_concurrent_update_skips_the_rollup(self):
+        """Test 6: A shard written during reconciliation is skipped and the rollup left for the next run"""
+        self.add(make_question('q1', shard=3))
+        shard_id = shard_counter_id('academic_writing', 'writing_task2', 3)
+        self.db.counters[shard_id]['total'] = 9
+        self.db.counters[rollup_counter_id('academic_writing', 'writing_task2')]['total'] = 9
+        self.db.conflicting_counter = shard_id
+
+        result = self.counters.reconcile('academic_writing', 'writing_task2')
+
+        assert result['skipped'] == [3]
+        assert result['rollup_corrected'] is False
+        assert self.db.counters[rollup_counter_id('academic_writing', 'writing_task2')]['total'] == 9
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Request-Scoped Data Loader Tests
+Memoization, batching and invalidation of the per-invocation loaders
+"""
+
+import pytest
+
+import request_loader
+from aws_mock_config import AWSMockServices
+from request_loader import DataLoader, request_scope, request_scoped
+
+
+class CountingSource:
+    """batch_load over a dict that records every call"""
+
+    def __init__(self, items):
+        self.items = items
+        self.calls = []
+
+    def batch_load(self, keys):
+        self.calls.append(list(keys))
+        return {key: dict(self.items[key]) for key in keys if key in self.items}
+
+
+@pytest.mark.unit
+class TestDataLoader:
+    """Test DataLoader caching"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.source = CountingSource({'a': {'name': 'A'}, 'b': {'name': 'B'}})
+        self.loader = DataLoader('users', self.source.batch_load, max_batch_size=2)
+
+    def test_01_repeat_reads_are_memoized(self):
+        """Test 1: The same key is fetched once, misses included"""
+        assert self.loader.load('a') == {'name': 'A'}
+        assert self.loader.load('a') == {'name': 'A'}
+        assert self.loader.load('missing') is None
+        assert self.loader.load('missing') is None
+
+        assert self.source.calls == [['a'], ['missing']]
+        assert (self.loader.reads, self.loader.hits) == (2, 2)
+
+    def test_02_uncached_keys_are_batched(self):
+        """Test 2: load_many fetches only uncached keys, in batches of max_batch_size"""
+        self.loader.load('a')
+        items = self.loader.load_many(['a', 'b', 'c', 'd', 'b'])
+
+        assert list(items) == ['a', 'b', 'c', 'd']
+        assert self.source.calls == [['a'], ['b', 'c'], ['d']]
+
+    def test_03_clear_forces_a_fresh_read(self):
+        """Test 3: After clear(key) the next load sees the written value"""
+        self.loader.load('a')
+        self.source.items['a'] = {'name': 'A2'}
+        assert self.loader.load('a') == {'name': 'A'}
+
+        self.loader.clear('a')
+        assert self.loader.load('a') == {'name': 'A2'}
+        assert self.source.calls == [['a'], ['a']]
+
+
+@pytest.mark.unit
+class TestRequestScope:
+    """Test scoping and invalidation through the module helpers"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.source = CountingSource({'a': {'name': 'A'}})
+
+    def test_01_reads_are_shared_within_a_scope_only(self):
+        """Test 1: Loads share one loader inside a scope and are not cached outside it"""
+        with request_scope() as scope:
+            request_loader.load('users', 'a', self.source.batch_load)
+            with request_scope() as nested:
+                assert nested is scope
+                request_loader.load('users', 'a', self.source.batch_load)
+        assert len(self.source.calls) == 1
+
+        request_loader.load('users', 'a', self.source.batch_load)
+        request_loader.load('users', 'a', self.source.batch_load)
+        assert len(self.source.calls) == 3
+
+    def test_02_invalidate_drops_one_key(self):
+        """Test 2: invalidate() forgets the written key and keeps the rest"""
+        self.source.items['b'] = {'name': 'B'}
+        with request_scope():
+            request_loader.load_many('users', ['a', 'b'], self.source.batch_load)
+            self.source.items['a'] = {'name': 'A2'}
+            request_loader.invalidate('users', 'a')
+
+            assert request_loader.load('users', 'a', self.source.batch_load) == {'name': 'A2'}
+            assert request_loader.load('users', 'b', self.source.batch_load) == {'name': 'B'}
+        assert self.source.calls == [['a', 'b'], ['a']]
+
+    def test_03_invalidate_outside_a_scope_is_a_no_op(self):
+        """Test 3: invalidate() without a scope does nothing"""
+        request_loader.invalidate('users', 'a')
+
+    def test_04_request_scoped_decorator(self):
+        """Test 4: A decorated entry point runs in its own scope"""
+        @request_scoped
+        def handler():
+            request_loader.load('users', 'a', self.source.batch_load)
+            request_loader.load('users', 'a', self.source.batch_load)
+
+        handler()
+        handler()
+        assert len(self.source.calls) == 2
+
+
+@pytest.mark.unit
+class TestTableWritesInvalidate:
+    """Test that mock table writes invalidate cached reads in the same request"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.services = AWSMockServices()
+        self.user_email = 'loader@example.com'
+        self.services.users_table.put_item({'email': self.user_email, 'username': 'before',
+                                            'purchases': [{'assessment_type': 'academic_writing',
+                                                           'assessments_remaining': 1}]})
+
+    def test_01_put_item(self):
+        """Test 1: A put within the request is visible to the next load"""
+        with request_scope():
+            assert self.services._load_user(self.user_email)['username'] == 'before'
+            self.services.users_table.put_item({'email': self.user_email, 'username': 'after'})
+            assert self.services._load_user(self.user_email)['username'] == 'after'
+
+    def test_02_delete_item(self):
+        """Test 2: A deleted user is not served from the request cache"""
+        with request_scope():
+            assert self.services._load_user(self.user_email) is not None
+            self.services.users_table.delete_item(self.user_email)
+            assert self.services._load_user(self.user_email) is None
+
+    def test_03_conditional_update(self):
+        """Test 3: A consume invalidates the cached user, so the next load reads it again"""
+        with request_scope() as scope:
+            self.services._load_user(self.user_email)
+            assert self.services.consume_assessment_attempt(self.user_email, 'academic_writing') == 0
+            user = self.services._load_user(self.user_email)
+            stats = scope.stats()[self.services.users_table.table_name]
+        assert user['purchases'][0]['assessments_remaining'] == 0
+        assert stats == {'reads': 2, 'hits': 0}
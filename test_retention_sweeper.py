@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Retention Sweeper Tests
+Parallel-segment pruning of expired history, embedded profile history and session conversation data
+"""
+
+import json
+import zlib
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import ClientError
+
+import question_bank_dal
+import retention_sweeper
+from retention_sweeper import RetentionSweeper, WriteBudget
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+class FakeTable:
+    """Items hashed to parallel-scan segments by key; `matches` stands in for the FilterExpression"""
+
+    def __init__(self, key, items=(), matches=lambda item, kwargs: True, page_size=10, sort_key=None):
+        self.key = key
+        self.keys = (key, sort_key) if sort_key else (key,)
+        self.items = [dict(item) for item in items]
+        self.matches = matches
+        self.page_size = page_size
+        self.scan_calls = []
+        self.updates = []
+        self.conflicting_key = None
+
+    def scan(self, Segment, TotalSegments, ExclusiveStartKey=None, **kwargs):
+        self.scan_calls.append((Segment, TotalSegments))
+        segment = sorted((item for item in self.items
+                          if zlib.crc32(repr(self.key_of(item)).encode()) % TotalSegments == Segment),
+                         key=self.key_of)
+        if ExclusiveStartKey:
+            segment = [item for item in segment if self.key_of(item) > self.key_of(ExclusiveStartKey)]
+        page = segment[:self.page_size]
+        response = {'Items': [dict(item) for item in page if self.matches(item, kwargs)]}
+        if len(segment) > self.page_size:
+            response['LastEvaluatedKey'] = {k: page[-1][k] for k in self.keys}
+        return response
+
+    def key_of(self, item):
+        return tuple(item[k] for k in self.keys)
+
+    def update_item(self, Key, ConditionExpression, **kwargs):
+        item = next((i for i in self.items if i[self.key] == Key[self.key]), None)
+        if item is None or Key[self.key] == self.conflicting_key:
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+        self.updates.append((Key, kwargs))
+        values = kwargs['ExpressionAttributeValues']
+        if ':active' in values:
+            item['assessment_history'] = values[':active']
+        else:
+            for name in kwargs['ExpressionAttributeNames'].values():
+                item.pop(name, None)
+            item['conversation_data_cleaned'] = True
+        return {'ConsumedCapacity': {'CapacityUnits': 1.0}}
+
+
+class FakeClient:
+    """BatchWriteItem against the history table, optionally leaving one batch partly unprocessed"""
+
+    def __init__(self, history):
+        self.history = history
+        self.batch_sizes = []
+        self.unprocessed_once = False
+
+    def batch_write_item(self, RequestItems, ReturnConsumedCapacity):
+        (table_name, requests), = RequestItems.items()
+        self.batch_sizes.append(len(requests))
+        unprocessed = {}
+        if self.unprocessed_once and len(requests) > 1:
+            self.unprocessed_once = False
+            unprocessed = {table_name: requests[1:]}
+            requests = requests[:1]
+        for request in requests:
+            key = request['DeleteRequest']['Key']
+            self.history.items = [i for i in self.history.items
+                                  if (i['user_email'], i['recorded_at']) != (key['user_email'], key['recorded_at'])]
+        return {'UnprocessedItems': unprocessed,
+                'ConsumedCapacity': [{'TableName': table_name, 'CapacityUnits': float(len(requests))}]}
+
+
+def history_item(i, expired):
+    expires_at = int((NOW + timedelta(days=-1 if expired else 1)).timestamp())
+    return {'user_email': f'user{i % 7}@example.com', 'recorded_at': f'2025-01-01T00:00:{i:02d}',
+            'expires_at': expires_at}
+
+
+def profile(email, expiries, last_updated='2026-01-01T00:00:00'):
+    records = [{'session_id': f'{email}-{i}', 'expiry_date': (NOW + timedelta(days=days)).isoformat()}
+               for i, days in enumerate(expiries)]
+    return {'user_email': email, 'assessment_history': records, 'last_updated': last_updated}
+
+
+@pytest.mark.unit
+class TestWriteBudget:
+    """Test the shared token bucket of write capacity units"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.now = 0.0
+        self.sleeps = []
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+        self.budget = WriteBudget(10, clock=lambda: self.now, sleep=sleep)
+
+    def test_01_acquire_waits_for_refill(self):
+        """Test 1: Writes beyond the available units wait for the bucket to refill"""
+        self.budget.acquire(10)
+        self.budget.acquire(5)
+
+        assert self.sleeps == [pytest.approx(0.5)]
+        assert self.budget.consumed == 15
+
+    def test_02_settle_charges_reported_capacity(self):
+        """Test 2: Consumed capacity above the estimate is paid from the bucket; no report changes nothing"""
+        self.budget.acquire(2)
+        self.budget.settle(2, {'ConsumedCapacity': [{'CapacityUnits': 3.0}, {'CapacityUnits': 2.0}]})
+        self.budget.settle(1, {})
+
+        assert self.budget.consumed == 5
+        assert self.budget.tokens == 5
+
+
+@pytest.mark.unit
+class TestRetentionSweeper:
+    """Test each table's segment sweep and the combined report"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.setattr(retention_sweeper, 'RETRY_BASE_DELAY_SECONDS', 0)
+        now_ts = int(NOW.timestamp())
+        self.history = FakeTable(
+            'user_email', [history_item(i, expired=i % 3 != 0) for i in range(90)], sort_key='recorded_at',
+            matches=lambda item, kwargs: item['expires_at'] < kwargs['ExpressionAttributeValues'][':now'])
+        self.profiles = FakeTable(
+            'user_email', [profile('old@example.com', [-30, 30, -1]), profile('fresh@example.com', [30]),
+                           profile('busy@example.com', [-5])],
+            matches=lambda item, kwargs: 'assessment_history' in item)
+        self.sessions = FakeTable(
+            'session_id', [{'session_id': 's1', 'status': 'completed', 'conversation_history': ['hi']},
+                           {'session_id': 's2', 'status': 'in_progress', 'conversation_history': ['hi']},
+                           {'session_id': 's3', 'status': 'completed', 'transcript_data': 'text'},
+                           {'session_id': 's4', 'status': 'completed'}],
+            matches=lambda item, kwargs: item['status'] == 'completed' and any(
+                item.get(name) for name in retention_sweeper.CONVERSATION_DATA_KEYS))
+        self.client = FakeClient(self.history)
+        dal = SimpleNamespace(
+            dynamodb=SimpleNamespace(meta=SimpleNamespace(client=self.client)),
+            history_table=self.history, history_table_name='history',
+            profiles_table=self.profiles, profiles_table_name='profiles',
+            sessions_table=self.sessions, sessions_table_name='sessions'
+        )
+        self.sweeper = RetentionSweeper(dal, total_segments=2, wcu_per_second=1000)
+        self.now_ts = now_ts
+
+    def test_01_history_deletes_expired_items_in_batches(self):
+        """Test 1: Expired items are deleted 25 at a time, and unprocessed deletes are retried"""
+        self.client.unprocessed_once = True
+        counts = [self.sweeper.sweep_history_segment(segment, self.now_ts) for segment in (0, 1)]
+
+        assert sum(c['pruned'] for c in counts) == sum(c['scanned'] for c in counts) == 60
+        assert max(self.client.batch_sizes) <= retention_sweeper.BATCH_WRITE_LIMIT
+        assert len(self.history.items) == 30
+        assert all(item['expires_at'] > self.now_ts for item in self.history.items)
+
+    def test_02_profiles_drop_expired_embedded_records(self):
+        """Test 2: Only expired records are removed, conditional on the profile being unchanged"""
+        self.profiles.conflicting_key = 'busy@example.com'
+        counts = [self.sweeper.sweep_profiles_segment(segment, NOW) for segment in (0, 1)]
+
+        assert sum(c['scanned'] for c in counts) == 3
+        assert sum(c['pruned'] for c in counts) == 2
+        assert sum(c['profiles_updated'] for c in counts) == 1
+        old, fresh, busy = self.profiles.items
+        assert [r['session_id'] for r in old['assessment_history']] == ['old@example.com-1']
+        assert len(fresh['assessment_history']) == len(busy['assessment_history']) == 1
+        _, update = self.profiles.updates[0]
+        assert update['ExpressionAttributeValues'][':seen'] == '2026-01-01T00:00:00'
+
+    def test_03_sessions_lose_conversation_data(self):
+        """Test 3: Completed sessions with conversation data are stripped; others are left alone"""
+        counts = [self.sweeper.sweep_sessions_segment(segment, NOW) for segment in (0, 1)]
+
+        assert sum(c['pruned'] for c in counts) == 2
+        assert 'conversation_history' not in self.sessions.items[0]
+        assert 'transcript_data' not in self.sessions.items[2]
+        assert self.sessions.items[1]['conversation_history'] == ['hi']
+
+    def test_04_sweep_covers_every_segment(self):
+        """Test 4: The sweep scans every segment of every table and totals the counts"""
+        report = self.sweeper.sweep()
+
+        assert report['errors'] == []
+        assert report['tables']['history']['pruned'] == 60
+        assert report['tables']['profiles']['profiles_updated'] == 2
+        assert report['tables']['sessions']['pruned'] == 2
+        assert {segment for segment, _ in self.history.scan_calls} == {0, 1}
+        assert all(total == 2 for _, total in self.history.scan_calls)
+        assert report['wcu_consumed'] == 60 + 2 + 2
+
+    def test_05_handler_reports_failed_tables(self, monkeypatch):
+        """Test 5: The scheduled handler applies overrides and returns 500 when a table fails"""
+        def broken_scan(**kwargs):
+            raise ClientError({'Error': {'Code': 'ProvisionedThroughputExceededException'}}, 'Scan')
+
+        self.sessions.scan = broken_scan
+        monkeypatch.setattr(question_bank_dal, 'get_question_bank_dal', lambda: self.sweeper.dal)
+
+        response = retention_sweeper.retention_sweep_handler({'total_segments': 3, 'wcu_per_second': 1000}, None)
+        body = json.loads(response['body'])
+
+        assert response['statusCode'] == 500
+        assert body['tables']['history']['pruned'] == 60
+        assert len(body['errors']) == 3 and all(e.startswith('sessions: ') for e in body['errors'])
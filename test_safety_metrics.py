@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Safety Metrics Tests
+Per-thread sharded safety counters, their cross-process totals and the admin-only metrics endpoint
+"""
+
+import json
+import os
+import threading
+
+import pytest
+
+import content_safety
+import lambda_handler
+from content_safety import SAFETY_COUNTER_NAMES, ShardedCounters
+
+
+@pytest.mark.unit
+class TestShardedCounters:
+    """Test counter sharding, snapshots and aggregation"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        self.metrics_dir = str(tmp_path)
+        monkeypatch.setattr(content_safety, 'SAFETY_METRICS_DIR', self.metrics_dir)
+        self.counters = ShardedCounters(SAFETY_COUNTER_NAMES)
+
+    def write_snapshot(self, name, totals):
+        with open(os.path.join(self.metrics_dir, name), 'w') as f:
+            json.dump(totals, f)
+
+    def test_01_increments_from_many_threads(self):
+        """Test 1: Totals include every thread, including threads that have finished"""
+        def work():
+            for _ in range(1000):
+                self.counters.increment('total_requests')
+            self.counters.increment('blocked_requests', 3)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        first = self.counters.snapshot()
+        self.counters.increment('total_requests')
+
+        assert first['total_requests'] == 8000
+        assert first['blocked_requests'] == 24
+        assert self.counters.snapshot()['total_requests'] == 8001
+
+    def test_02_aggregate_adds_live_workers_and_drops_stale_ones(self):
+        """Test 2: Other live workers' snapshots are added; snapshots of exited workers are deleted"""
+        self.counters.increment('total_requests', 5)
+        self.counters.flush()
+        other = dict.fromkeys(SAFETY_COUNTER_NAMES, 0)
+        other['total_requests'] = 7
+        self.write_snapshot(f'{os.getpid()}-other-worker.json', other)
+        self.write_snapshot('999999999-gone.json', other)
+
+        totals = self.counters.aggregate()
+
+        assert totals['total_requests'] == 12
+        assert not os.path.exists(os.path.join(self.metrics_dir, '999999999-gone.json'))
+
+    def test_03_emf_lines_carry_deltas(self):
+        """Test 3: Each EMF emission reports only the increments since the previous one"""
+        safety_filter = content_safety.ContentSafetyFilter()
+        safety_filter.safety_counters.increment('total_requests', 4)
+        first = safety_filter.emit_safety_metrics_emf()
+        safety_filter.safety_counters.increment('total_requests')
+        second = safety_filter.emit_safety_metrics_emf()
+
+        assert first['total_requests'] == 4
+        assert second['total_requests'] == 1
+        assert first['_aws']['CloudWatchMetrics'][0]['Namespace'] == content_safety.SAFETY_METRICS_NAMESPACE
+
+
+@pytest.mark.unit
+class TestSafetyMetricsEndpoint:
+    """Test that the metrics read is admin-only and read-only"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(content_safety, 'SAFETY_METRICS_DIR', str(tmp_path))
+        monkeypatch.setenv('ADMIN_API_KEY', 'admin-secret')
+        monkeypatch.setattr(content_safety.content_safety, 'emit_safety_metrics_emf',
+                            lambda: pytest.fail('metrics read emitted EMF'))
+
+    def test_01_requires_the_admin_key(self, monkeypatch):
+        """Test 1: Missing or wrong keys get 403; an unset ADMIN_API_KEY disables the endpoint"""
+        assert lambda_handler.handle_safety_metrics({})['statusCode'] == 403
+        assert lambda_handler.handle_safety_metrics({'X-Admin-Key': 'guess'})['statusCode'] == 403
+
+        monkeypatch.delenv('ADMIN_API_KEY')
+        assert lambda_handler.handle_safety_metrics({'x-admin-key': ''})['statusCode'] == 403
+
+    def test_02_admin_reads_the_counters(self):
+        """Test 2: The admin key returns the counters without emitting or flushing"""
+        response = lambda_handler.handle_safety_metrics({'x-admin-key': 'admin-secret'})
+        body = json.loads(response['body'])
+
+        assert response['statusCode'] == 200
+        assert set(SAFETY_COUNTER_NAMES) <= set(body)
+        assert body['scope'] == 'all_processes'
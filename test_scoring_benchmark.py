@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Scoring Benchmark Tests
+Deterministic corpora, baseline comparison and the command line of the band scoring benchmark
+"""
+
+import json
+
+import pytest
+
+import scoring_benchmark
+from scoring_benchmark import (REFERENCE_BANDS, compare_to_baseline, generate_speaking_corpus,
+                               generate_writing_corpus, percentile)
+
+
+def result(bands, items_per_second=100.0):
+    return {'bands': bands, 'metrics': {'items_per_second': items_per_second}}
+
+
+@pytest.mark.unit
+class TestCorpora:
+    """Test the synthetic labeled corpora"""
+
+    def test_01_corpora_are_deterministic(self):
+        """Test 1: The same seed gives the same corpus; another seed does not"""
+        assert generate_writing_corpus(20, 7) == generate_writing_corpus(20, 7)
+        assert generate_writing_corpus(20, 7) != generate_writing_corpus(20, 8)
+        questions = ['Describe a place you like to visit.']
+        assert generate_speaking_corpus(10, 7, questions) == generate_speaking_corpus(10, 7, questions)
+
+    def test_02_reference_bands_are_spread_evenly(self):
+        """Test 2: Each reference band labels the same number of items"""
+        corpus = generate_writing_corpus(len(REFERENCE_BANDS) * 3, 7)
+
+        assert [item['reference_band'] for item in corpus[:len(REFERENCE_BANDS)]] == REFERENCE_BANDS
+        assert all(sum(1 for item in corpus if item['reference_band'] == band) == 3 for band in REFERENCE_BANDS)
+        assert len({item['id'] for item in corpus}) == len(corpus)
+
+
+@pytest.mark.unit
+class TestBaselineComparison:
+    """Test regression detection against a baseline"""
+
+    def test_01_percentile_is_nearest_rank(self):
+        """Test 1: Nearest-rank percentiles of a sorted list"""
+        values = [float(v) for v in range(1, 101)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+        assert percentile([], 50) == 0.0
+
+    def test_02_shifts_missing_items_and_slowdowns_fail(self):
+        """Test 2: Shifted bands beyond the allowance, unscored items and slowdowns are reported"""
+        baseline = result({'a': 6.0, 'b': 6.5, 'c': 7.0}, items_per_second=100.0)
+
+        assert compare_to_baseline('s', result({'a': 6.0, 'b': 6.5, 'c': 7.0}), baseline, 0, 0.3) == []
+        assert compare_to_baseline('s', result({'a': 6.0, 'b': 7.0, 'c': 7.0}), baseline, 1, None) == []
+        failures = compare_to_baseline('s', result({'a': 5.5, 'b': 6.5}, items_per_second=50.0), baseline, 0, 0.3)
+
+        assert len(failures) == 3
+        assert 'a: 6.0 -> 5.5' in failures[0]
+        assert 'not scored' in failures[1]
+        assert 'throughput' in failures[2]
+
+
+@pytest.mark.unit
+class TestBenchmarkCommand:
+    """Test main() against the stored and a freshly written baseline"""
+
+    def test_01_stored_baseline_has_no_band_shifts(self, capsys):
+        """Test 1: The band scorer matches the committed baseline"""
+        assert scoring_benchmark.main(['--scorer', 'band_scorer_speaking', '--writing-items', '1']) == 0
+        assert 'No band shifts against baseline' in capsys.readouterr().out
+
+    def test_02_update_then_compare(self, tmp_path, capsys):
+        """Test 2: A written baseline passes unchanged and a different seed is refused"""
+        baseline_path = str(tmp_path / 'baseline.json')
+        args = ['--scorer', 'band_scorer_speaking', '--writing-items', '1', '--speaking-items', '20',
+                '--baseline', baseline_path]
+
+        assert scoring_benchmark.main(args + ['--update-baseline']) == 0
+        with open(baseline_path) as f:
+            assert len(json.load(f)['scorers']['band_scorer_speaking']['bands']) == 20
+        assert scoring_benchmark.main(args) == 0
+        assert scoring_benchmark.main(args + ['--seed', '1']) == 1
+        assert 'not 1' in capsys.readouterr().out
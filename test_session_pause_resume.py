@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Session Pause/Resume Tests
+Pausing a timed section cancels its auto-advance; resuming schedules it at the shifted deadline
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from session_management import AssessmentSessionManager, SessionStatus
+
+
+class RecordingScheduler:
+    """schedule/cancel that record their calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def schedule(self, session_id, user_id, section_id, due_at):
+        self.calls.append(('schedule', section_id, due_at))
+
+    def cancel(self, session_id, section_id):
+        self.calls.append(('cancel', section_id))
+
+
+@pytest.mark.unit
+class TestPauseResume:
+    """Test auto-advance timers across pause and resume"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.manager = AssessmentSessionManager()
+        self.manager.scheduler = RecordingScheduler()
+        self.state = self.manager.create_session('user-1', 'academic_writing')
+        monkeypatch.setattr(self.manager, '_load_session_state', lambda session_id, user_id: self.state)
+        assert self.manager.start_session(self.state.session_id, 'user-1')
+        self.section = self.state.current_section
+        self.timer = self.state.timers[self.section]
+
+    def test_01_pause_cancels_the_auto_advance(self):
+        """Test 1: A paused section's timer is cancelled"""
+        assert self.manager.pause_session(self.state.session_id, 'user-1')
+
+        assert self.state.status == SessionStatus.PAUSED
+        assert self.manager.scheduler.calls[-1] == ('cancel', self.section)
+
+    def test_02_resume_schedules_the_shifted_deadline(self):
+        """Test 2: Resuming schedules the auto-advance later by the time spent paused"""
+        original_deadline = self.timer.auto_advance_at
+        self.manager.pause_session(self.state.session_id, 'user-1')
+        self.timer.paused_at -= timedelta(minutes=10)
+
+        assert self.manager.resume_session(self.state.session_id, 'user-1')
+        action, section, due_at = self.manager.scheduler.calls[-1]
+
+        assert (action, section) == ('schedule', self.section)
+        assert due_at == self.timer.auto_advance_at == self.timer.expires_at
+        assert abs((due_at - original_deadline).total_seconds() - 600) < 5
+
+    def test_03_time_remaining_is_frozen_while_paused(self, monkeypatch):
+        """Test 3: A paused section neither loses time nor auto-advances"""
+        self.manager.pause_session(self.state.session_id, 'user-1')
+        self.timer.started_at -= timedelta(hours=2)
+        self.timer.paused_at -= timedelta(hours=2) - timedelta(minutes=5)
+        monkeypatch.setattr(self.manager, '_auto_advance_section',
+                            lambda *args: pytest.fail('paused section auto-advanced'))
+
+        remaining = self.manager.get_time_remaining(self.state.session_id, 'user-1')
+        assert abs(remaining - (self.timer.time_remaining - 5 * 60)) <= 1
+
+    def test_04_pause_only_in_progress(self):
+        """Test 4: Resuming a running session or pausing twice changes no timers"""
+        calls = len(self.manager.scheduler.calls)
+        assert not self.manager.resume_session(self.state.session_id, 'user-1')
+        self.manager.pause_session(self.state.session_id, 'user-1')
+        assert not self.manager.pause_session(self.state.session_id, 'user-1')
+
+        assert len(self.manager.scheduler.calls) == calls + 1
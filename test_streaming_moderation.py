@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Streaming Moderation Tests
+Partial transcripts are moderated incrementally with the batch rules, and per-session moderators are bounded
+"""
+
+import pytest
+
+import content_moderation_service
+from content_moderation_service import (ModerationSeverity, StreamingContentModerator, content_moderator,
+                                        end_streaming_moderation, get_streaming_moderator)
+
+
+def stream(moderator, text, chunk_size):
+    """Feed text in fixed-size deltas, then finalize; returns the events emitted"""
+    events = [moderator.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+    events.append(moderator.finalize())
+    return [event for event in events if event]
+
+
+@pytest.mark.unit
+class TestStreamingContentModerator:
+    """Test incremental moderation of transcript deltas"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.moderator = StreamingContentModerator('session-1', 'user-1')
+
+    def test_01_trailing_partial_word_is_held_back(self):
+        """Test 1: 'kill' is not flagged while the word may still become 'killer'"""
+        assert self.moderator.feed('I saw a kill') is None
+        assert self.moderator.feed('er whale at the aquarium ') is None
+        assert self.moderator.finalize() is None
+        assert self.moderator.current_severity == ModerationSeverity.CLEAN
+
+    def test_02_matches_across_delta_boundaries(self):
+        """Test 2: A word split across deltas is found once the word is complete"""
+        events = stream(self.moderator, 'On weekends I like to drink alcohol with friends', 3)
+
+        assert [event['severity'] for event in events] == [ModerationSeverity.MODERATE]
+        assert events[0]['category'] == 'inappropriate_topic'
+        assert events[0]['continue_assessment'] is True
+
+    def test_03_repeated_profanity_across_deltas_is_severe(self):
+        """Test 3: More than two hits of a profanity pattern over the session ends the assessment"""
+        events = [self.moderator.feed('that was stupid ', is_final=True) for _ in range(3)]
+
+        assert events[0]['severity'] == ModerationSeverity.MILD
+        assert events[1] is None
+        assert events[2]['severity'] == ModerationSeverity.SEVERE
+        assert events[2]['continue_assessment'] is False
+        assert self.moderator.feed('anything else ', is_final=True) is None
+
+    @pytest.mark.parametrize('text', [
+        'I really enjoy reading books and learning new languages.',
+        'This f***ing test is so damn hard!',
+        'I like to drink alcohol every weekend with friends.',
+        'I want to kill this exam and get the best score possible.',
+        'stupid idiot stupid moron stupid question',
+    ])
+    def test_04_final_severity_matches_batch_moderation(self, text):
+        """Test 4: Streaming in small deltas ends at the severity moderate_content gives the whole text"""
+        stream(self.moderator, text, 4)
+
+        assert self.moderator.current_severity == content_moderator.moderate_content(text)[0]
+
+
+@pytest.mark.unit
+class TestStreamingModeratorRegistry:
+    """Test the per-container moderator registry bounds"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.now = 1000.0
+        monkeypatch.setattr(content_moderation_service.time, 'monotonic', lambda: self.now)
+        monkeypatch.setattr(content_moderation_service, 'MAX_STREAMING_MODERATORS', 2)
+        monkeypatch.setattr(content_moderation_service, '_streaming_moderators',
+                            content_moderation_service.OrderedDict())
+
+    def test_01_same_session_reuses_its_moderator(self):
+        """Test 1: A session keeps its moderator until it ends"""
+        moderator = get_streaming_moderator('a')
+        assert get_streaming_moderator('a') is moderator
+
+        end_streaming_moderation('a')
+        assert get_streaming_moderator('a') is not moderator
+
+    def test_02_idle_and_surplus_moderators_are_dropped(self):
+        """Test 2: Idle moderators expire and the least recently used goes beyond the cap"""
+        a = get_streaming_moderator('a')
+        get_streaming_moderator('b')
+        get_streaming_moderator('a')
+        get_streaming_moderator('c')
+
+        assert list(content_moderation_service._streaming_moderators) == ['a', 'c']
+
+        self.now += content_moderation_service.STREAMING_MODERATOR_IDLE_SECONDS + 1
+        assert get_streaming_moderator('a') is not a
+        assert list(content_moderation_service._streaming_moderators) == ['a']
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Submission Idempotency Tests
+Retried writing submissions are evaluated once per submitter, for web and mobile clients alike
+"""
+
+import json
+
+import pytest
+
+import idempotency
+import lambda_handler
+from aws_mock_config import aws_mock
+from idempotency import REPLAY_HEADER
+
+
+@pytest.mark.unit
+class TestWritingSubmissionIdempotency:
+    """Test handle_nova_micro_writing replay"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.setattr(idempotency, '_idempotency_cache', None)
+        self.processed = []
+
+        def process(data):
+            self.processed.append(data)
+            return {'statusCode': 200, 'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({'user_email': data.get('user_email')})}
+
+        monkeypatch.setattr(lambda_handler, 'process_nova_micro_writing', process)
+        self.essay = {'essay_text': 'Some people believe ...', 'prompt': 'Discuss both views.',
+                      'assessment_type': 'academic_writing'}
+
+    def test_01_mobile_submission_without_cookie(self):
+        """Test 1: A mobile client (no cookie, session_id in the body) is evaluated, and its retry replayed"""
+        body = {**self.essay, 'session_id': 'mobile-session-1'}
+        headers = {'Content-Type': 'application/json', 'User-Agent': 'IELTS-GenAI-Prep-Mobile/1.0'}
+
+        first = lambda_handler.handle_nova_micro_writing(body, headers)
+        retry = lambda_handler.handle_nova_micro_writing(body, headers)
+
+        assert first['statusCode'] == 200
+        assert retry['headers'][REPLAY_HEADER] == 'true'
+        assert len(self.processed) == 1
+
+    def test_02_submitters_do_not_share_results(self):
+        """Test 2: The same essay from two mobile sessions is evaluated for each"""
+        lambda_handler.handle_nova_micro_writing({**self.essay, 'session_id': 'mobile-a'}, {})
+        second = lambda_handler.handle_nova_micro_writing({**self.essay, 'session_id': 'mobile-b'}, {})
+
+        assert REPLAY_HEADER not in second['headers']
+        assert len(self.processed) == 2
+
+    def test_03_web_session_user_owns_the_submission(self):
+        """Test 3: With a web session the signed-in user is the submitter, whatever the body claims"""
+        aws_mock.create_session({'session_id': 'web-idem-1', 'user_email': 'web.user@example.com'})
+        headers = {'Cookie': 'web_session_id=web-idem-1'}
+
+        try:
+            response = lambda_handler.handle_nova_micro_writing({**self.essay, 'user_email': 'other@example.com'}, headers)
+            lambda_handler.handle_nova_micro_writing({**self.essay, 'user_email': 'other@example.com'}, {})
+        finally:
+            aws_mock.delete_session('web-idem-1')
+
+        assert json.loads(response['body'])['user_email'] == 'web.user@example.com'
+        assert len(self.processed) == 2
+
+    def test_04_idempotency_key_header(self):
+        """Test 4: An Idempotency-Key header replays even if the retried body differs"""
+        headers = {'Idempotency-Key': 'retry-123'}
+        lambda_handler.handle_nova_micro_writing({**self.essay, 'session_id': 'mobile-c'}, headers)
+        retry = lambda_handler.handle_nova_micro_writing(
+            {**self.essay, 'essay_text': 'edited', 'session_id': 'mobile-c'}, headers)
+
+        assert retry['headers'][REPLAY_HEADER] == 'true'
+        assert len(self.processed) == 1
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Text Feature Extraction Tests
+The shared features must count exactly as the evaluators' original inline code did
+"""
+
+import pytest
+
+from text_features import extract_text_features, LEXICONS
+
+
+@pytest.mark.unit
+class TestTextFeatures:
+    """Test the shared text features"""
+
+    def test_01_whitespace_tokens(self):
+        """Test 1: Tokens and the type/token ratio use lowercased whitespace tokens, punctuation included"""
+        text = "Well, well. I think - I think so!"
+        features = extract_text_features(text)
+        words = text.lower().split()
+
+        assert features.tokens == tuple(words)
+        assert features.word_count == len(text.split()) == 8
+        assert features.type_token_ratio == len(set(words)) / len(words)
+
+    def test_02_sentence_counts(self):
+        """Test 2: Sentences are non-empty '.' segments; average length counts '.', '!' and '?'"""
+        text = "Is it? Yes! It is. Definitely..."
+        features = extract_text_features(text)
+
+        assert features.sentence_count == len([s for s in text.split('.') if s.strip()]) == 2
+        assert features.avg_sentence_length == len(text.split()) / 6
+        assert extract_text_features("no punctuation at all").avg_sentence_length == 4
+
+    def test_03_paragraphs(self):
+        """Test 3: Paragraphs are counted from blank-line separators"""
+        assert extract_text_features("One.\n\nTwo.\n\nThree.").paragraph_count == 3
+        assert extract_text_features("").paragraph_count == 1
+
+    def test_04_lexicon_terms_match_as_substrings(self):
+        """Test 4: Lexicon terms match anywhere in the lowercased text, as the inline checks did"""
+        text = "However, what I have been told Which matters"
+        features = extract_text_features(text)
+
+        for lexicon, terms in LEXICONS.items():
+            assert features.distinct_hits(lexicon) == sum(1 for term in terms if term in text.lower())
+            assert features.lexicon_hits[lexicon] == tuple(term for term in terms if term in text.lower())
+        assert 'that' not in features.lexicon_hits['complex_grammar']
+        assert 'been' in features.lexicon_hits['complex_grammar']
+
+    def test_05_shared_features_are_read_only(self):
+        """Test 5: The memoized features are shared and cannot be changed through the hits"""
+        features = extract_text_features("which is sustainable")
+
+        assert extract_text_features("which is sustainable") is features
+        with pytest.raises(TypeError):
+            features.lexicon_hits['complex_grammar'] = ()
+        with pytest.raises(AttributeError):
+            features.lexicon_hits['complex_grammar'].append('that')
+
+    def test_06_empty_text(self):
+        """Test 6: Missing text has no tokens and no hits"""
+        features = extract_text_features(None)
+
+        assert features.word_count == 0
+        assert features.type_token_ratio == 0.0
+        assert features.sentence_count == 0
+        assert features.distinct_hits('complex_indicators') == 0
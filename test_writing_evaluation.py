@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Writing Evaluation Mode Tests
+WRITING_EVALUATION_MODE selects per-criterion Nova Micro calls, one Nova Micro call or local scoring
+"""
+
+import io
+import json
+
+import boto3
+import pytest
+
+import lambda_handler
+from evaluation_orchestrator import WRITING_CRITERIA
+
+
+class FakeBedrockClient:
+    """invoke_model that answers criterion and all-criteria prompts and records each request"""
+
+    def __init__(self, fail_criteria=False):
+        self.fail_criteria = fail_criteria
+        self.requests = []
+
+    def invoke_model(self, modelId, body, contentType):
+        prompt = json.loads(body)['messages'][0]['content'][0]['text']
+        self.requests.append(prompt)
+        if 'Assess only' in prompt:
+            if self.fail_criteria:
+                raise RuntimeError('ThrottlingException')
+            reply = {'band': 7.0, 'feedback': 'criterion feedback'}
+        else:
+            reply = {criterion: {'band': 6.5, 'feedback': f'{criterion} feedback'} for criterion in WRITING_CRITERIA}
+        text = f"Here is the assessment: {json.dumps(reply)}"
+        return {'body': io.BytesIO(json.dumps({'output': {'message': {'content': [{'text': text}]}}}).encode())}
+
+
+@pytest.mark.unit
+class TestWritingEvaluationMode:
+    """Test evaluate_writing_concurrently in each mode"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+        self.template = lambda_handler.prompt_templates.get_template(
+            'academic_writing', lambda_handler.get_fallback_writing_rubric, 2)
+        self.essay = 'However, many people believe that technology has been beneficial. ' * 30
+
+    def evaluate(self, mode, client=None):
+        self.monkeypatch.setattr(lambda_handler, 'WRITING_EVALUATION_MODE', mode)
+        self.client = client or FakeBedrockClient()
+        self.monkeypatch.setattr(boto3, 'client', lambda *args, **kwargs: self.client)
+        return lambda_handler.evaluate_writing_concurrently(self.essay, 'Discuss both views.', self.template,
+                                                            'academic_writing')
+
+    def test_01_per_criterion(self):
+        """Test 1: Each criterion is one Nova Micro call"""
+        evaluation = self.evaluate('per_criterion')
+
+        assert evaluation['evaluation_mode'] == 'per_criterion'
+        assert len(self.client.requests) == len(WRITING_CRITERIA)
+        assert evaluation['criteria_scores'] == {criterion: 7.0 for criterion in WRITING_CRITERIA}
+        assert evaluation['overall_band'] == 7.0
+
+    def test_02_fallback_is_one_model_call(self):
+        """Test 2: When the fan-out fails, the fallback asks Nova Micro once for all criteria"""
+        evaluation = self.evaluate('per_criterion', FakeBedrockClient(fail_criteria=True))
+
+        assert evaluation['evaluation_mode'] == 'single_call'
+        assert sum(1 for prompt in self.client.requests if 'Assess only' not in prompt) == 1
+        assert evaluation['criteria_scores'] == {criterion: 6.5 for criterion in WRITING_CRITERIA}
+        assert evaluation['criteria_feedback']['lexical_resource'] == 'lexical_resource feedback'
+
+    def test_03_single_call(self):
+        """Test 3: single_call mode sends exactly one request"""
+        evaluation = self.evaluate('single_call')
+
+        assert evaluation['evaluation_mode'] == 'single_call'
+        assert len(self.client.requests) == 1
+        assert all(criterion in self.client.requests[0] for criterion in WRITING_CRITERIA)
+        assert evaluation['overall_band'] == 6.5
+        assert evaluation['word_count'] == len(self.essay.split())
+
+    def test_04_local_does_not_call_bedrock(self):
+        """Test 4: local mode scores with the content heuristics only"""
+        evaluation = self.evaluate('local')
+
+        assert evaluation['evaluation_mode'] == 'local'
+        assert self.client.requests == []
+        assert set(evaluation['criteria_scores']) == set(WRITING_CRITERIA)
@@ -0,0 +1,127 @@
+"""
+Text Feature Extraction for IELTS Evaluators
+Tokens, counts and lexicon checks shared by the speaking and writing evaluators, memoized
+per text so an essay or transcript is only tokenized once whichever evaluators read it
+"""
+
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple
+
+# Maximum number of analysed texts kept in the per-container cache
+FEATURE_CACHE_SIZE = 1024
+
+# Word lists used by the evaluators (terms are matched as substrings of the lowercased text)
+LEXICONS: Dict[str, Tuple[str, ...]] = {
+    # Speaking (lambda_handler.evaluate_speaking_with_nova_micro)
+    'speaking_complex_words': (
+        'multicultural', 'responsibilities', 'conservation', 'authentic', 'dramatically',
+        'sustainable', 'environmentally', 'comprehensive', 'globalized'
+    ),
+    'speaking_complex_structures': ('have been', 'would use', 'which is', 'that requires', 'increasingly'),
+    # Writing (lambda_handler.evaluate_writing_with_nova_micro)
+    'writing_task_words': (
+        'shows', 'illustrates', 'demonstrates', 'according to', 'overall', 'in conclusion',
+        'however', 'furthermore'
+    ),
+    'coherence_words': (
+        'firstly', 'secondly', 'moreover', 'furthermore', 'in addition', 'however',
+        'nevertheless', 'in conclusion'
+    ),
+    'writing_complex_words': (
+        'significant', 'approximately', 'dramatically', 'proportion', 'accommodation',
+        'correspondingly', 'predominant'
+    ),
+    'complex_grammar': ('which', 'that', 'although', 'despite', 'having', 'been', 'would', 'could', 'should'),
+    # Speaking band scoring (ielts_band_scoring.IELTSBandScorer)
+    'complex_indicators': ('because', 'although', 'however', 'therefore', 'which', 'that', 'when', 'if'),
+    'example_indicators': ('because', 'although', 'however', 'when', 'if', 'which')
+}
+
+class TextFeatures:
+    """
+    Features of one text (shared between callers and read-only)
+
+    Tokens are split up front since every evaluator reads them; the vocabulary and
+    sentence count are only built for the evaluators that ask for them.
+    """
+
+    __slots__ = ('text', 'text_lower', 'tokens', '_vocabulary', '_sentence_count')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.text_lower = text.lower()
+        # Lowercased whitespace-delimited tokens
+        self.tokens = tuple(self.text_lower.split())
+        self._vocabulary: Optional[FrozenSet[str]] = None
+        self._sentence_count: Optional[int] = None
+
+    @property
+    def word_count(self) -> int:
+        """Whitespace-delimited word count, matching the word counter shown in the editors"""
+        return len(self.tokens)
+
+    @property
+    def vocabulary(self) -> FrozenSet[str]:
+        if self._vocabulary is None:
+            self._vocabulary = frozenset(self.tokens)
+        return self._vocabulary
+
+    @property
+    def type_token_ratio(self) -> float:
+        return len(self.vocabulary) / len(self.tokens) if self.tokens else 0.0
+
+    @property
+    def sentence_count(self) -> int:
+        """Non-empty '.'-separated segments"""
+        if self._sentence_count is None:
+            self._sentence_count = sum(1 for segment in self.text.split('.') if segment.strip())
+        return self._sentence_count
+
+    @property
+    def avg_sentence_length(self) -> float:
+        """Words per terminal punctuation mark ('.', '!' or '?')"""
+        text = self.text
+        return len(self.tokens) / max(text.count('.') + text.count('!') + text.count('?'), 1)
+
+    @property
+    def paragraph_count(self) -> int:
+        return self.text.count('\n\n') + 1
+
+    @property
+    def lexicon_hits(self) -> Mapping[str, Tuple[str, ...]]:
+        """Read-only {lexicon: terms present in the text}"""
+        text_lower = self.text_lower
+        return MappingProxyType({
+            name: tuple(term for term in terms if term in text_lower) for name, terms in LEXICONS.items()
+        })
+
+    def distinct_hits(self, lexicon: str) -> int:
+        """Number of different terms from a lexicon that occur in the text"""
+        text_lower = self.text_lower
+        return sum(1 for term in LEXICONS[lexicon] if term in text_lower)
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def _cached_features(text: str) -> TextFeatures:
+    return TextFeatures(text)
+
+
+def extract_text_features(text: Optional[str]) -> TextFeatures:
+    """
+    Get the shared features of a text
+
+    Args:
+        text: Essay, transcript or spoken response text
+
+    Returns:
+        TextFeatures (memoized per text, shared by every evaluator in the container)
+    """
+    return _cached_features(text or '')
+
+
+__all__ = [
+    'LEXICONS',
+    'TextFeatures',
+    'extract_text_features'
+]